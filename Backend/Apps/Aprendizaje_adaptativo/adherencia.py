@@ -0,0 +1,118 @@
+"""
+Adherencia al plan de estudio: minutos planificados frente a completados.
+
+Los minutos salen de una sola consulta agrupada por día y TemaDificultad
+(Sum de duracion_minutos, con y sin completada) sobre las sesiones de
+estudio y repaso; los descansos no cuentan. Los totales por día, por tema y
+por método se arman sumando esas pocas filas, sin cargar sesiones.
+
+La adherencia móvil de cada día cubre los últimos `ventana` días. Se calcula
+con sumas acumuladas sobre la serie diaria (O(días), no O(días x ventana));
+para eso la consulta empieza ventana - 1 días antes de desde.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import accumulate
+
+from django.db.models import Q, Sum
+
+from .models import SesionEstudio
+
+TIPOS_PLANIFICADOS = ["estudio", "repaso"]
+VENTANA_MOVIL = 7
+MAX_VENTANA = 90
+MAX_DIAS = 366
+
+
+def _porcentaje(completados, planificados):
+    return round(completados * 100 / planificados, 1) if planificados else None
+
+
+def _fila(planificados, completados, **datos):
+    return {
+        **datos,
+        "planificados": planificados,
+        "completados": completados,
+        "adherencia": _porcentaje(completados, planificados),
+    }
+
+
+def adherencia_estudio(usuario_id, desde, hasta, ventana=VENTANA_MOVIL):
+    """Minutos planificados, completados y adherencia del usuario en [desde, hasta]"""
+    inicio_consulta = desde - timedelta(days=ventana - 1)
+    filas = (
+        SesionEstudio.objects.filter(
+            usuario_id=usuario_id,
+            tipo_sesion__in=TIPOS_PLANIFICADOS,
+            fecha__range=(inicio_consulta, hasta),
+        )
+        .order_by()
+        .values(
+            "fecha",
+            "tema_dificultad_id",
+            "tema_dificultad__tema__nombre",
+            "tema_dificultad__metodo_estudio",
+        )
+        .annotate(
+            planificados=Sum("duracion_minutos"),
+            completados=Sum("duracion_minutos", filter=Q(completada=True), default=0),
+        )
+    )
+
+    dias = (hasta - inicio_consulta).days + 1
+    planificados_dia = [0] * dias
+    completados_dia = [0] * dias
+    por_tema = {}
+    por_metodo = defaultdict(lambda: [0, 0])
+
+    for fila in filas:
+        indice = (fila["fecha"] - inicio_consulta).days
+        planificados_dia[indice] += fila["planificados"]
+        completados_dia[indice] += fila["completados"]
+        if fila["fecha"] < desde:
+            continue  # solo sirve para la ventana móvil de los primeros días
+
+        tema = por_tema.setdefault(fila["tema_dificultad_id"], {
+            "tema": fila["tema_dificultad__tema__nombre"],
+            "metodo": fila["tema_dificultad__metodo_estudio"],
+            "minutos": [0, 0],
+        })
+        tema["minutos"][0] += fila["planificados"]
+        tema["minutos"][1] += fila["completados"]
+        metodo = por_metodo[fila["tema_dificultad__metodo_estudio"]]
+        metodo[0] += fila["planificados"]
+        metodo[1] += fila["completados"]
+
+    # Sumas acumuladas con un cero adelante: la ventana que termina en i es acum[i + 1] - acum[i + 1 - ventana]
+    acum_planificados = [0, *accumulate(planificados_dia)]
+    acum_completados = [0, *accumulate(completados_dia)]
+    por_dia = []
+    for indice in range(ventana - 1, dias):
+        fin, inicio = indice + 1, indice + 1 - ventana
+        por_dia.append(_fila(
+            planificados_dia[indice],
+            completados_dia[indice],
+            fecha=inicio_consulta + timedelta(days=indice),
+            adherencia_movil=_porcentaje(
+                acum_completados[fin] - acum_completados[inicio],
+                acum_planificados[fin] - acum_planificados[inicio],
+            ),
+        ))
+
+    total_planificados = sum(dia["planificados"] for dia in por_dia)
+    total_completados = sum(dia["completados"] for dia in por_dia)
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "ventana": ventana,
+        "total": _fila(total_planificados, total_completados),
+        "por_dia": por_dia,
+        "por_tema": [
+            _fila(*datos.pop("minutos"), tema_dificultad=tema_id, **datos)
+            for tema_id, datos in sorted(por_tema.items())
+        ],
+        "por_metodo": [
+            _fila(planificados, completados, metodo=metodo)
+            for metodo, (planificados, completados) in sorted(por_metodo.items())
+        ],
+    }
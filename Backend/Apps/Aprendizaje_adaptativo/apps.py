@@ -5,4 +5,5 @@ class AprendizajeAdaptativoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "Apps.Aprendizaje_adaptativo"
 
-
+    def ready(self):
+        from . import signals  # noqa: F401
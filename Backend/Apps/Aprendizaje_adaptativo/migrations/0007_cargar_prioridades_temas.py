@@ -1,8 +1,8 @@
 from django.db import migrations
 
 def cargar_prioridades(apps, schema_editor):
-    Tema = apps.get_model("aprendizaje_adaptativo", "Tema")
-    TemaPrioridad = apps.get_model("aprendizaje_adaptativo", "TemaPrioridad")
+    Tema = apps.get_model("Aprendizaje_adaptativo", "Tema")
+    TemaPrioridad = apps.get_model("Aprendizaje_adaptativo", "PrioridadMetodoTema")
 
     prioridades = [
         # Cálculo / Física / Química — 20 temas
@@ -46,7 +46,7 @@ def cargar_prioridades(apps, schema_editor):
             print(f"Tema NO encontrado en BD: {nombre}")
 
 def revertir_prioridades(apps, schema_editor):
-    TemaPrioridad = apps.get_model("aprendizaje_adaptativo", "TemaPrioridad")
+    TemaPrioridad = apps.get_model("Aprendizaje_adaptativo", "PrioridadMetodoTema")
     TemaPrioridad.objects.all().delete()
 
 class Migration(migrations.Migration):
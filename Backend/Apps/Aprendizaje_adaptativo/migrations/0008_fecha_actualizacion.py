@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Aprendizaje_adaptativo", "0007_cargar_prioridades_temas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="planificacionadaptativa",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="sesionestudio",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 13:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Aprendizaje_adaptativo", "0008_fecha_actualizacion"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sesionestudio",
+            index=models.Index(
+                fields=["usuario", "fecha"], name="Aprendizaje_usuario_19e4e5_idx"
+            ),
+        ),
+    ]
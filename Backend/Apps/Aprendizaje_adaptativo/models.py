@@ -92,9 +92,13 @@ class SesionEstudio(models.Model):
     numero_sesion = models.IntegerField()  # Número de sesión dentro del plan
     completada = models.BooleanField(default=False)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['fecha', 'hora_inicio']
+        indexes = [
+            models.Index(fields=['usuario', 'fecha']),
+        ]
     
     def __str__(self):
         return f"Sesión {self.numero_sesion} - {self.tema_dificultad.tema.nombre} ({self.fecha})"
@@ -110,6 +114,7 @@ class PlanificacionAdaptativa(models.Model):
     sesiones_completadas = models.IntegerField(default=0)
     activa = models.BooleanField(default=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"Planificación {self.tema_dificultad.tema.nombre} - {self.usuario.username}"
@@ -1,4 +1,40 @@
-from .models import PerfilAprendizaje, PrioridadMetodoTema, RecomendacionEstudio
+import math
+from datetime import datetime, timedelta, time
+
+from .models import (
+    PerfilAprendizaje, PrioridadMetodoTema, RecomendacionEstudio, SesionEstudio, PlanificacionAdaptativa
+)
+from .serializers import PlanificacionAdaptativaSerializer
+
+# Configuración de parámetros por método de estudio y dificultad
+METODOS_CONFIG = {
+    'Pomodoro': {
+        'duracion_estudio': 25,
+        'duracion_descanso_corto': 5,
+        'duracion_descanso_largo': 15,
+        'sesiones_por_ciclo': 4,
+    },
+    'Feynman': {
+        'duracion_estudio': 30,
+        'duracion_descanso': 10,
+        'sesiones_por_ciclo': 3,
+    },
+    'Leitner': {
+        'duracion_estudio': 20,
+        'duracion_descanso': 5,
+        'sesiones_por_ciclo': 5,
+    },
+}
+
+# Multiplicadores de sesiones según dificultad
+MULTIPLICADORES_DIFICULTAD = {
+    'baja': 0.7,    # Menos sesiones
+    'media': 1.0,   # Sesiones normales
+    'alta': 1.5,    # Más sesiones
+}
+
+# Sesiones base recomendadas
+SESIONES_BASE = 6
 
 
 def recomendar_metodo(usuario, tema):
@@ -40,3 +76,226 @@ def recomendar_metodo(usuario, tema):
     )
 
     return metodo_elegido, razon
+
+
+def crear_planificacion(tema_dificultad, fecha_inicio, hora_preferida_str, dias_disponibles):
+    """Genera las sesiones de estudio según la dificultad y el método"""
+
+    # Obtener configuración del método
+    metodo = tema_dificultad.metodo_estudio
+    if metodo not in METODOS_CONFIG:
+        metodo = 'Pomodoro'  # Por defecto
+
+    config = METODOS_CONFIG[metodo]
+    multiplicador = MULTIPLICADORES_DIFICULTAD[tema_dificultad.dificultad]
+
+    # Calcular número total de sesiones
+    total_sesiones = math.ceil(SESIONES_BASE * multiplicador)
+
+    # Mapeo de días de la semana
+    dias_map = {
+        'lunes': 0, 'martes': 1, 'miercoles': 2, 'jueves': 3,
+        'viernes': 4, 'sabado': 5, 'domingo': 6
+    }
+    dias_validos = [dias_map[d] for d in dias_disponibles if d in dias_map]
+
+    # Crear la planificación
+    sesiones_creadas = []
+    fecha_actual = fecha_inicio
+    numero_sesion = 1
+
+    # Convertir hora preferida
+    try:
+        hora_inicio = datetime.strptime(hora_preferida_str, '%H:%M').time()
+    except ValueError:
+        hora_inicio = time(9, 0)  # 9:00 AM por defecto
+
+    while numero_sesion <= total_sesiones:
+        # Verificar si el día actual está en los días disponibles
+        if fecha_actual.weekday() in dias_validos:
+            hora_actual = datetime.combine(fecha_actual, hora_inicio)
+
+            # Generar sesiones según el método
+            if metodo == 'Pomodoro':
+                sesiones_dia = _sesiones_pomodoro(
+                    tema_dificultad, fecha_actual, hora_actual, numero_sesion, config
+                )
+            elif metodo == 'Feynman':
+                sesiones_dia = _sesiones_feynman(
+                    tema_dificultad, fecha_actual, hora_actual, numero_sesion, config
+                )
+            elif metodo == 'Leitner':
+                sesiones_dia = _sesiones_leitner(
+                    tema_dificultad, fecha_actual, hora_actual, numero_sesion, config
+                )
+            else:
+                sesiones_dia = _sesiones_pomodoro(
+                    tema_dificultad, fecha_actual, hora_actual, numero_sesion, config
+                )
+
+            sesiones_creadas.extend(sesiones_dia)
+            numero_sesion += len([s for s in sesiones_dia if s.tipo_sesion == 'estudio'])
+
+        # Avanzar al siguiente día
+        fecha_actual += timedelta(days=1)
+
+        # Limitar a 30 días para evitar bucles infinitos
+        if (fecha_actual - fecha_inicio).days > 30:
+            break
+
+    # Calcular fecha de fin
+    fecha_fin = max(s.fecha for s in sesiones_creadas) if sesiones_creadas else fecha_inicio
+
+    # Crear el registro de planificación
+    planificacion = PlanificacionAdaptativa.objects.create(
+        usuario=tema_dificultad.usuario,
+        tema_dificultad=tema_dificultad,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        total_sesiones=len([s for s in sesiones_creadas if s.tipo_sesion == 'estudio'])
+    )
+
+    # Serializar respuesta
+    serializer = PlanificacionAdaptativaSerializer(planificacion)
+
+    return {
+        "mensaje": "Planificación generada con éxito",
+        "planificacion": serializer.data,
+        "sesiones_generadas": len(sesiones_creadas)
+    }
+
+
+def _sesiones_pomodoro(tema_dificultad, fecha, hora_inicio, numero_sesion, config):
+    """Genera sesiones siguiendo la técnica Pomodoro"""
+    sesiones = []
+    hora_actual = hora_inicio
+
+    # Generar un ciclo Pomodoro (4 sesiones de estudio con descansos)
+    for i in range(config['sesiones_por_ciclo']):
+        # Sesión de estudio
+        hora_fin = hora_actual + timedelta(minutes=config['duracion_estudio'])
+        sesion_estudio = SesionEstudio.objects.create(
+            usuario=tema_dificultad.usuario,
+            tema_dificultad=tema_dificultad,
+            tipo_sesion='estudio',
+            fecha=fecha,
+            hora_inicio=hora_actual.time(),
+            hora_fin=hora_fin.time(),
+            duracion_minutos=config['duracion_estudio'],
+            numero_sesion=numero_sesion + i
+        )
+        sesiones.append(sesion_estudio)
+        hora_actual = hora_fin
+
+        # Descanso (corto o largo)
+        if i < config['sesiones_por_ciclo'] - 1:
+            # Descanso corto
+            hora_fin = hora_actual + timedelta(minutes=config['duracion_descanso_corto'])
+            sesion_descanso = SesionEstudio.objects.create(
+                usuario=tema_dificultad.usuario,
+                tema_dificultad=tema_dificultad,
+                tipo_sesion='descanso',
+                fecha=fecha,
+                hora_inicio=hora_actual.time(),
+                hora_fin=hora_fin.time(),
+                duracion_minutos=config['duracion_descanso_corto'],
+                numero_sesion=numero_sesion + i
+            )
+            sesiones.append(sesion_descanso)
+            hora_actual = hora_fin
+        else:
+            # Descanso largo al final del ciclo
+            hora_fin = hora_actual + timedelta(minutes=config['duracion_descanso_largo'])
+            sesion_descanso = SesionEstudio.objects.create(
+                usuario=tema_dificultad.usuario,
+                tema_dificultad=tema_dificultad,
+                tipo_sesion='descanso',
+                fecha=fecha,
+                hora_inicio=hora_actual.time(),
+                hora_fin=hora_fin.time(),
+                duracion_minutos=config['duracion_descanso_largo'],
+                numero_sesion=numero_sesion + i
+            )
+            sesiones.append(sesion_descanso)
+
+    return sesiones
+
+
+def _sesiones_feynman(tema_dificultad, fecha, hora_inicio, numero_sesion, config):
+    """Genera sesiones siguiendo la técnica Feynman"""
+    sesiones = []
+    hora_actual = hora_inicio
+
+    for i in range(config['sesiones_por_ciclo']):
+        # Sesión de estudio
+        hora_fin = hora_actual + timedelta(minutes=config['duracion_estudio'])
+        sesion_estudio = SesionEstudio.objects.create(
+            usuario=tema_dificultad.usuario,
+            tema_dificultad=tema_dificultad,
+            tipo_sesion='estudio',
+            fecha=fecha,
+            hora_inicio=hora_actual.time(),
+            hora_fin=hora_fin.time(),
+            duracion_minutos=config['duracion_estudio'],
+            numero_sesion=numero_sesion + i
+        )
+        sesiones.append(sesion_estudio)
+        hora_actual = hora_fin
+
+        # Descanso
+        hora_fin = hora_actual + timedelta(minutes=config['duracion_descanso'])
+        sesion_descanso = SesionEstudio.objects.create(
+            usuario=tema_dificultad.usuario,
+            tema_dificultad=tema_dificultad,
+            tipo_sesion='descanso',
+            fecha=fecha,
+            hora_inicio=hora_actual.time(),
+            hora_fin=hora_fin.time(),
+            duracion_minutos=config['duracion_descanso'],
+            numero_sesion=numero_sesion + i
+        )
+        sesiones.append(sesion_descanso)
+        hora_actual = hora_fin
+
+    return sesiones
+
+
+def _sesiones_leitner(tema_dificultad, fecha, hora_inicio, numero_sesion, config):
+    """Genera sesiones siguiendo la técnica Leitner"""
+    sesiones = []
+    hora_actual = hora_inicio
+
+    for i in range(config['sesiones_por_ciclo']):
+        tipo = 'repaso' if i % 2 == 0 else 'estudio'
+
+        # Sesión de estudio o repaso
+        hora_fin = hora_actual + timedelta(minutes=config['duracion_estudio'])
+        sesion = SesionEstudio.objects.create(
+            usuario=tema_dificultad.usuario,
+            tema_dificultad=tema_dificultad,
+            tipo_sesion=tipo,
+            fecha=fecha,
+            hora_inicio=hora_actual.time(),
+            hora_fin=hora_fin.time(),
+            duracion_minutos=config['duracion_estudio'],
+            numero_sesion=numero_sesion + i
+        )
+        sesiones.append(sesion)
+        hora_actual = hora_fin
+
+        # Descanso
+        hora_fin = hora_actual + timedelta(minutes=config['duracion_descanso'])
+        sesion_descanso = SesionEstudio.objects.create(
+            usuario=tema_dificultad.usuario,
+            tema_dificultad=tema_dificultad,
+            tipo_sesion='descanso',
+            fecha=fecha,
+            hora_inicio=hora_actual.time(),
+            hora_fin=hora_fin.time(),
+            duracion_minutos=config['duracion_descanso'],
+            numero_sesion=numero_sesion + i
+        )
+        sesiones.append(sesion_descanso)
+        hora_actual = hora_fin
+
+    return sesiones
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from Apps.Calendario.versiones import incrementar_version
+from .models import SesionEstudio, PlanificacionAdaptativa
+
+
+@receiver([post_save, post_delete], sender=SesionEstudio)
+def sesion_modificada(sender, instance, **kwargs):
+    incrementar_version(instance.usuario_id, "sesiones")
+
+
+@receiver([post_save, post_delete], sender=PlanificacionAdaptativa)
+def planificacion_modificada(sender, instance, **kwargs):
+    incrementar_version(instance.usuario_id, "planificaciones")
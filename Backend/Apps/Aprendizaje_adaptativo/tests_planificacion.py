@@ -5,7 +5,8 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from datetime import date, time
+from datetime import date, time, timedelta
+from .adherencia import adherencia_estudio
 from .models import Curso, Tema, TemaDificultad, SesionEstudio, PlanificacionAdaptativa
 
 User = get_user_model()
@@ -321,3 +322,105 @@ class PlanificacionAdaptativaTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['total_sesiones'], 6)
+
+
+class AdherenciaEstudioTests(TestCase):
+    """Tests para la adherencia al plan de estudio"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        curso = Curso.objects.create(nombre='Matemáticas')
+        self.calculo = TemaDificultad.objects.create(
+            usuario=self.user, tema=Tema.objects.create(curso=curso, nombre='Cálculo'),
+            dificultad='alta', metodo_estudio='Pomodoro'
+        )
+        self.algebra = TemaDificultad.objects.create(
+            usuario=self.user, tema=Tema.objects.create(curso=curso, nombre='Álgebra'),
+            dificultad='baja', metodo_estudio='Feynman'
+        )
+        self.numero = 0
+
+    def crear_sesion(self, tema_dificultad, fecha, minutos, completada, tipo='estudio'):
+        self.numero += 1
+        return SesionEstudio.objects.create(
+            usuario=self.user, tema_dificultad=tema_dificultad, tipo_sesion=tipo,
+            fecha=fecha, hora_inicio=time(9, 0), hora_fin=time(10, 0),
+            duracion_minutos=minutos, numero_sesion=self.numero, completada=completada
+        )
+
+    def test_agrega_por_dia_tema_y_metodo(self):
+        """Test: Los minutos se agregan por día, tema y método en una consulta"""
+        dia = lambda n: date(2025, 9, n)
+        self.crear_sesion(self.calculo, dia(1), 50, True)
+        self.crear_sesion(self.calculo, dia(1), 10, False, tipo='descanso')  # no cuenta
+        self.crear_sesion(self.calculo, dia(2), 50, False)
+        self.crear_sesion(self.algebra, dia(2), 30, True, tipo='repaso')
+        self.crear_sesion(self.algebra, dia(3), 40, True)
+        self.crear_sesion(self.algebra, dia(10), 40, True)  # fuera del rango
+
+        with self.assertNumQueries(1):
+            resultado = adherencia_estudio(self.user.pk, dia(1), dia(3), ventana=2)
+
+        self.assertEqual(resultado['total'], {'planificados': 170, 'completados': 120, 'adherencia': 70.6})
+        self.assertEqual(resultado['por_dia'], [
+            {'fecha': dia(1), 'planificados': 50, 'completados': 50, 'adherencia': 100.0, 'adherencia_movil': 100.0},
+            {'fecha': dia(2), 'planificados': 80, 'completados': 30, 'adherencia': 37.5, 'adherencia_movil': 61.5},
+            {'fecha': dia(3), 'planificados': 40, 'completados': 40, 'adherencia': 100.0, 'adherencia_movil': 58.3},
+        ])
+        self.assertEqual(resultado['por_tema'], [
+            {'tema_dificultad': self.calculo.id, 'tema': 'Cálculo', 'metodo': 'Pomodoro',
+             'planificados': 100, 'completados': 50, 'adherencia': 50.0},
+            {'tema_dificultad': self.algebra.id, 'tema': 'Álgebra', 'metodo': 'Feynman',
+             'planificados': 70, 'completados': 70, 'adherencia': 100.0},
+        ])
+        self.assertEqual(
+            [(m['metodo'], m['adherencia']) for m in resultado['por_metodo']],
+            [('Feynman', 100.0), ('Pomodoro', 50.0)],
+        )
+
+    def test_ventana_movil_incluye_dias_previos_al_rango(self):
+        """Test: La adherencia móvil del primer día mira los días anteriores a desde"""
+        inicio = date(2025, 9, 10)
+        self.crear_sesion(self.calculo, inicio - timedelta(days=3), 60, False)
+        self.crear_sesion(self.calculo, inicio, 60, True)
+
+        resultado = adherencia_estudio(self.user.pk, inicio, inicio, ventana=7)
+
+        self.assertEqual(resultado['por_dia'][0]['adherencia'], 100.0)
+        self.assertEqual(resultado['por_dia'][0]['adherencia_movil'], 50.0)
+        self.assertEqual(resultado['total']['planificados'], 60)
+        self.assertEqual(resultado['por_tema'][0]['planificados'], 60)
+
+    def test_endpoint_semestre(self):
+        """Test: Un semestre de sesiones se resume con una consulta y días sin sesiones en cero"""
+        inicio = date(2025, 8, 1)
+        for i in range(0, 140, 2):
+            self.crear_sesion(self.calculo, inicio + timedelta(days=i), 50, i % 4 == 0)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/aprendizaje_adaptativo/adherencia/',
+                {'desde': '2025-08-01', 'hasta': '2025-12-18', 'ventana': 14}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['por_dia']), 140)
+        self.assertEqual(response.data['por_dia'][1]['planificados'], 0)
+        self.assertEqual(response.data['total']['adherencia'], 50.0)
+
+    def test_endpoint_valida_parametros(self):
+        """Test: Rangos invertidos o demasiado largos y ventanas inválidas responden 400"""
+        for parametros in [
+            {'desde': '2025-09-10', 'hasta': '2025-09-01'},
+            {'desde': '2024-01-01', 'hasta': '2025-09-01'},
+            {'ventana': '0'},
+            {'ventana': 'semana'},
+        ]:
+            response = self.client.get('/aprendizaje_adaptativo/adherencia/', parametros)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,16 @@
+"""
+Trabajos en segundo plano del aprendizaje adaptativo (ver Apps.Cola_trabajos).
+"""
+from datetime import date
+
+from Apps.Cola_trabajos.cola import trabajo
+from .models import TemaDificultad
+from .services import crear_planificacion
+
+
+@trabajo
+def generar_planificacion(tema_dificultad_id, fecha_inicio, hora_preferida, dias_disponibles):
+    tema_dificultad = TemaDificultad.objects.get(id=tema_dificultad_id)
+    return crear_planificacion(
+        tema_dificultad, date.fromisoformat(fecha_inicio), hora_preferida, dias_disponibles
+    )
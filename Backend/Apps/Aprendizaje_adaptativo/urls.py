@@ -1,11 +1,9 @@
 # Apps/Aprendizaje_adaptativo/urls.py
 from django.urls import path
 from .views import (
-    TestPerfilView, CursoTemaView, TemaDificultadView,
-    GenerarPlanificacionView, PlanificacionesView, SesionesEstudioView,
-    RecomendarMetodoAPIView
     TestPerfilView, PerfilAprendizajeView, CursoTemaView, TemaDificultadView,
-    GenerarPlanificacionView, PlanificacionesView, SesionesEstudioView
+    GenerarPlanificacionView, PlanificacionesView, SesionesEstudioView,
+    RecomendarMetodoAPIView, AdherenciaEstudioView
 )
 
 
@@ -24,6 +22,7 @@ urlpatterns = [
     
     path('generar-planificacion/', GenerarPlanificacionView.as_view(), name='generar-planificacion'),
     # http://localhost:8000/aprendizaje_adaptativo/generar-planificacion/
+    # Con {"asincrono": true} responde 202 y el avance se consulta en /cola/api/trabajos/<id>/
     
     path('planificaciones/', PlanificacionesView.as_view(), name='planificaciones'),
     # http://localhost:8000/aprendizaje_adaptativo/planificaciones/
@@ -37,4 +36,7 @@ urlpatterns = [
     path("recomendar-metodo/", RecomendarMetodoAPIView.as_view(), name="recomendar-metodo"),
     # http://localhost:8000/aprendizaje_adaptativo/recomendar-metodo/
 
+    path('adherencia/', AdherenciaEstudioView.as_view(), name='adherencia-estudio'),
+    # http://localhost:8000/aprendizaje_adaptativo/adherencia/?desde=2025-08-01&hasta=2025-12-15&ventana=7
+
 ]
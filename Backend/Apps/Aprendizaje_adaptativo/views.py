@@ -12,45 +12,31 @@ from .serializers import (
     SesionEstudioSerializer, PlanificacionAdaptativaSerializer
 )
 from django.db.models import Sum
-from datetime import datetime, timedelta, time
-import math
+from datetime import datetime, timedelta
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
-from .services import recomendar_metodo
+from .services import crear_planificacion, recomendar_metodo
 from .models import Tema
+from Apps.Calendario.paginacion import KeysetPagination
+from Apps.Calendario.versiones import responder_condicional
+from Apps.Cola_trabajos.cola import encolar
+from django.urls import reverse
+from .trabajos import generar_planificacion
+from django.utils import timezone
+from Apps.Calendario.services import parsear_rango_fechas
+from .adherencia import adherencia_estudio, MAX_DIAS, MAX_VENTANA, VENTANA_MOVIL
 
-# Configuración de parámetros por método de estudio y dificultad
-METODOS_CONFIG = {
-    'Pomodoro': {
-        'duracion_estudio': 25,
-        'duracion_descanso_corto': 5,
-        'duracion_descanso_largo': 15,
-        'sesiones_por_ciclo': 4,
-    },
-    'Feynman': {
-        'duracion_estudio': 30,
-        'duracion_descanso': 10,
-        'sesiones_por_ciclo': 3,
-    },
-    'Leitner': {
-        'duracion_estudio': 20,
-        'duracion_descanso': 5,
-        'sesiones_por_ciclo': 5,
-    },
-}
-
-# Multiplicadores de sesiones según dificultad
-MULTIPLICADORES_DIFICULTAD = {
-    'baja': 0.7,    # Menos sesiones
-    'media': 1.0,   # Sesiones normales
-    'alta': 1.5,    # Más sesiones
-}
-
-# Sesiones base recomendadas
-SESIONES_BASE = 6
+
+def responder_lista(vista, request, queryset, serializer_class):
+    """Serializa el queryset completo o una página si se pidió ?page_size=/?cursor="""
+    paginador = KeysetPagination()
+    pagina = paginador.paginate_queryset(queryset, request, vista)
+    if pagina is None:
+        return Response(serializer_class(queryset, many=True).data)
+    return paginador.get_paginated_response(serializer_class(pagina, many=True).data)
 
 
 class TestPerfilView(APIView):
@@ -185,12 +171,12 @@ class CursoTemaView(APIView):
 class TemaDificultadView(APIView):
     """Vista para asignar dificultad a un tema"""
     permission_classes = [permissions.IsAuthenticated]
+    orden_keyset = ('fecha_asignacion', 'id')
     
     def get(self, request):
         """Obtener temas con dificultad asignada por el usuario"""
         temas_dificultad = TemaDificultad.objects.filter(usuario=request.user)
-        serializer = TemaDificultadSerializer(temas_dificultad, many=True)
-        return Response(serializer.data)
+        return responder_lista(self, request, temas_dificultad, TemaDificultadSerializer)
     
     def post(self, request):
         """Asignar dificultad a un tema"""
@@ -265,236 +251,39 @@ class GenerarPlanificacionView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Con "asincrono": true las sesiones se generan en un worker de la cola
+        # y la respuesta trae el trabajo para consultar su estado
+        if request.data.get('asincrono') in (True, 'true', '1', 1):
+            trabajo = encolar(
+                generar_planificacion,
+                usuario=request.user,
+                tema_dificultad_id=tema_dificultad.id,
+                fecha_inicio=fecha_inicio.isoformat(),
+                hora_preferida=hora_preferida_str,
+                dias_disponibles=dias_disponibles,
+            )
+            return Response(
+                {
+                    "mensaje": "Planificación en proceso",
+                    "trabajo": trabajo.id,
+                    "estado": reverse('estado-trabajo', args=[trabajo.id]),
+                },
+                status=status.HTTP_202_ACCEPTED
+            )
+
         # Generar planificación
-        resultado = self._generar_planificacion(
+        resultado = crear_planificacion(
             tema_dificultad, fecha_inicio, hora_preferida_str, dias_disponibles
         )
         
         return Response(resultado, status=status.HTTP_201_CREATED)
     
-    def _generar_planificacion(self, tema_dificultad, fecha_inicio, hora_preferida_str, dias_disponibles):
-        """Genera las sesiones de estudio según la dificultad y el método"""
-        
-        # Obtener configuración del método
-        metodo = tema_dificultad.metodo_estudio
-        if metodo not in METODOS_CONFIG:
-            metodo = 'Pomodoro'  # Por defecto
-        
-        config = METODOS_CONFIG[metodo]
-        multiplicador = MULTIPLICADORES_DIFICULTAD[tema_dificultad.dificultad]
-        
-        # Calcular número total de sesiones
-        total_sesiones = math.ceil(SESIONES_BASE * multiplicador)
-        
-        # Mapeo de días de la semana
-        dias_map = {
-            'lunes': 0, 'martes': 1, 'miercoles': 2, 'jueves': 3,
-            'viernes': 4, 'sabado': 5, 'domingo': 6
-        }
-        dias_validos = [dias_map[d] for d in dias_disponibles if d in dias_map]
-        
-        # Crear la planificación
-        sesiones_creadas = []
-        fecha_actual = fecha_inicio
-        numero_sesion = 1
-        
-        # Convertir hora preferida
-        try:
-            hora_inicio = datetime.strptime(hora_preferida_str, '%H:%M').time()
-        except ValueError:
-            hora_inicio = time(9, 0)  # 9:00 AM por defecto
-        
-        while numero_sesion <= total_sesiones:
-            # Verificar si el día actual está en los días disponibles
-            if fecha_actual.weekday() in dias_validos:
-                hora_actual = datetime.combine(fecha_actual, hora_inicio)
-                
-                # Generar sesiones según el método
-                if metodo == 'Pomodoro':
-                    sesiones_dia = self._generar_sesiones_pomodoro(
-                        tema_dificultad, fecha_actual, hora_actual, numero_sesion, config
-                    )
-                elif metodo == 'Feynman':
-                    sesiones_dia = self._generar_sesiones_feynman(
-                        tema_dificultad, fecha_actual, hora_actual, numero_sesion, config
-                    )
-                elif metodo == 'Leitner':
-                    sesiones_dia = self._generar_sesiones_leitner(
-                        tema_dificultad, fecha_actual, hora_actual, numero_sesion, config
-                    )
-                else:
-                    sesiones_dia = self._generar_sesiones_pomodoro(
-                        tema_dificultad, fecha_actual, hora_actual, numero_sesion, config
-                    )
-                
-                sesiones_creadas.extend(sesiones_dia)
-                numero_sesion += len([s for s in sesiones_dia if s.tipo_sesion == 'estudio'])
-            
-            # Avanzar al siguiente día
-            fecha_actual += timedelta(days=1)
-            
-            # Limitar a 30 días para evitar bucles infinitos
-            if (fecha_actual - fecha_inicio).days > 30:
-                break
-        
-        # Calcular fecha de fin
-        fecha_fin = max(s.fecha for s in sesiones_creadas) if sesiones_creadas else fecha_inicio
-        
-        # Crear el registro de planificación
-        planificacion = PlanificacionAdaptativa.objects.create(
-            usuario=tema_dificultad.usuario,
-            tema_dificultad=tema_dificultad,
-            fecha_inicio=fecha_inicio,
-            fecha_fin=fecha_fin,
-            total_sesiones=len([s for s in sesiones_creadas if s.tipo_sesion == 'estudio'])
-        )
-        
-        # Serializar respuesta
-        serializer = PlanificacionAdaptativaSerializer(planificacion)
-        
-        return {
-            "mensaje": "Planificación generada con éxito",
-            "planificacion": serializer.data,
-            "sesiones_generadas": len(sesiones_creadas)
-        }
-    
-    def _generar_sesiones_pomodoro(self, tema_dificultad, fecha, hora_inicio, numero_sesion, config):
-        """Genera sesiones siguiendo la técnica Pomodoro"""
-        sesiones = []
-        hora_actual = hora_inicio
-        
-        # Generar un ciclo Pomodoro (4 sesiones de estudio con descansos)
-        for i in range(config['sesiones_por_ciclo']):
-            # Sesión de estudio
-            hora_fin = hora_actual + timedelta(minutes=config['duracion_estudio'])
-            sesion_estudio = SesionEstudio.objects.create(
-                usuario=tema_dificultad.usuario,
-                tema_dificultad=tema_dificultad,
-                tipo_sesion='estudio',
-                fecha=fecha,
-                hora_inicio=hora_actual.time(),
-                hora_fin=hora_fin.time(),
-                duracion_minutos=config['duracion_estudio'],
-                numero_sesion=numero_sesion + i
-            )
-            sesiones.append(sesion_estudio)
-            hora_actual = hora_fin
-            
-            # Descanso (corto o largo)
-            if i < config['sesiones_por_ciclo'] - 1:
-                # Descanso corto
-                hora_fin = hora_actual + timedelta(minutes=config['duracion_descanso_corto'])
-                sesion_descanso = SesionEstudio.objects.create(
-                    usuario=tema_dificultad.usuario,
-                    tema_dificultad=tema_dificultad,
-                    tipo_sesion='descanso',
-                    fecha=fecha,
-                    hora_inicio=hora_actual.time(),
-                    hora_fin=hora_fin.time(),
-                    duracion_minutos=config['duracion_descanso_corto'],
-                    numero_sesion=numero_sesion + i
-                )
-                sesiones.append(sesion_descanso)
-                hora_actual = hora_fin
-            else:
-                # Descanso largo al final del ciclo
-                hora_fin = hora_actual + timedelta(minutes=config['duracion_descanso_largo'])
-                sesion_descanso = SesionEstudio.objects.create(
-                    usuario=tema_dificultad.usuario,
-                    tema_dificultad=tema_dificultad,
-                    tipo_sesion='descanso',
-                    fecha=fecha,
-                    hora_inicio=hora_actual.time(),
-                    hora_fin=hora_fin.time(),
-                    duracion_minutos=config['duracion_descanso_largo'],
-                    numero_sesion=numero_sesion + i
-                )
-                sesiones.append(sesion_descanso)
-        
-        return sesiones
-    
-    def _generar_sesiones_feynman(self, tema_dificultad, fecha, hora_inicio, numero_sesion, config):
-        """Genera sesiones siguiendo la técnica Feynman"""
-        sesiones = []
-        hora_actual = hora_inicio
-        
-        for i in range(config['sesiones_por_ciclo']):
-            # Sesión de estudio
-            hora_fin = hora_actual + timedelta(minutes=config['duracion_estudio'])
-            sesion_estudio = SesionEstudio.objects.create(
-                usuario=tema_dificultad.usuario,
-                tema_dificultad=tema_dificultad,
-                tipo_sesion='estudio',
-                fecha=fecha,
-                hora_inicio=hora_actual.time(),
-                hora_fin=hora_fin.time(),
-                duracion_minutos=config['duracion_estudio'],
-                numero_sesion=numero_sesion + i
-            )
-            sesiones.append(sesion_estudio)
-            hora_actual = hora_fin
-            
-            # Descanso
-            hora_fin = hora_actual + timedelta(minutes=config['duracion_descanso'])
-            sesion_descanso = SesionEstudio.objects.create(
-                usuario=tema_dificultad.usuario,
-                tema_dificultad=tema_dificultad,
-                tipo_sesion='descanso',
-                fecha=fecha,
-                hora_inicio=hora_actual.time(),
-                hora_fin=hora_fin.time(),
-                duracion_minutos=config['duracion_descanso'],
-                numero_sesion=numero_sesion + i
-            )
-            sesiones.append(sesion_descanso)
-            hora_actual = hora_fin
-        
-        return sesiones
-    
-    def _generar_sesiones_leitner(self, tema_dificultad, fecha, hora_inicio, numero_sesion, config):
-        """Genera sesiones siguiendo la técnica Leitner"""
-        sesiones = []
-        hora_actual = hora_inicio
-        
-        for i in range(config['sesiones_por_ciclo']):
-            tipo = 'repaso' if i % 2 == 0 else 'estudio'
-            
-            # Sesión de estudio o repaso
-            hora_fin = hora_actual + timedelta(minutes=config['duracion_estudio'])
-            sesion = SesionEstudio.objects.create(
-                usuario=tema_dificultad.usuario,
-                tema_dificultad=tema_dificultad,
-                tipo_sesion=tipo,
-                fecha=fecha,
-                hora_inicio=hora_actual.time(),
-                hora_fin=hora_fin.time(),
-                duracion_minutos=config['duracion_estudio'],
-                numero_sesion=numero_sesion + i
-            )
-            sesiones.append(sesion)
-            hora_actual = hora_fin
-            
-            # Descanso
-            hora_fin = hora_actual + timedelta(minutes=config['duracion_descanso'])
-            sesion_descanso = SesionEstudio.objects.create(
-                usuario=tema_dificultad.usuario,
-                tema_dificultad=tema_dificultad,
-                tipo_sesion='descanso',
-                fecha=fecha,
-                hora_inicio=hora_actual.time(),
-                hora_fin=hora_fin.time(),
-                duracion_minutos=config['duracion_descanso'],
-                numero_sesion=numero_sesion + i
-            )
-            sesiones.append(sesion_descanso)
-            hora_actual = hora_fin
-        
-        return sesiones
 
 
 class PlanificacionesView(APIView):
     """Vista para listar planificaciones del usuario"""
     permission_classes = [permissions.IsAuthenticated]
+    orden_keyset = ('-fecha_creacion', '-id')
     
     def get(self, request):
         """Obtener todas las planificaciones del usuario"""
@@ -502,20 +291,26 @@ class PlanificacionesView(APIView):
             usuario=request.user
         ).order_by('-fecha_creacion')
         
-        serializer = PlanificacionAdaptativaSerializer(planificaciones, many=True)
-        return Response(serializer.data)
+        # Cada planificación incluye sus sesiones: depende de ambas colecciones
+        return responder_condicional(
+            request, ('planificaciones', 'sesiones'),
+            lambda: responder_lista(self, request, planificaciones, PlanificacionAdaptativaSerializer)
+        )
 
 
 class SesionesEstudioView(APIView):
     """Vista para gestionar sesiones de estudio"""
     permission_classes = [permissions.IsAuthenticated]
+    orden_keyset = ('fecha', 'hora_inicio', 'id')
     
     def get(self, request):
         """Obtener sesiones de estudio del usuario"""
         fecha_inicio = request.query_params.get('fecha_inicio')
         fecha_fin = request.query_params.get('fecha_fin')
         
-        sesiones = SesionEstudio.objects.filter(usuario=request.user)
+        sesiones = SesionEstudio.objects.filter(usuario=request.user).select_related(
+            'tema_dificultad__tema__curso'
+        )
         
         # Filtrar por rango de fechas si se proporciona
         if fecha_inicio:
@@ -523,8 +318,10 @@ class SesionesEstudioView(APIView):
         if fecha_fin:
             sesiones = sesiones.filter(fecha__lte=fecha_fin)
         
-        serializer = SesionEstudioSerializer(sesiones, many=True)
-        return Response(serializer.data)
+        return responder_condicional(
+            request, ('sesiones',),
+            lambda: responder_lista(self, request, sesiones, SesionEstudioSerializer)
+        )
     
     def patch(self, request, pk=None):
         """Editar manualmente una sesión de estudio"""
@@ -597,4 +394,37 @@ class RecomendarMetodoAPIView(APIView):
             "tema": tema.nombre,
             "metodo_recomendado": metodo,
             "razon": razon
-        })
\ No newline at end of file
+        })
+
+
+class AdherenciaEstudioView(APIView):
+    """Minutos de estudio planificados frente a completados, por día, tema y método"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        desde, hasta = parsear_rango_fechas(request.query_params)
+        # Por defecto, los últimos 30 días
+        hasta = hasta or timezone.localdate()
+        desde = desde or hasta - timedelta(days=29)
+        if desde > hasta:
+            return Response(
+                {"error": "La fecha 'desde' no puede ser posterior a 'hasta'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (hasta - desde).days >= MAX_DIAS:
+            return Response(
+                {"error": f"El rango no puede superar {MAX_DIAS} días"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            ventana = int(request.query_params.get('ventana', VENTANA_MOVIL))
+        except ValueError:
+            ventana = 0
+        if not 1 <= ventana <= MAX_VENTANA:
+            return Response(
+                {"error": f"ventana debe ser un número entre 1 y {MAX_VENTANA}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(adherencia_estudio(request.user.pk, desde, hasta, ventana))
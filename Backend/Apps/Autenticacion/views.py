@@ -12,8 +12,8 @@ from rest_framework.permissions import AllowAny
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.core.mail import send_mail
-from django.conf import settings
+from Apps.Cola_trabajos.cola import encolar, PRIORIDAD_ALTA
+from Apps.Notificacion.trabajos import enviar_correo
 
 
 class RegistroUsuarioAPIView(APIView):
@@ -71,13 +71,19 @@ class PasswordResetRequestAPIView(APIView):
             uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
             reset_link = f"http://localhost:3000/reset-password/{uidb64}/{token}/"
 
-            # Envío de correo real
+            # El correo lo envía un worker de la cola; la respuesta no espera a SMTP
             subject = "Restablece tu contraseña"
             message = f"Hola, has solicitado restablecer tu contraseña. Haz clic en el siguiente enlace:\n\n{reset_link}\n\nSi no fuiste tú, ignora este mensaje."
-            from_email = settings.DEFAULT_FROM_EMAIL
             recipient_list = [email]
 
-            send_mail(subject, message, from_email, recipient_list, fail_silently=False) #Envía el correo usando la configuración SMTP definida en settings.py
+            encolar(
+                enviar_correo,
+                usuario=user,
+                prioridad=PRIORIDAD_ALTA,
+                asunto=subject,
+                mensaje=message,
+                destinatarios=recipient_list,
+            )
 
             return Response({"mensaje": "Se ha enviado un enlace para restablecer la contraseña al correo."}, status=status.HTTP_200_OK)
 
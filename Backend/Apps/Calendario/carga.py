@@ -0,0 +1,119 @@
+"""
+Mantenimiento de CargaDiaria, la carga de cada día por usuario.
+
+Cada alta, cambio o baja de una actividad recalcula solo los días que toca
+(los de antes y los de después del cambio; en una serie, todas sus semanas).
+El recálculo lee esos días con la misma consulta que la agenda y escribe las
+filas con bulk_create/bulk_update, así que el costo depende de los días
+afectados y no del historial del usuario.
+
+Dos recálculos del mismo día pueden correr a la vez (dos peticiones del
+usuario, o una petición y el comando de reconstrucción) y ambos ver que la
+fila no existe. Las nuevas se insertan con un upsert sobre (usuario, fecha):
+el que llega segundo sobrescribe los valores en lugar de fallar.
+"""
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ActividadNoAcademica, CargaDiaria, Clase, ExcepcionOcurrencia
+from .recurrencia import fechas_en_ventana
+from .services import agenda
+
+SOBRECARGA_MINUTOS = 10 * 60
+
+CAMPO_CONTEO = {
+    "Tarea": "tareas",
+    "Clase": "clases",
+    "Estudio": "estudios",
+    "ActividadNoAcademica": "actividadesNoAcademicas",
+}
+TIPOS_ACADEMICOS = ("Tarea", "Clase", "Estudio")
+CAMPOS_CARGA = [
+    "minutos_academicos", "minutos_no_academicos",
+    "tareas", "clases", "estudios", "actividadesNoAcademicas",
+]
+
+
+def _duracion(inicio, fin):
+    return max((fin.hour * 60 + fin.minute) - (inicio.hour * 60 + inicio.minute), 0)
+
+
+def fechas_ocupadas(actividad):
+    """Días en que la actividad ocupa tiempo (todas las semanas si es una serie)"""
+    if hasattr(actividad, "fechaRealizacion"):
+        return {actividad.fechaRealizacion}
+    if not isinstance(actividad, (Clase, ActividadNoAcademica)) or not actividad.repetir:
+        return {actividad.fecha}
+
+    fechas = set(fechas_en_ventana(actividad, None, None))
+    if actividad.pk:
+        # Las ocurrencias movidas pueden caer fuera de las fechas de la serie
+        fechas.update(
+            ExcepcionOcurrencia.objects.filter(
+                Q(clase_id=actividad.pk) if isinstance(actividad, Clase)
+                else Q(actividadNoAcademica_id=actividad.pk),
+                fecha__isnull=False,
+            ).values_list("fecha", flat=True)
+        )
+    return fechas
+
+
+def recalcular_carga(usuario_id, fechas):
+    """Recalcula las filas de CargaDiaria del usuario para esas fechas"""
+    fechas = set(fechas)
+    if not fechas:
+        return
+
+    totales = {fecha: dict.fromkeys(CAMPOS_CARGA, 0) for fecha in fechas}
+    for actividad in agenda(usuario_id, min(fechas), max(fechas), incluir_sesiones=False):
+        dia = totales.get(actividad["fecha"])
+        if dia is None:
+            continue
+        minutos = _duracion(actividad["horaInicio"], actividad["horaFin"])
+        if actividad["tipo"] in TIPOS_ACADEMICOS:
+            dia["minutos_academicos"] += minutos
+        else:
+            dia["minutos_no_academicos"] += minutos
+        dia[CAMPO_CONTEO[actividad["tipo"]]] += 1
+
+    existentes = {
+        carga.fecha: carga
+        for carga in CargaDiaria.objects.filter(usuario_id=usuario_id, fecha__in=fechas)
+    }
+    # bulk_update y el upsert no pasan por auto_now
+    ahora = timezone.now()
+    nuevas, modificadas, vacias = [], [], []
+    for fecha, valores in totales.items():
+        carga = existentes.get(fecha)
+        if not any(valores.values()):
+            if carga:
+                vacias.append(carga.pk)
+        elif carga is None:
+            nuevas.append(
+                CargaDiaria(usuario_id=usuario_id, fecha=fecha, fecha_actualizacion=ahora, **valores)
+            )
+        elif any(getattr(carga, campo) != valor for campo, valor in valores.items()):
+            for campo, valor in valores.items():
+                setattr(carga, campo, valor)
+            carga.fecha_actualizacion = ahora
+            modificadas.append(carga)
+
+    CargaDiaria.objects.bulk_create(
+        nuevas,
+        update_conflicts=True,
+        unique_fields=["usuario", "fecha"],
+        update_fields=CAMPOS_CARGA + ["fecha_actualizacion"],
+    )
+    CargaDiaria.objects.bulk_update(modificadas, CAMPOS_CARGA + ["fecha_actualizacion"])
+    if vacias:
+        CargaDiaria.objects.filter(pk__in=vacias).delete()
+
+
+def minutos_academicos(usuario, fecha):
+    """Minutos académicos del día según CargaDiaria (una sola fila)"""
+    return (
+        CargaDiaria.objects.filter(usuario=usuario, fecha=fecha)
+        .values_list("minutos_academicos", flat=True)
+        .first()
+        or 0
+    )
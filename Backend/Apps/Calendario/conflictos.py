@@ -0,0 +1,109 @@
+"""
+Detección de solapes entre actividades del calendario.
+
+Dos actividades chocan si el mismo día inicio_a < fin_b y fin_a > inicio_b.
+Para validar una actividad nueva se consultan solo las filas del usuario que
+cumplen esa condición (índice (usuario, fecha) más el filtro horario) en lugar
+de cargar el día completo. Para listar todos los solapes de un rango se
+recorre la agenda ya ordenada con un barrido: un heap guarda las actividades
+abiertas por hora de fin, así que el costo es O(n log n + k) para k solapes.
+"""
+import copy
+import heapq
+from itertools import count
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .recurrencia import fechas_en_ventana
+from .services import agenda
+
+
+class ConflictoHorario(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "La actividad se solapa con otras actividades del calendario"
+    default_code = "conflicto_horario"
+
+    def __init__(self, conflictos):
+        super().__init__()
+        # Se asigna tal cual para conservar ids y horas sin convertir a texto
+        self.detail = {"error": str(self.default_detail), "conflictos": conflictos}
+
+
+def _fechas_actividad(actividad):
+    """Fechas que ocupa la actividad (todas las semanas si es una serie)"""
+    if hasattr(actividad, "fechaRealizacion"):
+        return [actividad.fechaRealizacion]
+    if getattr(actividad, "repetir", False):
+        return list(fechas_en_ventana(actividad, None, None))
+    return [actividad.fecha]
+
+
+def _resumen(actividad):
+    return {
+        "tipo": actividad["tipo"],
+        "id": actividad["id"],
+        "titulo": actividad["titulo"],
+        "fecha": actividad["fecha"],
+        "horaInicio": actividad["horaInicio"],
+        "horaFin": actividad["horaFin"],
+    }
+
+
+def conflictos_con(usuario, actividad):
+    """Actividades del usuario que se solapan con actividad (guardada o no)"""
+    fechas = set(_fechas_actividad(actividad))
+    propia = (type(actividad).__name__, actividad.pk)
+    filas = agenda(
+        usuario,
+        min(fechas),
+        max(fechas),
+        incluir_sesiones=False,
+        entre_horas=(actividad.horaInicio, actividad.horaFin),
+    )
+    return [
+        _resumen(fila)
+        for fila in filas
+        if fila["fecha"] in fechas and (fila["tipo"], fila["id"]) != propia
+    ]
+
+
+def validar_conflictos(usuario, serializer):
+    """
+    Lanza ConflictoHorario si los datos validados del serializer chocan con
+    otra actividad. En un PATCH se combinan con la instancia actual.
+    """
+    if serializer.instance is not None:
+        actividad = copy.copy(serializer.instance)
+    else:
+        actividad = serializer.Meta.model(usuario=usuario)
+    for campo, valor in serializer.validated_data.items():
+        setattr(actividad, campo, valor)
+
+    conflictos = conflictos_con(usuario, actividad)
+    if conflictos:
+        raise ConflictoHorario(conflictos)
+
+
+def detectar_solapes(actividades):
+    """
+    Pares de actividades que se solapan. actividades debe venir ordenada por
+    (fecha, horaInicio), como la devuelve agenda().
+    """
+    solapes = []
+    abiertas = []  # heap de (horaFin, desempate, actividad)
+    desempate = count()
+    dia = None
+    for actividad in actividades:
+        if actividad["fecha"] != dia:
+            dia = actividad["fecha"]
+            abiertas = []
+
+        while abiertas and abiertas[0][0] <= actividad["horaInicio"]:
+            heapq.heappop(abiertas)
+        for _, _, abierta in abiertas:
+            solapes.append(
+                {"fecha": dia, "actividades": [_resumen(abierta), _resumen(actividad)]}
+            )
+        heapq.heappush(abiertas, (actividad["horaFin"], next(desempate), actividad))
+    return solapes
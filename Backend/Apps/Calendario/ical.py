@@ -0,0 +1,316 @@
+"""
+Lectura y escritura del calendario en formato iCalendar (RFC 5545).
+
+El archivo se genera por partes: cada tipo de actividad se lee con
+.iterator(chunk_size) y cada componente se emite en cuanto se formatea, así
+que la memoria no crece con el historial del usuario. La lectura también es
+incremental: el archivo se recorre línea a línea y se entrega un componente
+a la vez.
+
+Las horas se guardan sin zona horaria, por lo que se exportan como hora
+"flotante" y se indica la zona del servidor con X-WR-TIMEZONE. Al importar,
+las horas UTC o con TZID se convierten a esa misma zona.
+"""
+from datetime import datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+
+from Apps.Aprendizaje_adaptativo.models import SesionEstudio
+from .models import Tarea, Clase, Estudio, ActividadNoAcademica
+
+PRODID = "-//SmarTime//Calendario//ES"
+DOMINIO_UID = "smartime"
+TAMANO_LOTE_ICS = 500
+
+ESTADOS_VTODO = {
+    "inicio": "NEEDS-ACTION",
+    "en_desarrollo": "IN-PROCESS",
+    "finalizado": "COMPLETED",
+    "entregado": "COMPLETED",
+}
+
+
+def escapar(texto):
+    """Escapa un valor TEXT según RFC 5545 §3.3.11"""
+    return (
+        (texto or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def plegar(linea):
+    """Corta la línea en trozos de 75 octetos como pide RFC 5545 §3.1"""
+    datos = linea.encode()
+    if len(datos) <= 75:
+        return linea + "\r\n"
+    partes = []
+    inicio = 0
+    limite = 75
+    while inicio < len(datos):
+        fin = min(inicio + limite, len(datos))
+        # No partir un carácter UTF-8 multibyte
+        while fin < len(datos) and (datos[fin] & 0xC0) == 0x80:
+            fin -= 1
+        partes.append(datos[inicio:fin].decode())
+        inicio = fin
+        limite = 74  # el espacio inicial de la continuación cuenta
+    return "\r\n ".join(partes) + "\r\n"
+
+
+def fecha_hora(fecha, hora):
+    return datetime.combine(fecha, hora).strftime("%Y%m%dT%H%M%S")
+
+
+def marca_utc(momento):
+    return momento.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def componente(nombre, propiedades):
+    """Formatea un componente; propiedades es una lista de (nombre, valor)"""
+    lineas = [f"BEGIN:{nombre}"]
+    lineas += [f"{prop}:{valor}" for prop, valor in propiedades if valor not in (None, "")]
+    lineas.append(f"END:{nombre}")
+    return "".join(plegar(linea) for linea in lineas)
+
+
+def _uid(tipo, actividad_id):
+    return f"{tipo}-{actividad_id}@{DOMINIO_UID}"
+
+
+def _vtodo_tarea(tarea):
+    return componente("VTODO", [
+        ("UID", _uid("tarea", tarea.id)),
+        ("DTSTAMP", marca_utc(tarea.fecha_actualizacion)),
+        ("LAST-MODIFIED", marca_utc(tarea.fecha_actualizacion)),
+        ("SUMMARY", escapar(tarea.titulo)),
+        ("DESCRIPTION", escapar(tarea.descripcion)),
+        ("CATEGORIES", escapar(tarea.curso)),
+        ("DTSTART", fecha_hora(tarea.fechaRealizacion, tarea.horaInicio)),
+        ("DUE", fecha_hora(tarea.fechaEntrega, tarea.horaEntrega)),
+        ("STATUS", ESTADOS_VTODO.get(tarea.estado, "NEEDS-ACTION")),
+    ])
+
+
+def _vevents_serie(tipo, serie, titulo):
+    """VEVENT de la serie con RRULE, más uno por cada ocurrencia movida"""
+    uid = _uid(tipo, serie.id)
+    base = [
+        ("UID", uid),
+        ("DTSTAMP", marca_utc(serie.fecha_actualizacion)),
+        ("LAST-MODIFIED", marca_utc(serie.fecha_actualizacion)),
+        ("SUMMARY", escapar(titulo)),
+        ("DESCRIPTION", escapar(serie.descripcion)),
+    ]
+    propiedades = base + [
+        ("DTSTART", fecha_hora(serie.fecha, serie.horaInicio)),
+        ("DTEND", fecha_hora(serie.fecha, serie.horaFin)),
+    ]
+    excepciones = list(serie.excepciones.all()) if serie.repetir else []
+    if serie.repetir:
+        propiedades.append(("RRULE", f"FREQ=WEEKLY;COUNT={max(serie.semanas or 1, 1)}"))
+        canceladas = [e for e in excepciones if e.cancelada]
+        if canceladas:
+            propiedades.append((
+                "EXDATE",
+                ",".join(fecha_hora(e.fechaOriginal, serie.horaInicio) for e in canceladas),
+            ))
+
+    partes = [componente("VEVENT", propiedades)]
+    for excepcion in excepciones:
+        if excepcion.cancelada:
+            continue
+        fecha = excepcion.fecha or excepcion.fechaOriginal
+        partes.append(componente("VEVENT", base + [
+            ("RECURRENCE-ID", fecha_hora(excepcion.fechaOriginal, serie.horaInicio)),
+            ("DTSTART", fecha_hora(fecha, excepcion.horaInicio or serie.horaInicio)),
+            ("DTEND", fecha_hora(fecha, excepcion.horaFin or serie.horaFin)),
+        ]))
+    return "".join(partes)
+
+
+def _vevent_estudio(estudio):
+    return componente("VEVENT", [
+        ("UID", _uid("estudio", estudio.id)),
+        ("DTSTAMP", marca_utc(estudio.fecha_actualizacion)),
+        ("LAST-MODIFIED", marca_utc(estudio.fecha_actualizacion)),
+        ("SUMMARY", escapar(estudio.titulo)),
+        ("DESCRIPTION", escapar(estudio.temas)),
+        ("CATEGORIES", escapar(estudio.curso)),
+        ("DTSTART", fecha_hora(estudio.fecha, estudio.horaInicio)),
+        ("DTEND", fecha_hora(estudio.fecha, estudio.horaFin)),
+    ])
+
+
+def _vevent_sesion(sesion):
+    tema = sesion.tema_dificultad.tema
+    return componente("VEVENT", [
+        ("UID", _uid("sesion", sesion.id)),
+        ("DTSTAMP", marca_utc(sesion.fecha_actualizacion)),
+        ("LAST-MODIFIED", marca_utc(sesion.fecha_actualizacion)),
+        ("SUMMARY", escapar(f"Sesión {sesion.numero_sesion}: {tema.nombre}")),
+        ("CATEGORIES", escapar(tema.curso.nombre)),
+        ("DTSTART", fecha_hora(sesion.fecha, sesion.hora_inicio)),
+        ("DTEND", fecha_hora(sesion.fecha, sesion.hora_fin)),
+        ("STATUS", "CONFIRMED" if sesion.completada else "TENTATIVE"),
+    ])
+
+
+def exportar_ics(usuario):
+    """Genera el calendario del usuario como una secuencia de trozos de texto"""
+    yield "".join(plegar(linea) for linea in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escapar('SmarTime - ' + usuario.username)}",
+        f"X-WR-TIMEZONE:{settings.TIME_ZONE}",
+    ])
+
+    for tarea in Tarea.objects.filter(usuario=usuario).order_by("id").iterator(TAMANO_LOTE_ICS):
+        yield _vtodo_tarea(tarea)
+
+    for modelo, tipo, campo_titulo in [
+        (Clase, "clase", "curso"),
+        (ActividadNoAcademica, "actividad", "titulo"),
+    ]:
+        series = (
+            modelo.objects.filter(usuario=usuario)
+            .prefetch_related("excepciones")
+            .order_by("id")
+        )
+        for serie in series.iterator(TAMANO_LOTE_ICS):
+            yield _vevents_serie(tipo, serie, getattr(serie, campo_titulo))
+
+    for estudio in Estudio.objects.filter(usuario=usuario).order_by("id").iterator(TAMANO_LOTE_ICS):
+        yield _vevent_estudio(estudio)
+
+    sesiones = (
+        SesionEstudio.objects.filter(usuario=usuario)
+        .select_related("tema_dificultad__tema__curso")
+        .order_by("id")
+    )
+    for sesion in sesiones.iterator(TAMANO_LOTE_ICS):
+        yield _vevent_sesion(sesion)
+
+    yield plegar("END:VCALENDAR")
+
+
+def desescapar(texto):
+    """Inverso de escapar()"""
+    resultado = []
+    i = 0
+    while i < len(texto):
+        if texto[i] == "\\" and i + 1 < len(texto):
+            siguiente = texto[i + 1]
+            resultado.append("\n" if siguiente in "nN" else siguiente)
+            i += 2
+        else:
+            resultado.append(texto[i])
+            i += 1
+    return "".join(resultado)
+
+
+def desplegar(lineas):
+    """Une las líneas plegadas; lineas puede ser un archivo abierto en binario"""
+    actual = None
+    for cruda in lineas:
+        if isinstance(cruda, bytes):
+            cruda = cruda.decode("utf-8", errors="replace")
+        cruda = cruda.rstrip("\r\n")
+        if cruda[:1] in (" ", "\t") and actual is not None:
+            actual += cruda[1:]
+            continue
+        if actual:
+            yield actual
+        actual = cruda
+    if actual:
+        yield actual
+
+
+def parsear_linea(linea):
+    """'DTSTART;TZID=America/Lima:20250303T080000' -> (nombre, parámetros, valor)"""
+    entre_comillas = False
+    for posicion, caracter in enumerate(linea):
+        if caracter == '"':
+            entre_comillas = not entre_comillas
+        elif caracter == ":" and not entre_comillas:
+            break
+    else:
+        return None
+    cabecera, valor = linea[:posicion], linea[posicion + 1:]
+    nombre, *parametros = cabecera.split(";")
+    return (
+        nombre.upper(),
+        {
+            clave.upper(): valor_param.strip('"')
+            for clave, _, valor_param in (p.partition("=") for p in parametros)
+        },
+        valor,
+    )
+
+
+def leer_componentes(archivo, nombres=("VEVENT", "VTODO")):
+    """
+    Genera (componente, propiedades) por cada VEVENT/VTODO del archivo.
+    propiedades mapea cada nombre a la lista de (parámetros, valor); los
+    subcomponentes (VALARM, ...) se ignoran.
+    """
+    actual = None
+    propiedades = None
+    anidados = 0
+    for linea in desplegar(archivo):
+        partes = parsear_linea(linea)
+        if partes is None:
+            continue
+        nombre, parametros, valor = partes
+
+        if nombre == "BEGIN":
+            if actual is not None:
+                anidados += 1
+            elif valor.upper() in nombres:
+                actual, propiedades = valor.upper(), {}
+        elif nombre == "END":
+            if anidados:
+                anidados -= 1
+            elif actual is not None and valor.upper() == actual:
+                yield actual, propiedades
+                actual = propiedades = None
+        elif actual is not None and not anidados:
+            propiedades.setdefault(nombre, []).append((parametros, valor))
+
+
+def leer_fecha_hora(parametros, valor):
+    """
+    Convierte un DATE o DATE-TIME a (fecha, hora) en la zona del servidor.
+    La hora es None para los valores de día completo.
+    """
+    valor = valor.strip()
+    if parametros.get("VALUE") == "DATE" or len(valor) == 8:
+        return datetime.strptime(valor[:8], "%Y%m%d").date(), None
+
+    utc = valor.endswith("Z")
+    momento = datetime.strptime(valor.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    zona_local = ZoneInfo(settings.TIME_ZONE)
+    if utc:
+        momento = momento.replace(tzinfo=dt_timezone.utc).astimezone(zona_local)
+    elif "TZID" in parametros:
+        try:
+            momento = momento.replace(tzinfo=ZoneInfo(parametros["TZID"])).astimezone(zona_local)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # TZID desconocido: se toma como hora local
+    return momento.date(), momento.time().replace(tzinfo=None)
+
+
+def leer_regla(valor):
+    """'FREQ=WEEKLY;COUNT=16;BYDAY=MO,WE' -> {'FREQ': 'WEEKLY', ...}"""
+    return {
+        clave.upper(): dato
+        for clave, _, dato in (parte.partition("=") for parte in valor.split(";"))
+        if clave
+    }
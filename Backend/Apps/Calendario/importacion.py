@@ -0,0 +1,339 @@
+"""
+Importación de archivos .ics al calendario.
+
+El archivo se lee componente a componente (ical.leer_componentes) y cada
+evento se traduce a la fila que le corresponde: VTODO a Tarea y VEVENT a Clase
+o ActividadNoAcademica. Una regla semanal (RRULE FREQ=WEEKLY) se guarda como
+serie con repetir/semanas, una por día de la semana si la regla tiene varios
+BYDAY; EXDATE y RECURRENCE-ID pasan a ExcepcionOcurrencia.
+
+Los eventos que ya existen (mismo título, fecha y horario) se descartan con
+una consulta por tipo y el resto se escribe con bulk_create por lotes en una
+sola transacción, junto con la CargaDiaria de los días que ocupan y la
+transición inicial de cada tarea (bulk_create no emite post_save). Las
+sugerencias de sobrecarga se calculan una vez al final.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+
+from Apps.Tareas.transiciones import registrar_altas
+from .ical import desescapar, leer_componentes, leer_fecha_hora, leer_regla
+from .models import Tarea, Clase, ActividadNoAcademica, ExcepcionOcurrencia
+from .recurrencia import ultima_fecha, fechas_en_ventana
+from .versiones import incrementar_version
+from .carga import recalcular_carga
+
+TAMANO_LOTE_IMPORTACION = 200
+SEMANAS_REGLA_SIN_FIN = 16  # reglas sin COUNT ni UNTIL: un semestre
+MAX_SEMANAS_REGLA = 260
+HORA_FIN_DIA = time(23, 59)
+HORA_TAREA_SIN_HORA = time(9, 0)
+
+DIAS_ICS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+ESTADOS_TAREA_ICS = {"COMPLETED": "finalizado", "IN-PROCESS": "en_desarrollo"}
+TIPOS_EVENTO_ICS = ("clases", "actividadesNoAcademicas")
+
+MODELOS_IMPORTACION = {
+    "tareas": Tarea,
+    "clases": Clase,
+    "actividadesNoAcademicas": ActividadNoAcademica,
+}
+# Campos que identifican un evento ya importado
+CLAVES_DUPLICADO = {
+    "tareas": ("titulo", "fechaRealizacion", "horaInicio"),
+    "clases": ("curso", "fecha", "horaInicio", "horaFin"),
+    "actividadesNoAcademicas": ("titulo", "fecha", "horaInicio", "horaFin"),
+}
+CAMPO_FECHA = {"tareas": "fechaRealizacion", "clases": "fecha", "actividadesNoAcademicas": "fecha"}
+CAMPO_SERIE = {"clases": "clase", "actividadesNoAcademicas": "actividadNoAcademica"}
+
+
+class EventoOmitido(Exception):
+    pass
+
+
+def _texto(propiedades, nombre, defecto=""):
+    valores = propiedades.get(nombre)
+    texto = desescapar(valores[0][1]).strip() if valores else ""
+    return texto or defecto
+
+
+def _fecha_hora(propiedades, nombre):
+    valores = propiedades.get(nombre)
+    if not valores:
+        return None, None
+    try:
+        return leer_fecha_hora(*valores[0])
+    except ValueError:
+        raise EventoOmitido(f"{nombre} inválido")
+
+
+def _fechas(propiedades, nombre):
+    """Fechas de una propiedad que admite varias líneas y valores (EXDATE)"""
+    fechas = set()
+    for parametros, valor in propiedades.get(nombre, []):
+        for parte in valor.split(","):
+            try:
+                fechas.add(leer_fecha_hora(parametros, parte)[0])
+            except ValueError:
+                continue
+    return fechas
+
+
+def _sumar_hora(hora, minutos):
+    momento = datetime.combine(datetime.min, hora) + timedelta(minutes=minutos)
+    return momento.time() if momento.date() == datetime.min.date() else HORA_FIN_DIA
+
+
+def _horario(propiedades):
+    """(fecha, horaInicio, horaFin) de un VEVENT con hora"""
+    fecha, inicio = _fecha_hora(propiedades, "DTSTART")
+    if fecha is None:
+        raise EventoOmitido("Sin DTSTART")
+    if inicio is None:
+        raise EventoOmitido("Evento de día completo")
+    fecha_fin, fin = _fecha_hora(propiedades, "DTEND")
+    if fecha_fin is None:
+        fin = _sumar_hora(inicio, 60)
+    elif fecha_fin > fecha or fin is None:
+        fin = HORA_FIN_DIA
+    if fin <= inicio:
+        raise EventoOmitido("La hora de fin no es posterior a la de inicio")
+    return fecha, inicio, fin
+
+
+def _fechas_regla(inicio, regla):
+    """Fechas de una regla semanal, en orden"""
+    if regla.get("FREQ") != "WEEKLY" or regla.get("INTERVAL", "1") != "1":
+        raise EventoOmitido("Solo se admiten repeticiones semanales")
+    try:
+        dias = (
+            sorted({DIAS_ICS[dia[-2:]] for dia in regla["BYDAY"].split(",")})
+            if "BYDAY" in regla
+            else [inicio.weekday()]
+        )
+        total = int(regla["COUNT"]) if "COUNT" in regla else None
+        hasta = leer_fecha_hora({}, regla["UNTIL"])[0] if "UNTIL" in regla else None
+    except (KeyError, ValueError):
+        raise EventoOmitido("RRULE inválida")
+
+    semanas = MAX_SEMANAS_REGLA if (total or hasta) else SEMANAS_REGLA_SIN_FIN
+    lunes = inicio - timedelta(days=inicio.weekday())
+    fechas = []
+    for semana in range(semanas):
+        for dia in dias:
+            fecha = lunes + timedelta(weeks=semana, days=dia)
+            if fecha < inicio:
+                continue
+            if hasta and fecha > hasta:
+                return fechas
+            fechas.append(fecha)
+            if total and len(fechas) >= total:
+                return fechas
+    return fechas
+
+
+def _candidatos_evento(propiedades, coleccion):
+    """Filas (una por día de la semana si es una serie) de un VEVENT"""
+    if _texto(propiedades, "STATUS").upper() == "CANCELLED":
+        raise EventoOmitido("Evento cancelado")
+    fecha, inicio, fin = _horario(propiedades)
+    titulo = _texto(propiedades, "SUMMARY", "Sin título")[:100]
+    campos = {
+        "curso" if coleccion == "clases" else "titulo": titulo,
+        "descripcion": _texto(propiedades, "DESCRIPTION"),
+        "horaInicio": inicio,
+        "horaFin": fin,
+    }
+
+    if "RRULE" not in propiedades:
+        return [{**campos, "fecha": fecha, "repetir": False, "semanas": None}], [{fecha}]
+
+    fechas = _fechas_regla(fecha, leer_regla(propiedades["RRULE"][0][1]))
+    if not fechas:
+        raise EventoOmitido("La repetición no tiene ocurrencias")
+    por_dia = defaultdict(list)
+    for ocurrencia in fechas:
+        por_dia[ocurrencia.weekday()].append(ocurrencia)
+
+    filas, fechas_series = [], []
+    for ocurrencias in por_dia.values():
+        semanas = (ocurrencias[-1] - ocurrencias[0]).days // 7 + 1
+        filas.append({**campos, "fecha": ocurrencias[0], "repetir": semanas > 1,
+                      "semanas": semanas if semanas > 1 else None})
+        fechas_series.append(set(ocurrencias))
+    return filas, fechas_series
+
+
+def _candidato_tarea(propiedades):
+    fecha_entrega, hora_entrega = _fecha_hora(propiedades, "DUE")
+    fecha_inicio, hora_inicio = _fecha_hora(propiedades, "DTSTART")
+    if fecha_entrega is None and fecha_inicio is None:
+        raise EventoOmitido("La tarea no tiene fecha")
+    fecha_entrega = fecha_entrega or fecha_inicio
+    hora_entrega = hora_entrega or HORA_FIN_DIA
+    fecha_inicio = fecha_inicio or fecha_entrega
+    hora_inicio = hora_inicio or HORA_TAREA_SIN_HORA
+    return {
+        "titulo": _texto(propiedades, "SUMMARY", "Sin título")[:100],
+        "curso": _texto(propiedades, "CATEGORIES", "General").split(",")[0][:100],
+        "descripcion": _texto(propiedades, "DESCRIPTION"),
+        "fechaEntrega": fecha_entrega,
+        "horaEntrega": hora_entrega,
+        "fechaRealizacion": fecha_inicio,
+        "horaInicio": hora_inicio,
+        "horaFin": _sumar_hora(hora_inicio, 60),
+        "complejidad": 1,
+        "estado": ESTADOS_TAREA_ICS.get(_texto(propiedades, "STATUS").upper(), "inicio"),
+    }
+
+
+def _leer_archivo(archivo, tipo_evento):
+    """Recorre el archivo y devuelve (candidatos, ocurrencias movidas, omitidos)"""
+    candidatos = []  # dicts con coleccion, uid, campos, fechas y excepciones
+    movidas = []
+    omitidos = []
+    for nombre, propiedades in leer_componentes(archivo):
+        uid = _texto(propiedades, "UID")
+        try:
+            if nombre == "VTODO":
+                candidatos.append(
+                    {"coleccion": "tareas", "uid": uid, "campos": _candidato_tarea(propiedades)}
+                )
+                continue
+            if "RECURRENCE-ID" in propiedades:
+                movidas.append((uid, propiedades))
+                continue
+            filas, fechas_series = _candidatos_evento(propiedades, tipo_evento)
+            canceladas = _fechas(propiedades, "EXDATE")
+            for campos, fechas in zip(filas, fechas_series):
+                candidatos.append({
+                    "coleccion": tipo_evento,
+                    "uid": uid,
+                    "campos": campos,
+                    "fechas": fechas,
+                    "excepciones": [
+                        {"fechaOriginal": fecha, "cancelada": True}
+                        for fecha in sorted(canceladas & fechas)
+                    ] if campos["repetir"] else [],
+                })
+        except EventoOmitido as motivo:
+            omitidos.append({"uid": uid, "motivo": str(motivo)})
+    return candidatos, movidas, omitidos
+
+
+def _aplicar_movidas(candidatos, movidas, omitidos):
+    """Convierte cada RECURRENCE-ID en una excepción de la serie de su UID"""
+    series = defaultdict(list)
+    for candidato in candidatos:
+        if candidato["campos"].get("repetir"):
+            series[candidato["uid"]].append(candidato)
+
+    for uid, propiedades in movidas:
+        try:
+            original, _ = _fecha_hora(propiedades, "RECURRENCE-ID")
+            serie = next(
+                (s for s in series.get(uid, []) if original in s["fechas"]), None
+            )
+            if serie is None:
+                raise EventoOmitido("RECURRENCE-ID sin serie")
+            serie["excepciones"] = [
+                e for e in serie["excepciones"] if e["fechaOriginal"] != original
+            ]
+            if _texto(propiedades, "STATUS").upper() == "CANCELLED":
+                serie["excepciones"].append({"fechaOriginal": original, "cancelada": True})
+                continue
+            fecha, inicio, fin = _horario(propiedades)
+            serie["excepciones"].append({
+                "fechaOriginal": original, "cancelada": False,
+                "fecha": fecha, "horaInicio": inicio, "horaFin": fin,
+            })
+        except EventoOmitido as motivo:
+            omitidos.append({"uid": uid, "motivo": str(motivo)})
+
+
+def _descartar_duplicados(usuario, candidatos):
+    """Quita los candidatos que ya existen o se repiten dentro del archivo"""
+    por_coleccion = defaultdict(list)
+    for candidato in candidatos:
+        por_coleccion[candidato["coleccion"]].append(candidato)
+
+    nuevos = []
+    duplicados = 0
+    for coleccion, grupo in por_coleccion.items():
+        claves = CLAVES_DUPLICADO[coleccion]
+        campo_fecha = CAMPO_FECHA[coleccion]
+        fechas = [c["campos"][campo_fecha] for c in grupo]
+        vistos = set(
+            MODELOS_IMPORTACION[coleccion].objects.filter(
+                usuario=usuario, **{f"{campo_fecha}__range": (min(fechas), max(fechas))}
+            ).values_list(*claves)
+        )
+        for candidato in grupo:
+            clave = tuple(candidato["campos"][campo] for campo in claves)
+            if clave in vistos:
+                duplicados += 1
+                continue
+            vistos.add(clave)
+            nuevos.append(candidato)
+    return nuevos, duplicados
+
+
+def importar_ics(usuario, archivo, tipo_evento="clases"):
+    """
+    Importa el archivo .ics al calendario del usuario.
+
+    Devuelve (resumen, fechas afectadas, tareas creadas) para que la vista
+    calcule las sugerencias una sola vez.
+    """
+    candidatos, movidas, omitidos = _leer_archivo(archivo, tipo_evento)
+    _aplicar_movidas(candidatos, movidas, omitidos)
+    candidatos, duplicados = _descartar_duplicados(usuario, candidatos)
+
+    creados = defaultdict(list)
+    excepciones = []
+    dias_carga = set()
+    for candidato in candidatos:
+        coleccion = candidato["coleccion"]
+        actividad = MODELOS_IMPORTACION[coleccion](usuario=usuario, **candidato["campos"])
+        if coleccion in CAMPO_SERIE:
+            actividad.fechaFinSerie = ultima_fecha(actividad)
+            excepciones.extend(
+                (coleccion, actividad, datos) for datos in candidato["excepciones"]
+            )
+            dias_carga.update(fechas_en_ventana(actividad, None, None))
+            dias_carga.update(e["fecha"] for e in candidato["excepciones"] if e.get("fecha"))
+        else:
+            dias_carga.add(getattr(actividad, CAMPO_FECHA[coleccion]))
+        creados[coleccion].append(actividad)
+
+    with transaction.atomic():
+        for coleccion, actividades in creados.items():
+            MODELOS_IMPORTACION[coleccion].objects.bulk_create(
+                actividades, batch_size=TAMANO_LOTE_IMPORTACION
+            )
+        ExcepcionOcurrencia.objects.bulk_create(
+            [
+                ExcepcionOcurrencia(**{CAMPO_SERIE[coleccion]: serie}, **datos)
+                for coleccion, serie, datos in excepciones
+            ],
+            batch_size=TAMANO_LOTE_IMPORTACION,
+        )
+        registrar_altas(creados.get("tareas", []))
+        for coleccion in creados:
+            incrementar_version(usuario.pk, coleccion)
+        recalcular_carga(usuario.pk, dias_carga)
+
+    fechas = {
+        getattr(actividad, CAMPO_FECHA[coleccion])
+        for coleccion, actividades in creados.items()
+        for actividad in actividades
+    }
+    resumen = {
+        "creados": {coleccion: len(actividades) for coleccion, actividades in creados.items()},
+        "duplicados": duplicados,
+        "omitidos": omitidos,
+    }
+    return resumen, fechas, creados.get("tareas", [])
@@ -0,0 +1,214 @@
+"""
+Operaciones en lote sobre las actividades del calendario.
+
+Un lote mezcla altas, cambios y bajas de cualquier tipo de actividad. Se
+valida completo antes de escribir; si una operación falla no se aplica
+ninguna. Las escrituras van en una sola transacción con bulk_create y
+bulk_update (una sentencia por tipo) y las sugerencias de sobrecarga y orden
+se calculan una vez por día afectado, no por fila.
+
+bulk_create/bulk_update no emiten post_save, así que aquí se hace a mano lo
+que harían save() y las señales: fin de serie, fecha_actualizacion, versión
+de la colección, transición inicial de las tareas nuevas y CargaDiaria de
+los días tocados. Las bajas usan delete() del queryset para que borre en
+cascada, pero dentro de escritura_en_lote(): las señales no hacen su trabajo
+fila por fila y aquí se registran las bajas con un solo bulk_create, se
+versiona una vez por colección y la carga entra en el mismo recálculo.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from Apps.Tareas.transiciones import registrar_altas
+from .models import Tarea, Clase, Estudio, ActividadNoAcademica, EliminacionCalendario
+from .recurrencia import ultima_fecha
+from .serializers import (
+    TareaSerializer,
+    ClaseSerializer,
+    EstudioSerializer,
+    ActividadNoAcademicaSerializer,
+)
+from .versiones import incrementar_version
+from .carga import fechas_ocupadas, recalcular_carga
+from .signals import escritura_en_lote
+
+MAX_OPERACIONES_LOTE = 1000
+
+
+class LoteInvalido(Exception):
+    """Errores de validación del lote, indexados por posición de la operación"""
+
+    def __init__(self, errores):
+        super().__init__(errores)
+        self.errores = errores
+
+
+TIPOS_LOTE = {
+    "tareas": (Tarea, TareaSerializer),
+    "clases": (Clase, ClaseSerializer),
+    "estudios": (Estudio, EstudioSerializer),
+    "actividadesNoAcademicas": (ActividadNoAcademica, ActividadNoAcademicaSerializer),
+}
+OPERACIONES_LOTE = ("crear", "actualizar", "eliminar")
+
+
+def _fecha_actividad(actividad):
+    return getattr(actividad, "fechaRealizacion", None) or actividad.fecha
+
+
+def _preparar_serie(actividad):
+    if isinstance(actividad, (Clase, ActividadNoAcademica)):
+        actividad.fechaFinSerie = ultima_fecha(actividad)
+
+
+def _validar(usuario, operaciones):
+    """Valida el lote completo; devuelve las operaciones listas para escribir"""
+    if not isinstance(operaciones, list) or not operaciones:
+        raise ValidationError({"operaciones": "Envía una lista de operaciones"})
+    if len(operaciones) > MAX_OPERACIONES_LOTE:
+        raise ValidationError(
+            {"operaciones": f"Un lote admite como máximo {MAX_OPERACIONES_LOTE} operaciones"}
+        )
+
+    # Las actividades a modificar o borrar se leen con una consulta por tipo
+    ids_por_tipo = defaultdict(set)
+    for operacion in operaciones:
+        if isinstance(operacion, dict) and operacion.get("tipo") in TIPOS_LOTE:
+            if operacion.get("operacion") in ("actualizar", "eliminar"):
+                ids_por_tipo[operacion["tipo"]].add(operacion.get("id"))
+    existentes = {
+        tipo: TIPOS_LOTE[tipo][0].objects.filter(usuario=usuario).in_bulk(
+            [i for i in ids if isinstance(i, int)]
+        )
+        for tipo, ids in ids_por_tipo.items()
+    }
+
+    validas = []
+    errores = []
+    vistos = set()
+    for indice, operacion in enumerate(operaciones):
+        if not isinstance(operacion, dict):
+            errores.append({"indice": indice, "errores": "La operación debe ser un objeto"})
+            continue
+        tipo = operacion.get("tipo")
+        accion = operacion.get("operacion")
+        if tipo not in TIPOS_LOTE:
+            errores.append({"indice": indice, "errores": {"tipo": f"Tipo inválido: {tipo}"}})
+            continue
+        if accion not in OPERACIONES_LOTE:
+            errores.append(
+                {"indice": indice, "errores": {"operacion": f"Operación inválida: {accion}"}}
+            )
+            continue
+
+        serializer_class = TIPOS_LOTE[tipo][1]
+        if accion == "crear":
+            serializer = serializer_class(data=operacion.get("datos", {}))
+            if serializer.is_valid():
+                validas.append((accion, tipo, serializer))
+            else:
+                errores.append({"indice": indice, "errores": serializer.errors})
+            continue
+
+        instancia = existentes.get(tipo, {}).get(operacion.get("id"))
+        if instancia is None:
+            errores.append({"indice": indice, "errores": {"id": "Actividad no encontrada"}})
+            continue
+        if (tipo, instancia.pk) in vistos:
+            errores.append(
+                {"indice": indice, "errores": {"id": "La actividad aparece dos veces en el lote"}}
+            )
+            continue
+        vistos.add((tipo, instancia.pk))
+
+        if accion == "eliminar":
+            validas.append((accion, tipo, instancia))
+            continue
+        serializer = serializer_class(instancia, data=operacion.get("datos", {}), partial=True)
+        if serializer.is_valid():
+            validas.append((accion, tipo, serializer))
+        else:
+            errores.append({"indice": indice, "errores": serializer.errors})
+
+    if errores:
+        raise LoteInvalido(errores)
+    return validas
+
+
+def aplicar_lote(usuario, operaciones):
+    """
+    Valida y aplica un lote de operaciones del usuario en una transacción.
+
+    Devuelve (resultado, fechas afectadas, tareas creadas o modificadas) para
+    que la vista calcule las sugerencias después de confirmar.
+    """
+    validas = _validar(usuario, operaciones)
+    ahora = timezone.now()
+
+    nuevas = defaultdict(list)
+    modificadas = defaultdict(list)
+    campos_modificados = defaultdict(set)
+    eliminadas = defaultdict(list)
+    fechas = set()
+    dias_carga = set()
+
+    for accion, tipo, objeto in validas:
+        if accion == "crear":
+            actividad = TIPOS_LOTE[tipo][0](usuario=usuario, **objeto.validated_data)
+            _preparar_serie(actividad)
+            nuevas[tipo].append(actividad)
+            fechas.add(_fecha_actividad(actividad))
+            dias_carga |= fechas_ocupadas(actividad)
+        elif accion == "actualizar":
+            actividad = objeto.instance
+            fechas.add(_fecha_actividad(actividad))
+            dias_carga |= fechas_ocupadas(actividad)
+            for campo, valor in objeto.validated_data.items():
+                setattr(actividad, campo, valor)
+                campos_modificados[tipo].add(campo)
+            _preparar_serie(actividad)
+            actividad.fecha_actualizacion = ahora
+            modificadas[tipo].append(actividad)
+            fechas.add(_fecha_actividad(actividad))
+            dias_carga |= fechas_ocupadas(actividad)
+        else:
+            dias_carga |= fechas_ocupadas(objeto)
+            eliminadas[tipo].append(objeto.pk)
+
+    with transaction.atomic():
+        for tipo, actividades in nuevas.items():
+            TIPOS_LOTE[tipo][0].objects.bulk_create(actividades)
+        registrar_altas(nuevas.get("tareas", []))
+        for tipo, actividades in modificadas.items():
+            campos = campos_modificados[tipo] | {"fecha_actualizacion"}
+            if tipo in ("clases", "actividadesNoAcademicas"):
+                campos.add("fechaFinSerie")
+            TIPOS_LOTE[tipo][0].objects.bulk_update(actividades, sorted(campos))
+        with escritura_en_lote():
+            for tipo, ids in eliminadas.items():
+                TIPOS_LOTE[tipo][0].objects.filter(usuario=usuario, pk__in=ids).delete()
+        EliminacionCalendario.objects.bulk_create([
+            EliminacionCalendario(usuario=usuario, coleccion=tipo, objeto_id=pk)
+            for tipo, ids in eliminadas.items()
+            for pk in ids
+        ])
+        for tipo in set(nuevas) | set(modificadas) | set(eliminadas):
+            incrementar_version(usuario.pk, tipo)
+        if "tareas" in eliminadas:
+            incrementar_version(usuario.pk, "estadosTareas")  # sus estados se borran en cascada
+        recalcular_carga(usuario.pk, dias_carga)
+
+    resultado = {
+        "creados": {
+            tipo: TIPOS_LOTE[tipo][1](actividades, many=True).data
+            for tipo, actividades in nuevas.items()
+        },
+        "actualizados": {
+            tipo: [a.pk for a in actividades] for tipo, actividades in modificadas.items()
+        },
+        "eliminados": dict(eliminadas),
+    }
+    tareas = nuevas["tareas"] + modificadas["tareas"]
+    return resultado, fechas, tareas
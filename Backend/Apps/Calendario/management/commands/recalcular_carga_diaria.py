@@ -0,0 +1,71 @@
+"""
+Reconstruye CargaDiaria desde las actividades guardadas.
+
+Las señales la mantienen al día; este comando sirve para llenarla la primera
+vez o repararla tras cargas masivas hechas por fuera de la aplicación.
+
+    python manage.py recalcular_carga_diaria [--usuario ID]
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+
+from Apps.Calendario.carga import recalcular_carga
+from Apps.Calendario.models import CargaDiaria
+
+DIAS_POR_TRAMO = 92
+
+
+class Command(BaseCommand):
+    help = "Recalcula la carga diaria de los usuarios a partir de sus actividades"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuario", type=int, help="Solo este usuario")
+
+    def handle(self, *args, **options):
+        usuarios = get_user_model().objects.order_by("id")
+        if options["usuario"]:
+            usuarios = usuarios.filter(id=options["usuario"])
+
+        total = 0
+        for usuario in usuarios.iterator():
+            rango = self._rango(usuario)
+            if rango is None:
+                CargaDiaria.objects.filter(usuario=usuario).delete()
+                continue
+
+            inicio, fin = rango
+            with transaction.atomic():
+                CargaDiaria.objects.filter(usuario=usuario).delete()
+                # Por tramos para acotar la memoria con historiales largos
+                while inicio <= fin:
+                    tramo_fin = min(inicio + timedelta(days=DIAS_POR_TRAMO - 1), fin)
+                    recalcular_carga(
+                        usuario.pk,
+                        (inicio + timedelta(days=d) for d in range((tramo_fin - inicio).days + 1)),
+                    )
+                    inicio = tramo_fin + timedelta(days=1)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Carga diaria recalculada para {total} usuario(s)"))
+
+    def _rango(self, usuario):
+        """Primer y último día con actividades del usuario, o None"""
+        limites = [
+            usuario.tareas.aggregate(inicio=Min("fechaRealizacion"), fin=Max("fechaRealizacion")),
+            usuario.estudios.aggregate(inicio=Min("fecha"), fin=Max("fecha")),
+            usuario.clases.aggregate(inicio=Min("fecha"), fin=Max("fechaFinSerie")),
+            usuario.actividades_no_academicas.aggregate(inicio=Min("fecha"), fin=Max("fechaFinSerie")),
+            usuario.clases.aggregate(inicio=Min("excepciones__fecha"), fin=Max("excepciones__fecha")),
+            usuario.actividades_no_academicas.aggregate(
+                inicio=Min("excepciones__fecha"), fin=Max("excepciones__fecha")
+            ),
+        ]
+        inicios = [l["inicio"] for l in limites if l["inicio"]]
+        fines = [l["fin"] for l in limites if l["fin"]]
+        if not inicios:
+            return None
+        return min(inicios), max(fines)
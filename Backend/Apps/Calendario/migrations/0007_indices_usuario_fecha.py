@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 12:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Calendario", "0006_tarea_estado"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="actividadnoacademica",
+            index=models.Index(
+                fields=["usuario", "fecha"], name="Calendario__usuario_17d0d2_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="clase",
+            index=models.Index(
+                fields=["usuario", "fecha"], name="Calendario__usuario_cf73bc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="estudio",
+            index=models.Index(
+                fields=["usuario", "fecha"], name="Calendario__usuario_55c7a3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tarea",
+            index=models.Index(
+                fields=["usuario", "fechaRealizacion"],
+                name="Calendario__usuario_53ee6e_idx",
+            ),
+        ),
+    ]
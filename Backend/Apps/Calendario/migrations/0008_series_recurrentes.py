@@ -0,0 +1,86 @@
+# Generated by Django 5.2 on 2026-10-18 12:38
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def calcular_fin_de_series(apps, schema_editor):
+    for nombre in ["Clase", "ActividadNoAcademica"]:
+        Modelo = apps.get_model("Calendario", nombre)
+        series = list(Modelo.objects.all())
+        for serie in series:
+            semanas = max(serie.semanas or 1, 1) if serie.repetir else 1
+            serie.fechaFinSerie = serie.fecha + timedelta(weeks=semanas - 1)
+        Modelo.objects.bulk_update(series, ["fechaFinSerie"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Calendario", "0007_indices_usuario_fecha"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="actividadnoacademica",
+            name="fechaFinSerie",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="clase",
+            name="fechaFinSerie",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name="ExcepcionOcurrencia",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fechaOriginal", models.DateField()),
+                ("cancelada", models.BooleanField(default=False)),
+                ("fecha", models.DateField(blank=True, null=True)),
+                ("horaInicio", models.TimeField(blank=True, null=True)),
+                ("horaFin", models.TimeField(blank=True, null=True)),
+                (
+                    "actividadNoAcademica",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="excepciones",
+                        to="Calendario.actividadnoacademica",
+                    ),
+                ),
+                (
+                    "clase",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="excepciones",
+                        to="Calendario.clase",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("clase", "fechaOriginal"), name="excepcion_unica_clase"
+                    ),
+                    models.UniqueConstraint(
+                        fields=("actividadNoAcademica", "fechaOriginal"),
+                        name="excepcion_unica_actividad",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(calcular_fin_de_series, migrations.RunPython.noop),
+    ]
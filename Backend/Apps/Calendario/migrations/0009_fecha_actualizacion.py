@@ -0,0 +1,69 @@
+# Generated by Django 5.2 on 2026-10-18 12:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Calendario", "0008_series_recurrentes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="actividadnoacademica",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="clase",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="estudio",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="tarea",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name="VersionColeccion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("coleccion", models.CharField(max_length=30)),
+                ("version", models.BigIntegerField(default=0)),
+                ("fecha_actualizacion", models.DateTimeField(auto_now=True)),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="versiones_colecciones",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("usuario", "coleccion"),
+                        name="version_unica_por_coleccion",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2 on 2026-10-18 12:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Calendario", "0009_fecha_actualizacion"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EliminacionCalendario",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("coleccion", models.CharField(max_length=30)),
+                ("objeto_id", models.BigIntegerField()),
+                ("fecha_eliminacion", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="actividadnoacademica",
+            index=models.Index(
+                fields=["usuario", "fecha_actualizacion"],
+                name="Calendario__usuario_deaa71_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="clase",
+            index=models.Index(
+                fields=["usuario", "fecha_actualizacion"],
+                name="Calendario__usuario_fc8c24_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="estudio",
+            index=models.Index(
+                fields=["usuario", "fecha_actualizacion"],
+                name="Calendario__usuario_b9c94d_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tarea",
+            index=models.Index(
+                fields=["usuario", "fecha_actualizacion"],
+                name="Calendario__usuario_10d901_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="eliminacioncalendario",
+            name="usuario",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="eliminaciones_calendario",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eliminacioncalendario",
+            index=models.Index(
+                fields=["usuario", "fecha_eliminacion"],
+                name="Calendario__usuario_df6984_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-18 12:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Calendario", "0010_sincronizacion"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CargaDiaria",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fecha", models.DateField()),
+                ("minutos_academicos", models.IntegerField(default=0)),
+                ("minutos_no_academicos", models.IntegerField(default=0)),
+                ("tareas", models.IntegerField(default=0)),
+                ("clases", models.IntegerField(default=0)),
+                ("estudios", models.IntegerField(default=0)),
+                ("actividadesNoAcademicas", models.IntegerField(default=0)),
+                ("fecha_actualizacion", models.DateTimeField(auto_now=True)),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cargas_diarias",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("usuario", "fecha"), name="carga_unica_por_dia"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-18 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Calendario", "0011_carga_diaria"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="tarea",
+            name="Calendario__usuario_53ee6e_idx",
+        ),
+        migrations.AddIndex(
+            model_name="tarea",
+            index=models.Index(
+                fields=["usuario", "fechaRealizacion", "fechaEntrega"],
+                name="Calendario__usuario_fd57e8_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 13:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Calendario", "0012_indice_inversiones"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tarea",
+            index=models.Index(
+                fields=["fechaEntrega", "horaEntrega"],
+                name="Calendario__fechaEn_dc2da6_idx",
+            ),
+        ),
+    ]
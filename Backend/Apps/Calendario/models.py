@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from .recurrencia import ultima_fecha
 
 # Create your models here.
 class Tarea(models.Model):
@@ -28,6 +29,15 @@ class Tarea(models.Model):
         choices=ESTADOS,
         default='inicio'
     )
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["usuario", "fechaRealizacion", "fechaEntrega"]),
+            models.Index(fields=["usuario", "fecha_actualizacion"]),
+            # Recordatorios de vencimiento: rango sobre todas las entregas próximas
+            models.Index(fields=["fechaEntrega", "horaEntrega"]),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.usuario.username}"
@@ -43,6 +53,19 @@ class Clase(models.Model):
     horaFin = models.TimeField()
     repetir = models.BooleanField(default=False)  # Solo se activa si el usuario marcó "Repetir"
     semanas = models.IntegerField(null=True, blank=True)  # Solo se activa si repetir=True
+    # Fecha de la última ocurrencia; se calcula al guardar para filtrar series por ventana
+    fechaFinSerie = models.DateField(null=True, blank=True, editable=False)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["usuario", "fecha"]),
+            models.Index(fields=["usuario", "fecha_actualizacion"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.fechaFinSerie = ultima_fecha(self)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.curso} - Clase de {self.usuario.username}"
@@ -56,6 +79,13 @@ class Estudio(models.Model):
     fecha = models.DateField()
     horaInicio = models.TimeField()
     horaFin = models.TimeField()
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["usuario", "fecha"]),
+            models.Index(fields=["usuario", "fecha_actualizacion"]),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - Estudio de {self.usuario.username}"
@@ -71,6 +101,98 @@ class ActividadNoAcademica(models.Model):
     horaFin = models.TimeField()
     repetir = models.BooleanField(default=False)  # Solo se activa si el usuario marcó "Repetir"
     semanas = models.IntegerField(null=True, blank=True)  # Solo se activa si repetir=True
+    # Fecha de la última ocurrencia; se calcula al guardar para filtrar series por ventana
+    fechaFinSerie = models.DateField(null=True, blank=True, editable=False)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["usuario", "fecha"]),
+            models.Index(fields=["usuario", "fecha_actualizacion"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.fechaFinSerie = ultima_fecha(self)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.titulo} - {self.usuario}"
+
+
+# Excepción sobre una ocurrencia concreta de una serie semanal (cancelarla o moverla)
+class ExcepcionOcurrencia(models.Model):
+    clase = models.ForeignKey(Clase, on_delete=models.CASCADE, null=True, blank=True, related_name="excepciones")
+    actividadNoAcademica = models.ForeignKey(ActividadNoAcademica, on_delete=models.CASCADE, null=True, blank=True, related_name="excepciones")
+    fechaOriginal = models.DateField()
+    cancelada = models.BooleanField(default=False)
+    # Si la ocurrencia se movió, nuevos valores; null = se mantiene el de la serie
+    fecha = models.DateField(null=True, blank=True)
+    horaInicio = models.TimeField(null=True, blank=True)
+    horaFin = models.TimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["clase", "fechaOriginal"], name="excepcion_unica_clase"),
+            models.UniqueConstraint(fields=["actividadNoAcademica", "fechaOriginal"], name="excepcion_unica_actividad"),
+        ]
+
+    def __str__(self):
+        serie = self.clase or self.actividadNoAcademica
+        return f"Excepción {self.fechaOriginal} - {serie}"
+
+
+# Versión por usuario de cada colección (tareas, clases, ...). Se incrementa en
+# cada alta, cambio o baja y permite responder 304 sin volver a serializar.
+class VersionColeccion(models.Model):
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="versiones_colecciones")
+    coleccion = models.CharField(max_length=30)
+    version = models.BigIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["usuario", "coleccion"], name="version_unica_por_coleccion"),
+        ]
+
+    def __str__(self):
+        return f"{self.coleccion} v{self.version} - {self.usuario}"
+
+
+# Registro de bajas (tombstone) para que los clientes con réplica local
+# sepan qué borrar al sincronizar con /calendario/api/sync/
+class EliminacionCalendario(models.Model):
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="eliminaciones_calendario")
+    coleccion = models.CharField(max_length=30)
+    objeto_id = models.BigIntegerField()
+    fecha_eliminacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["usuario", "fecha_eliminacion"]),
+        ]
+
+    def __str__(self):
+        return f"{self.coleccion} #{self.objeto_id} eliminado - {self.usuario}"
+
+
+# Carga de cada día del usuario, mantenida al guardar o borrar actividades
+# (ver carga.py). La verificación de sobrecarga y el mapa de calor la leen
+# sin volver a sumar las actividades.
+class CargaDiaria(models.Model):
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="cargas_diarias")
+    fecha = models.DateField()
+    minutos_academicos = models.IntegerField(default=0)  # tareas + clases + estudios
+    minutos_no_academicos = models.IntegerField(default=0)
+    tareas = models.IntegerField(default=0)
+    clases = models.IntegerField(default=0)
+    estudios = models.IntegerField(default=0)
+    actividadesNoAcademicas = models.IntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["usuario", "fecha"], name="carga_unica_por_dia"),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha}: {self.minutos_academicos} min - {self.usuario}"
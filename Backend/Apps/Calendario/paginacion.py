@@ -0,0 +1,97 @@
+"""
+Paginación por cursor (keyset) para los listados.
+
+En lugar de OFFSET, cada página continúa "después" de la última fila vista
+sobre una clave de orden estable, p. ej. (fecha, horaInicio, id). Así la
+página 100 cuesta lo mismo que la primera. El cursor es opaco para el
+cliente (JSON en base64 con los valores de la clave).
+
+La paginación es opcional: solo se activa si la petición trae ?cursor= o
+?page_size=, de modo que los clientes que esperan la lista completa siguen
+funcionando igual.
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.orden = list(getattr(view, "orden_keyset", ("id",)))
+        self.tamano = self._tamano_pagina(params.get(self.page_size_query_param))
+
+        queryset = queryset.order_by(*self.orden)
+        posicion = self._decodificar(params.get(self.cursor_query_param))
+        if posicion is not None:
+            queryset = queryset.filter(self._despues_de(posicion))
+
+        filas = list(queryset[: self.tamano + 1])
+        self.hay_siguiente = len(filas) > self.tamano
+        pagina = filas[: self.tamano]
+        self.ultima = pagina[-1] if pagina else None
+        return pagina
+
+    def get_paginated_response(self, data):
+        return Response({"next": self._enlace_siguiente(), "results": data})
+
+    def _tamano_pagina(self, valor):
+        if not valor:
+            return self.page_size
+        try:
+            tamano = int(valor)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "Debe ser un número entero"})
+        return max(1, min(tamano, self.max_page_size))
+
+    def _despues_de(self, posicion):
+        """(a, b, c) > (x, y, z) expresado como OR de prefijos iguales"""
+        condicion = Q()
+        iguales = Q()
+        for campo, valor in zip(self.orden, posicion):
+            nombre = campo.lstrip("-")
+            operador = "lt" if campo.startswith("-") else "gt"
+            condicion |= iguales & Q(**{f"{nombre}__{operador}": valor})
+            iguales &= Q(**{nombre: valor})
+        return condicion
+
+    def _enlace_siguiente(self):
+        if not self.hay_siguiente:
+            return None
+        posicion = []
+        for campo in self.orden:
+            valor = getattr(self.ultima, campo.lstrip("-"))
+            if isinstance(valor, (datetime.date, datetime.time)):
+                valor = valor.isoformat()
+            posicion.append(valor)
+        cursor = base64.urlsafe_b64encode(json.dumps(posicion).encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def _decodificar(self, cursor):
+        if not cursor:
+            return None
+        try:
+            posicion = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValueError):
+            raise ValidationError({self.cursor_query_param: "Cursor inválido"})
+        if not isinstance(posicion, list) or len(posicion) != len(self.orden):
+            raise ValidationError({self.cursor_query_param: "Cursor inválido"})
+        return posicion
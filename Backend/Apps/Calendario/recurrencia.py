@@ -0,0 +1,114 @@
+"""
+Motor de recurrencia para Clase y ActividadNoAcademica.
+
+Una serie semanal se guarda como una sola fila (fecha = primera ocurrencia,
+repetir/semanas = cuántas semanas se repite). Las ocurrencias se calculan al
+vuelo para la ventana pedida y las excepciones (ExcepcionOcurrencia) permiten
+cancelar o mover una ocurrencia concreta sin tocar el resto de la serie.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db.models import Q
+
+SEMANA = timedelta(days=7)
+
+Ocurrencia = namedtuple(
+    "Ocurrencia",
+    ["serie", "fechaOriginal", "fecha", "horaInicio", "horaFin", "modificada"],
+)
+
+
+def total_ocurrencias(serie):
+    """Número de semanas que abarca la serie (1 si no se repite)"""
+    if serie.repetir and serie.semanas:
+        return max(serie.semanas, 1)
+    return 1
+
+
+def ultima_fecha(serie):
+    """Fecha de la última ocurrencia de la serie"""
+    return serie.fecha + SEMANA * (total_ocurrencias(serie) - 1)
+
+
+def fechas_en_ventana(serie, desde, hasta):
+    """Fechas originales de la serie dentro de [desde, hasta], sin excepciones"""
+    total = total_ocurrencias(serie)
+    primera = 0
+    if desde and desde > serie.fecha:
+        primera = -(-(desde - serie.fecha).days // 7)  # techo
+    ultima = total - 1
+    if hasta:
+        ultima = min(ultima, (hasta - serie.fecha).days // 7)
+
+    for semana in range(primera, ultima + 1):
+        yield serie.fecha + SEMANA * semana
+
+
+def series_en_ventana(queryset, desde, hasta):
+    """
+    Filtra las series que tienen alguna ocurrencia en [desde, hasta].
+    Incluye las series con una ocurrencia movida hacia la ventana.
+    """
+    condicion = Q()
+    if desde:
+        condicion &= Q(fechaFinSerie__gte=desde)
+    if hasta:
+        condicion &= Q(fecha__lte=hasta)
+
+    movidas = Q(excepciones__cancelada=False)
+    if desde:
+        movidas &= Q(excepciones__fecha__gte=desde)
+    if hasta:
+        movidas &= Q(excepciones__fecha__lte=hasta)
+
+    if not (desde or hasta):
+        return queryset
+    return queryset.filter(condicion | movidas).distinct()
+
+
+def ocurrencias_serie(serie, desde, hasta):
+    """
+    Ocurrencias de una sola serie en [desde, hasta], sin ordenar. Usa
+    serie.excepciones.all(), así que conviene traer las excepciones con
+    prefetch_related.
+    """
+    excepciones = {e.fechaOriginal: e for e in serie.excepciones.all()}
+
+    for fecha in fechas_en_ventana(serie, desde, hasta):
+        if fecha not in excepciones:
+            yield Ocurrencia(serie, fecha, fecha, serie.horaInicio, serie.horaFin, False)
+
+    for original, excepcion in excepciones.items():
+        if excepcion.cancelada or original > ultima_fecha(serie):
+            continue
+        fecha = excepcion.fecha or original
+        if (desde and fecha < desde) or (hasta and fecha > hasta):
+            continue
+        yield Ocurrencia(
+            serie,
+            original,
+            fecha,
+            excepcion.horaInicio or serie.horaInicio,
+            excepcion.horaFin or serie.horaFin,
+            True,
+        )
+
+
+def expandir_ocurrencias(series, desde, hasta):
+    """
+    Devuelve las Ocurrencia de las series en [desde, hasta], ordenadas por
+    fecha y hora de inicio.
+    """
+    ocurrencias = []
+    for serie in series.prefetch_related("excepciones"):
+        ocurrencias.extend(ocurrencias_serie(serie, desde, hasta))
+
+    ocurrencias.sort(key=lambda o: (o.fecha, o.horaInicio))
+    return ocurrencias
+
+
+def es_ocurrencia(serie, fecha):
+    """Indica si fecha es una ocurrencia original de la serie"""
+    dias = (fecha - serie.fecha).days
+    return dias >= 0 and dias % 7 == 0 and fecha <= ultima_fecha(serie)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Tarea, Clase, Estudio, ActividadNoAcademica
+from .models import Tarea, Clase, Estudio, ActividadNoAcademica, ExcepcionOcurrencia
 from Apps.Tareas.models import EstadoTarea
 
 
@@ -20,11 +20,24 @@ class TareaResumenSerializer(serializers.ModelSerializer):
         read_only_fields = ['usuario']
 
 
+def validar_repeticion(datos, instancia=None):
+    repetir = datos.get('repetir', getattr(instancia, 'repetir', False))
+    semanas = datos.get('semanas', getattr(instancia, 'semanas', None))
+    if repetir and (semanas is None or semanas < 1):
+        raise serializers.ValidationError(
+            {'semanas': 'Indica cuántas semanas se repite (mínimo 1).'}
+        )
+    return datos
+
+
 class ClaseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Clase
         fields = '__all__'
         read_only_fields = ['usuario']
+
+    def validate(self, data):
+        return validar_repeticion(data, self.instance)
         
 class ClaseResumenSerializer(serializers.ModelSerializer):
     class Meta:
@@ -51,9 +64,17 @@ class ActividadNoAcademicaSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['usuario']
 
+    def validate(self, data):
+        return validar_repeticion(data, self.instance)
+
 class ActividadNoAcademicaResumenSerializer(serializers.ModelSerializer):
     class Meta:
         model = ActividadNoAcademica
         fields = ['horaInicio', 'horaFin', 'titulo', 'usuario']
         read_only_fields = ['usuario']
 
+
+class ExcepcionOcurrenciaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExcepcionOcurrencia
+        fields = ['id', 'fechaOriginal', 'cancelada', 'fecha', 'horaInicio', 'horaFin']
@@ -0,0 +1,197 @@
+import heapq
+from datetime import datetime, timedelta
+
+from django.db.models import CharField, F, Value
+from rest_framework.exceptions import ValidationError
+
+from Apps.Aprendizaje_adaptativo.models import SesionEstudio
+from .models import Tarea, Clase, Estudio, ActividadNoAcademica
+from .recurrencia import series_en_ventana, expandir_ocurrencias
+
+
+def parsear_fecha(valor, parametro):
+    """Convierte un parámetro YYYY-MM-DD en date, o None si no se envió"""
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError(
+            {parametro: "Formato de fecha inválido. Use YYYY-MM-DD"}
+        )
+
+
+def parsear_rango_fechas(query_params):
+    """Lee ?desde= y ?hasta= de la petición y valida que formen un rango"""
+    desde = parsear_fecha(query_params.get("desde"), "desde")
+    hasta = parsear_fecha(query_params.get("hasta"), "hasta")
+
+    if desde and hasta and desde > hasta:
+        raise ValidationError(
+            {"hasta": "La fecha 'hasta' no puede ser anterior a 'desde'"}
+        )
+    return desde, hasta
+
+
+def filtrar_por_rango(queryset, campo_fecha, desde, hasta):
+    """Restringe el queryset al rango [desde, hasta] sobre campo_fecha"""
+    if desde:
+        queryset = queryset.filter(**{f"{campo_fecha}__gte": desde})
+    if hasta:
+        queryset = queryset.filter(**{f"{campo_fecha}__lte": hasta})
+    return queryset
+
+
+def _columnas_agenda(queryset, tipo, titulo, fecha, hora_inicio, hora_fin):
+    """Proyecta un queryset a las columnas comunes de la agenda"""
+    return (
+        queryset.order_by()
+        .annotate(
+            tipo=Value(tipo, output_field=CharField()),
+            actividad_id=F("id"),
+            nombre=F(titulo),
+            dia=F(fecha),
+            inicio=F(hora_inicio),
+            fin=F(hora_fin),
+        )
+        .values("tipo", "actividad_id", "nombre", "dia", "inicio", "fin")
+    )
+
+
+def _fila_agenda(tipo, actividad_id, titulo, fecha, hora_inicio, hora_fin):
+    return {
+        "tipo": tipo,
+        "id": actividad_id,
+        "titulo": titulo,
+        "fecha": fecha,
+        "horaInicio": hora_inicio,
+        "horaFin": hora_fin,
+    }
+
+
+def agenda(usuario, desde, hasta, incluir_sesiones=True, entre_horas=None):
+    """
+    Todas las actividades del usuario en [desde, hasta] ordenadas por fecha y
+    hora de inicio.
+
+    Con entre_horas=(inicio, fin) solo devuelve las que se solapan con ese
+    intervalo horario (inicio < fin_actividad y fin > inicio_actividad).
+
+    Las filas guardadas (tareas, estudios, clases y actividades sin repetición
+    y sesiones de estudio) salen de un único UNION ALL ... ORDER BY en la base
+    de datos. Las series semanales se expanden aparte y se intercalan con
+    heapq.merge, que recorre ambas secuencias ya ordenadas una sola vez.
+    """
+    consultas = [
+        _columnas_agenda(
+            Tarea.objects.filter(
+                usuario=usuario, fechaRealizacion__range=(desde, hasta)
+            ),
+            "Tarea", "titulo", "fechaRealizacion", "horaInicio", "horaFin",
+        ),
+        _columnas_agenda(
+            Estudio.objects.filter(usuario=usuario, fecha__range=(desde, hasta)),
+            "Estudio", "titulo", "fecha", "horaInicio", "horaFin",
+        ),
+        _columnas_agenda(
+            Clase.objects.filter(
+                usuario=usuario, repetir=False, fecha__range=(desde, hasta)
+            ),
+            "Clase", "curso", "fecha", "horaInicio", "horaFin",
+        ),
+        _columnas_agenda(
+            ActividadNoAcademica.objects.filter(
+                usuario=usuario, repetir=False, fecha__range=(desde, hasta)
+            ),
+            "ActividadNoAcademica", "titulo", "fecha", "horaInicio", "horaFin",
+        ),
+    ]
+    if incluir_sesiones:
+        consultas.append(
+            _columnas_agenda(
+                SesionEstudio.objects.filter(
+                    usuario=usuario, fecha__range=(desde, hasta)
+                ),
+                "SesionEstudio", "tema_dificultad__tema__nombre",
+                "fecha", "hora_inicio", "hora_fin",
+            )
+        )
+
+    if entre_horas:
+        inicio, fin = entre_horas
+        consultas = [c.filter(inicio__lt=fin, fin__gt=inicio) for c in consultas]
+
+    guardadas = (
+        _fila_agenda(
+            fila["tipo"], fila["actividad_id"], fila["nombre"],
+            fila["dia"], fila["inicio"], fila["fin"],
+        )
+        for fila in consultas[0]
+        .union(*consultas[1:], all=True)
+        .order_by("dia", "inicio")
+    )
+
+    recurrentes = []
+    for modelo, tipo, titulo in [
+        (Clase, "Clase", "curso"),
+        (ActividadNoAcademica, "ActividadNoAcademica", "titulo"),
+    ]:
+        series = series_en_ventana(
+            modelo.objects.filter(usuario=usuario, repetir=True), desde, hasta
+        )
+        recurrentes.append(
+            [
+                _fila_agenda(
+                    tipo, o.serie.id, getattr(o.serie, titulo),
+                    o.fecha, o.horaInicio, o.horaFin,
+                )
+                for o in expandir_ocurrencias(series, desde, hasta)
+                if not entre_horas
+                or (o.horaInicio < entre_horas[1] and o.horaFin > entre_horas[0])
+            ]
+        )
+
+    return heapq.merge(
+        guardadas, *recurrentes, key=lambda a: (a["fecha"], a["horaInicio"])
+    )
+
+
+def _minutos(hora):
+    return hora.hour * 60 + hora.minute
+
+
+def huecos_libres(actividades, desde, hasta, inicio_dia, fin_dia, duracion):
+    """
+    Ventanas libres de al menos duracion minutos dentro de [inicio_dia, fin_dia]
+    para cada día de [desde, hasta].
+
+    actividades debe venir ordenada por (fecha, horaInicio), como la devuelve
+    agenda(). Un solo barrido avanza el fin de lo ocupado y emite cada hueco
+    que queda antes de la siguiente actividad, así que el costo es lineal en
+    el número de actividades más el número de días.
+    """
+    actividades = iter(actividades)
+    siguiente = next(actividades, None)
+    dia = desde
+    while dia <= hasta:
+        ocupado_hasta = _minutos(inicio_dia)
+        fin = _minutos(fin_dia)
+        huecos_dia = []
+        while siguiente is not None and siguiente["fecha"] <= dia:
+            if siguiente["fecha"] == dia:
+                inicio_act = _minutos(siguiente["horaInicio"])
+                if inicio_act - ocupado_hasta >= duracion and ocupado_hasta < fin:
+                    huecos_dia.append((ocupado_hasta, min(inicio_act, fin)))
+                ocupado_hasta = max(ocupado_hasta, _minutos(siguiente["horaFin"]))
+            siguiente = next(actividades, None)
+        huecos_dia.append((ocupado_hasta, fin))
+
+        for inicio, final in huecos_dia:
+            if final - inicio >= duracion:
+                yield {
+                    "fecha": dia,
+                    "horaInicio": f"{inicio // 60:02d}:{inicio % 60:02d}",
+                    "horaFin": f"{final // 60:02d}:{final % 60:02d}",
+                    "minutos": final - inicio,
+                }
+        dia += timedelta(days=1)
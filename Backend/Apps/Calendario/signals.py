@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    Tarea, Clase, Estudio, ActividadNoAcademica, ExcepcionOcurrencia, EliminacionCalendario
+)
+from .versiones import incrementar_version
+from .carga import fechas_ocupadas, recalcular_carga
+
+COLECCIONES = {
+    Tarea: "tareas",
+    Clase: "clases",
+    Estudio: "estudios",
+    ActividadNoAcademica: "actividadesNoAcademicas",
+}
+
+_escritura_en_lote = ContextVar("escritura_en_lote", default=False)
+
+
+@contextmanager
+def escritura_en_lote():
+    """
+    Dentro del bloque las señales de las actividades (y de sus excepciones en
+    cascada) no versionan, no registran bajas ni recalculan la carga: quien
+    escribe en lote lo hace una sola vez para todas las filas.
+    """
+    anterior = _escritura_en_lote.set(True)
+    try:
+        yield
+    finally:
+        _escritura_en_lote.reset(anterior)
+
+
+def en_lote():
+    return _escritura_en_lote.get()
+
+
+@receiver([post_save, post_delete], sender=Tarea)
+@receiver([post_save, post_delete], sender=Clase)
+@receiver([post_save, post_delete], sender=Estudio)
+@receiver([post_save, post_delete], sender=ActividadNoAcademica)
+def actividad_modificada(sender, instance, **kwargs):
+    if en_lote():
+        return
+    incrementar_version(instance.usuario_id, COLECCIONES[sender])
+
+
+@receiver(post_delete, sender=Tarea)
+@receiver(post_delete, sender=Clase)
+@receiver(post_delete, sender=Estudio)
+@receiver(post_delete, sender=ActividadNoAcademica)
+def actividad_eliminada(sender, instance, **kwargs):
+    if en_lote():
+        return
+    EliminacionCalendario.objects.create(
+        usuario_id=instance.usuario_id,
+        coleccion=COLECCIONES[sender],
+        objeto_id=instance.pk,
+    )
+
+
+@receiver(pre_save, sender=ExcepcionOcurrencia)
+def recordar_fecha_excepcion(sender, instance, **kwargs):
+    # Al volver a mover una ocurrencia, el día al que se había movido se libera
+    if instance.pk:
+        instance._fecha_previa = (
+            sender.objects.filter(pk=instance.pk).values_list("fecha", flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=ExcepcionOcurrencia)
+def excepcion_modificada(sender, instance, **kwargs):
+    if en_lote():
+        return
+    # Mover o cancelar una ocurrencia cambia la serie a la que pertenece
+    if instance.clase_id:
+        modelo, serie_id = Clase, instance.clase_id
+    else:
+        modelo, serie_id = ActividadNoAcademica, instance.actividadNoAcademica_id
+
+    # Al borrar la serie en cascada ya no existe; su propio post_delete la versiona
+    usuario_id = (
+        modelo.objects.filter(pk=serie_id).values_list("usuario_id", flat=True).first()
+    )
+    if usuario_id:
+        # La serie cambia para los clientes que sincronizan por fecha_actualizacion
+        modelo.objects.filter(pk=serie_id).update(fecha_actualizacion=timezone.now())
+        incrementar_version(usuario_id, COLECCIONES[modelo])
+        fechas = {instance.fechaOriginal, instance.fecha, getattr(instance, "_fecha_previa", None)}
+        recalcular_carga(usuario_id, fechas - {None})
+
+
+@receiver(pre_save, sender=Tarea)
+@receiver(pre_save, sender=Clase)
+@receiver(pre_save, sender=Estudio)
+@receiver(pre_save, sender=ActividadNoAcademica)
+def recordar_fechas_previas(sender, instance, **kwargs):
+    # Si la actividad cambia de día, el día anterior también debe recalcularse
+    anterior = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._fechas_carga_previas = fechas_ocupadas(anterior) if anterior else set()
+
+
+@receiver(pre_delete, sender=Clase)
+@receiver(pre_delete, sender=ActividadNoAcademica)
+def recordar_fechas_serie(sender, instance, **kwargs):
+    if en_lote():
+        return
+    # Las excepciones se borran en cascada antes del post_delete de la serie
+    instance._fechas_carga_previas = fechas_ocupadas(instance)
+
+
+@receiver([post_save, post_delete], sender=Tarea)
+@receiver([post_save, post_delete], sender=Clase)
+@receiver([post_save, post_delete], sender=Estudio)
+@receiver([post_save, post_delete], sender=ActividadNoAcademica)
+def actualizar_carga_actividad(sender, instance, **kwargs):
+    if en_lote():
+        return
+    fechas = fechas_ocupadas(instance) | getattr(instance, "_fechas_carga_previas", set())
+    recalcular_carga(instance.usuario_id, fechas)
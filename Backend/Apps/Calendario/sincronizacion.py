@@ -0,0 +1,126 @@
+"""
+Sincronización incremental del calendario (?since=<token>).
+
+El cliente guarda el token de la última respuesta y en la siguiente pide
+solo lo que cambió desde entonces: filas con fecha_actualizacion posterior
+(índice (usuario, fecha_actualizacion)) y los ids borrados, que quedan
+registrados en EliminacionCalendario. Sin token, o si es más antiguo que la
+retención de eliminaciones, se devuelve una copia completa ("completo").
+
+El token es el instante en que empezó la consulta anterior. Se relee un
+pequeño margen hacia atrás para no perder escrituras que se confirmaron
+mientras se respondía; el cliente aplica los cambios por id, así que
+recibir una fila dos veces no tiene efecto.
+"""
+import base64
+import binascii
+from datetime import datetime, timedelta
+
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import (
+    Tarea, Clase, Estudio, ActividadNoAcademica, ExcepcionOcurrencia, EliminacionCalendario
+)
+from .serializers import (
+    TareaSerializer,
+    ClaseSerializer,
+    EstudioSerializer,
+    ActividadNoAcademicaSerializer,
+    ExcepcionOcurrenciaSerializer,
+)
+
+MARGEN_SINCRONIZACION = timedelta(seconds=2)
+RETENCION_ELIMINACIONES = timedelta(days=30)
+
+COLECCIONES_SINCRONIZADAS = [
+    ("tareas", Tarea, TareaSerializer, False),
+    ("clases", Clase, ClaseSerializer, True),
+    ("estudios", Estudio, EstudioSerializer, False),
+    ("actividadesNoAcademicas", ActividadNoAcademica, ActividadNoAcademicaSerializer, True),
+]
+
+
+def generar_token(instante):
+    return base64.urlsafe_b64encode(instante.isoformat().encode()).decode()
+
+
+def leer_token(token):
+    """Devuelve el instante codificado en el token, o None si no se envió"""
+    if not token:
+        return None
+    try:
+        instante = datetime.fromisoformat(base64.urlsafe_b64decode(token.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({"since": "Token de sincronización inválido"})
+    if timezone.is_naive(instante):
+        raise ValidationError({"since": "Token de sincronización inválido"})
+    return instante
+
+
+def _serializar(queryset, serializer_class, con_excepciones):
+    if not con_excepciones:
+        return serializer_class(queryset, many=True).data
+
+    # Las series viajan con sus excepciones para que el cliente pueda expandirlas
+    datos = []
+    for serie in queryset.prefetch_related(
+        Prefetch("excepciones", queryset=ExcepcionOcurrencia.objects.order_by("fechaOriginal"))
+    ):
+        fila = serializer_class(serie).data
+        fila["excepciones"] = ExcepcionOcurrenciaSerializer(
+            serie.excepciones.all(), many=True
+        ).data
+        datos.append(fila)
+    return datos
+
+
+def cambios_desde(usuario, token=None):
+    """
+    Cambios del calendario del usuario desde el token recibido.
+
+    Devuelve {"token", "completo", "cambios": {coleccion: [...]},
+    "eliminados": {coleccion: [ids]}}.
+    """
+    ahora = timezone.now()
+    desde = leer_token(token)
+    completo = desde is None or desde < ahora - RETENCION_ELIMINACIONES
+
+    cambios = {}
+    eliminados = {}
+    for coleccion, modelo, serializer_class, con_excepciones in COLECCIONES_SINCRONIZADAS:
+        queryset = modelo.objects.filter(usuario=usuario)
+        if not completo:
+            queryset = queryset.filter(
+                fecha_actualizacion__gte=desde - MARGEN_SINCRONIZACION
+            )
+        cambios[coleccion] = _serializar(
+            queryset.order_by("fecha_actualizacion", "id"), serializer_class, con_excepciones
+        )
+        eliminados[coleccion] = []
+
+    if not completo:
+        for coleccion, objeto_id in (
+            EliminacionCalendario.objects.filter(
+                usuario=usuario,
+                fecha_eliminacion__gte=desde - MARGEN_SINCRONIZACION,
+            )
+            .order_by("fecha_eliminacion")
+            .values_list("coleccion", "objeto_id")
+        ):
+            eliminados[coleccion].append(objeto_id)
+
+    return {
+        "token": generar_token(ahora),
+        "completo": completo,
+        "cambios": cambios,
+        "eliminados": eliminados,
+    }
+
+
+def purgar_eliminaciones(antes_de=None):
+    """Borra las eliminaciones más antiguas que la retención; devuelve cuántas"""
+    antes_de = antes_de or timezone.now() - RETENCION_ELIMINACIONES
+    borradas, _ = EliminacionCalendario.objects.filter(fecha_eliminacion__lt=antes_de).delete()
+    return borradas
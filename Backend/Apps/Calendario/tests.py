@@ -1,3 +1,1500 @@
+"""
+Tests para los endpoints del calendario
+"""
+from io import StringIO
+from unittest.mock import patch
+from django.core import mail, signing
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import date, time, timedelta
+from django.utils.http import http_date
+from .models import (
+    Tarea, Clase, Estudio, ActividadNoAcademica, EliminacionCalendario, CargaDiaria, VersionColeccion
+)
+from Apps.Cola_trabajos.programador import PROGRAMA
+from .sincronizacion import generar_token, purgar_eliminaciones
+from .versiones import incrementar_version
+from .trabajos import purgar_eliminaciones_calendario
+from Apps.Aprendizaje_adaptativo.models import Curso, Tema, TemaDificultad, SesionEstudio
+from Apps.Notificacion.models import Outbox
+from Apps.Tareas.models import TransicionEstado
+from Apps.Cola_trabajos.cola import ejecutar_pendientes
 
-# Create your tests here.
+User = get_user_model()
+
+
+class RangoFechasTests(TestCase):
+    """Tests para el filtrado ?desde=&hasta= de los listados del calendario"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.otro = User.objects.create_user(
+            username='otro',
+            email='otro@example.com',
+            password='testpass123'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        for dia in [date(2025, 6, 30), date(2025, 7, 1), date(2025, 7, 31), date(2025, 8, 1)]:
+            Tarea.objects.create(
+                usuario=self.user, titulo=f'Tarea {dia}', curso='Cálculo',
+                fechaEntrega=dia, horaEntrega=time(23, 59),
+                fechaRealizacion=dia, horaInicio=time(9, 0), horaFin=time(10, 0),
+                complejidad=2
+            )
+            Clase.objects.create(
+                usuario=self.user, curso='Física', fecha=dia,
+                horaInicio=time(8, 0), horaFin=time(10, 0)
+            )
+            Estudio.objects.create(
+                usuario=self.user, titulo='Repaso', curso='Química', fecha=dia,
+                horaInicio=time(15, 0), horaFin=time(16, 0)
+            )
+            ActividadNoAcademica.objects.create(
+                usuario=self.user, titulo='Gimnasio', fecha=dia,
+                horaInicio=time(18, 0), horaFin=time(19, 0)
+            )
+
+        # Actividades de otro usuario dentro del rango no deben aparecer
+        Clase.objects.create(
+            usuario=self.otro, curso='Física', fecha=date(2025, 7, 15),
+            horaInicio=time(8, 0), horaFin=time(10, 0)
+        )
+
+    def test_listados_filtrados_por_rango(self):
+        """Test: Cada listado devuelve solo las actividades dentro del rango"""
+        rango = {'desde': '2025-07-01', 'hasta': '2025-07-31'}
+
+        for url, campo in [
+            ('/calendario/api/tareas/', 'fechaRealizacion'),
+            ('/calendario/api/clases/', 'fecha'),
+            ('/calendario/api/estudios/', 'fecha'),
+            ('/calendario/api/actividadesNoAcademicas/', 'fecha'),
+        ]:
+            response = self.client.get(url, rango)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                sorted(item[campo] for item in response.data),
+                ['2025-07-01', '2025-07-31'],
+                url
+            )
+
+    def test_rango_abierto(self):
+        """Test: Se puede enviar solo uno de los extremos del rango"""
+        response = self.client.get('/calendario/api/clases/', {'desde': '2025-07-31'})
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_sin_rango_devuelve_todo(self):
+        """Test: Sin parámetros se mantiene el listado completo"""
+        response = self.client.get('/calendario/api/tareas/')
+
+        self.assertEqual(len(response.data), 4)
+
+    def test_rango_invalido(self):
+        """Test: Fechas mal formadas o invertidas devuelven 400"""
+        response = self.client.get('/calendario/api/tareas/', {'desde': '01/07/2025'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            '/calendario/api/tareas/', {'desde': '2025-08-01', 'hasta': '2025-07-01'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detalle_ignora_rango(self):
+        """Test: El rango solo aplica al listado, no al detalle"""
+        tarea = Tarea.objects.filter(usuario=self.user).first()
+
+        response = self.client.get(
+            f'/calendario/api/tareas/{tarea.id}/', {'desde': '2030-01-01'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class RecurrenciaTests(TestCase):
+    """Tests para las series semanales de Clase y ActividadNoAcademica"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        # Semestre de 16 semanas: lunes 2025-03-03 a lunes 2025-06-16
+        self.clase = Clase.objects.create(
+            usuario=self.user, curso='Física', fecha=date(2025, 3, 3),
+            horaInicio=time(8, 0), horaFin=time(10, 0),
+            repetir=True, semanas=16
+        )
+
+    def test_serie_ocupa_una_fila(self):
+        """Test: Una clase de 16 semanas se guarda en una sola fila"""
+        self.assertEqual(Clase.objects.count(), 1)
+        self.assertEqual(self.clase.fechaFinSerie, date(2025, 6, 16))
+
+    def test_ocurrencias_en_ventana(self):
+        """Test: Se expanden solo las ocurrencias del rango pedido"""
+        response = self.client.get(
+            '/calendario/api/clases/ocurrencias/',
+            {'desde': '2025-04-01', 'hasta': '2025-04-30'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [o['fecha'] for o in response.data],
+            ['2025-04-07', '2025-04-14', '2025-04-21', '2025-04-28']
+        )
+        self.assertTrue(all(o['id'] == self.clase.id for o in response.data))
+
+    def test_ocurrencias_requieren_rango(self):
+        """Test: /ocurrencias/ exige desde y hasta"""
+        response = self.client.get('/calendario/api/clases/ocurrencias/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_listado_incluye_series_iniciadas_antes(self):
+        """Test: El listado por rango incluye series que empezaron antes de la ventana"""
+        response = self.client.get(
+            '/calendario/api/clases/', {'desde': '2025-05-01', 'hasta': '2025-05-31'}
+        )
+        self.assertEqual(len(response.data), 1)
+
+        response = self.client.get(
+            '/calendario/api/clases/', {'desde': '2025-07-01', 'hasta': '2025-07-31'}
+        )
+        self.assertEqual(len(response.data), 0)
+
+    def test_cancelar_ocurrencia(self):
+        """Test: Una ocurrencia cancelada no aparece en la expansión"""
+        response = self.client.post(
+            f'/calendario/api/clases/{self.clase.id}/excepciones/',
+            {'fechaOriginal': '2025-04-14', 'cancelada': True}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(
+            '/calendario/api/clases/ocurrencias/',
+            {'desde': '2025-04-01', 'hasta': '2025-04-30'}
+        )
+        self.assertNotIn('2025-04-14', [o['fecha'] for o in response.data])
+        self.assertEqual(len(response.data), 3)
+
+    def test_mover_ocurrencia(self):
+        """Test: Una ocurrencia movida aparece en su nueva fecha y hora"""
+        response = self.client.post(
+            f'/calendario/api/clases/{self.clase.id}/excepciones/',
+            {'fechaOriginal': '2025-04-14', 'fecha': '2025-04-16', 'horaInicio': '14:00', 'horaFin': '16:00'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(
+            '/calendario/api/clases/ocurrencias/',
+            {'desde': '2025-04-14', 'hasta': '2025-04-20'}
+        )
+        self.assertEqual(len(response.data), 1)
+        movida = response.data[0]
+        self.assertEqual(movida['fecha'], '2025-04-16')
+        self.assertEqual(movida['fechaOriginal'], '2025-04-14')
+        self.assertEqual(movida['horaInicio'], '14:00:00')
+        self.assertEqual(movida['horaFin'], '16:00:00')
+        self.assertTrue(movida['modificada'])
+
+    def test_excepcion_fuera_de_la_serie(self):
+        """Test: No se aceptan excepciones en fechas que no son ocurrencias"""
+        response = self.client.post(
+            f'/calendario/api/clases/{self.clase.id}/excepciones/',
+            {'fechaOriginal': '2025-04-15', 'cancelada': True}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            f'/calendario/api/clases/{self.clase.id}/excepciones/',
+            {'fechaOriginal': '2025-06-23', 'cancelada': True}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_repetir_requiere_semanas(self):
+        """Test: repetir=True sin semanas es inválido"""
+        response = self.client.post('/calendario/api/actividadesNoAcademicas/', {
+            'titulo': 'Fútbol', 'fecha': '2025-03-04',
+            'horaInicio': '18:00', 'horaFin': '19:00', 'repetir': True
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_actividades_de_hoy_incluye_ocurrencias(self):
+        """Test: actividadesHoy muestra la clase de la semana en curso"""
+        hoy = date.today()
+        ActividadNoAcademica.objects.create(
+            usuario=self.user, titulo='Gimnasio', fecha=hoy - timedelta(weeks=3),
+            horaInicio=time(18, 0), horaFin=time(19, 0), repetir=True, semanas=10
+        )
+
+        response = self.client.get('/calendario/api/actividadesHoy/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(a['tipo'], a['titulo']) for a in response.data],
+            [('ActividadNoAcademica', 'Gimnasio')]
+        )
+
+
+class AgendaTests(TestCase):
+    """Tests para la agenda unificada /calendario/api/agenda/"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.lunes = date(2025, 7, 7)
+        martes = date(2025, 7, 8)
+
+        Tarea.objects.create(
+            usuario=self.user, titulo='Informe', curso='Redes',
+            fechaEntrega=martes, horaEntrega=time(23, 59),
+            fechaRealizacion=self.lunes, horaInicio=time(14, 0), horaFin=time(16, 0),
+            complejidad=3
+        )
+        Estudio.objects.create(
+            usuario=self.user, titulo='Repaso', curso='Química', fecha=martes,
+            horaInicio=time(7, 0), horaFin=time(8, 0)
+        )
+        ActividadNoAcademica.objects.create(
+            usuario=self.user, titulo='Gimnasio', fecha=self.lunes,
+            horaInicio=time(18, 0), horaFin=time(19, 0)
+        )
+        # Serie semanal que empezó semanas antes de la ventana
+        Clase.objects.create(
+            usuario=self.user, curso='Física', fecha=date(2025, 6, 16),
+            horaInicio=time(8, 0), horaFin=time(10, 0), repetir=True, semanas=8
+        )
+
+        curso = Curso.objects.create(nombre='Matemáticas')
+        tema = Tema.objects.create(curso=curso, nombre='Límites')
+        tema_dificultad = TemaDificultad.objects.create(
+            usuario=self.user, tema=tema, dificultad='media', metodo_estudio='Pomodoro'
+        )
+        SesionEstudio.objects.create(
+            usuario=self.user, tema_dificultad=tema_dificultad, fecha=self.lunes,
+            hora_inicio=time(11, 0), hora_fin=time(11, 25),
+            duracion_minutos=25, numero_sesion=1
+        )
+
+    def test_agenda_ordenada_por_fecha_y_hora(self):
+        """Test: La agenda mezcla todos los tipos ya ordenados"""
+        response = self.client.get(
+            '/calendario/api/agenda/', {'desde': '2025-07-07', 'hasta': '2025-07-08'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(a['fecha'], a['horaInicio'], a['tipo'], a['titulo']) for a in response.json()],
+            [
+                ('2025-07-07', '08:00:00', 'Clase', 'Física'),
+                ('2025-07-07', '11:00:00', 'SesionEstudio', 'Límites'),
+                ('2025-07-07', '14:00:00', 'Tarea', 'Informe'),
+                ('2025-07-07', '18:00:00', 'ActividadNoAcademica', 'Gimnasio'),
+                ('2025-07-08', '07:00:00', 'Estudio', 'Repaso'),
+            ]
+        )
+
+    def test_agenda_por_defecto_es_un_dia(self):
+        """Test: Con solo desde, la agenda cubre ese día"""
+        response = self.client.get('/calendario/api/agenda/', {'desde': '2025-07-08'})
+
+        self.assertEqual([a['tipo'] for a in response.data], ['Estudio'])
+
+    def test_agenda_rango_maximo(self):
+        """Test: Rangos de más de un año se rechazan"""
+        response = self.client.get(
+            '/calendario/api/agenda/', {'desde': '2025-01-01', 'hasta': '2026-06-01'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PaginacionKeysetTests(TestCase):
+    """Tests para la paginación por cursor de los listados"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        # Varias tareas comparten fecha y hora para probar el desempate por id
+        for i in range(12):
+            dia = date(2025, 7, 1) + timedelta(days=i // 4)
+            Tarea.objects.create(
+                usuario=self.user, titulo=f'Tarea {i}', curso='Curso',
+                fechaEntrega=dia, horaEntrega=time(23, 59),
+                fechaRealizacion=dia, horaInicio=time(9 + i % 2, 0), horaFin=time(11, 0),
+                complejidad=1
+            )
+
+    def _recorrer(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_recorre_todas_las_paginas_en_orden(self):
+        """Test: Las páginas cubren todas las filas, sin repetidos y en orden"""
+        ids = self._recorrer('/calendario/api/tareas/', {'page_size': 5})
+
+        esperado = list(
+            Tarea.objects.order_by('fechaRealizacion', 'horaInicio', 'id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, esperado)
+
+    def test_paginas_no_usan_offset(self):
+        """Test: Las páginas siguientes filtran por la clave, no con OFFSET"""
+        primera = self.client.get('/calendario/api/tareas/', {'page_size': 5})
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(primera.data['next'])
+
+        sql = ' '.join(q['sql'] for q in consultas.captured_queries)
+        self.assertNotIn('OFFSET', sql.upper())
+
+    def test_paginacion_combinada_con_rango(self):
+        """Test: El cursor conserva el filtro de rango"""
+        ids = self._recorrer(
+            '/calendario/api/tareas/',
+            {'page_size': 3, 'desde': '2025-07-02', 'hasta': '2025-07-02'}
+        )
+        self.assertEqual(len(ids), 4)
+
+    def test_sin_parametros_no_pagina(self):
+        """Test: Sin page_size ni cursor se devuelve la lista completa"""
+        response = self.client.get('/calendario/api/tareas/')
+
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 12)
+
+    def test_cursor_invalido(self):
+        """Test: Un cursor manipulado devuelve 400"""
+        response = self.client.get('/calendario/api/tareas/', {'cursor': 'no-es-un-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sesiones_de_estudio_paginadas(self):
+        """Test: SesionesEstudioView también pagina por cursor"""
+        curso = Curso.objects.create(nombre='Matemáticas')
+        tema = Tema.objects.create(curso=curso, nombre='Límites')
+        tema_dificultad = TemaDificultad.objects.create(
+            usuario=self.user, tema=tema, dificultad='media', metodo_estudio='Pomodoro'
+        )
+        for i in range(7):
+            SesionEstudio.objects.create(
+                usuario=self.user, tema_dificultad=tema_dificultad,
+                fecha=date(2025, 7, 1 + i % 3), hora_inicio=time(9, 0),
+                hora_fin=time(9, 25), duracion_minutos=25, numero_sesion=i
+            )
+
+        ids = self._recorrer('/aprendizaje_adaptativo/sesiones/', {'page_size': 2})
+
+        self.assertEqual(sorted(ids), sorted(SesionEstudio.objects.values_list('id', flat=True)))
+        self.assertEqual(len(ids), 7)
+
+
+class GetCondicionalTests(TestCase):
+    """Tests para ETag / Last-Modified en los listados"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.otro = User.objects.create_user(
+            username='otro',
+            email='otro@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.estudio = Estudio.objects.create(
+            usuario=self.user, titulo='Repaso', curso='Química', fecha=date(2025, 7, 1),
+            horaInicio=time(15, 0), horaFin=time(16, 0)
+        )
+
+    def _envejecer_version(self):
+        """Simula que la última escritura fue hace un minuto"""
+        VersionColeccion.objects.update(fecha_actualizacion=timezone.now() - timedelta(minutes=1))
+
+    def test_version_creada_por_otra_peticion(self):
+        """Test: Si otra petición crea la fila de versión a la vez, se incrementa sin romper la transacción"""
+        VersionColeccion.objects.filter(usuario=self.user, coleccion='estudios').delete()
+        atomic = transaction.atomic
+
+        def otra_peticion_primero(*args, **kwargs):
+            # La otra petición inserta la fila entre el UPDATE y el INSERT de esta
+            VersionColeccion.objects.create(usuario=self.user, coleccion='estudios', version=1)
+            return atomic(*args, **kwargs)
+
+        with patch('Apps.Calendario.versiones.transaction') as transaccion:
+            transaccion.atomic.side_effect = otra_peticion_primero
+            incrementar_version(self.user.pk, 'estudios')
+
+        self.assertEqual(
+            VersionColeccion.objects.get(usuario=self.user, coleccion='estudios').version, 2
+        )
+
+    def test_listado_devuelve_etag(self):
+        """Test: El listado incluye ETag, Last-Modified y exige revalidar"""
+        self._envejecer_version()
+        response = self.client.get('/calendario/api/estudios/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_304_sin_serializar(self):
+        """Test: Con el mismo ETag se responde 304 sin leer las actividades"""
+        etag = self.client.get('/calendario/api/estudios/')['ETag']
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/calendario/api/estudios/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(
+            any('Calendario_estudio' in q['sql'] for q in consultas.captured_queries)
+        )
+
+    def test_if_modified_since(self):
+        """Test: If-Modified-Since con la última fecha devuelve 304"""
+        self._envejecer_version()
+        ultima = self.client.get('/calendario/api/estudios/')['Last-Modified']
+
+        response = self.client.get('/calendario/api/estudios/', HTTP_IF_MODIFIED_SINCE=ultima)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_sin_last_modified_en_el_segundo_de_la_escritura(self):
+        """Test: Una escritura en el mismo segundo no queda oculta tras un 304 por fecha"""
+        VersionColeccion.objects.update(fecha_actualizacion=timezone.now())
+        response = self.client.get('/calendario/api/estudios/')
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('ETag', response)
+
+        ahora = http_date(timezone.now().timestamp())
+        self.client.patch(f'/calendario/api/estudios/{self.estudio.id}/', {'titulo': 'Examen'})
+        response = self.client.get('/calendario/api/estudios/', HTTP_IF_MODIFIED_SINCE=ahora)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_sin_last_modified_si_depende_del_dia(self):
+        """Test: Las respuestas que cambian con la fecha solo se validan por ETag"""
+        self._envejecer_version()
+        response = self.client.get('/calendario/api/actividadesHoy/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('ETag', response)
+
+    def test_cambios_invalidan_etag(self):
+        """Test: Crear, editar o borrar cambia el ETag"""
+        etag = self.client.get('/calendario/api/estudios/')['ETag']
+
+        self.client.patch(f'/calendario/api/estudios/{self.estudio.id}/', {'titulo': 'Examen'})
+        response = self.client.get('/calendario/api/estudios/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        self.estudio.delete()
+        response = self.client.get('/calendario/api/estudios/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_etag_depende_de_parametros_y_coleccion(self):
+        """Test: Otro rango u otra colección no reutilizan el ETag"""
+        etag = self.client.get('/calendario/api/estudios/')['ETag']
+
+        response = self.client.get(
+            '/calendario/api/estudios/', {'desde': '2025-07-01'}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Cambios de otro usuario no invalidan la versión de este
+        Estudio.objects.create(
+            usuario=self.otro, titulo='Otro', curso='Física', fecha=date(2025, 7, 1),
+            horaInicio=time(9, 0), horaFin=time(10, 0)
+        )
+        response = self.client.get('/calendario/api/estudios/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_sesiones_de_estudio_condicionales(self):
+        """Test: SesionesEstudioView responde 304 mientras no cambien las sesiones"""
+        curso = Curso.objects.create(nombre='Matemáticas')
+        tema = Tema.objects.create(curso=curso, nombre='Límites')
+        tema_dificultad = TemaDificultad.objects.create(
+            usuario=self.user, tema=tema, dificultad='media', metodo_estudio='Pomodoro'
+        )
+        sesion = SesionEstudio.objects.create(
+            usuario=self.user, tema_dificultad=tema_dificultad, fecha=date(2025, 7, 1),
+            hora_inicio=time(9, 0), hora_fin=time(9, 25), duracion_minutos=25, numero_sesion=1
+        )
+        etag = self.client.get('/aprendizaje_adaptativo/sesiones/')['ETag']
+
+        response = self.client.get('/aprendizaje_adaptativo/sesiones/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        sesion.completada = True
+        sesion.save()
+        response = self.client.get('/aprendizaje_adaptativo/sesiones/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SincronizacionTests(TestCase):
+    """Tests para la sincronización incremental /calendario/api/sync/"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.otro = User.objects.create_user(
+            username='otro',
+            email='otro@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.estudio = Estudio.objects.create(
+            usuario=self.user, titulo='Repaso', curso='Química', fecha=date(2025, 7, 1),
+            horaInicio=time(15, 0), horaFin=time(16, 0)
+        )
+        self.clase = Clase.objects.create(
+            usuario=self.user, curso='Física', fecha=date(2025, 3, 3),
+            horaInicio=time(8, 0), horaFin=time(10, 0), repetir=True, semanas=16
+        )
+        Estudio.objects.create(
+            usuario=self.otro, titulo='Otro', curso='Física', fecha=date(2025, 7, 1),
+            horaInicio=time(9, 0), horaFin=time(10, 0)
+        )
+
+    def _envejecer(self):
+        """Simula que todo lo creado en setUp ocurrió hace una hora"""
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        Estudio.objects.update(fecha_actualizacion=hace_una_hora)
+        Clase.objects.update(fecha_actualizacion=hace_una_hora)
+
+    def test_sin_token_devuelve_copia_completa(self):
+        """Test: Sin ?since= se devuelve todo el calendario del usuario"""
+        response = self.client.get('/calendario/api/sync/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['completo'])
+        self.assertEqual([e['id'] for e in response.data['cambios']['estudios']], [self.estudio.id])
+        self.assertEqual(response.data['cambios']['clases'][0]['excepciones'], [])
+        self.assertIn('token', response.data)
+
+    def test_solo_devuelve_cambios_posteriores(self):
+        """Test: Con token solo vuelven las filas modificadas después"""
+        self._envejecer()
+        token = self.client.get('/calendario/api/sync/').data['token']
+
+        tarea = Tarea.objects.create(
+            usuario=self.user, titulo='Informe', curso='Química',
+            fechaEntrega=date(2025, 7, 3), horaEntrega=time(23, 59),
+            fechaRealizacion=date(2025, 7, 2), horaInicio=time(9, 0), horaFin=time(10, 0),
+            complejidad=2
+        )
+        response = self.client.get('/calendario/api/sync/', {'since': token})
+
+        self.assertFalse(response.data['completo'])
+        self.assertEqual([t['id'] for t in response.data['cambios']['tareas']], [tarea.id])
+        self.assertEqual(response.data['cambios']['estudios'], [])
+        self.assertEqual(response.data['cambios']['clases'], [])
+
+    def test_eliminaciones_como_tombstones(self):
+        """Test: Las actividades borradas se informan por id"""
+        self._envejecer()
+        token = self.client.get('/calendario/api/sync/').data['token']
+        estudio_id = self.estudio.id
+
+        self.client.delete(f'/calendario/api/estudios/{estudio_id}/')
+        response = self.client.get('/calendario/api/sync/', {'since': token})
+
+        self.assertEqual(response.data['eliminados']['estudios'], [estudio_id])
+        self.assertEqual(response.data['cambios']['estudios'], [])
+
+    def test_excepcion_marca_serie_modificada(self):
+        """Test: Cancelar una ocurrencia hace que la serie vuelva a sincronizarse"""
+        self._envejecer()
+        token = self.client.get('/calendario/api/sync/').data['token']
+
+        self.client.post(
+            f'/calendario/api/clases/{self.clase.id}/excepciones/',
+            {'fechaOriginal': '2025-04-14', 'cancelada': True}
+        )
+        response = self.client.get('/calendario/api/sync/', {'since': token})
+
+        clases = response.data['cambios']['clases']
+        self.assertEqual([c['id'] for c in clases], [self.clase.id])
+        self.assertEqual(clases[0]['excepciones'][0]['fechaOriginal'], '2025-04-14')
+
+    def test_token_antiguo_fuerza_copia_completa(self):
+        """Test: Un token más viejo que la retención de eliminaciones pide todo de nuevo"""
+        token = generar_token(timezone.now() - timedelta(days=60))
+
+        response = self.client.get('/calendario/api/sync/', {'since': token})
+
+        self.assertTrue(response.data['completo'])
+        self.assertEqual(len(response.data['cambios']['estudios']), 1)
+
+    def test_token_invalido(self):
+        """Test: Un token que no se puede leer devuelve 400"""
+        response = self.client.get('/calendario/api/sync/', {'since': 'no-es-un-token'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purgar_eliminaciones(self):
+        """Test: Las eliminaciones fuera de la retención se purgan"""
+        self.estudio.delete()
+        EliminacionCalendario.objects.update(
+            fecha_eliminacion=timezone.now() - timedelta(days=31)
+        )
+
+        self.assertEqual(purgar_eliminaciones(), 1)
+        self.assertFalse(EliminacionCalendario.objects.exists())
+
+    def test_purga_periodica_y_token_vencido(self):
+        """Test: La purga corre cada noche y un token más viejo que la retención pide todo de nuevo"""
+        self.assertIn('purgar_eliminaciones_calendario', PROGRAMA)
+        token = generar_token(timezone.now() - timedelta(days=31))
+        self.estudio.delete()
+        EliminacionCalendario.objects.update(
+            fecha_eliminacion=timezone.now() - timedelta(days=31)
+        )
+
+        self.assertEqual(purgar_eliminaciones_calendario(), 1)
+        response = self.client.get('/calendario/api/sync/', {'since': token})
+
+        self.assertTrue(response.data['completo'])
+        self.assertEqual(response.data['eliminados']['estudios'], [])
+        self.assertEqual(response.data['cambios']['estudios'], [])
+
+
+class LoteActividadesTests(TestCase):
+    """Tests para el endpoint de operaciones en lote /calendario/api/lote/"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.otro = User.objects.create_user(
+            username='otro',
+            email='otro@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _tarea(self, titulo, dia, inicio, fin, entrega=None):
+        return {
+            'titulo': titulo, 'curso': 'Química',
+            'fechaEntrega': (entrega or dia).isoformat(), 'horaEntrega': '23:59',
+            'fechaRealizacion': dia.isoformat(), 'horaInicio': inicio, 'horaFin': fin,
+            'complejidad': 2,
+        }
+
+    def _horario(self):
+        """Horario semanal de 20 clases (4 por día, lunes a viernes)"""
+        operaciones = []
+        for dia in range(5):
+            for bloque in range(4):
+                operaciones.append({
+                    'operacion': 'crear', 'tipo': 'clases',
+                    'datos': {
+                        'curso': f'Curso {dia}-{bloque}',
+                        'fecha': (date(2025, 3, 3) + timedelta(days=dia)).isoformat(),
+                        'horaInicio': f'{8 + 2 * bloque:02d}:00',
+                        'horaFin': f'{9 + 2 * bloque:02d}:00',
+                        'repetir': True, 'semanas': 16,
+                    },
+                })
+        return operaciones
+
+    def test_importar_horario_en_una_peticion(self):
+        """Test: Un horario completo se crea con consultas constantes"""
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post(
+                '/calendario/api/lote/', {'operaciones': self._horario()}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['creados']['clases']), 20)
+        self.assertEqual(Clase.objects.filter(usuario=self.user).count(), 20)
+        self.assertFalse(Clase.objects.filter(fechaFinSerie__isnull=True).exists())
+        inserts = [q for q in consultas.captured_queries
+                   if q['sql'].startswith('INSERT INTO "Calendario_clase"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_tareas_del_lote_abren_su_historia(self):
+        """Test: Las tareas creadas en lote quedan con su transición inicial"""
+        response = self.client.post('/calendario/api/lote/', {'operaciones': [
+            {'operacion': 'crear', 'tipo': 'tareas',
+             'datos': self._tarea('Informe', date(2025, 7, 2), '09:00', '10:00')},
+        ]}, format='json')
+
+        tarea_id = response.data['creados']['tareas'][0]['id']
+        self.assertEqual(
+            list(TransicionEstado.objects.filter(tarea_id=tarea_id).values_list('estado_nuevo', flat=True)),
+            ['inicio']
+        )
+
+    def test_actualizar_y_eliminar(self):
+        """Test: Cambios y bajas se aplican juntos y las bajas quedan registradas"""
+        tarea = Tarea.objects.create(
+            usuario=self.user, titulo='Informe', curso='Química',
+            fechaEntrega=date(2025, 7, 3), horaEntrega=time(23, 59),
+            fechaRealizacion=date(2025, 7, 2), horaInicio=time(9, 0), horaFin=time(10, 0),
+            complejidad=2
+        )
+        estudio = Estudio.objects.create(
+            usuario=self.user, titulo='Repaso', curso='Química', fecha=date(2025, 7, 1),
+            horaInicio=time(15, 0), horaFin=time(16, 0)
+        )
+        etag = self.client.get('/calendario/api/tareas/')['ETag']
+
+        response = self.client.post('/calendario/api/lote/', {'operaciones': [
+            {'operacion': 'actualizar', 'tipo': 'tareas', 'id': tarea.id,
+             'datos': {'fechaRealizacion': '2025-07-03'}},
+            {'operacion': 'eliminar', 'tipo': 'estudios', 'id': estudio.id},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.fechaRealizacion, date(2025, 7, 3))
+        self.assertFalse(Estudio.objects.filter(id=estudio.id).exists())
+        self.assertTrue(
+            EliminacionCalendario.objects.filter(coleccion='estudios', objeto_id=estudio.id).exists()
+        )
+        response = self.client.get('/calendario/api/tareas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def _borrar_estudios(self, cantidad, dia):
+        estudios = [
+            Estudio.objects.create(
+                usuario=self.user, titulo=f'Repaso {i}', curso='Química', fecha=dia,
+                horaInicio=time(8 + i % 12, 0), horaFin=time(9 + i % 12, 0)
+            )
+            for i in range(cantidad)
+        ]
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post('/calendario/api/lote/', {'operaciones': [
+                {'operacion': 'eliminar', 'tipo': 'estudios', 'id': estudio.id}
+                for estudio in estudios
+            ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return estudios, consultas
+
+    def test_bajas_en_consultas_constantes(self):
+        """Test: Borrar muchas actividades cuesta lo mismo que borrar pocas"""
+        _, pocas = self._borrar_estudios(2, date(2025, 7, 1))
+        estudios, muchas = self._borrar_estudios(10, date(2025, 7, 2))
+
+        self.assertEqual(len(muchas), len(pocas))
+        self.assertEqual(
+            EliminacionCalendario.objects.filter(coleccion='estudios').count(), 12
+        )
+        self.assertTrue(
+            {e.id for e in estudios} <= set(EliminacionCalendario.objects.values_list('objeto_id', flat=True))
+        )
+        self.assertFalse(CargaDiaria.objects.filter(usuario=self.user, estudios__gt=0).exists())
+
+    def test_lote_invalido_no_escribe_nada(self):
+        """Test: Si una operación es inválida no se aplica ninguna"""
+        estudio_ajeno = Estudio.objects.create(
+            usuario=self.otro, titulo='Otro', curso='Física', fecha=date(2025, 7, 1),
+            horaInicio=time(9, 0), horaFin=time(10, 0)
+        )
+        operaciones = self._horario()[:2] + [
+            {'operacion': 'crear', 'tipo': 'clases', 'datos': {'curso': 'Sin fecha'}},
+            {'operacion': 'eliminar', 'tipo': 'estudios', 'id': estudio_ajeno.id},
+        ]
+
+        response = self.client.post(
+            '/calendario/api/lote/', {'operaciones': operaciones}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['indice'] for e in response.data['errores']], [2, 3])
+        self.assertFalse(Clase.objects.exists())
+        self.assertTrue(Estudio.objects.filter(id=estudio_ajeno.id).exists())
+
+    def test_sobrecarga_una_vez_por_dia(self):
+        """Test: La sobrecarga se avisa una sola vez por día afectado"""
+        dia = date(2025, 7, 7)
+        operaciones = [
+            {'operacion': 'crear', 'tipo': 'tareas',
+             'datos': self._tarea(f'Tarea {i}', dia, f'{8 + 3 * i:02d}:00', f'{11 + 3 * i:02d}:00')}
+            for i in range(4)
+        ]
+
+        response = self.client.post(
+            '/calendario/api/lote/', {'operaciones': operaciones}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ejecutar_pendientes()
+        avisos = Outbox.objects.filter(usuario=self.user, mensaje__contains='sobrecarga')
+        self.assertEqual(avisos.count(), 1)
+
+
+class ConflictosTests(TestCase):
+    """Tests para la detección de solapes entre actividades"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        # Lunes 2025-03-03 a lunes 2025-06-16, de 8:00 a 10:00
+        self.clase = Clase.objects.create(
+            usuario=self.user, curso='Física', fecha=date(2025, 3, 3),
+            horaInicio=time(8, 0), horaFin=time(10, 0), repetir=True, semanas=16
+        )
+        self.estudio = Estudio.objects.create(
+            usuario=self.user, titulo='Repaso', curso='Química', fecha=date(2025, 3, 10),
+            horaInicio=time(9, 30), horaFin=time(11, 0)
+        )
+
+    def _estudio(self, fecha, inicio, fin):
+        return {
+            'titulo': 'Nuevo', 'curso': 'Química', 'fecha': fecha,
+            'horaInicio': inicio, 'horaFin': fin,
+        }
+
+    def test_alta_con_solape_devuelve_409(self):
+        """Test: Con ?validar_conflictos=1 un alta que choca no se guarda"""
+        response = self.client.post(
+            '/calendario/api/estudios/?validar_conflictos=1',
+            self._estudio('2025-03-17', '09:00', '09:30')
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            [(c['tipo'], c['id']) for c in response.data['conflictos']],
+            [('Clase', self.clase.id)]
+        )
+        self.assertEqual(Estudio.objects.count(), 1)
+
+    def test_intervalos_contiguos_no_chocan(self):
+        """Test: Terminar justo cuando empieza otra actividad no es un solape"""
+        response = self.client.post(
+            '/calendario/api/estudios/?validar_conflictos=1',
+            self._estudio('2025-03-17', '10:00', '11:00')
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_sin_parametro_no_valida(self):
+        """Test: Sin ?validar_conflictos el alta se comporta como antes"""
+        response = self.client.post(
+            '/calendario/api/estudios/', self._estudio('2025-03-17', '09:00', '09:30')
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_patch_ignora_la_propia_actividad(self):
+        """Test: Al editar no se cuenta el solape consigo misma"""
+        response = self.client.patch(
+            f'/calendario/api/estudios/{self.estudio.id}/?validar_conflictos=1',
+            {'horaInicio': '10:00'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.patch(
+            f'/calendario/api/estudios/{self.estudio.id}/?validar_conflictos=1',
+            {'horaInicio': '09:00'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_serie_nueva_revisa_todas_sus_semanas(self):
+        """Test: Una serie semanal choca si alguna de sus ocurrencias se solapa"""
+        response = self.client.post('/calendario/api/actividadesNoAcademicas/?validar_conflictos=1', {
+            'titulo': 'Deporte', 'fecha': '2025-02-24', 'horaInicio': '10:30',
+            'horaFin': '12:00', 'repetir': True, 'semanas': 4,
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['conflictos'][0]['id'], self.estudio.id)
+
+    def test_listar_conflictos_del_rango(self):
+        """Test: /conflictos/ lista cada par de actividades que se solapan"""
+        Tarea.objects.create(
+            usuario=self.user, titulo='Informe', curso='Química',
+            fechaEntrega=date(2025, 3, 12), horaEntrega=time(23, 59),
+            fechaRealizacion=date(2025, 3, 10), horaInicio=time(7, 0), horaFin=time(12, 0),
+            complejidad=2
+        )
+
+        response = self.client.get(
+            '/calendario/api/conflictos/', {'desde': '2025-03-03', 'hasta': '2025-03-16'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        pares = {
+            tuple(sorted(a['tipo'] for a in s['actividades'])) for s in response.data
+        }
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(
+            pares, {('Clase', 'Tarea'), ('Estudio', 'Tarea'), ('Clase', 'Estudio')}
+        )
+        self.assertTrue(all(s['fecha'] == date(2025, 3, 10) for s in response.data))
+
+
+class ExportarICSTests(TestCase):
+    """Tests para la exportación del calendario en formato iCalendar"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.tarea = Tarea.objects.create(
+            usuario=self.user, titulo='Informe; final', curso='Química',
+            fechaEntrega=date(2025, 7, 3), horaEntrega=time(23, 59),
+            fechaRealizacion=date(2025, 7, 2), horaInicio=time(9, 0), horaFin=time(10, 0),
+            complejidad=2, estado='entregado'
+        )
+        self.clase = Clase.objects.create(
+            usuario=self.user, curso='Física', fecha=date(2025, 3, 3),
+            horaInicio=time(8, 0), horaFin=time(10, 0), repetir=True, semanas=16
+        )
+        self.clase.excepciones.create(fechaOriginal=date(2025, 3, 10), cancelada=True)
+        self.clase.excepciones.create(
+            fechaOriginal=date(2025, 3, 17), fecha=date(2025, 3, 18), horaInicio=time(14, 0),
+            horaFin=time(16, 0)
+        )
+        Estudio.objects.create(
+            usuario=self.user, titulo='Repaso', curso='Química', fecha=date(2025, 7, 1),
+            horaInicio=time(15, 0), horaFin=time(16, 0)
+        )
+
+    def _contenido(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_exporta_todos_los_tipos(self):
+        """Test: El .ics incluye la tarea como VTODO y la serie con RRULE y excepciones"""
+        response = self.client.get('/calendario/api/ics/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        contenido = self._contenido(response)
+        self.assertTrue(contenido.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(contenido.endswith('END:VCALENDAR\r\n'))
+        self.assertIn('BEGIN:VTODO', contenido)
+        self.assertIn('SUMMARY:Informe\; final', contenido)
+        self.assertIn('DUE:20250703T235900', contenido)
+        self.assertIn('STATUS:COMPLETED', contenido)
+        self.assertIn('RRULE:FREQ=WEEKLY;COUNT=16', contenido)
+        self.assertIn('EXDATE:20250310T080000', contenido)
+        self.assertIn('RECURRENCE-ID:20250317T080000', contenido)
+        self.assertIn('DTSTART:20250318T140000', contenido)
+        self.assertEqual(contenido.count('BEGIN:VEVENT'), 3)
+
+    def test_lineas_plegadas(self):
+        """Test: Ninguna línea supera los 75 octetos"""
+        self.tarea.descripcion = 'Detalle ' * 40
+        self.tarea.save()
+
+        contenido = self._contenido(self.client.get('/calendario/api/ics/'))
+
+        self.assertTrue(all(len(l.encode()) <= 75 for l in contenido.split('\r\n')))
+
+    def test_feed_con_etag(self):
+        """Test: Un suscriptor con el ETag vigente recibe 304"""
+        url = self.client.get('/calendario/api/ics/enlace/').data['url']
+        anonimo = APIClient()
+
+        response = anonimo.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('BEGIN:VTODO', self._contenido(response))
+
+        response = anonimo.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_token_alterado(self):
+        """Test: Un token de suscripción inválido devuelve 404"""
+        response = APIClient().get('/calendario/ics/no-valido/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_regenerar_enlace_revoca_el_anterior(self):
+        """Test: Tras regenerar la URL, la anterior deja de servir el feed"""
+        anterior = self.client.get('/calendario/api/ics/enlace/').data['url']
+        self.assertEqual(self.client.get('/calendario/api/ics/enlace/').data['url'], anterior)
+
+        response = self.client.post('/calendario/api/ics/enlace/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        nueva = response.data['url']
+        self.assertNotEqual(nueva, anterior)
+
+        anonimo = APIClient()
+        self.assertEqual(anonimo.get(anterior).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(anonimo.get(nueva).status_code, status.HTTP_200_OK)
+
+    def test_token_sin_clave_no_sirve(self):
+        """Test: Un token firmado solo con el id del usuario no abre el feed"""
+        token = signing.dumps(self.user.pk, salt='calendario.ics')
+
+        response = APIClient().get(f'/calendario/ics/{token}/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ImportarICSTests(TestCase):
+    """Tests para la importación de archivos .ics"""
+
+    HORARIO = (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:fisica@uni\r\n"
+        "SUMMARY:Física\r\n"
+        "DTSTART;TZID=America/Lima:20250303T080000\r\n"
+        "DTEND;TZID=America/Lima:20250303T100000\r\n"
+        "RRULE:FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20250430T235959Z\r\n"
+        "EXDATE;TZID=America/Lima:20250310T080000\r\n"
+        "BEGIN:VALARM\r\n"
+        "TRIGGER:-PT15M\r\n"
+        "SUMMARY:No es un evento\r\n"
+        "END:VALARM\r\n"
+        "END:VEVENT\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:fisica@uni\r\n"
+        "RECURRENCE-ID;TZID=America/Lima:20250317T080000\r\n"
+        "SUMMARY:Física\r\n"
+        "DTSTART;TZID=America/Lima:20250318T140000\r\n"
+        "DTEND;TZID=America/Lima:20250318T160000\r\n"
+        "END:VEVENT\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:charla@uni\r\n"
+        "SUMMARY:Charla de bienvenida\\, auditorio\r\n"
+        "DTSTART:20250301T150000Z\r\n"
+        "DTEND:20250301T170000Z\r\n"
+        "END:VEVENT\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:feriado@uni\r\n"
+        "SUMMARY:Feriado\r\n"
+        "DTSTART;VALUE=DATE:20250418\r\n"
+        "END:VEVENT\r\n"
+        "BEGIN:VTODO\r\n"
+        "UID:informe@uni\r\n"
+        "SUMMARY:Informe de laboratorio con un título lo bastante largo para que\r\n"
+        "  la línea se pliegue\r\n"
+        "CATEGORIES:Química\r\n"
+        "DUE;VALUE=DATE:20250320\r\n"
+        "END:VTODO\r\n"
+        "END:VCALENDAR\r\n"
+    )
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _subir(self, contenido, **datos):
+        archivo = SimpleUploadedFile('horario.ics', contenido.encode(), content_type='text/calendar')
+        return self.client.post(
+            '/calendario/api/ics/importar/', {'archivo': archivo, **datos}, format='multipart'
+        )
+
+    def test_importar_horario(self):
+        """Test: Las reglas semanales se guardan como series por día con sus excepciones"""
+        response = self._subir(self.HORARIO)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['creados'], {'tareas': 1, 'clases': 3})
+        self.assertEqual([o['uid'] for o in response.data['omitidos']], ['feriado@uni'])
+
+        lunes = Clase.objects.get(curso='Física', fecha=date(2025, 3, 3))
+        self.assertTrue(lunes.repetir)
+        self.assertEqual(lunes.semanas, 9)
+        self.assertEqual(lunes.fechaFinSerie, date(2025, 4, 28))
+        self.assertEqual(
+            sorted((e.fechaOriginal, e.cancelada, e.fecha) for e in lunes.excepciones.all()),
+            [(date(2025, 3, 10), True, None), (date(2025, 3, 17), False, date(2025, 3, 18))]
+        )
+        self.assertEqual(Clase.objects.get(curso='Física', fecha=date(2025, 3, 5)).semanas, 9)
+
+        # 15:00 UTC son las 10:00 en Lima
+        charla = Clase.objects.get(curso='Charla de bienvenida, auditorio')
+        self.assertEqual((charla.horaInicio, charla.horaFin), (time(10, 0), time(12, 0)))
+        self.assertFalse(charla.repetir)
+
+        tarea = Tarea.objects.get()
+        self.assertTrue(tarea.titulo.startswith('Informe de laboratorio'))
+        self.assertEqual((tarea.fechaEntrega, tarea.horaEntrega), (date(2025, 3, 20), time(23, 59)))
+        self.assertEqual(tarea.curso, 'Química')
+
+    def test_tareas_importadas_abren_su_historia(self):
+        """Test: Cada tarea importada queda con su transición inicial, como un alta normal"""
+        self._subir(self.HORARIO)
+
+        tarea = Tarea.objects.get()
+        self.assertEqual(
+            list(TransicionEstado.objects.filter(tarea=tarea).values_list('estado_anterior', 'estado_nuevo')),
+            [('', 'inicio')]
+        )
+        self.assertEqual(TransicionEstado.objects.count(), 1)
+
+    def test_reimportar_no_duplica(self):
+        """Test: Subir el mismo archivo dos veces no crea filas nuevas"""
+        self._subir(self.HORARIO)
+
+        response = self._subir(self.HORARIO)
+
+        self.assertEqual(response.data['creados'], {})
+        self.assertEqual(response.data['duplicados'], 4)
+        self.assertEqual(Clase.objects.count(), 3)
+
+    def test_importar_como_actividades(self):
+        """Test: Con tipo=actividadesNoAcademicas los eventos van a esa colección"""
+        response = self._subir(self.HORARIO, tipo='actividadesNoAcademicas')
+
+        self.assertEqual(response.data['creados']['actividadesNoAcademicas'], 3)
+        self.assertFalse(Clase.objects.exists())
+
+    def test_quinientos_eventos_en_consultas_constantes(self):
+        """Test: 500 eventos se escriben con un número fijo de INSERT"""
+        eventos = ''.join(
+            "BEGIN:VEVENT\r\n"
+            f"UID:evento-{i}@uni\r\n"
+            f"SUMMARY:Curso {i}\r\n"
+            f"DTSTART:20250303T{8 + i % 10:02d}0000\r\n"
+            f"DTEND:20250303T{9 + i % 10:02d}0000\r\n"
+            "RRULE:FREQ=WEEKLY;COUNT=16\r\n"
+            "END:VEVENT\r\n"
+            for i in range(500)
+        )
+        with CaptureQueriesContext(connection) as consultas:
+            response = self._subir(f"BEGIN:VCALENDAR\r\n{eventos}END:VCALENDAR\r\n")
+
+        self.assertEqual(response.data['creados'], {'clases': 500})
+        # Un INSERT por lote (SQLite limita además los parámetros por sentencia)
+        inserts = [q for q in consultas.captured_queries
+                   if q['sql'].startswith('INSERT INTO "Calendario_clase"')]
+        self.assertLess(len(inserts), 10)
+
+    def test_sin_archivo(self):
+        """Test: Sin archivo se responde 400"""
+        response = self.client.post('/calendario/api/ics/importar/', {})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class HuecosLibresTests(TestCase):
+    """Tests para el buscador de huecos libres /calendario/api/huecos/"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        # Lunes 2025-03-03: clase 8-10, estudio 9:30-11 (se solapan) y tarea 14-15
+        Clase.objects.create(
+            usuario=self.user, curso='Física', fecha=date(2025, 3, 3),
+            horaInicio=time(8, 0), horaFin=time(10, 0), repetir=True, semanas=16
+        )
+        Estudio.objects.create(
+            usuario=self.user, titulo='Repaso', curso='Química', fecha=date(2025, 3, 3),
+            horaInicio=time(9, 30), horaFin=time(11, 0)
+        )
+        Tarea.objects.create(
+            usuario=self.user, titulo='Informe', curso='Química',
+            fechaEntrega=date(2025, 3, 5), horaEntrega=time(23, 59),
+            fechaRealizacion=date(2025, 3, 3), horaInicio=time(14, 0), horaFin=time(15, 0),
+            complejidad=2
+        )
+
+    def _huecos(self, **params):
+        return self.client.get('/calendario/api/huecos/', params)
+
+    def test_huecos_de_un_dia(self):
+        """Test: Los intervalos solapados se fusionan y se devuelven los huecos"""
+        response = self._huecos(desde='2025-03-03', hasta='2025-03-03', duracion=60)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(h['horaInicio'], h['horaFin']) for h in response.data],
+            [('07:00', '08:00'), ('11:00', '14:00'), ('15:00', '22:00')]
+        )
+
+    def test_duracion_minima(self):
+        """Test: Se omiten los huecos más cortos que la duración pedida"""
+        response = self._huecos(desde='2025-03-03', hasta='2025-03-03', duracion=240)
+
+        self.assertEqual([h['horaInicio'] for h in response.data], ['15:00'])
+
+    def test_varios_dias_y_horario_despierto(self):
+        """Test: Cada día usa el horario despierto y los días libres salen completos"""
+        response = self._huecos(
+            desde='2025-03-03', hasta='2025-03-04', duracion=30,
+            inicio_dia='06:00', fin_dia='12:00'
+        )
+
+        self.assertEqual(
+            [(str(h['fecha']), h['horaInicio'], h['horaFin']) for h in response.data],
+            [
+                ('2025-03-03', '06:00', '08:00'),
+                ('2025-03-03', '11:00', '12:00'),
+                ('2025-03-04', '06:00', '12:00'),
+            ]
+        )
+
+    def test_horario_del_perfil(self):
+        """Test: Sin parámetros se usa el horario guardado en el perfil"""
+        self.client.patch('/usuarios/me/horario/', {'hora_inicio_dia': '10:30', 'hora_fin_dia': '16:00'})
+
+        response = self._huecos(desde='2025-03-03', hasta='2025-03-03', duracion=30)
+
+        self.assertEqual(
+            [(h['horaInicio'], h['horaFin']) for h in response.data],
+            [('11:00', '14:00'), ('15:00', '16:00')]
+        )
+
+    def test_parametros_invalidos(self):
+        """Test: Duración u horario inválidos devuelven 400"""
+        self.assertEqual(self._huecos(duracion='abc').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self._huecos(inicio_dia='20:00', fin_dia='08:00').status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+
+class CargaDiariaTests(TestCase):
+    """Tests para la tabla CargaDiaria y el mapa de calor /calendario/api/carga/"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.clase = Clase.objects.create(
+            usuario=self.user, curso='Física', fecha=date(2025, 3, 3),
+            horaInicio=time(8, 0), horaFin=time(10, 0), repetir=True, semanas=4
+        )
+        self.tarea = Tarea.objects.create(
+            usuario=self.user, titulo='Informe', curso='Química',
+            fechaEntrega=date(2025, 3, 5), horaEntrega=time(23, 59),
+            fechaRealizacion=date(2025, 3, 3), horaInicio=time(14, 0), horaFin=time(15, 30),
+            complejidad=2
+        )
+
+    def _carga(self, fecha):
+        return CargaDiaria.objects.filter(usuario=self.user, fecha=fecha).first()
+
+    def test_alta_de_actividades(self):
+        """Test: Cada alta actualiza los días que ocupa, incluidas todas las semanas de una serie"""
+        lunes = self._carga(date(2025, 3, 3))
+        self.assertEqual(lunes.minutos_academicos, 210)
+        self.assertEqual((lunes.tareas, lunes.clases), (1, 1))
+        self.assertEqual(
+            list(CargaDiaria.objects.order_by('fecha').values_list('fecha', flat=True)),
+            [date(2025, 3, 3), date(2025, 3, 10), date(2025, 3, 17), date(2025, 3, 24)]
+        )
+
+    def test_mover_y_borrar(self):
+        """Test: Cambiar de día una tarea recalcula el día anterior y el nuevo"""
+        self.tarea.fechaRealizacion = date(2025, 3, 4)
+        self.tarea.save()
+
+        self.assertEqual(self._carga(date(2025, 3, 3)).minutos_academicos, 120)
+        self.assertEqual(self._carga(date(2025, 3, 4)).minutos_academicos, 90)
+
+        self.tarea.delete()
+        self.assertIsNone(self._carga(date(2025, 3, 4)))
+
+    def test_excepciones_de_la_serie(self):
+        """Test: Cancelar o mover una ocurrencia actualiza la carga"""
+        self.client.post(
+            f'/calendario/api/clases/{self.clase.id}/excepciones/',
+            {'fechaOriginal': '2025-03-10', 'cancelada': True}
+        )
+        self.client.post(
+            f'/calendario/api/clases/{self.clase.id}/excepciones/',
+            {'fechaOriginal': '2025-03-17', 'fecha': '2025-03-19'}
+        )
+
+        self.assertIsNone(self._carga(date(2025, 3, 10)))
+        self.assertIsNone(self._carga(date(2025, 3, 17)))
+        self.assertEqual(self._carga(date(2025, 3, 19)).clases, 1)
+
+        self.client.post(
+            f'/calendario/api/clases/{self.clase.id}/excepciones/',
+            {'fechaOriginal': '2025-03-17', 'fecha': '2025-03-20'}
+        )
+        self.assertIsNone(self._carga(date(2025, 3, 19)))
+        self.assertEqual(self._carga(date(2025, 3, 20)).clases, 1)
+
+        self.clase.delete()
+        self.assertFalse(CargaDiaria.objects.filter(clases__gt=0).exists())
+
+    def test_sobrecarga_lee_una_fila(self):
+        """Test: La verificación de sobrecarga lee una sola fila de la carga"""
+        from Apps.Notificacion.utils import verificar_sobrecarga_dia
+        Estudio.objects.create(
+            usuario=self.user, titulo='Maratón', curso='Química', fecha=date(2025, 3, 3),
+            horaInicio=time(15, 30), horaFin=time(23, 30)
+        )
+
+        with CaptureQueriesContext(connection) as consultas:
+            verificar_sobrecarga_dia(self.user, date(2025, 3, 3))
+
+        lecturas = [
+            q for q in consultas.captured_queries if 'cargadiaria' in q['sql'].lower()
+        ]
+        self.assertEqual(len(lecturas), 1)
+        self.assertTrue(Outbox.objects.filter(usuario=self.user).exists())
+
+    def test_lote_actualiza_la_carga(self):
+        """Test: Las escrituras en lote también mantienen la carga"""
+        self.client.post('/calendario/api/lote/', {'operaciones': [
+            {'operacion': 'actualizar', 'tipo': 'clases', 'id': self.clase.id,
+             'datos': {'semanas': 2}},
+        ]}, format='json')
+
+        self.assertIsNone(self._carga(date(2025, 3, 17)))
+        self.assertEqual(self._carga(date(2025, 3, 10)).clases, 1)
+
+    def test_mapa_de_calor(self):
+        """Test: /carga/ devuelve los días del rango con su carga"""
+        response = self.client.get(
+            '/calendario/api/carga/', {'desde': '2025-03-01', 'hasta': '2025-03-09'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['minutos_academicos'], 210)
+        self.assertFalse(response.data[0]['sobrecarga'])
+
+    def test_alta_concurrente_del_mismo_dia(self):
+        """Test: Si otro recálculo crea la fila primero, el alta la sobrescribe sin fallar"""
+        dia = date(2025, 3, 4)
+        bulk_create = CargaDiaria.objects.bulk_create
+
+        def otro_recalculo_primero(nuevas, **kwargs):
+            # Simula el recálculo paralelo que insertó la fila entre la lectura y el alta
+            CargaDiaria.objects.create(usuario=self.user, fecha=dia, minutos_academicos=5)
+            return bulk_create(nuevas, **kwargs)
+
+        with patch.object(CargaDiaria.objects, 'bulk_create', side_effect=otro_recalculo_primero):
+            Estudio.objects.create(
+                usuario=self.user, titulo='Repaso', curso='Química', fecha=dia,
+                horaInicio=time(9, 0), horaFin=time(10, 0)
+            )
+
+        self.assertEqual(CargaDiaria.objects.filter(usuario=self.user, fecha=dia).count(), 1)
+        self.assertEqual(self._carga(dia).minutos_academicos, 60)
+        self.assertEqual(self._carga(dia).estudios, 1)
+
+    def test_recalculo_actualiza_la_fecha(self):
+        """Test: Las filas modificadas o sobrescritas por el upsert renuevan fecha_actualizacion"""
+        antes = timezone.now() - timedelta(days=1)
+        CargaDiaria.objects.update(fecha_actualizacion=antes)
+
+        self.tarea.horaFin = time(16, 0)
+        self.tarea.save()
+
+        self.assertGreater(self._carga(date(2025, 3, 3)).fecha_actualizacion, antes)
+        self.assertEqual(self._carga(date(2025, 3, 10)).fecha_actualizacion, antes)
+
+        dia = date(2025, 3, 4)
+        bulk_create = CargaDiaria.objects.bulk_create
+
+        def otro_recalculo_primero(nuevas, **kwargs):
+            CargaDiaria.objects.create(usuario=self.user, fecha=dia, minutos_academicos=5)
+            CargaDiaria.objects.filter(fecha=dia).update(fecha_actualizacion=antes)
+            return bulk_create(nuevas, **kwargs)
+
+        with patch.object(CargaDiaria.objects, 'bulk_create', side_effect=otro_recalculo_primero):
+            Estudio.objects.create(
+                usuario=self.user, titulo='Repaso', curso='Química', fecha=dia,
+                horaInicio=time(9, 0), horaFin=time(10, 0)
+            )
+        self.assertGreater(self._carga(dia).fecha_actualizacion, antes)
+
+    def test_comando_reconstruye_la_tabla(self):
+        """Test: recalcular_carga_diaria deja la tabla igual que las señales"""
+        esperado = list(CargaDiaria.objects.order_by('fecha').values_list('fecha', 'minutos_academicos'))
+        CargaDiaria.objects.all().delete()
+
+        call_command('recalcular_carga_diaria', stdout=StringIO())
+
+        self.assertEqual(
+            list(CargaDiaria.objects.order_by('fecha').values_list('fecha', 'minutos_academicos')),
+            esperado
+        )
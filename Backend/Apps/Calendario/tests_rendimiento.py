@@ -0,0 +1,113 @@
+"""
+Benchmark del listado por rango del calendario.
+
+Mide la latencia de GET /calendario/api/tareas/?desde=&hasta= para una vista
+mensual mientras el historial del usuario crece. Con el índice compuesto
+(usuario, fechaRealizacion, fechaEntrega) la latencia debe mantenerse plana.
+
+    python manage.py test Apps.Calendario.tests_rendimiento
+"""
+import statistics
+import time as reloj
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Tarea
+
+User = get_user_model()
+
+TAMANOS_HISTORIAL = [100, 2000, 10000]
+TAREAS_EN_VENTANA = 30
+REPETICIONES = 15
+
+
+class ListadoPorRangoBenchmark(TestCase):
+    """Benchmark: latencia del listado mensual frente al tamaño del historial"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='bench',
+            email='bench@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.inicio_mes = date(2025, 7, 1)
+        self.fin_mes = date(2025, 7, 31)
+
+        Tarea.objects.bulk_create(
+            self._tarea(self.inicio_mes + timedelta(days=i % 31))
+            for i in range(TAREAS_EN_VENTANA)
+        )
+        self.historial = 0
+
+    def _tarea(self, dia):
+        return Tarea(
+            usuario=self.user, titulo='Tarea', curso='Curso',
+            fechaEntrega=dia, horaEntrega=time(23, 59),
+            fechaRealizacion=dia, horaInicio=time(9, 0), horaFin=time(10, 0),
+            complejidad=1
+        )
+
+    def _crecer_historial(self, total):
+        """Agrega tareas fuera de la ventana (semestres anteriores)"""
+        nuevas = total - self.historial
+        base = self.inicio_mes - timedelta(days=1)
+        Tarea.objects.bulk_create(
+            (self._tarea(base - timedelta(days=i % 720)) for i in range(nuevas)),
+            batch_size=500
+        )
+        self.historial = total
+
+    def _medir_listado(self):
+        rango = {'desde': str(self.inicio_mes), 'hasta': str(self.fin_mes)}
+        tiempos = []
+        for _ in range(REPETICIONES):
+            inicio = reloj.perf_counter()
+            response = self.client.get('/calendario/api/tareas/', rango)
+            tiempos.append(reloj.perf_counter() - inicio)
+            self.assertEqual(len(response.data), TAREAS_EN_VENTANA)
+        return statistics.median(tiempos)
+
+    def test_latencia_plana_al_crecer_historial(self):
+        resultados = []
+        for total in TAMANOS_HISTORIAL:
+            self._crecer_historial(total)
+            resultados.append((total, self._medir_listado()))
+
+        print("\nHistorial  |  Mediana listado mensual")
+        for total, mediana in resultados:
+            print(f"{total:>9}  |  {mediana * 1000:8.2f} ms")
+
+        # 100x más historial no debe costar más del triple
+        primera = resultados[0][1]
+        ultima = resultados[-1][1]
+        self.assertLess(ultima, primera * 3)
+
+    def test_consulta_usa_indice_compuesto(self):
+        """Test: El rango por usuario y fechaRealizacion usa el índice (usuario, fechaRealizacion, fechaEntrega)"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN es propio de SQLite')
+        self._crecer_historial(TAMANOS_HISTORIAL[0])
+        queryset = Tarea.objects.filter(
+            usuario=self.user,
+            fechaRealizacion__gte=self.inicio_mes,
+            fechaRealizacion__lte=self.fin_mes,
+        )
+        sql, params = queryset.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(fila) for fila in cursor.fetchall())
+
+        # Se busca por campos y no por posición en Meta.indexes
+        indice = next(
+            indice for indice in Tarea._meta.indexes
+            if indice.fields == ["usuario", "fechaRealizacion", "fechaEntrega"]
+        )
+        self.assertIn(indice.name, plan)
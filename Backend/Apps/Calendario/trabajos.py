@@ -0,0 +1,11 @@
+"""
+Trabajos periódicos del calendario (ver Apps.Cola_trabajos).
+"""
+from Apps.Cola_trabajos.programador import periodico
+from .sincronizacion import purgar_eliminaciones
+
+
+@periodico("15 3 * * *")
+def purgar_eliminaciones_calendario():
+    # Los tokens más viejos que la retención ya reciben la copia completa
+    return purgar_eliminaciones()
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TareaViewSet, ClaseViewSet, EstudioViewSet, ActividadNoAcademicaViewSet, ActividadesDeHoyAPIView
+from .views import TareaViewSet, ClaseViewSet, EstudioViewSet, ActividadNoAcademicaViewSet, ActividadesDeHoyAPIView, AgendaAPIView, HuecosAPIView, CargaDiariaAPIView, SincronizacionAPIView, LoteActividadesAPIView, ConflictosAPIView, ExportarICSAPIView, ImportarICSAPIView, EnlaceICSAPIView, SuscripcionICSView
 
 router = DefaultRouter()
 router.register(r'tareas', TareaViewSet, basename='tarea')
@@ -13,4 +13,14 @@ router.register(r'actividadesNoAcademicas', ActividadNoAcademicaViewSet, basenam
 urlpatterns = [
     path('api/', include(router.urls)),
     path('api/actividadesHoy/', ActividadesDeHoyAPIView.as_view(), name='actividadesHoy'), # http://localhost:8000/calendario/api/actividadesHoy/
+    path('api/agenda/', AgendaAPIView.as_view(), name='agenda'), # http://localhost:8000/calendario/api/agenda/?desde=&hasta=
+    path('api/huecos/', HuecosAPIView.as_view(), name='huecos'), # http://localhost:8000/calendario/api/huecos/?desde=&hasta=&duracion=
+    path('api/carga/', CargaDiariaAPIView.as_view(), name='carga'), # http://localhost:8000/calendario/api/carga/?desde=&hasta=
+    path('api/sync/', SincronizacionAPIView.as_view(), name='sincronizacion'), # http://localhost:8000/calendario/api/sync/?since=<token>
+    path('api/lote/', LoteActividadesAPIView.as_view(), name='lote'), # http://localhost:8000/calendario/api/lote/
+    path('api/conflictos/', ConflictosAPIView.as_view(), name='conflictos'), # http://localhost:8000/calendario/api/conflictos/?desde=&hasta=
+    path('api/ics/', ExportarICSAPIView.as_view(), name='exportar_ics'), # http://localhost:8000/calendario/api/ics/
+    path('api/ics/importar/', ImportarICSAPIView.as_view(), name='importar_ics'), # http://localhost:8000/calendario/api/ics/importar/
+    path('api/ics/enlace/', EnlaceICSAPIView.as_view(), name='enlace_ics'), # http://localhost:8000/calendario/api/ics/enlace/ (GET obtener, POST regenerar)
+    path('ics/<str:token>/', SuscripcionICSView.as_view(), name='calendario_ics'), # http://localhost:8000/calendario/ics/<token>/
 ]
@@ -0,0 +1,99 @@
+"""
+Versiones por usuario de las colecciones del calendario y GET condicional.
+
+Cada alta, cambio o baja incrementa la versión de su colección
+(VersionColeccion). Los listados calculan un ETag a partir de esas versiones
+con una sola consulta pequeña y, si el cliente ya tiene esa versión
+(If-None-Match / If-Modified-Since), responden 304 sin consultar ni
+serializar las actividades.
+
+Last-Modified solo tiene segundos, así que se envía únicamente cuando el
+segundo de la última modificación ya terminó: una escritura posterior cae
+en otro segundo y un cliente que solo manda If-Modified-Since la ve. Las
+respuestas con extra (que dependen del día) tampoco lo llevan; para esas y
+para las del mismo segundo queda el ETag.
+"""
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import VersionColeccion
+
+
+def incrementar_version(usuario_id, coleccion):
+    """Marca la colección del usuario como modificada"""
+    filas = VersionColeccion.objects.filter(usuario_id=usuario_id, coleccion=coleccion)
+    if filas.update(version=F("version") + 1, fecha_actualizacion=timezone.now()):
+        return
+    try:
+        # Punto de guardado propio: si falla no invalida la transacción de quien llama
+        with transaction.atomic():
+            VersionColeccion.objects.create(usuario_id=usuario_id, coleccion=coleccion, version=1)
+    except IntegrityError:
+        # Otra petición creó la fila entre el UPDATE y el INSERT
+        filas.update(version=F("version") + 1, fecha_actualizacion=timezone.now())
+
+
+def estado_colecciones(usuario, colecciones):
+    """Devuelve (suma de versiones, última modificación) de las colecciones"""
+    estado = VersionColeccion.objects.filter(
+        usuario=usuario, coleccion__in=colecciones
+    ).aggregate(version=Sum("version"), ultima=Max("fecha_actualizacion"))
+    return estado["version"] or 0, estado["ultima"]
+
+
+def _segundo_cerrado(ultima, extra):
+    """Timestamp para Last-Modified, o None si no identifica la respuesta"""
+    if ultima is None or extra:
+        return None
+    segundo = int(ultima.timestamp())
+    if timezone.now().timestamp() < segundo + 1:
+        return None  # todavía puede haber escrituras en este mismo segundo
+    return segundo
+
+
+def responder_condicional(request, colecciones, construir_respuesta, extra="", usuario=None):
+    """
+    Responde 304 si el cliente ya tiene la versión actual de las colecciones;
+    si no, construye la respuesta y le agrega ETag y Last-Modified.
+
+    extra permite variar el ETag por datos que no dependen de las colecciones
+    (por ejemplo, la fecha de hoy en actividadesHoy). usuario reemplaza a
+    request.user cuando la petición no viene autenticada (feed .ics).
+    """
+    usuario = usuario or request.user
+    version, ultima = estado_colecciones(usuario, colecciones)
+    clave = f"{usuario.pk}|{version}|{request.get_full_path()}|{extra}"
+    etag = f'"{hashlib.md5(clave.encode()).hexdigest()}"'
+    ultima_ts = _segundo_cerrado(ultima, extra)
+
+    no_modificado = get_conditional_response(
+        request, etag=etag, last_modified=ultima_ts
+    )
+    if no_modificado is not None:
+        return no_modificado
+
+    response = construir_respuesta()
+    if response.status_code == 200:
+        response["ETag"] = etag
+        if ultima_ts:
+            response["Last-Modified"] = http_date(ultima_ts)
+        # El navegador puede guardar la respuesta pero debe revalidarla siempre
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class RespuestaCondicionalMixin:
+    """Agrega GET condicional al listado de un ViewSet"""
+    colecciones_version = ()
+
+    def list(self, request, *args, **kwargs):
+        return responder_condicional(
+            request,
+            self.colecciones_version,
+            lambda: super(RespuestaCondicionalMixin, self).list(request, *args, **kwargs),
+        )
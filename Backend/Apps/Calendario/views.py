@@ -1,38 +1,168 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from datetime import date
-from .models import Tarea, Clase, Estudio, ActividadNoAcademica
+from rest_framework.exceptions import ValidationError
+import secrets
+from datetime import date, datetime, time, timedelta
+from django.core import signing
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.views import View
+from .models import Tarea, Clase, Estudio, ActividadNoAcademica, ExcepcionOcurrencia, CargaDiaria
 from .serializers import (
     TareaSerializer,
     ClaseSerializer,
     EstudioSerializer,
     ActividadNoAcademicaSerializer,
-)
-from .serializers import (
-    TareaResumenSerializer,
-    EstudioResumenSerializer,
-    ClaseResumenSerializer,
-    ActividadNoAcademicaResumenSerializer,
+    ExcepcionOcurrenciaSerializer,
 )
 from rest_framework.views import APIView
-from Apps.Notificacion.utils import sugerencia_actividad
+from Apps.Notificacion.trabajos import encolar_sugerencia, encolar_sugerencias_lote
+from Apps.Usuarios.models import PerfilUsuario
+from .services import parsear_rango_fechas, filtrar_por_rango, agenda, huecos_libres
+from .paginacion import KeysetPagination
+from .versiones import RespuestaCondicionalMixin, responder_condicional
+from .recurrencia import series_en_ventana, expandir_ocurrencias, es_ocurrencia
+from .sincronizacion import cambios_desde
+from .lote import aplicar_lote, LoteInvalido
+from .conflictos import validar_conflictos, detectar_solapes
+from .ical import exportar_ics
+from .importacion import importar_ics, TIPOS_EVENTO_ICS
+from .carga import SOBRECARGA_MINUTOS
+
+
+# Permite pedir solo una ventana del calendario: ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD
+# La consulta usa los índices compuestos (usuario, fecha) de cada modelo.
+# Con ?page_size= o ?cursor= el listado se pagina por (fecha, horaInicio, id).
+# Con ?validar_conflictos=1 el alta o el PATCH responden 409 si la actividad
+# se solapa con otra del usuario.
+class RangoFechasMixin:
+    campo_fecha = "fecha"
+    pagination_class = KeysetPagination
+
+    @property
+    def orden_keyset(self):
+        return (self.campo_fecha, "horaInicio", "id")
+
+    def get_queryset(self):
+        queryset = self.queryset.filter(usuario=self.request.user)
+        if self.action == "list":
+            desde, hasta = parsear_rango_fechas(self.request.query_params)
+            queryset = self.filtrar_rango(queryset, desde, hasta)
+        return queryset
+
+    def filtrar_rango(self, queryset, desde, hasta):
+        return filtrar_por_rango(queryset, self.campo_fecha, desde, hasta)
+
+    def comprobar_conflictos(self, serializer):
+        if self.request.query_params.get("validar_conflictos") in ("1", "true"):
+            validar_conflictos(self.request.user, serializer)
+
+    def perform_update(self, serializer):
+        self.comprobar_conflictos(serializer)
+        super().perform_update(serializer)
+
+
+def serializar_ocurrencias(ocurrencias, serializer_class):
+    """Serializa cada serie una sola vez y sobreescribe los datos de la ocurrencia"""
+    series = {}
+    datos = []
+    for ocurrencia in ocurrencias:
+        serie = ocurrencia.serie
+        if serie.pk not in series:
+            series[serie.pk] = serializer_class(serie).data
+        datos.append(
+            {
+                **series[serie.pk],
+                "fecha": ocurrencia.fecha.isoformat(),
+                "fechaOriginal": ocurrencia.fechaOriginal.isoformat(),
+                "horaInicio": ocurrencia.horaInicio.isoformat(),
+                "horaFin": ocurrencia.horaFin.isoformat(),
+                "modificada": ocurrencia.modificada,
+            }
+        )
+    return datos
+
+
+# Clase y ActividadNoAcademica se guardan como una sola fila por serie semanal.
+# El listado con rango devuelve las series que tocan la ventana y /ocurrencias/
+# las expande semana a semana aplicando las excepciones.
+class SerieRecurrenteMixin(RangoFechasMixin):
+    campo_serie = None  # FK hacia la serie en ExcepcionOcurrencia
+
+    def filtrar_rango(self, queryset, desde, hasta):
+        return series_en_ventana(queryset, desde, hasta)
+
+    @action(detail=False, methods=["get"])
+    def ocurrencias(self, request):
+        desde, hasta = parsear_rango_fechas(request.query_params)
+        if not (desde and hasta):
+            return Response(
+                {"error": "Se requieren los parámetros desde y hasta"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        def construir_respuesta():
+            series = series_en_ventana(
+                self.queryset.filter(usuario=request.user), desde, hasta
+            )
+            ocurrencias = expandir_ocurrencias(series, desde, hasta)
+            return Response(
+                serializar_ocurrencias(ocurrencias, self.get_serializer_class())
+            )
+
+        return responder_condicional(
+            request, self.colecciones_version, construir_respuesta
+        )
+
+    @action(detail=True, methods=["post"])
+    def excepciones(self, request, pk=None):
+        serie = self.get_object()
+        serializer = ExcepcionOcurrenciaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if not serie.repetir:
+            return Response(
+                {"error": "Solo las series semanales admiten excepciones; edita la actividad directamente"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        datos = serializer.validated_data
+        fecha_original = datos.pop("fechaOriginal")
+        if not es_ocurrencia(serie, fecha_original):
+            return Response(
+                {"error": "La fecha no corresponde a ninguna ocurrencia de la serie"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        excepcion, creada = ExcepcionOcurrencia.objects.update_or_create(
+            **{self.campo_serie: serie, "fechaOriginal": fecha_original},
+            defaults=datos,
+        )
+        return Response(
+            {
+                "mensaje": "Excepción registrada con éxito" if creada else "Excepción actualizada con éxito",
+                "excepcion": ExcepcionOcurrenciaSerializer(excepcion).data,
+            },
+            status=status.HTTP_201_CREATED if creada else status.HTTP_200_OK,
+        )
 
 
 # ViewSet para Tareas
-class TareaViewSet(viewsets.ModelViewSet):
+class TareaViewSet(RespuestaCondicionalMixin, RangoFechasMixin, viewsets.ModelViewSet):
     queryset = Tarea.objects.select_related('estado_actual').all()
     serializer_class = TareaSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        return self.queryset.filter(usuario=self.request.user)
+    colecciones_version = ("tareas",)
+    campo_fecha = "fechaRealizacion"
 
     def perform_create(self, serializer):
+        self.comprobar_conflictos(serializer)
         tarea = serializer.save(usuario=self.request.user)
-        sugerencia_actividad(self.request.user, tarea)
+        encolar_sugerencia(self.request.user, tarea)
 
     def update(self, request, *args, **kwargs):
         if request.method == "PUT":
@@ -63,6 +193,8 @@ class TareaViewSet(viewsets.ModelViewSet):
 
 # Operación	                   Método HTTP	                    Ruta completa
 # Lista de tareas	              GET	          http://localhost:8000/calendario/api/tareas/
+# Tareas de un rango	          GET	          http://localhost:8000/calendario/api/tareas/?desde=2025-07-01&hasta=2025-07-31
+# Lista paginada	              GET	          http://localhost:8000/calendario/api/tareas/?page_size=50 (seguir el campo "next")
 # Crear tarea	                  POST	          http://localhost:8000/calendario/api/tareas/
 # Detalle de una tarea	          GET	          http://localhost:8000/calendario/api/tareas/<id>/
 # Actualizar tarea	             PATCH	          http://localhost:8000/calendario/api/tareas/<id>/
@@ -70,17 +202,17 @@ class TareaViewSet(viewsets.ModelViewSet):
 
 
 # ViewSet para Clases
-class ClaseViewSet(viewsets.ModelViewSet):
+class ClaseViewSet(RespuestaCondicionalMixin, SerieRecurrenteMixin, viewsets.ModelViewSet):
     queryset = Clase.objects.all()
     serializer_class = ClaseSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        return self.queryset.filter(usuario=self.request.user)
+    colecciones_version = ("clases",)
+    campo_serie = "clase"
 
     def perform_create(self, serializer):
+        self.comprobar_conflictos(serializer)
         clase = serializer.save(usuario=self.request.user)
-        sugerencia_actividad(self.request.user, clase)
+        encolar_sugerencia(self.request.user, clase)
 
     def update(self, request, *args, **kwargs):
         if request.method == "PUT":
@@ -115,20 +247,21 @@ class ClaseViewSet(viewsets.ModelViewSet):
 # Detalle de una clase	         GET	          http://localhost:8000/calendario/api/clases/<id>/
 # Actualizar clase	             PATCH	          http://localhost:8000/calendario/api/clases/<id>/
 # Eliminar clase	                 DELETE	          http://localhost:8000/calendario/api/clases/<id>/
+# Ocurrencias de un rango	     GET	          http://localhost:8000/calendario/api/clases/ocurrencias/?desde=2025-07-01&hasta=2025-07-31
+# Cancelar/mover una ocurrencia  POST	          http://localhost:8000/calendario/api/clases/<id>/excepciones/
 
 
 # ViewSet para Estudios
-class EstudioViewSet(viewsets.ModelViewSet):
+class EstudioViewSet(RespuestaCondicionalMixin, RangoFechasMixin, viewsets.ModelViewSet):
     queryset = Estudio.objects.all()
     serializer_class = EstudioSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        return self.queryset.filter(usuario=self.request.user)
+    colecciones_version = ("estudios",)
 
     def perform_create(self, serializer):
+        self.comprobar_conflictos(serializer)
         estudio = serializer.save(usuario=self.request.user)
-        sugerencia_actividad(self.request.user, estudio)
+        encolar_sugerencia(self.request.user, estudio)
 
     def update(self, request, *args, **kwargs):
         if request.method == "PUT":
@@ -166,15 +299,15 @@ class EstudioViewSet(viewsets.ModelViewSet):
 
 
 # ViewSet para Actividades No Académicas
-class ActividadNoAcademicaViewSet(viewsets.ModelViewSet):
+class ActividadNoAcademicaViewSet(RespuestaCondicionalMixin, SerieRecurrenteMixin, viewsets.ModelViewSet):
     queryset = ActividadNoAcademica.objects.all()
     serializer_class = ActividadNoAcademicaSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        return self.queryset.filter(usuario=self.request.user)
+    colecciones_version = ("actividadesNoAcademicas",)
+    campo_serie = "actividadNoAcademica"
 
     def perform_create(self, serializer):
+        self.comprobar_conflictos(serializer)
         serializer.save(usuario=self.request.user)
 
     def update(self, request, *args, **kwargs):
@@ -214,6 +347,11 @@ class ActividadNoAcademicaViewSet(viewsets.ModelViewSet):
 # Detalle de una actividad	                      GET	           http://localhost:8000/calendario/api/actividadesNoAcademicas/<id>/
 # Actualizar actividad	                          PATCH	           http://localhost:8000/calendario/api/actividadesNoAcademicas/<id>/
 # Eliminar actividad	                              DELETE	       http://localhost:8000/calendario/api/actividadesNoAcademicas/<id>/
+# Ocurrencias de un rango	                      GET	           http://localhost:8000/calendario/api/actividadesNoAcademicas/ocurrencias/?desde=&hasta=
+# Cancelar/mover una ocurrencia	                  POST	           http://localhost:8000/calendario/api/actividadesNoAcademicas/<id>/excepciones/
+
+
+COLECCIONES_CALENDARIO = ("tareas", "clases", "estudios", "actividadesNoAcademicas")
 
 
 class ActividadesDeHoyAPIView(APIView):
@@ -223,31 +361,342 @@ class ActividadesDeHoyAPIView(APIView):
         usuario = request.user
         hoy = date.today()
 
-        tareas = Tarea.objects.filter(usuario=usuario, fechaRealizacion=hoy)
-        estudios = Estudio.objects.filter(usuario=usuario, fecha=hoy)
-        clases = Clase.objects.filter(usuario=usuario, fecha=hoy)
-        actividades_no_acad = ActividadNoAcademica.objects.filter(
-            usuario=usuario, fecha=hoy
+        def construir_respuesta():
+            # Misma consulta que la agenda, restringida a hoy y sin sesiones de estudio
+            actividades = agenda(usuario, hoy, hoy, incluir_sesiones=False)
+
+            todas_ordenadas = []
+            for actividad in actividades:
+                # Las clases se identifican por el curso en lugar de un título
+                campo_titulo = "curso" if actividad["tipo"] == "Clase" else "titulo"
+                todas_ordenadas.append(
+                    {
+                        "tipo": actividad["tipo"],
+                        "horaInicio": actividad["horaInicio"],
+                        "horaFin": actividad["horaFin"],
+                        campo_titulo: actividad["titulo"],
+                        "usuario": usuario.id,
+                    }
+                )
+            return Response(todas_ordenadas)
+
+        return responder_condicional(
+            request, COLECCIONES_CALENDARIO, construir_respuesta, extra=hoy.isoformat()
+        )
+
+
+MAX_DIAS_AGENDA = 366
+
+
+class AgendaAPIView(APIView):
+    """Agenda unificada del usuario, ya ordenada por fecha y hora de inicio"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        desde, hasta = parsear_rango_fechas(request.query_params)
+        desde = desde or hasta or date.today()
+        hasta = hasta or desde
+
+        if (hasta - desde).days >= MAX_DIAS_AGENDA:
+            return Response(
+                {"error": f"El rango no puede superar {MAX_DIAS_AGENDA} días"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return responder_condicional(
+            request,
+            COLECCIONES_CALENDARIO + ("sesiones",),
+            lambda: Response(list(agenda(request.user, desde, hasta))),
+            extra=date.today().isoformat(),
+        )
+
+
+# Operación	              Método HTTP	                    Ruta completa
+# Agenda de un rango	     GET	          http://localhost:8000/calendario/api/agenda/?desde=2025-07-01&hasta=2025-07-07
+
+
+DURACION_HUECO_POR_DEFECTO = 30
+HORARIO_DESPIERTO_POR_DEFECTO = (time(7, 0), time(22, 0))
+
+
+def _leer_hora(valor, parametro):
+    try:
+        return datetime.strptime(valor, "%H:%M").time()
+    except ValueError:
+        raise ValidationError({parametro: "Formato de hora inválido. Use HH:MM"})
+
+
+class HuecosAPIView(APIView):
+    """Ventanas libres del usuario de al menos ?duracion= minutos"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        desde, hasta = parsear_rango_fechas(request.query_params)
+        desde = desde or hasta or date.today()
+        hasta = hasta or desde
+        if (hasta - desde).days >= MAX_DIAS_AGENDA:
+            return Response(
+                {"error": f"El rango no puede superar {MAX_DIAS_AGENDA} días"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            duracion = int(request.query_params.get("duracion", DURACION_HUECO_POR_DEFECTO))
+        except ValueError:
+            duracion = 0
+        if not 1 <= duracion <= 24 * 60:
+            return Response(
+                {"error": "duracion debe ser un número de minutos entre 1 y 1440"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # El horario despierto sale del perfil y se puede ajustar por petición
+        inicio_dia, fin_dia = (
+            PerfilUsuario.objects.filter(usuario=request.user)
+            .values_list("hora_inicio_dia", "hora_fin_dia")
+            .first()
+            or HORARIO_DESPIERTO_POR_DEFECTO
+        )
+        if "inicio_dia" in request.query_params:
+            inicio_dia = _leer_hora(request.query_params["inicio_dia"], "inicio_dia")
+        if "fin_dia" in request.query_params:
+            fin_dia = _leer_hora(request.query_params["fin_dia"], "fin_dia")
+        if inicio_dia >= fin_dia:
+            return Response(
+                {"error": "inicio_dia debe ser anterior a fin_dia"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return responder_condicional(
+            request,
+            COLECCIONES_CALENDARIO + ("sesiones",),
+            lambda: Response(
+                list(
+                    huecos_libres(
+                        agenda(request.user, desde, hasta),
+                        desde, hasta, inicio_dia, fin_dia, duracion,
+                    )
+                )
+            ),
+            extra=f"{date.today().isoformat()}|{inicio_dia}|{fin_dia}",
+        )
+
+
+# Operación	                      Método HTTP	                    Ruta completa
+# Huecos libres de un rango	         GET	          http://localhost:8000/calendario/api/huecos/?desde=2025-07-01&hasta=2025-07-07&duracion=60
+# Ajustar el horario despierto	     GET	          http://localhost:8000/calendario/api/huecos/?duracion=30&inicio_dia=08:00&fin_dia=23:00
+
+
+class CargaDiariaAPIView(APIView):
+    """Carga de cada día del rango (mapa de calor); los días sin actividades no aparecen"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        desde, hasta = parsear_rango_fechas(request.query_params)
+        hoy = date.today()
+        desde = desde or hoy.replace(day=1)
+        hasta = hasta or (desde.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        if (hasta - desde).days >= MAX_DIAS_AGENDA:
+            return Response(
+                {"error": f"El rango no puede superar {MAX_DIAS_AGENDA} días"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        def construir_respuesta():
+            cargas = CargaDiaria.objects.filter(
+                usuario=request.user, fecha__range=(desde, hasta)
+            ).order_by("fecha").values(
+                "fecha", "minutos_academicos", "minutos_no_academicos",
+                "tareas", "clases", "estudios", "actividadesNoAcademicas",
+            )
+            return Response(
+                [
+                    {**carga, "sobrecarga": carga["minutos_academicos"] > SOBRECARGA_MINUTOS}
+                    for carga in cargas
+                ]
+            )
+
+        return responder_condicional(
+            request, COLECCIONES_CALENDARIO, construir_respuesta, extra=hoy.isoformat()
+        )
+
+
+# Operación	                      Método HTTP	                    Ruta completa
+# Carga del mes actual	             GET	          http://localhost:8000/calendario/api/carga/
+# Carga de un rango	                 GET	          http://localhost:8000/calendario/api/carga/?desde=2025-07-01&hasta=2025-07-31
+
+
+class SincronizacionAPIView(APIView):
+    """Cambios y eliminaciones del calendario desde el último token del cliente"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(cambios_desde(request.user, request.query_params.get("since")))
+
+
+# Operación	                      Método HTTP	                    Ruta completa
+# Copia completa del calendario	     GET	          http://localhost:8000/calendario/api/sync/
+# Cambios desde la última sincronización	     GET	          http://localhost:8000/calendario/api/sync/?since=<token>
+
+
+class LoteActividadesAPIView(APIView):
+    """Aplica en una sola transacción un lote de altas, cambios y bajas"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            resultado, fechas, tareas = aplicar_lote(
+                request.user, request.data.get("operaciones")
+            )
+        except LoteInvalido as error:
+            return Response({"errores": error.errores}, status=status.HTTP_400_BAD_REQUEST)
+        encolar_sugerencias_lote(request.user, fechas, tareas)
+        return Response(
+            {"mensaje": "Lote aplicado con éxito", **resultado},
+            status=status.HTTP_200_OK,
+        )
+
+
+# Operación	                      Método HTTP	                    Ruta completa
+# Lote de operaciones	             POST	          http://localhost:8000/calendario/api/lote/
+# Cuerpo: {"operaciones": [{"operacion": "crear", "tipo": "clases", "datos": {...}},
+#                          {"operacion": "actualizar", "tipo": "tareas", "id": 5, "datos": {...}},
+#                          {"operacion": "eliminar", "tipo": "estudios", "id": 7}]}
+
+
+class ConflictosAPIView(APIView):
+    """Todos los solapes entre actividades del usuario en un rango de fechas"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        desde, hasta = parsear_rango_fechas(request.query_params)
+        desde = desde or hasta or date.today()
+        hasta = hasta or desde
+
+        if (hasta - desde).days >= MAX_DIAS_AGENDA:
+            return Response(
+                {"error": f"El rango no puede superar {MAX_DIAS_AGENDA} días"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return responder_condicional(
+            request,
+            COLECCIONES_CALENDARIO,
+            lambda: Response(
+                detectar_solapes(
+                    agenda(request.user, desde, hasta, incluir_sesiones=False)
+                )
+            ),
+            extra=date.today().isoformat(),
+        )
+
+
+# Operación	                      Método HTTP	                    Ruta completa
+# Solapes de un rango	             GET	          http://localhost:8000/calendario/api/conflictos/?desde=2025-07-01&hasta=2025-07-31
+# Validar al crear o editar	         POST/PATCH	      http://localhost:8000/calendario/api/tareas/?validar_conflictos=1 (409 si hay solapes)
+
+
+SALT_ICS = "calendario.ics"
+
+
+def responder_ics(request, usuario):
+    """Feed .ics del usuario, generado por partes y con GET condicional"""
+
+    def construir_respuesta():
+        response = StreamingHttpResponse(
+            exportar_ics(usuario), content_type="text/calendar; charset=utf-8"
+        )
+        response["Content-Disposition"] = 'inline; filename="smartime.ics"'
+        return response
+
+    return responder_condicional(
+        request,
+        COLECCIONES_CALENDARIO + ("sesiones",),
+        construir_respuesta,
+        usuario=usuario,
+    )
+
+
+class ExportarICSAPIView(APIView):
+    """Descarga el calendario del usuario autenticado en formato iCalendar"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return responder_ics(request, request.user)
+
+
+class ImportarICSAPIView(APIView):
+    """Importa un archivo .ics (p. ej. el horario de la universidad) en una petición"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        archivo = request.FILES.get("archivo")
+        if archivo is None:
+            return Response(
+                {"error": "Adjunta el archivo .ics en el campo 'archivo'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        tipo = request.data.get("tipo", "clases")
+        if tipo not in TIPOS_EVENTO_ICS:
+            return Response(
+                {"error": f"tipo debe ser uno de: {', '.join(TIPOS_EVENTO_ICS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        resumen, fechas, tareas = importar_ics(request.user, archivo, tipo)
+        encolar_sugerencias_lote(request.user, fechas, tareas)
+        return Response(
+            {"mensaje": "Calendario importado con éxito", **resumen},
+            status=status.HTTP_201_CREATED,
         )
 
-        tareas_serializadas = TareaResumenSerializer(tareas, many=True).data
-        estudios_serializados = EstudioResumenSerializer(estudios, many=True).data
-        clases_serializadas = ClaseResumenSerializer(clases, many=True).data
-        actividades_serializadas = ActividadNoAcademicaResumenSerializer(
-            actividades_no_acad, many=True
-        ).data
 
-        todas = (
-            [{"tipo": "Tarea", **item} for item in tareas_serializadas]
-            + [{"tipo": "Estudio", **item} for item in estudios_serializados]
-            + [{"tipo": "Clase", **item} for item in clases_serializadas]
-            + [
-                {"tipo": "ActividadNoAcademica", **item}
-                for item in actividades_serializadas
-            ]
+def enlace_ics(request, rotar=False):
+    """URL del feed firmada con la clave del perfil; rotar la cambia y revoca las anteriores"""
+    perfil, _ = PerfilUsuario.objects.get_or_create(usuario=request.user)
+    if rotar or not perfil.clave_ics:
+        perfil.clave_ics = secrets.token_hex(16)
+        perfil.save(update_fields=["clave_ics"])
+    token = signing.dumps([request.user.pk, perfil.clave_ics], salt=SALT_ICS)
+    return request.build_absolute_uri(reverse("calendario_ics", args=[token]))
+
+
+class EnlaceICSAPIView(APIView):
+    """URL privada para suscribirse al calendario desde otras aplicaciones"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"url": enlace_ics(request)})
+
+    def post(self, request):
+        """Genera una URL nueva; la anterior deja de funcionar"""
+        return Response({"url": enlace_ics(request, rotar=True)}, status=status.HTTP_201_CREATED)
+
+
+# Vista de Django y no de DRF: los clientes de calendario piden text/calendar
+# y no envían el token JWT; la URL firmada identifica al usuario.
+class SuscripcionICSView(View):
+    """Feed .ics identificado por el token firmado de la URL"""
+
+    def get(self, request, token):
+        try:
+            usuario_id, clave = signing.loads(token, salt=SALT_ICS)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise Http404
+        perfil = (
+            PerfilUsuario.objects.select_related("usuario")
+            .filter(usuario_id=usuario_id, usuario__is_active=True)
+            .exclude(clave_ics="")
+            .first()
         )
+        if perfil is None or not secrets.compare_digest(perfil.clave_ics, str(clave)):
+            raise Http404
+        return responder_ics(request, perfil.usuario)
 
-        # Ordenar por horaInicio (convertido a string para comparación)
-        todas_ordenadas = sorted(todas, key=lambda x: x["horaInicio"])
 
-        return Response(todas_ordenadas)
+# Operación	                      Método HTTP	                    Ruta completa
+# Descargar calendario .ics	         GET	          http://localhost:8000/calendario/api/ics/
+# Importar calendario .ics	         POST	          http://localhost:8000/calendario/api/ics/importar/ (multipart: archivo, tipo=clases|actividadesNoAcademicas)
+# Obtener URL de suscripción	         GET	          http://localhost:8000/calendario/api/ics/enlace/
+# Regenerar URL de suscripción	     POST	          http://localhost:8000/calendario/api/ics/enlace/ (revoca la anterior)
+# Feed para otras aplicaciones	     GET	          http://localhost:8000/calendario/ics/<token>/
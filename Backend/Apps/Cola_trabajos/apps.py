@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class ColaTrabajosConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "Apps.Cola_trabajos"
+    label = "Cola_trabajos"
+
+    def ready(self):
+        # Cada app registra sus trabajos en su módulo trabajos.py
+        autodiscover_modules("trabajos")
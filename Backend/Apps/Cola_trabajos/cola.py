@@ -0,0 +1,204 @@
+"""
+Cola de trabajos en segundo plano sobre la base de datos.
+
+Las vistas encolan con encolar() en lugar de hacer en la petición el trabajo
+lento (correo, generación de sesiones). El proyecto no usa ATOMIC_REQUESTS:
+la fila se confirma apenas se inserta y un worker puede tomarla antes de que
+termine la petición. Por eso se encola después de guardar lo que el trabajo
+va a leer; dentro de un transaction.atomic la fila se confirma o se descarta
+junto con el bloque. Los workers (manage.py run_workers) reclaman trabajos
+por prioridad y los ejecutan.
+
+Reclamar es un UPDATE condicional sobre la fila candidata: solo un worker
+puede cambiarla a en_curso, sin bloqueos y en cualquier base de datos. Al
+reclamarla se le da un tiempo de visibilidad; mientras el trabajo corre, un
+hilo de latido la extiende cada tercio de ese tiempo, así un trabajo largo
+(los correos a todos los usuarios, el resumen global) no lo toma otro worker
+a la mitad. Si el worker muere, el latido se detiene con él y al vencer la
+visibilidad otro worker vuelve a tomar el trabajo. Los errores se reintentan
+con espera exponencial hasta max_intentos. Cada reclamo cuenta como intento,
+así que un trabajo que tumba al worker tampoco se repite sin fin: al vencer
+su visibilidad sin intentos restantes queda fallido.
+"""
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Trabajo
+
+logger = logging.getLogger(__name__)
+
+PRIORIDAD_ALTA = 10
+PRIORIDAD_NORMAL = 0
+PRIORIDAD_BAJA = -10
+
+VISIBILIDAD = timedelta(minutes=5)
+FRACCION_LATIDO = 1 / 3  # el latido renueva la visibilidad cada tercio de ella
+ESPERA_REINTENTO = timedelta(seconds=30)  # se duplica en cada intento
+CANDIDATOS_POR_RECLAMO = 10
+
+REGISTRO = {}
+
+
+def trabajo(funcion):
+    """Registra funcion como trabajo; se encola por su nombre 'app.modulo.funcion'"""
+    REGISTRO[f"{funcion.__module__}.{funcion.__qualname__}"] = funcion
+    funcion.nombre_trabajo = f"{funcion.__module__}.{funcion.__qualname__}"
+    return funcion
+
+
+def encolar(funcion, usuario=None, prioridad=PRIORIDAD_NORMAL, retraso=None, max_intentos=3, **argumentos):
+    """
+    Encola funcion(**argumentos). Los argumentos se guardan como JSON, así
+    que deben ser ids, textos, números o fechas, no instancias de modelos.
+    Fuera de una transacción el trabajo queda disponible de inmediato: hay
+    que llamarla después de guardar las filas que el trabajo necesita.
+    """
+    nombre = getattr(funcion, "nombre_trabajo", funcion)
+    if nombre not in REGISTRO:
+        raise ValueError(f"Trabajo no registrado: {nombre}")
+    return Trabajo.objects.create(
+        nombre=nombre,
+        argumentos=argumentos,
+        usuario=usuario,
+        prioridad=prioridad,
+        max_intentos=max_intentos,
+        disponible_desde=timezone.now() + (retraso or timedelta(0)),
+    )
+
+
+def _disponibles(ahora):
+    return Trabajo.objects.filter(
+        Q(estado=Trabajo.PENDIENTE) | Q(estado=Trabajo.EN_CURSO),
+        disponible_desde__lte=ahora,
+        intentos__lt=F("max_intentos"),
+    )
+
+
+def marcar_agotados(ahora=None):
+    """Marca fallidos los trabajos que vencieron su visibilidad en el último intento"""
+    ahora = ahora or timezone.now()
+    return Trabajo.objects.filter(
+        estado=Trabajo.EN_CURSO,
+        disponible_desde__lte=ahora,
+        intentos__gte=F("max_intentos"),
+    ).update(
+        estado=Trabajo.FALLIDO,
+        ultimo_error="El worker no terminó el trabajo en ninguno de sus intentos",
+        fecha_fin=ahora,
+    )
+
+
+def reclamar(visibilidad=VISIBILIDAD):
+    """Toma el siguiente trabajo disponible por prioridad, o None si no hay"""
+    ahora = timezone.now()
+    marcar_agotados(ahora)
+    candidatos = list(
+        _disponibles(ahora)
+        .order_by("-prioridad", "disponible_desde", "id")
+        .values_list("id", flat=True)[:CANDIDATOS_POR_RECLAMO]
+    )
+    for trabajo_id in candidatos:
+        token = uuid.uuid4().hex
+        tomados = _disponibles(ahora).filter(id=trabajo_id).update(
+            estado=Trabajo.EN_CURSO,
+            disponible_desde=ahora + visibilidad,
+            intentos=F("intentos") + 1,
+            token=token,
+        )
+        if tomados:
+            return Trabajo.objects.get(id=trabajo_id)
+    return None
+
+
+def renovar(trabajo_reclamado, visibilidad=VISIBILIDAD):
+    """Extiende la visibilidad del trabajo en curso; False si ya no es de este worker"""
+    return bool(
+        Trabajo.objects.filter(
+            id=trabajo_reclamado.id, token=trabajo_reclamado.token, estado=Trabajo.EN_CURSO
+        ).update(disponible_desde=timezone.now() + visibilidad)
+    )
+
+
+def _latir(trabajo_reclamado, visibilidad, terminado):
+    try:
+        while not terminado.wait(visibilidad.total_seconds() * FRACCION_LATIDO):
+            if not renovar(trabajo_reclamado, visibilidad):
+                return  # otro worker lo tomó: el resultado de este ya no se guarda
+    finally:
+        connection.close()
+
+
+def ejecutar(trabajo_reclamado, visibilidad=VISIBILIDAD):
+    """
+    Ejecuta un trabajo ya reclamado y registra el resultado. Las
+    actualizaciones se filtran por token: si el trabajo venció su
+    visibilidad y otro worker lo tomó, este ya no lo modifica.
+    visibilidad debe ser la misma con la que se reclamó.
+    """
+    propio = Trabajo.objects.filter(id=trabajo_reclamado.id, token=trabajo_reclamado.token)
+    funcion = REGISTRO.get(trabajo_reclamado.nombre)
+    terminado = threading.Event()
+    latido = threading.Thread(
+        target=_latir,
+        args=(trabajo_reclamado, visibilidad, terminado),
+        name=f"latido-{trabajo_reclamado.id}",
+        daemon=True,
+    )
+    latido.start()
+    try:
+        try:
+            if funcion is None:
+                raise LookupError(f"Trabajo no registrado: {trabajo_reclamado.nombre}")
+            resultado = funcion(**trabajo_reclamado.argumentos)
+        finally:
+            terminado.set()
+            latido.join()
+    except Exception as error:
+        logger.exception("Falló el trabajo %s", trabajo_reclamado)
+        if trabajo_reclamado.intentos >= trabajo_reclamado.max_intentos:
+            propio.update(
+                estado=Trabajo.FALLIDO,
+                ultimo_error=repr(error)[:2000],
+                fecha_fin=timezone.now(),
+            )
+        else:
+            propio.update(
+                estado=Trabajo.PENDIENTE,
+                ultimo_error=repr(error)[:2000],
+                disponible_desde=timezone.now()
+                + ESPERA_REINTENTO * 2 ** (trabajo_reclamado.intentos - 1),
+            )
+        return False
+
+    propio.update(
+        estado=Trabajo.COMPLETADO,
+        resultado=resultado,
+        fecha_fin=timezone.now(),
+    )
+    return True
+
+
+def ejecutar_pendientes(limite=None, visibilidad=VISIBILIDAD):
+    """Ejecuta trabajos disponibles hasta vaciar la cola o llegar a limite"""
+    ejecutados = 0
+    while limite is None or ejecutados < limite:
+        siguiente = reclamar(visibilidad)
+        if siguiente is None:
+            break
+        ejecutar(siguiente, visibilidad)
+        ejecutados += 1
+    return ejecutados
+
+
+def purgar_terminados(antiguedad=timedelta(days=7)):
+    """Borra los trabajos completados hace más de antiguedad"""
+    borrados, _ = Trabajo.objects.filter(
+        estado=Trabajo.COMPLETADO, fecha_fin__lt=timezone.now() - antiguedad
+    ).delete()
+    return borrados
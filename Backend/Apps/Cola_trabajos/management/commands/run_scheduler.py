@@ -0,0 +1,70 @@
+"""
+Dispara los trabajos periódicos registrados con @periodico.
+
+Cada vuelta encola en Cola_trabajos las tareas vencidas (los workers de
+run_workers las ejecutan) y duerme hasta el próximo vencimiento, a lo sumo
+--espera segundos. Se pueden correr varios nodos: el lease en
+TareaProgramada garantiza que cada ocurrencia se encola una sola vez.
+
+    python manage.py run_scheduler [--espera 30] [--lease 60] [--una-vez] [--listar]
+"""
+import signal
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from Apps.Cola_trabajos.models import TareaProgramada
+from Apps.Cola_trabajos.programador import (
+    PROGRAMA,
+    disparar_vencidas,
+    identificador_nodo,
+    proximo_vencimiento,
+    sincronizar,
+)
+
+
+class Command(BaseCommand):
+    help = "Encola los trabajos periódicos cuando vence su horario cron"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--espera", type=float, default=getattr(settings, "PROGRAMADOR_ESPERA", 30), help="Máximo de segundos entre vueltas")
+        parser.add_argument("--lease", type=int, default=60, help="Segundos que un nodo retiene una tarea al dispararla")
+        parser.add_argument("--una-vez", action="store_true", help="Dispara lo vencido y termina")
+        parser.add_argument("--listar", action="store_true", help="Muestra las tareas programadas y termina")
+
+    def handle(self, *args, **options):
+        if options["listar"]:
+            sincronizar()
+            for fila in TareaProgramada.objects.filter(nombre__in=PROGRAMA).order_by("proxima_ejecucion"):
+                self.stdout.write(
+                    f"{fila.nombre:<28} {fila.cron:<16} próxima {timezone.localtime(fila.proxima_ejecucion):%Y-%m-%d %H:%M}"
+                )
+            return
+
+        propietario = identificador_nodo()
+        lease = timedelta(seconds=options["lease"])
+
+        if options["una_vez"]:
+            encolados = disparar_vencidas(propietario=propietario, lease=lease)
+            self.stdout.write(self.style.SUCCESS(f"{len(encolados)} trabajo(s) encolados"))
+            return
+
+        detener = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: detener.set())
+        signal.signal(signal.SIGINT, lambda *_: detener.set())
+
+        self.stdout.write(f"Programador {propietario}: {len(PROGRAMA)} tarea(s) periódicas")
+        while not detener.is_set():
+            close_old_connections()
+            for encolado in disparar_vencidas(propietario=propietario, lease=lease):
+                self.stdout.write(f"Encolado {encolado}")
+
+            espera = options["espera"]
+            proxima = proximo_vencimiento()
+            if proxima is not None:
+                espera = min(espera, max((proxima - timezone.now()).total_seconds(), 0.5))
+            detener.wait(espera)
@@ -0,0 +1,93 @@
+"""
+Ejecuta los trabajos encolados en Cola_trabajos.
+
+Arranca --procesos procesos con --hilos hilos cada uno; cada hilo reclama un
+trabajo, lo ejecuta y vuelve a consultar la cola, esperando --espera
+segundos cuando está vacía. Con --una-vez procesa lo disponible y termina
+(útil desde cron o en despliegues sin procesos permanentes).
+
+    python manage.py run_workers [--procesos 2] [--hilos 4] [--visibilidad 300]
+"""
+import multiprocessing
+import signal
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, connections
+
+from Apps.Cola_trabajos.cola import ejecutar, ejecutar_pendientes, reclamar
+
+
+def _hilo(detener, visibilidad, espera):
+    try:
+        while not detener.is_set():
+            close_old_connections()
+            siguiente = reclamar(visibilidad)
+            if siguiente is None:
+                detener.wait(espera)
+                continue
+            ejecutar(siguiente, visibilidad)
+    finally:
+        connection.close()
+
+
+def _proceso(hilos, visibilidad, espera):
+    detener = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
+    signal.signal(signal.SIGINT, lambda *_: detener.set())
+
+    grupo = [
+        threading.Thread(target=_hilo, args=(detener, visibilidad, espera), name=f"worker-{i}")
+        for i in range(hilos)
+    ]
+    for hilo in grupo:
+        hilo.start()
+    for hilo in grupo:
+        hilo.join()
+
+
+class Command(BaseCommand):
+    help = "Ejecuta los trabajos en segundo plano de la cola"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--procesos", type=int, default=getattr(settings, "COLA_TRABAJOS_PROCESOS", 1))
+        parser.add_argument("--hilos", type=int, default=getattr(settings, "COLA_TRABAJOS_HILOS", 2))
+        parser.add_argument("--visibilidad", type=int, default=300, help="Segundos antes de reintentar un trabajo sin terminar")
+        parser.add_argument("--espera", type=float, default=1.0, help="Segundos entre consultas con la cola vacía")
+        parser.add_argument("--una-vez", action="store_true", help="Procesa lo disponible y termina")
+
+    def handle(self, *args, **options):
+        visibilidad = timedelta(seconds=options["visibilidad"])
+
+        if options["una_vez"]:
+            ejecutados = ejecutar_pendientes(visibilidad=visibilidad)
+            self.stdout.write(self.style.SUCCESS(f"{ejecutados} trabajo(s) ejecutados"))
+            return
+
+        self.stdout.write(
+            f"Workers: {options['procesos']} proceso(s) x {options['hilos']} hilo(s)"
+        )
+        if options["procesos"] == 1:
+            _proceso(options["hilos"], visibilidad, options["espera"])
+            return
+
+        # Cada proceso abre sus propias conexiones a la base de datos
+        connections.close_all()
+        procesos = [
+            multiprocessing.Process(
+                target=_proceso, args=(options["hilos"], visibilidad, options["espera"])
+            )
+            for _ in range(options["procesos"])
+        ]
+        for proceso in procesos:
+            proceso.start()
+        try:
+            for proceso in procesos:
+                proceso.join()
+        except KeyboardInterrupt:
+            for proceso in procesos:
+                proceso.terminate()
+            for proceso in procesos:
+                proceso.join()
@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 13:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Cola_trabajos", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TareaProgramada",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nombre", models.CharField(max_length=100, unique=True)),
+                ("cron", models.CharField(max_length=100)),
+                ("proxima_ejecucion", models.DateTimeField()),
+                ("ultima_ejecucion", models.DateTimeField(blank=True, null=True)),
+                ("bloqueado_hasta", models.DateTimeField(blank=True, null=True)),
+                ("propietario", models.CharField(blank=True, max_length=100)),
+                (
+                    "ultimo_trabajo",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="Cola_trabajos.trabajo",
+                    ),
+                ),
+            ],
+        ),
+    ]
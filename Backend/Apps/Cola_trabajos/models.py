@@ -0,0 +1,67 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.contrib.auth import get_user_model
+
+
+class Trabajo(models.Model):
+    """
+    Trabajo en segundo plano guardado en la base de datos.
+
+    disponible_desde cumple dos papeles: para un trabajo pendiente es el
+    momento desde el que se puede ejecutar (reintentos con espera); para uno
+    en curso es el fin de su tiempo de visibilidad, pasado el cual otro
+    worker puede reclamarlo si el primero murió.
+    """
+    PENDIENTE = "pendiente"
+    EN_CURSO = "en_curso"
+    COMPLETADO = "completado"
+    FALLIDO = "fallido"
+    ESTADOS = [
+        (PENDIENTE, "Pendiente"),
+        (EN_CURSO, "En curso"),
+        (COMPLETADO, "Completado"),
+        (FALLIDO, "Fallido"),
+    ]
+
+    nombre = models.CharField(max_length=200)
+    argumentos = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, null=True, blank=True, related_name="trabajos")
+    prioridad = models.SmallIntegerField(default=0)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=3)
+    disponible_desde = models.DateTimeField()
+    token = models.CharField(max_length=32, blank=True)
+    resultado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    ultimo_error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["estado", "disponible_desde"]),
+            models.Index(fields=["estado", "fecha_fin"]),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} #{self.pk} ({self.estado})"
+
+
+class TareaProgramada(models.Model):
+    """
+    Estado compartido de un trabajo periódico de run_scheduler.
+
+    proxima_ejecucion es la siguiente hora del cron que aún no se disparó.
+    bloqueado_hasta y propietario forman el lease: el nodo que lo toma es el
+    único que puede disparar la tarea hasta que lo libera o vence.
+    """
+    nombre = models.CharField(max_length=100, unique=True)
+    cron = models.CharField(max_length=100)
+    proxima_ejecucion = models.DateTimeField()
+    ultima_ejecucion = models.DateTimeField(null=True, blank=True)
+    ultimo_trabajo = models.ForeignKey(Trabajo, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    bloqueado_hasta = models.DateTimeField(null=True, blank=True)
+    propietario = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return f"{self.nombre} ({self.cron})"
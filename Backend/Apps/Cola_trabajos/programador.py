@@ -0,0 +1,241 @@
+"""
+Trabajos periódicos con horario tipo cron (manage.py run_scheduler).
+
+Cada app marca sus funciones con @periodico("m h dom mes dow") en su
+trabajos.py. El programador no ejecuta nada: cuando una tarea vence la
+encola en Cola_trabajos y los workers la corren con sus reintentos.
+
+Varios nodos pueden correr run_scheduler a la vez. Para disparar una tarea
+un nodo toma primero su lease en TareaProgramada con un UPDATE condicional;
+después, en una sola transacción, encola el trabajo, avanza
+proxima_ejecucion y libera el lease, solo si el lease sigue siendo suyo. Así
+cada ocurrencia se encola una sola vez aunque un nodo se caiga a la mitad.
+
+Si el programador estuvo detenido, las ocurrencias perdidas se recuperan
+con un único disparo al volver. Con tolerancia, la recuperación solo ocurre
+si la última ocurrencia perdida no es más antigua que ese margen (un
+recordatorio matutino no tiene sentido por la noche). Una tarea tampoco se
+encola mientras su ejecución anterior siga pendiente o en curso.
+"""
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cola import PRIORIDAD_NORMAL, encolar, trabajo
+from .models import TareaProgramada, Trabajo
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=1)
+ALIAS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# (mínimo, máximo) de minuto, hora, día del mes, mes y día de la semana
+RANGOS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+PROGRAMA = {}
+
+
+def _campo(texto, minimo, maximo):
+    valores = set()
+    for parte in texto.split(","):
+        rango, _, paso = parte.partition("/")
+        paso = int(paso) if paso else 1
+        if rango == "*":
+            inicio, fin = minimo, maximo
+        elif "-" in rango:
+            inicio, fin = (int(x) for x in rango.split("-"))
+        else:
+            inicio = int(rango)
+            fin = maximo if paso > 1 else inicio
+        if paso < 1 or not minimo <= inicio <= fin <= maximo:
+            raise ValueError(f"Campo cron fuera de rango: {parte}")
+        valores.update(range(inicio, fin + 1, paso))
+    return valores
+
+
+class Cron:
+    """Expresión cron de 5 campos evaluada en la zona horaria del proyecto"""
+
+    def __init__(self, expresion):
+        self.expresion = expresion
+        campos = ALIAS.get(expresion, expresion).split()
+        if len(campos) != 5:
+            raise ValueError(f"Expresión cron inválida: {expresion}")
+        self.minutos, self.horas, self.dias, self.meses, semana = (
+            _campo(texto, *rango) for texto, rango in zip(campos, RANGOS)
+        )
+        self.dias_semana = {dia % 7 for dia in semana}  # 0 y 7 son domingo
+        # Como en cron: si se restringen día del mes y de la semana basta con uno
+        self.solo_dia_mes = campos[4] == "*"
+        self.solo_dia_semana = campos[2] == "*"
+
+    def _dia_valido(self, dia):
+        en_mes = dia.day in self.dias
+        en_semana = (dia.weekday() + 1) % 7 in self.dias_semana
+        if self.solo_dia_mes:
+            return en_mes
+        if self.solo_dia_semana:
+            return en_semana
+        return en_mes or en_semana
+
+    def siguiente(self, despues):
+        """Primera ocurrencia estrictamente posterior a despues"""
+        local = timezone.localtime(despues).replace(tzinfo=None, second=0, microsecond=0)
+        momento = local + timedelta(minutes=1)
+        limite = momento + timedelta(days=366 * 5)
+        while momento < limite:
+            if momento.month not in self.meses:
+                momento = datetime(momento.year + momento.month // 12, momento.month % 12 + 1, 1)
+            elif not self._dia_valido(momento):
+                momento = datetime(momento.year, momento.month, momento.day) + timedelta(days=1)
+            elif momento.hour not in self.horas:
+                momento = momento.replace(minute=0) + timedelta(hours=1)
+            elif momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+            else:
+                return timezone.make_aware(momento)
+        raise ValueError(f"La expresión cron nunca ocurre: {self.expresion}")
+
+    def ultima_hasta(self, desde, ahora):
+        """Última ocurrencia en [desde, ahora], partiendo de una ocurrencia desde"""
+        ultima = desde
+        while (proxima := self.siguiente(ultima)) <= ahora:
+            ultima = proxima
+        return ultima
+
+
+@dataclass
+class Periodica:
+    nombre: str
+    cron: Cron
+    funcion: object
+    tolerancia: timedelta = None
+    prioridad: int = PRIORIDAD_NORMAL
+
+
+def periodico(expresion, nombre=None, tolerancia=None, prioridad=PRIORIDAD_NORMAL):
+    """
+    Registra la función (sin argumentos) como trabajo periódico. La
+    expresión se puede cambiar sin tocar código con settings.PROGRAMACION
+    = {nombre: "expresión cron"}.
+    """
+    def registrar(funcion):
+        funcion = trabajo(funcion)
+        clave = nombre or funcion.__name__
+        PROGRAMA[clave] = Periodica(
+            clave,
+            Cron(getattr(settings, "PROGRAMACION", {}).get(clave, expresion)),
+            funcion,
+            tolerancia,
+            prioridad,
+        )
+        return funcion
+    return registrar
+
+
+def sincronizar(ahora=None):
+    """Crea las filas de las tareas nuevas y reprograma las que cambiaron de cron"""
+    ahora = ahora or timezone.now()
+    existentes = {fila.nombre: fila for fila in TareaProgramada.objects.filter(nombre__in=PROGRAMA)}
+    for periodica in PROGRAMA.values():
+        fila = existentes.get(periodica.nombre)
+        expresion = periodica.cron.expresion
+        if fila is None:
+            TareaProgramada.objects.get_or_create(
+                nombre=periodica.nombre,
+                defaults={"cron": expresion, "proxima_ejecucion": periodica.cron.siguiente(ahora)},
+            )
+        elif fila.cron != expresion:
+            TareaProgramada.objects.filter(id=fila.id, cron=fila.cron).update(
+                cron=expresion, proxima_ejecucion=periodica.cron.siguiente(ahora)
+            )
+
+
+def _sin_terminar(trabajo_id):
+    return Trabajo.objects.filter(
+        id=trabajo_id, estado__in=[Trabajo.PENDIENTE, Trabajo.EN_CURSO]
+    ).exists()
+
+
+def _disparar(periodica, ahora, propietario, lease):
+    vencidas = TareaProgramada.objects.filter(
+        Q(bloqueado_hasta__isnull=True) | Q(bloqueado_hasta__lt=ahora),
+        nombre=periodica.nombre,
+        proxima_ejecucion__lte=ahora,
+    )
+    if not vencidas.update(bloqueado_hasta=ahora + lease, propietario=propietario):
+        return None
+
+    fila = TareaProgramada.objects.get(nombre=periodica.nombre)
+    with transaction.atomic():
+        encolado = None
+        ocurrencia = fila.proxima_ejecucion
+        if periodica.tolerancia is not None:
+            ocurrencia = periodica.cron.ultima_hasta(ocurrencia, ahora)
+        if periodica.tolerancia is not None and ahora - ocurrencia > periodica.tolerancia:
+            logger.warning("Se omite %s programada para %s: pasó la tolerancia", periodica.nombre, ocurrencia)
+        elif _sin_terminar(fila.ultimo_trabajo_id):
+            logger.warning("Se omite %s: la ejecución anterior no terminó", periodica.nombre)
+        else:
+            encolado = encolar(periodica.funcion, prioridad=periodica.prioridad)
+
+        liberada = TareaProgramada.objects.filter(id=fila.id, propietario=propietario).update(
+            proxima_ejecucion=periodica.cron.siguiente(ahora),
+            ultima_ejecucion=ahora,
+            ultimo_trabajo_id=encolado.id if encolado else fila.ultimo_trabajo_id,
+            bloqueado_hasta=None,
+            propietario="",
+        )
+        if not liberada:
+            # El lease venció y otro nodo tomó la tarea: que la dispare él
+            transaction.set_rollback(True)
+            return None
+    return encolado
+
+
+def identificador_nodo():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def disparar_vencidas(ahora=None, propietario=None, lease=LEASE):
+    """Encola las tareas periódicas vencidas; devuelve los trabajos encolados"""
+    ahora = ahora or timezone.now()
+    propietario = propietario or identificador_nodo()
+    sincronizar(ahora)
+    vencidas = list(
+        TareaProgramada.objects.filter(nombre__in=PROGRAMA, proxima_ejecucion__lte=ahora)
+        .values_list("nombre", flat=True)
+    )
+
+    encolados = []
+    for nombre in vencidas:
+        try:
+            encolado = _disparar(PROGRAMA[nombre], ahora, propietario, lease)
+        except Exception:
+            # El lease queda tomado y vence solo; otra vuelta lo reintenta
+            logger.exception("No se pudo disparar %s", nombre)
+            continue
+        if encolado is not None:
+            encolados.append(encolado)
+    return encolados
+
+
+def proximo_vencimiento():
+    """Próximo momento en que vence alguna tarea, o None si no hay"""
+    return (
+        TareaProgramada.objects.filter(nombre__in=PROGRAMA)
+        .order_by("proxima_ejecucion")
+        .values_list("proxima_ejecucion", flat=True)
+        .first()
+    )
@@ -0,0 +1,434 @@
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from Apps.Aprendizaje_adaptativo.models import Curso, SesionEstudio, Tema, TemaDificultad
+from .cola import (
+    PRIORIDAD_ALTA,
+    PRIORIDAD_BAJA,
+    ejecutar,
+    ejecutar_pendientes,
+    encolar,
+    purgar_terminados,
+    reclamar,
+    renovar,
+    trabajo,
+)
+from .models import TareaProgramada, Trabajo
+from .programador import PROGRAMA, Cron, Periodica, disparar_vencidas
+
+User = get_user_model()
+
+EJECUTADOS = []
+
+
+@trabajo
+def anotar(valor):
+    EJECUTADOS.append(valor)
+    return valor
+
+
+@trabajo
+def latido():
+    EJECUTADOS.append("latido")
+
+
+@trabajo
+def fallar():
+    raise RuntimeError("SMTP caído")
+
+
+class UnLatido:
+    """Evento que deja pasar un solo latido"""
+    def __init__(self):
+        self.esperas = 0
+
+    def wait(self, segundos):
+        self.esperas += 1
+        return self.esperas > 1
+
+
+class HiloManual:
+    """Hilo de latido que no arranca solo: el trabajo lo hace latir con latir()"""
+    ultimo = None
+
+    def __init__(self, target, args, **kwargs):
+        self.target, self.args = target, args
+        HiloManual.ultimo = self
+
+    def start(self):
+        pass
+
+    def join(self):
+        pass
+
+    def latir(self):
+        trabajo_reclamado, visibilidad, _ = self.args
+        # El hilo real cierra su propia conexión; aquí es la del test
+        with mock.patch("Apps.Cola_trabajos.cola.connection"):
+            self.target(trabajo_reclamado, visibilidad, UnLatido())
+
+
+@trabajo
+def largo():
+    # Pasa el tiempo de visibilidad: sin latido, otro worker lo tomaría
+    Trabajo.objects.filter(nombre=largo.nombre_trabajo).update(
+        disponible_desde=timezone.now() - timedelta(seconds=1)
+    )
+    HiloManual.ultimo.latir()
+    EJECUTADOS.append(reclamar())
+
+
+class ColaTrabajosTests(TestCase):
+    """Tests de la cola de trabajos en segundo plano"""
+
+    def setUp(self):
+        EJECUTADOS.clear()
+        self.user = User.objects.create_user(
+            username='colauser', email='cola@example.com', password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_encolar_trabajo_no_registrado(self):
+        """Test: Solo se pueden encolar funciones marcadas con @trabajo"""
+        with self.assertRaises(ValueError):
+            encolar(print, texto="hola")
+        self.assertFalse(Trabajo.objects.exists())
+
+    def test_ejecuta_por_prioridad(self):
+        """Test: Los trabajos de mayor prioridad se ejecutan primero"""
+        encolar(anotar, prioridad=PRIORIDAD_BAJA, valor="baja")
+        encolar(anotar, valor="normal")
+        encolar(anotar, prioridad=PRIORIDAD_ALTA, valor="alta")
+
+        self.assertEqual(ejecutar_pendientes(), 3)
+        self.assertEqual(EJECUTADOS, ["alta", "normal", "baja"])
+        self.assertEqual(
+            Trabajo.objects.filter(estado=Trabajo.COMPLETADO).count(), 3
+        )
+
+    def test_respeta_retraso(self):
+        """Test: Un trabajo con retraso no se reclama antes de tiempo"""
+        encolar(anotar, retraso=timedelta(minutes=10), valor="luego")
+        self.assertIsNone(reclamar())
+        self.assertEqual(EJECUTADOS, [])
+
+    def test_reintenta_con_espera_y_luego_falla(self):
+        """Test: Un error se reintenta con espera creciente hasta max_intentos"""
+        fallido = encolar(fallar, max_intentos=2)
+
+        self.assertEqual(ejecutar_pendientes(), 1)
+        fallido.refresh_from_db()
+        self.assertEqual(fallido.estado, Trabajo.PENDIENTE)
+        self.assertEqual(fallido.intentos, 1)
+        self.assertIn("SMTP caído", fallido.ultimo_error)
+        self.assertGreater(fallido.disponible_desde, timezone.now())
+
+        # Mientras espera no se vuelve a ejecutar
+        self.assertEqual(ejecutar_pendientes(), 0)
+
+        Trabajo.objects.filter(id=fallido.id).update(disponible_desde=timezone.now())
+        self.assertEqual(ejecutar_pendientes(), 1)
+        fallido.refresh_from_db()
+        self.assertEqual(fallido.estado, Trabajo.FALLIDO)
+        self.assertEqual(fallido.intentos, 2)
+        self.assertIsNotNone(fallido.fecha_fin)
+
+    def test_trabajo_abandonado_vuelve_a_reclamarse(self):
+        """Test: Si un worker muere, el trabajo se reclama al vencer su visibilidad"""
+        encolar(anotar, valor="x")
+        primero = reclamar(visibilidad=timedelta(minutes=5))
+        self.assertIsNotNone(primero)
+
+        # Mientras dura la visibilidad nadie más lo toma
+        self.assertIsNone(reclamar())
+
+        Trabajo.objects.filter(id=primero.id).update(
+            disponible_desde=timezone.now() - timedelta(seconds=1)
+        )
+        segundo = reclamar()
+        self.assertEqual(segundo.id, primero.id)
+        self.assertNotEqual(segundo.token, primero.token)
+        self.assertEqual(segundo.intentos, 2)
+
+        # El worker original ya no puede escribir el resultado
+        ejecutar(primero)
+        segundo.refresh_from_db()
+        self.assertEqual(segundo.estado, Trabajo.EN_CURSO)
+
+        ejecutar(segundo)
+        segundo.refresh_from_db()
+        self.assertEqual(segundo.estado, Trabajo.COMPLETADO)
+        self.assertEqual(segundo.resultado, "x")
+
+    def test_worker_que_muere_agota_los_intentos(self):
+        """Test: Un trabajo que tumba a cada worker queda fallido al agotar sus intentos"""
+        trabajo_id = encolar(anotar, max_intentos=2, valor="x").id
+        for _ in range(2):
+            self.assertIsNotNone(reclamar())
+            # El worker muere sin ejecutarlo y la visibilidad vence
+            Trabajo.objects.filter(id=trabajo_id).update(
+                disponible_desde=timezone.now() - timedelta(seconds=1)
+            )
+
+        self.assertIsNone(reclamar())
+        agotado = Trabajo.objects.get(id=trabajo_id)
+        self.assertEqual(agotado.estado, Trabajo.FALLIDO)
+        self.assertEqual(agotado.intentos, 2)
+        self.assertIsNotNone(agotado.fecha_fin)
+        self.assertEqual(EJECUTADOS, [])
+
+    def test_trabajo_en_curso_no_se_reclama_otra_vez(self):
+        """Test: El latido extiende la visibilidad mientras el trabajo corre"""
+        encolar(largo)
+        reclamado = reclamar(visibilidad=timedelta(minutes=5))
+
+        with mock.patch("Apps.Cola_trabajos.cola.threading.Thread", HiloManual):
+            self.assertTrue(ejecutar(reclamado, visibilidad=timedelta(minutes=5)))
+
+        self.assertEqual(EJECUTADOS, [None])  # nadie más lo reclamó
+        reclamado.refresh_from_db()
+        self.assertEqual(reclamado.intentos, 1)
+        self.assertEqual(reclamado.estado, Trabajo.COMPLETADO)
+
+    def test_latido_no_renueva_un_trabajo_ajeno(self):
+        """Test: Si otro worker tomó el trabajo, el latido del primero no lo toca"""
+        encolar(anotar, valor="x")
+        primero = reclamar()
+        Trabajo.objects.filter(id=primero.id).update(disponible_desde=timezone.now() - timedelta(seconds=1))
+        segundo = reclamar()
+
+        self.assertFalse(renovar(primero))
+        self.assertTrue(renovar(segundo))
+
+    def test_purgar_terminados(self):
+        """Test: Se borran solo los trabajos completados antiguos"""
+        encolar(anotar, valor="viejo")
+        encolar(fallar, max_intentos=1)
+        ejecutar_pendientes()
+        Trabajo.objects.update(fecha_fin=timezone.now() - timedelta(days=8))
+        encolar(anotar, valor="pendiente")
+
+        self.assertEqual(purgar_terminados(), 1)
+        self.assertEqual(
+            sorted(Trabajo.objects.values_list("estado", flat=True)),
+            [Trabajo.FALLIDO, Trabajo.PENDIENTE],
+        )
+
+    def test_run_workers_una_vez(self):
+        """Test: run_workers --una-vez procesa la cola y termina"""
+        encolar(anotar, valor=1)
+        encolar(anotar, valor=2)
+        salida = StringIO()
+
+        call_command("run_workers", "--una-vez", stdout=salida)
+
+        self.assertIn("2 trabajo(s) ejecutados", salida.getvalue())
+        self.assertEqual(EJECUTADOS, [1, 2])
+
+    def test_restablecer_contrasena_encola_correo(self):
+        """Test: La solicitud de nueva contraseña responde sin esperar al correo"""
+        response = APIClient().post(
+            '/autenticacion/solicitarNuevaContrasena/', {'email': 'cola@example.com'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        encolado = Trabajo.objects.get(usuario=self.user)
+        self.assertEqual(encolado.prioridad, PRIORIDAD_ALTA)
+
+        ejecutar_pendientes()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['cola@example.com'])
+        self.assertIn('/reset-password/', mail.outbox[0].body)
+
+    def test_planificacion_asincrona(self):
+        """Test: Con asincrono la planificación se genera en un worker"""
+        tema = Tema.objects.create(curso=Curso.objects.create(nombre='Física'), nombre='Cinemática')
+        tema_dificultad = TemaDificultad.objects.create(
+            usuario=self.user, tema=tema, dificultad='media', metodo_estudio='Pomodoro'
+        )
+
+        response = self.client.post('/aprendizaje_adaptativo/generar-planificacion/', {
+            'tema_dificultad_id': tema_dificultad.id,
+            'fecha_inicio': '2025-11-25',
+            'hora_preferida': '09:00',
+            'dias_disponibles': ['lunes', 'miercoles', 'viernes'],
+            'asincrono': True,
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(SesionEstudio.objects.exists())
+        estado_url = response.data['estado']
+
+        self.assertEqual(self.client.get(estado_url).data['estado'], Trabajo.PENDIENTE)
+
+        ejecutar_pendientes()
+        estado = self.client.get(estado_url)
+        self.assertEqual(estado.data['estado'], Trabajo.COMPLETADO)
+        self.assertTrue(SesionEstudio.objects.filter(tema_dificultad=tema_dificultad).exists())
+
+    def test_estado_de_trabajo_ajeno(self):
+        """Test: Un usuario no ve los trabajos de otro"""
+        otro = User.objects.create_user(username='otro', email='otro@example.com', password='x')
+        ajeno = encolar(anotar, usuario=otro, valor="privado")
+
+        response = self.client.get(f'/cola/api/trabajos/{ajeno.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CronTests(TestCase):
+    """Tests de las expresiones cron del programador"""
+
+    def setUp(self):
+        self.zona = ZoneInfo(settings.TIME_ZONE)
+
+    def momento(self, *args):
+        return datetime(*args, tzinfo=self.zona)
+
+    def test_siguiente_ocurrencia(self):
+        """Test: siguiente devuelve la primera ocurrencia estrictamente posterior"""
+        cada_cuarto = Cron("*/15 * * * *")
+        self.assertEqual(cada_cuarto.siguiente(self.momento(2025, 7, 10, 14, 7)), self.momento(2025, 7, 10, 14, 15))
+        self.assertEqual(cada_cuarto.siguiente(self.momento(2025, 7, 10, 23, 45)), self.momento(2025, 7, 11, 0, 0))
+
+        diario = Cron("0 7 * * *")
+        self.assertEqual(diario.siguiente(self.momento(2025, 7, 10, 7, 0)), self.momento(2025, 7, 11, 7, 0))
+
+        mensual = Cron("@monthly")
+        self.assertEqual(mensual.siguiente(self.momento(2025, 12, 5, 10, 0)), self.momento(2026, 1, 1, 0, 0))
+
+    def test_dias_de_la_semana_y_del_mes(self):
+        """Test: Con día del mes y de la semana restringidos basta con uno"""
+        lunes = Cron("0 9 * * 1")
+        self.assertEqual(lunes.siguiente(self.momento(2025, 7, 10, 12, 0)), self.momento(2025, 7, 14, 9, 0))
+
+        quince_o_domingo = Cron("0 9 15 * 7")
+        self.assertEqual(
+            quince_o_domingo.siguiente(self.momento(2025, 7, 10, 12, 0)), self.momento(2025, 7, 13, 9, 0)
+        )
+        self.assertEqual(
+            quince_o_domingo.siguiente(self.momento(2025, 7, 13, 12, 0)), self.momento(2025, 7, 15, 9, 0)
+        )
+
+    def test_expresion_invalida(self):
+        """Test: Una expresión mal formada falla al registrarse"""
+        for expresion in ["* * * *", "61 * * * *", "0 7 * * lunes", "*/0 * * * *"]:
+            with self.assertRaises(ValueError):
+                Cron(expresion)
+
+
+class ProgramadorTests(TestCase):
+    """Tests del disparo de trabajos periódicos con lease y recuperación"""
+
+    def setUp(self):
+        EJECUTADOS.clear()
+        zona = ZoneInfo(settings.TIME_ZONE)
+        self.inicio = datetime(2025, 7, 10, 6, 0, tzinfo=zona)
+        self.siete = self.inicio.replace(hour=7)
+        self.periodica = Periodica("latido_diario", Cron("0 7 * * *"), latido)
+        programa = mock.patch.dict(PROGRAMA, {"latido_diario": self.periodica}, clear=True)
+        programa.start()
+        self.addCleanup(programa.stop)
+        # Primera vuelta: solo registra la tarea con su próxima ejecución
+        self.assertEqual(disparar_vencidas(ahora=self.inicio, propietario="nodo-a"), [])
+
+    def fila(self):
+        return TareaProgramada.objects.get(nombre="latido_diario")
+
+    def test_dispara_una_vez_por_ocurrencia(self):
+        """Test: La tarea se encola al vencer y no se repite en la misma ocurrencia"""
+        self.assertEqual(self.fila().proxima_ejecucion, self.siete)
+
+        encolados = disparar_vencidas(ahora=self.siete, propietario="nodo-a")
+        self.assertEqual(len(encolados), 1)
+        self.assertEqual(disparar_vencidas(ahora=self.siete, propietario="nodo-b"), [])
+
+        fila = self.fila()
+        self.assertEqual(fila.proxima_ejecucion, self.siete + timedelta(days=1))
+        self.assertEqual(fila.ultimo_trabajo, encolados[0])
+        self.assertEqual(fila.propietario, "")
+
+        ejecutar_pendientes()
+        self.assertEqual(EJECUTADOS, ["latido"])
+
+    def test_lease_de_otro_nodo(self):
+        """Test: Mientras otro nodo tiene el lease la tarea no se dispara"""
+        TareaProgramada.objects.update(
+            propietario="nodo-b", bloqueado_hasta=self.siete + timedelta(minutes=1)
+        )
+        self.assertEqual(disparar_vencidas(ahora=self.siete, propietario="nodo-a"), [])
+
+        # Si el nodo b murió, al vencer el lease otro nodo la recupera
+        tarde = self.siete + timedelta(minutes=2)
+        self.assertEqual(len(disparar_vencidas(ahora=tarde, propietario="nodo-a")), 1)
+
+    def test_lease_perdido_no_encola(self):
+        """Test: Si el lease vence durante el disparo, el encolado se deshace"""
+        original = encolar
+
+        def robar_lease(*args, **kwargs):
+            TareaProgramada.objects.update(propietario="nodo-b")
+            return original(*args, **kwargs)
+
+        with mock.patch("Apps.Cola_trabajos.programador.encolar", side_effect=robar_lease):
+            self.assertEqual(disparar_vencidas(ahora=self.siete, propietario="nodo-a"), [])
+
+        self.assertFalse(Trabajo.objects.exists())
+        self.assertEqual(self.fila().proxima_ejecucion, self.siete)
+
+    def test_recupera_ocurrencias_perdidas_una_vez(self):
+        """Test: Tras días detenido se dispara una sola vez y se sigue desde ahora"""
+        regreso = self.siete + timedelta(days=3, hours=1)
+
+        self.assertEqual(len(disparar_vencidas(ahora=regreso, propietario="nodo-a")), 1)
+        self.assertEqual(self.fila().proxima_ejecucion, self.siete + timedelta(days=4))
+
+    def test_tolerancia_omite_recuperacion_tardia(self):
+        """Test: Con tolerancia, una ocurrencia demasiado vieja se omite"""
+        self.periodica.tolerancia = timedelta(hours=2)
+
+        self.assertEqual(disparar_vencidas(ahora=self.siete.replace(hour=10), propietario="nodo-a"), [])
+        self.assertEqual(self.fila().proxima_ejecucion, self.siete + timedelta(days=1))
+
+        # Dentro de la tolerancia se recupera aunque se hayan perdido varios días
+        TareaProgramada.objects.update(proxima_ejecucion=self.siete - timedelta(days=2))
+        self.assertEqual(len(disparar_vencidas(ahora=self.siete.replace(hour=8), propietario="nodo-a")), 1)
+
+    def test_no_solapa_con_la_ejecucion_anterior(self):
+        """Test: No se encola otra vez mientras la anterior sigue pendiente"""
+        disparar_vencidas(ahora=self.siete, propietario="nodo-a")
+
+        siguiente = self.siete + timedelta(days=1)
+        self.assertEqual(disparar_vencidas(ahora=siguiente, propietario="nodo-a"), [])
+        self.assertEqual(Trabajo.objects.count(), 1)
+
+    def test_cambio_de_cron_reprograma(self):
+        """Test: Si cambia la expresión la próxima ejecución se recalcula"""
+        self.periodica.cron = Cron("30 6 * * *")
+        disparar_vencidas(ahora=self.inicio, propietario="nodo-a")
+
+        fila = self.fila()
+        self.assertEqual(fila.cron, "30 6 * * *")
+        self.assertEqual(fila.proxima_ejecucion, self.inicio.replace(minute=30))
+
+    def test_run_scheduler_una_vez(self):
+        """Test: run_scheduler --una-vez encola lo vencido y termina"""
+        TareaProgramada.objects.update(proxima_ejecucion=timezone.now() - timedelta(minutes=1))
+        salida = StringIO()
+
+        call_command("run_scheduler", "--una-vez", stdout=salida)
+
+        self.assertIn("1 trabajo(s) encolados", salida.getvalue())
+        self.assertEqual(Trabajo.objects.get().nombre, latido.nombre_trabajo)
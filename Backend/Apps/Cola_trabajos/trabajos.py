@@ -0,0 +1,10 @@
+"""
+Trabajos periódicos de mantenimiento de la propia cola.
+"""
+from .cola import purgar_terminados
+from .programador import periodico
+
+
+@periodico("30 3 * * *")
+def purgar_trabajos():
+    return purgar_terminados()
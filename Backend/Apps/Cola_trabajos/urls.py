@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import EstadoTrabajoAPIView
+
+urlpatterns = [
+    path('api/trabajos/<int:trabajo_id>/', EstadoTrabajoAPIView.as_view(), name='estado-trabajo'), # GET http://localhost:8000/cola/api/trabajos/<id>/
+]
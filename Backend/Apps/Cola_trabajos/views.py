@@ -0,0 +1,30 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from .models import Trabajo
+
+
+class EstadoTrabajoAPIView(APIView):
+    """Estado de un trabajo en segundo plano encolado por el usuario"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, trabajo_id):
+        try:
+            trabajo = Trabajo.objects.get(id=trabajo_id, usuario=request.user)
+        except Trabajo.DoesNotExist:
+            return Response({"error": "Trabajo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "id": trabajo.id,
+            "estado": trabajo.estado,
+            "intentos": trabajo.intentos,
+            "resultado": trabajo.resultado,
+            "fecha_creacion": trabajo.fecha_creacion,
+            "fecha_fin": trabajo.fecha_fin,
+        })
+
+
+# Operación	                      Método HTTP	                    Ruta completa
+# Estado de un trabajo	             GET	          http://localhost:8000/cola/api/trabajos/<id>/
@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import ResumenGlobal
 
-# Register your models here.
+
+@admin.register(ResumenGlobal)
+class ResumenGlobalAdmin(admin.ModelAdmin):
+    list_display = [
+        'fecha', 'usuarios', 'usuarios_activos', 'carga_promedio_minutos',
+        'tasa_finalizacion', 'metodo_mas_usado', 'dias_sobrecargados'
+    ]
+    date_hierarchy = 'fecha'
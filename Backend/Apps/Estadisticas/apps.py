@@ -5,3 +5,6 @@ class EstadisticasConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "Apps.Estadisticas"
     label = "Estadisticas"
+
+    def ready(self):
+        from . import signals  # noqa: F401
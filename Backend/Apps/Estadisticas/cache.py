@@ -0,0 +1,106 @@
+"""
+Caché de las estadísticas por usuario.
+
+La clave lleva la versión de los datos del usuario: la suma de las
+versiones de sus colecciones "tareas" y "estadosTareas" en
+VersionColeccion, que las señales incrementan en cada post_save/post_delete
+de Tarea y EstadoTarea (y las altas masivas a mano). Un cambio no borra
+nada: solo hace que la siguiente lectura use otra clave, y las entradas
+viejas vencen solas. Como la versión está en la base de datos, vale igual
+para todos los procesos aunque cada uno tenga su propia caché.
+
+Si varias peticiones del mismo usuario fallan a la vez, solo una calcula
+(single-flight): dentro del proceso las demás esperan su resultado, y entre
+procesos la que gana cache.add(clave de cálculo) calcula mientras las
+otras esperan a que aparezca el valor.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from Apps.Calendario.versiones import estado_colecciones
+
+COLECCIONES = ("tareas", "estadosTareas")
+ESPERA_CALCULO = 10  # segundos que otro proceso espera al que está calculando
+INTERVALO_ESPERA = 0.05
+
+_vuelos = {}
+_candado_vuelos = threading.Lock()
+
+
+class _Vuelo:
+    def __init__(self):
+        self.terminado = threading.Event()
+        self.valor = None
+        self.error = None
+
+
+def _duracion():
+    return getattr(settings, "ESTADISTICAS_CACHE_SEGUNDOS", 600)
+
+
+def _esperar_otro_proceso(clave):
+    limite = time.monotonic() + ESPERA_CALCULO
+    while time.monotonic() < limite:
+        valor = cache.get(clave)
+        if valor is not None:
+            return valor
+        time.sleep(INTERVALO_ESPERA)
+    return None
+
+
+def _calcular_y_guardar(clave, calcular):
+    clave_calculo = f"{clave}:calculando"
+    if not cache.add(clave_calculo, 1, ESPERA_CALCULO):
+        valor = _esperar_otro_proceso(clave)
+        if valor is not None:
+            return valor
+        # El otro proceso tardó demasiado o murió: se calcula aquí
+    try:
+        valor = calcular()
+        cache.set(clave, valor, _duracion())
+        return valor
+    finally:
+        cache.delete(clave_calculo)
+
+
+def una_vez(clave, calcular):
+    """Valor en caché de clave; si falta, calcular() corre una sola vez por clave"""
+    valor = cache.get(clave)
+    if valor is not None:
+        return valor
+
+    with _candado_vuelos:
+        vuelo = _vuelos.get(clave)
+        lider = vuelo is None
+        if lider:
+            vuelo = _vuelos[clave] = _Vuelo()
+
+    if not lider:
+        vuelo.terminado.wait()
+        if vuelo.error is not None:
+            raise vuelo.error
+        return vuelo.valor
+
+    try:
+        vuelo.valor = _calcular_y_guardar(clave, calcular)
+        return vuelo.valor
+    except Exception as error:
+        vuelo.error = error
+        raise
+    finally:
+        with _candado_vuelos:
+            del _vuelos[clave]
+        vuelo.terminado.set()
+
+
+def estadisticas_en_cache(usuario_id, nombre, calcular, extra=""):
+    """
+    Resultado de calcular() para el usuario, en caché mientras no cambien sus
+    tareas ni sus estados. extra distingue resultados que dependen de algo
+    más que los datos (por ejemplo, el día).
+    """
+    version, _ = estado_colecciones(usuario_id, COLECCIONES)
+    return una_vez(f"estadisticas:{nombre}:{usuario_id}:{version}:{extra}", calcular)
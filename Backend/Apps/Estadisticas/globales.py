@@ -0,0 +1,175 @@
+"""
+Resumen global de todos los usuarios (ResumenGlobal).
+
+Los ids de usuario se parten en bloques y cada bloque se agrega con tres
+consultas agrupadas (carga diaria por usuario, tareas por usuario y minutos
+de estudio por método), filtradas con usuario_id IN (bloque). Cada bloque
+devuelve solo sumas y conteos, así que los parciales se combinan sumando y
+el orden en que terminan no importa.
+
+Con procesos > 1 los bloques se reparten en un ProcessPoolExecutor. Los
+procesos se crean con "spawn": arrancan limpios y configuran Django por su
+cuenta (ver procesos.py), así no heredan conexiones ni hilos del proceso que
+los lanza, que puede ser un worker de la cola con varios hilos.
+"""
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from Apps.Aprendizaje_adaptativo.adherencia import TIPOS_PLANIFICADOS
+from Apps.Aprendizaje_adaptativo.models import SesionEstudio
+from Apps.Calendario.carga import SOBRECARGA_MINUTOS
+from Apps.Calendario.models import CargaDiaria, Tarea
+from . import procesos as en_proceso
+from .models import ResumenGlobal
+from .resumen import CERRADOS
+
+DIAS_RESUMEN_GLOBAL = 30
+TAMANO_BLOQUE = 500
+SUMAS = [
+    "usuarios", "usuarios_activos", "suma_carga", "dias_sobrecargados", "usuarios_sobrecargados",
+    "tareas", "tareas_completadas", "usuarios_con_tareas", "suma_tasas",
+]
+
+
+def _porcentaje(parte, total):
+    return round(parte * 100 / total, 1) if total else None
+
+
+def bloques_de_usuarios(tamano=TAMANO_BLOQUE):
+    """Ids de los usuarios activos en listas de a lo más tamano"""
+    ids = get_user_model().objects.filter(is_active=True).order_by("id").values_list("id", flat=True)
+    bloque = []
+    for usuario_id in ids.iterator(chunk_size=tamano):
+        bloque.append(usuario_id)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def agregar_bloque(ids, desde, hasta):
+    """Sumas y conteos de los usuarios ids en [desde, hasta]; se combinan con combinar()"""
+    dias = (hasta - desde).days + 1
+    parcial = dict.fromkeys(SUMAS, 0)
+    parcial["usuarios"] = len(ids)
+
+    cargas = (
+        CargaDiaria.objects.filter(usuario_id__in=ids, fecha__range=(desde, hasta))
+        .order_by()
+        .values("usuario_id")
+        .annotate(
+            minutos=Sum("minutos_academicos"),
+            sobrecargados=Count("id", filter=Q(minutos_academicos__gt=SOBRECARGA_MINUTOS)),
+        )
+    )
+    for carga in cargas:
+        parcial["usuarios_activos"] += 1
+        parcial["suma_carga"] += carga["minutos"] / dias  # los días sin fila cuentan como 0
+        parcial["dias_sobrecargados"] += carga["sobrecargados"]
+        parcial["usuarios_sobrecargados"] += carga["sobrecargados"] > 0
+
+    tareas = (
+        Tarea.objects.filter(usuario_id__in=ids, visible=True, fechaEntrega__range=(desde, hasta))
+        .order_by()
+        .values("usuario_id")
+        .annotate(
+            total=Count("id"),
+            completadas=Count("id", filter=Q(estado_actual__estado__in=CERRADOS)),
+        )
+    )
+    for fila in tareas:
+        parcial["tareas"] += fila["total"]
+        parcial["tareas_completadas"] += fila["completadas"]
+        parcial["usuarios_con_tareas"] += 1
+        parcial["suma_tasas"] += fila["completadas"] / fila["total"]
+
+    parcial["minutos_por_metodo"] = dict(
+        SesionEstudio.objects.filter(
+            usuario_id__in=ids,
+            tipo_sesion__in=TIPOS_PLANIFICADOS,
+            completada=True,
+            fecha__range=(desde, hasta),
+        )
+        .order_by()
+        .values_list("tema_dificultad__metodo_estudio")
+        .annotate(minutos=Sum("duracion_minutos"))
+    )
+    return parcial
+
+
+def combinar(parciales):
+    total = dict.fromkeys(SUMAS, 0)
+    metodos = Counter()
+    for parcial in parciales:
+        for clave in SUMAS:
+            total[clave] += parcial[clave]
+        metodos.update(parcial["minutos_por_metodo"])
+    total["minutos_por_metodo"] = dict(metodos)
+    return total
+
+
+def agregar_usuarios(desde, hasta, procesos=1, tamano=TAMANO_BLOQUE):
+    """Totales de todos los usuarios, por bloques y en procesos si procesos > 1"""
+    lista = list(bloques_de_usuarios(tamano))
+    if procesos <= 1 or len(lista) <= 1:
+        return combinar(agregar_bloque(ids, desde, hasta) for ids in lista)
+
+    # Cada proceso abre sus propias conexiones a la misma base de datos
+    nombre_bd = str(connections["default"].settings_dict["NAME"])
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=min(procesos, len(lista)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=en_proceso.iniciar,
+        initargs=(nombre_bd,),
+    ) as grupo:
+        return combinar(grupo.map(
+            en_proceso.agregar_bloque, lista, [desde] * len(lista), [hasta] * len(lista)
+        ))
+
+
+def calcular_resumen_global(hoy=None, dias=DIAS_RESUMEN_GLOBAL, procesos=None, tamano=TAMANO_BLOQUE):
+    """Guarda el ResumenGlobal de hoy sobre los dias días anteriores"""
+    inicio = time.monotonic()
+    hoy = hoy or timezone.localdate()
+    hasta = hoy - timedelta(days=1)
+    desde = hasta - timedelta(days=dias - 1)
+    if procesos is None:
+        procesos = getattr(settings, "ESTADISTICAS_GLOBAL_PROCESOS", 1)
+
+    total = agregar_usuarios(desde, hasta, procesos, tamano)
+    metodos = total["minutos_por_metodo"]
+    resumen, _ = ResumenGlobal.objects.update_or_create(
+        fecha=hoy,
+        defaults={
+            "desde": desde,
+            "hasta": hasta,
+            "usuarios": total["usuarios"],
+            "usuarios_activos": total["usuarios_activos"],
+            "carga_promedio_minutos": (
+                round(total["suma_carga"] / total["usuarios_activos"], 1)
+                if total["usuarios_activos"] else None
+            ),
+            "dias_sobrecargados": total["dias_sobrecargados"],
+            "usuarios_sobrecargados": total["usuarios_sobrecargados"],
+            "tareas": total["tareas"],
+            "tareas_completadas": total["tareas_completadas"],
+            "tasa_finalizacion": _porcentaje(total["tareas_completadas"], total["tareas"]),
+            "tasa_finalizacion_promedio": _porcentaje(total["suma_tasas"], total["usuarios_con_tareas"]),
+            # En empate gana el primero en orden alfabético, para que no dependa del reparto
+            "metodo_mas_usado": min(metodos, key=lambda m: (-metodos[m], m)) if metodos else "",
+            "minutos_por_metodo": dict(sorted(metodos.items())),
+            "duracion_segundos": round(time.monotonic() - inicio, 2),
+        },
+    )
+    return resumen
@@ -0,0 +1,45 @@
+"""
+Calcula el ResumenGlobal de hoy con los datos de todos los usuarios.
+
+Los usuarios se reparten en bloques de --tamano-bloque y los bloques en
+--procesos procesos. Corre cada noche como trabajo periódico
+(resumen_global en Apps/Estadisticas/trabajos.py); este comando sirve para
+recalcularlo a mano o desde cron.
+
+    python manage.py resumen_global [--procesos 4] [--tamano-bloque 500] [--dias 30] [--fecha 2025-07-10]
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Apps.Estadisticas.globales import DIAS_RESUMEN_GLOBAL, TAMANO_BLOQUE, calcular_resumen_global
+
+
+class Command(BaseCommand):
+    help = "Calcula el resumen global de carga, tareas y métodos de estudio de todos los usuarios"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--procesos", type=int, default=getattr(settings, "ESTADISTICAS_GLOBAL_PROCESOS", 1))
+        parser.add_argument("--tamano-bloque", type=int, default=TAMANO_BLOQUE, help="Usuarios por bloque")
+        parser.add_argument("--dias", type=int, default=DIAS_RESUMEN_GLOBAL, help="Días anteriores a la fecha que se resumen")
+        parser.add_argument("--fecha", help="Día del resumen (AAAA-MM-DD); por defecto hoy")
+
+    def handle(self, *args, **options):
+        if options["procesos"] < 1 or options["tamano_bloque"] < 1 or options["dias"] < 1:
+            raise CommandError("--procesos, --tamano-bloque y --dias deben ser mayores que 0")
+        try:
+            hoy = date.fromisoformat(options["fecha"]) if options["fecha"] else None
+        except ValueError:
+            raise CommandError("--fecha debe tener el formato AAAA-MM-DD")
+
+        resumen = calcular_resumen_global(
+            hoy=hoy,
+            dias=options["dias"],
+            procesos=options["procesos"],
+            tamano=options["tamano_bloque"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Resumen global {resumen.fecha} ({resumen.desde} a {resumen.hasta}): "
+            f"{resumen.usuarios} usuario(s) en {resumen.duracion_segundos} s"
+        ))
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 13:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumenSemanalTareas",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("semana", models.DateField()),
+                ("por_hacer", models.IntegerField(default=0)),
+                ("en_proceso_dentro_fecha", models.IntegerField(default=0)),
+                ("en_proceso_fuera_fecha", models.IntegerField(default=0)),
+                ("finalizado_dentro_fecha", models.IntegerField(default=0)),
+                ("finalizado_fuera_fecha", models.IntegerField(default=0)),
+                ("fecha_calculo", models.DateField()),
+                ("version_tareas", models.IntegerField(default=0)),
+                ("fecha_actualizacion", models.DateTimeField(auto_now=True)),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_semanales",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("usuario", "semana"), name="resumen_unico_por_semana"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Estadisticas", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumenGlobal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fecha", models.DateField(unique=True)),
+                ("desde", models.DateField()),
+                ("hasta", models.DateField()),
+                ("usuarios", models.IntegerField(default=0)),
+                ("usuarios_activos", models.IntegerField(default=0)),
+                ("carga_promedio_minutos", models.FloatField(null=True)),
+                ("dias_sobrecargados", models.IntegerField(default=0)),
+                ("usuarios_sobrecargados", models.IntegerField(default=0)),
+                ("tareas", models.IntegerField(default=0)),
+                ("tareas_completadas", models.IntegerField(default=0)),
+                ("tasa_finalizacion", models.FloatField(null=True)),
+                ("tasa_finalizacion_promedio", models.FloatField(null=True)),
+                ("metodo_mas_usado", models.CharField(blank=True, max_length=20)),
+                ("minutos_por_metodo", models.JSONField(default=dict)),
+                ("duracion_segundos", models.FloatField(default=0)),
+                ("fecha_calculo", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-fecha"],
+            },
+        ),
+    ]
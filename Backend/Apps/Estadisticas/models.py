@@ -1,3 +1,57 @@
 from django.db import models
+from django.contrib.auth import get_user_model
 
-# Create your models here.
+
+class ResumenSemanalTareas(models.Model):
+    """
+    Conteo de tareas por estado de la semana de un usuario, tal como lo
+    devuelve EstadoTareasView. Se recalcula al leerlo si cambió el día
+    (fecha_calculo) o la versión de sus tareas y estados (version_tareas).
+    """
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="resumenes_semanales")
+    semana = models.DateField()  # lunes de la semana
+    por_hacer = models.IntegerField(default=0)
+    en_proceso_dentro_fecha = models.IntegerField(default=0)
+    en_proceso_fuera_fecha = models.IntegerField(default=0)
+    finalizado_dentro_fecha = models.IntegerField(default=0)
+    finalizado_fuera_fecha = models.IntegerField(default=0)
+    fecha_calculo = models.DateField()
+    version_tareas = models.IntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["usuario", "semana"], name="resumen_unico_por_semana"),
+        ]
+
+    def __str__(self):
+        return f"Semana {self.semana} - {self.usuario}"
+
+
+class ResumenGlobal(models.Model):
+    """
+    Foto diaria de todos los usuarios para los paneles de administración,
+    calculada de noche por resumen_global sobre los días [desde, hasta].
+    """
+    fecha = models.DateField(unique=True)
+    desde = models.DateField()
+    hasta = models.DateField()
+    usuarios = models.IntegerField(default=0)
+    usuarios_activos = models.IntegerField(default=0)  # con carga registrada en el periodo
+    carga_promedio_minutos = models.FloatField(null=True)  # minutos académicos por día y usuario activo
+    dias_sobrecargados = models.IntegerField(default=0)
+    usuarios_sobrecargados = models.IntegerField(default=0)
+    tareas = models.IntegerField(default=0)
+    tareas_completadas = models.IntegerField(default=0)
+    tasa_finalizacion = models.FloatField(null=True)  # sobre todas las tareas del periodo
+    tasa_finalizacion_promedio = models.FloatField(null=True)  # promedio de la tasa de cada usuario
+    metodo_mas_usado = models.CharField(max_length=20, blank=True)
+    minutos_por_metodo = models.JSONField(default=dict)
+    duracion_segundos = models.FloatField(default=0)
+    fecha_calculo = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-fecha"]
+
+    def __str__(self):
+        return f"Resumen global {self.fecha}"
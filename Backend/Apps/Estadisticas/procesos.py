@@ -0,0 +1,21 @@
+"""
+Puntos de entrada de los procesos del resumen global.
+
+Con "spawn" cada proceso importa este módulo antes de configurar Django, así
+que aquí no se importan modelos: se cargan recién después de django.setup().
+El proceso que los lanza pasa el nombre de su base de datos, que puede no
+ser el de settings (la base de pruebas, por ejemplo).
+"""
+import django
+
+
+def iniciar(nombre_bd=None):
+    django.setup()
+    if nombre_bd:
+        from django.conf import settings
+        settings.DATABASES["default"]["NAME"] = nombre_bd
+
+
+def agregar_bloque(ids, desde, hasta):
+    from .globales import agregar_bloque
+    return agregar_bloque(ids, desde, hasta)
@@ -0,0 +1,141 @@
+"""
+Resumen semanal del estado de las tareas (ResumenSemanalTareas).
+
+contar_estados hace el conteo en una sola consulta: une cada tarea con su
+estado_actual y cuenta cada categoría con un COUNT filtrado. El resultado se
+guarda por usuario y semana junto con la versión de las colecciones
+"tareas" y "estadosTareas" del usuario, así que EstadoTareasView solo lee
+una fila mientras no cambien.
+
+Guardar una Tarea o un EstadoTarea solo incrementa esa versión (las señales
+de Calendario y de Estadisticas); el conteo se rehace la primera vez que se
+lee el resumen después del cambio, no en cada escritura. Lo mismo vale para
+las altas masivas que versionan a mano. Las categorías dependen del día
+(una tarea en proceso pasa a estar fuera de fecha cuando vence su entrega),
+por eso la fila también se recalcula si se calculó otro día.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+
+from Apps.Calendario.models import Tarea
+from Apps.Calendario.versiones import estado_colecciones
+from .models import ResumenSemanalTareas
+
+CATEGORIAS = [
+    "por_hacer",
+    "en_proceso_dentro_fecha",
+    "en_proceso_fuera_fecha",
+    "finalizado_dentro_fecha",
+    "finalizado_fuera_fecha",
+]
+ABIERTOS = ["inicio", "en_desarrollo"]
+CERRADOS = ["finalizado", "entregado"]
+MAX_SEMANAS_SERIE = 52
+COLECCIONES_RESUMEN = ("tareas", "estadosTareas")
+
+
+def inicio_de_semana(dia):
+    return dia - timedelta(days=dia.weekday())  # lunes
+
+
+def contar_estados(usuario_id, hoy):
+    """Cuenta las tareas del usuario en cada categoría con una sola consulta"""
+    inicio_semana = inicio_de_semana(hoy)
+    fin_semana = inicio_semana + timedelta(days=6)  # domingo
+
+    sin_estado = Q(estado_actual__isnull=True)
+    abierta = Q(estado_actual__estado__in=ABIERTOS)
+    cerrada = Q(estado_actual__estado__in=CERRADOS)
+    en_semana = Q(fechaEntrega__range=(inicio_semana, fin_semana))
+    vencida = Q(fechaEntrega__lt=hoy)
+    a_tiempo = Q(cierre__lte=F("fechaEntrega"))
+    # Las futuras fuera de la semana actual no se cuentan
+    cerrada_contable = cerrada & (en_semana | vencida)
+
+    return (
+        Tarea.objects.filter(usuario_id=usuario_id)
+        .annotate(cierre=TruncDate("estado_actual__fecha_estado"))
+        .aggregate(
+            por_hacer=Count("id", filter=sin_estado & en_semana),
+            en_proceso_dentro_fecha=Count("id", filter=abierta & ~vencida),
+            en_proceso_fuera_fecha=Count(
+                "id", filter=(abierta & vencida) | (sin_estado & vencida & ~en_semana)
+            ),
+            finalizado_dentro_fecha=Count("id", filter=cerrada_contable & a_tiempo),
+            finalizado_fuera_fecha=Count("id", filter=cerrada_contable & ~a_tiempo),
+        )
+    )
+
+
+def recalcular_resumen(usuario_id, hoy=None):
+    """Recalcula y guarda el resumen de la semana actual del usuario"""
+    hoy = hoy or timezone.localdate()
+    version, _ = estado_colecciones(usuario_id, COLECCIONES_RESUMEN)
+    resumen, _ = ResumenSemanalTareas.objects.update_or_create(
+        usuario_id=usuario_id,
+        semana=inicio_de_semana(hoy),
+        defaults={
+            **contar_estados(usuario_id, hoy),
+            "fecha_calculo": hoy,
+            "version_tareas": version,
+        },
+    )
+    return resumen
+
+
+def resumen_semanal(usuario_id, hoy=None):
+    """Resumen vigente de la semana actual; solo lo recalcula si quedó viejo"""
+    hoy = hoy or timezone.localdate()
+    resumen = ResumenSemanalTareas.objects.filter(
+        usuario_id=usuario_id, semana=inicio_de_semana(hoy)
+    ).first()
+    if resumen is not None and resumen.fecha_calculo == hoy:
+        version, _ = estado_colecciones(usuario_id, COLECCIONES_RESUMEN)
+        if resumen.version_tareas == version:
+            return resumen
+    return recalcular_resumen(usuario_id, hoy)
+
+
+def porcentajes(resumen):
+    """Porcentaje de cada categoría, como lo muestra el panel de estadísticas"""
+    contador = {categoria: getattr(resumen, categoria) for categoria in CATEGORIAS}
+    total = sum(contador.values()) or 1  # Evitar división por cero
+    return {clave: f"{(valor / total) * 100:.1f}%" for clave, valor in contador.items()}
+
+
+def serie_semanal(usuario_id, semanas, hoy=None):
+    """
+    Por cada una de las últimas semanas (la actual incluida), cuántas tareas
+    con entrega en esa semana se cerraron a tiempo, tarde o siguen abiertas.
+    Es un solo GROUP BY por semana de fechaEntrega; las semanas sin tareas
+    se completan con ceros.
+    """
+    hoy = hoy or timezone.localdate()
+    fin = inicio_de_semana(hoy) + timedelta(days=6)
+    inicio = inicio_de_semana(hoy) - timedelta(weeks=semanas - 1)
+
+    cerrada = Q(estado_actual__estado__in=CERRADOS)
+    abierta = Q(estado_actual__isnull=True) | Q(estado_actual__estado__in=ABIERTOS)
+    cierre_a_tiempo = Q(estado_actual__fecha_estado__date__lte=F("fechaEntrega"))
+
+    filas = (
+        Tarea.objects.filter(usuario_id=usuario_id, fechaEntrega__range=(inicio, fin))
+        .annotate(semana=TruncWeek("fechaEntrega"))
+        .values("semana")
+        .annotate(
+            a_tiempo=Count("id", filter=cerrada & cierre_a_tiempo),
+            tarde=Count("id", filter=cerrada & ~cierre_a_tiempo),
+            abiertas=Count("id", filter=abierta),
+        )
+        .order_by("semana")
+    )
+    por_semana = {fila.pop("semana"): fila for fila in filas}
+
+    vacia = {"a_tiempo": 0, "tarde": 0, "abiertas": 0}
+    return [
+        {"semana": semana, **por_semana.get(semana, vacia)}
+        for semana in (inicio + timedelta(weeks=i) for i in range(semanas))
+    ]
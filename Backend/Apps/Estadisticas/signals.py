@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from Apps.Calendario.models import Tarea
+from Apps.Calendario.signals import en_lote
+from Apps.Calendario.versiones import incrementar_version
+from Apps.Tareas.models import EstadoTarea
+
+
+@receiver([post_save, post_delete], sender=EstadoTarea)
+def estado_modificado(sender, instance, **kwargs):
+    if en_lote():
+        return  # las bajas en lote versionan "estadosTareas" una sola vez
+    # Al borrar la tarea en cascada ya no existe; su propio post_delete versiona "tareas"
+    usuario_id = (
+        Tarea.objects.filter(pk=instance.tarea_id).values_list("usuario_id", flat=True).first()
+    )
+    if usuario_id:
+        # Las tareas ya versionan su colección; los estados invalidan la caché y el
+        # resumen semanal aquí (se recalculan al leerlos)
+        incrementar_version(usuario_id, "estadosTareas")
@@ -1,3 +1,398 @@
-from django.test import TestCase
+"""
+Tests para las estadísticas de tareas
+"""
+import threading
+import time as reloj
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from Apps.Aprendizaje_adaptativo.models import Curso, SesionEstudio, Tema, TemaDificultad
+from Apps.Calendario.models import CargaDiaria, Tarea
+from Apps.Calendario.versiones import incrementar_version
+from Apps.Tareas.models import EstadoTarea
+from .cache import una_vez
+from .globales import agregar_bloque, calcular_resumen_global
+from .models import ResumenGlobal, ResumenSemanalTareas
+from .resumen import contar_estados, recalcular_resumen, resumen_semanal, serie_semanal
+
+User = get_user_model()
+
+
+class TareasConEstado:
+    """Usuario y tareas con estado para los tests de estadísticas"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.hoy = date(2025, 7, 10)  # jueves; la semana va del 7 al 13
+        self.zona = ZoneInfo(settings.TIME_ZONE)
+
+    def crear_tarea(self, titulo, entrega, estado=None, cierre=None, usuario=None):
+        tarea = Tarea.objects.create(
+            usuario=usuario or self.user, titulo=titulo, curso='Cálculo',
+            fechaRealizacion=entrega, fechaEntrega=entrega,
+            horaEntrega=time(23, 59), horaInicio=time(9, 0), horaFin=time(10, 0),
+            complejidad=2
+        )
+        if estado:
+            EstadoTarea.objects.create(tarea=tarea, estado=estado)
+            # fecha_estado es auto_now: se fija el día del cambio con update
+            EstadoTarea.objects.filter(tarea=tarea).update(
+                fecha_estado=datetime.combine(cierre or entrega, time(12, 0), tzinfo=self.zona)
+            )
+        return tarea
+
+
+class TareasConEstadoTestCase(TareasConEstado, TestCase):
+    pass
+
+
+class ResumenSemanalTests(TareasConEstadoTestCase):
+    """Tests del resumen semanal de estados de tareas"""
+
+    def test_clasifica_como_el_calculo_por_tarea(self):
+        """Test: Cada tarea cae en la misma categoría que con el recorrido anterior"""
+        dia = lambda n: date(2025, 7, n)
+        self.crear_tarea('Sin estado en la semana', dia(12))
+        self.crear_tarea('Sin estado vencida esta semana', dia(8))
+        self.crear_tarea('Sin estado vencida antes', dia(1))
+        self.crear_tarea('Sin estado futura', dia(20))
+        self.crear_tarea('Iniciada vencida', dia(5), 'inicio')
+        self.crear_tarea('En desarrollo a tiempo', dia(20), 'en_desarrollo')
+        self.crear_tarea('Finalizada a tiempo', dia(11), 'finalizado', cierre=dia(9))
+        self.crear_tarea('Entregada tarde', dia(8), 'entregado', cierre=dia(9))
+        self.crear_tarea('Finalizada futura', dia(30), 'finalizado', cierre=dia(9))
+
+        with self.assertNumQueries(1):
+            conteo = contar_estados(self.user.pk, self.hoy)
+
+        self.assertEqual(conteo, {
+            'por_hacer': 2,
+            'en_proceso_dentro_fecha': 1,
+            'en_proceso_fuera_fecha': 2,
+            'finalizado_dentro_fecha': 1,
+            'finalizado_fuera_fecha': 1,
+        })
+
+    def test_endpoint_lee_una_fila(self):
+        """Test: El endpoint lee el resumen guardado y después la caché"""
+        hoy = timezone.localdate()
+        for i in range(30):
+            self.crear_tarea(f'Tarea {i}', hoy + timedelta(days=i % 3), 'inicio')
+
+        # Guardar las tareas no toca el resumen: se calcula en la primera lectura
+        self.assertFalse(ResumenSemanalTareas.objects.exists())
+        resumen_semanal(self.user.pk, hoy)
+
+        # Sin caché: versión de los datos + resumen guardado + versión de las tareas
+        with self.assertNumQueries(3):
+            self.client.get('/estadisticas/api/estadoTareasSemanal/')
+        with self.assertNumQueries(1):  # solo la versión de los datos
+            response = self.client.get('/estadisticas/api/estadoTareasSemanal/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['en_proceso_dentro_fecha'], '100.0%')
+        self.assertEqual(response.data['por_hacer'], '0.0%')
+
+    def test_cambio_de_estado_actualiza_el_resumen(self):
+        """Test: Al cambiar el estado de una tarea su semana se recalcula en la siguiente lectura"""
+        hoy = timezone.localdate()
+        tarea = self.crear_tarea('Informe', hoy, 'inicio')
+        resumen = resumen_semanal(self.user.pk, hoy)
+        self.assertEqual(resumen.en_proceso_dentro_fecha, 1)
+
+        response = self.client.patch(
+            f'/tareas/api/estadoTarea/{tarea.id}/actualizarEstado/',
+            {'estado': 'en_desarrollo'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.patch(
+            f'/tareas/api/estadoTarea/{tarea.id}/actualizarEstado/',
+            {'estado': 'finalizado'}, format='json'
+        )
+
+        resumen.refresh_from_db()
+        self.assertEqual(resumen.en_proceso_dentro_fecha, 1)  # la escritura no lo recalcula
+        resumen = resumen_semanal(self.user.pk, hoy)
+        self.assertEqual(resumen.en_proceso_dentro_fecha, 0)
+        self.assertEqual(resumen.finalizado_dentro_fecha, 1)
+
+        tarea.delete()
+        self.assertEqual(resumen_semanal(self.user.pk, hoy).finalizado_dentro_fecha, 0)
+
+    def test_recalcula_al_cambiar_el_dia(self):
+        """Test: Una tarea abierta pasa a fuera de fecha al día siguiente de su entrega"""
+        self.crear_tarea('Informe', self.hoy, 'inicio')
+        resumen = recalcular_resumen(self.user.pk, self.hoy)
+        self.assertEqual(resumen.en_proceso_dentro_fecha, 1)
+
+        manana = resumen_semanal(self.user.pk, self.hoy + timedelta(days=1))
+        self.assertEqual(manana.id, resumen.id)  # misma semana, misma fila
+        self.assertEqual(manana.en_proceso_fuera_fecha, 1)
+        self.assertEqual(manana.fecha_calculo, self.hoy + timedelta(days=1))
+
+    def test_altas_masivas_invalidan_por_version(self):
+        """Test: Las altas con bulk_create (sin señales) se ven por la versión de tareas"""
+        recalcular_resumen(self.user.pk, self.hoy)
+        Tarea.objects.bulk_create([
+            Tarea(
+                usuario=self.user, titulo='Importada', curso='Cálculo',
+                fechaRealizacion=self.hoy, fechaEntrega=self.hoy,
+                horaEntrega=time(23, 59), horaInicio=time(9, 0), horaFin=time(10, 0),
+                complejidad=2
+            )
+        ])
+        incrementar_version(self.user.pk, "tareas")
+
+        self.assertEqual(resumen_semanal(self.user.pk, self.hoy).por_hacer, 1)
+
+    def test_resumen_por_usuario(self):
+        """Test: El resumen solo cuenta las tareas del usuario"""
+        otro = User.objects.create_user(username='otro', email='otro@example.com', password='x')
+        self.crear_tarea('Ajena', self.hoy, usuario=otro)
+
+        self.assertEqual(resumen_semanal(self.user.pk, self.hoy).por_hacer, 0)
+        self.assertEqual(resumen_semanal(otro.pk, self.hoy).por_hacer, 1)
+
+
+class SerieEstadoTareasTests(TareasConEstadoTestCase):
+    """Tests de la serie semanal de tareas a tiempo, tarde y abiertas"""
+
+    def test_agrupa_por_semana_de_entrega(self):
+        """Test: Cada tarea cuenta en la semana de su fecha de entrega"""
+        dia = lambda n: date(2025, 7, n)
+        self.crear_tarea('A tiempo', dia(11), 'finalizado', cierre=dia(10))
+        self.crear_tarea('Tarde', dia(8), 'entregado', cierre=dia(9))
+        self.crear_tarea('Abierta', dia(9), 'en_desarrollo')
+        self.crear_tarea('Sin estado', dia(2))
+        self.crear_tarea('Fuera del rango', date(2025, 6, 2), 'finalizado')
+
+        with self.assertNumQueries(1):
+            serie = serie_semanal(self.user.pk, 3, hoy=self.hoy)
+
+        self.assertEqual(serie, [
+            {'semana': date(2025, 6, 23), 'a_tiempo': 0, 'tarde': 0, 'abiertas': 0},
+            {'semana': date(2025, 6, 30), 'a_tiempo': 0, 'tarde': 0, 'abiertas': 1},
+            {'semana': dia(7), 'a_tiempo': 1, 'tarde': 1, 'abiertas': 1},
+        ])
+
+    def test_endpoint_serie(self):
+        """Test: El endpoint devuelve una entrada por semana con una consulta"""
+        hoy = timezone.localdate()
+        for i in range(20):
+            self.crear_tarea(f'Tarea {i}', hoy - timedelta(weeks=i % 4), 'inicio')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/estadisticas/api/serie/?semanas=18')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        semanas = response.data['semanas']
+        self.assertEqual(len(semanas), 18)
+        self.assertEqual(sum(s['abiertas'] for s in semanas), 20)
+        self.assertEqual(semanas[-1]['semana'], hoy - timedelta(days=hoy.weekday()))
+
+    def test_endpoint_valida_semanas(self):
+        """Test: semanas debe ser un entero entre 1 y 52"""
+        for valor in ['0', '53', 'muchas']:
+            response = self.client.get(f'/estadisticas/api/serie/?semanas={valor}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CacheEstadisticasTests(TareasConEstadoTestCase):
+    """Tests de la caché de estadísticas por usuario"""
+
+    def test_cambio_de_estado_invalida_la_cache(self):
+        """Test: Cambiar el estado de una tarea cambia la versión y la respuesta"""
+        tarea = self.crear_tarea('Informe', timezone.localdate())
+        url = '/tareas/api/tareas-completadas-pendientes/'
+
+        self.assertEqual(self.client.get(url).data, {'completadas': 0, 'pendientes': 1})
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        EstadoTarea.objects.create(tarea=tarea, estado='finalizado')
+        self.assertEqual(self.client.get(url).data, {'completadas': 1, 'pendientes': 0})
+
+        tarea.visible = False
+        tarea.save()
+        self.assertEqual(self.client.get(url).data, {'completadas': 0, 'pendientes': 0})
+
+    def test_cache_separada_por_usuario(self):
+        """Test: Cada usuario ve sus propios conteos"""
+        otro = User.objects.create_user(username='otro', email='otro@example.com', password='x')
+        self.crear_tarea('Ajena', self.hoy, usuario=otro)
+        url = '/tareas/api/tareas-completadas-pendientes/'
+
+        self.assertEqual(self.client.get(url).data['pendientes'], 0)
+        cliente_otro = APIClient()
+        cliente_otro.force_authenticate(user=otro)
+        self.assertEqual(cliente_otro.get(url).data['pendientes'], 1)
+
+    def test_fallos_concurrentes_calculan_una_vez(self):
+        """Test: Con varias peticiones simultáneas sin caché se calcula una sola vez"""
+        calculos = []
+
+        def calcular():
+            calculos.append(1)
+            reloj.sleep(0.2)
+            return {'total': 42}
+
+        resultados = []
+        hilos = [
+            threading.Thread(target=lambda: resultados.append(una_vez('prueba:vuelo', calcular)))
+            for _ in range(8)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(calculos), 1)
+        self.assertEqual(resultados, [{'total': 42}] * 8)
+
+    def test_error_se_propaga_y_no_queda_en_cache(self):
+        """Test: Si el cálculo falla, el error llega al llamador y se reintenta después"""
+        def fallar():
+            raise ValueError('sin datos')
+
+        with self.assertRaises(ValueError):
+            una_vez('prueba:error', fallar)
+        self.assertEqual(una_vez('prueba:error', lambda: 'ok'), 'ok')
+
+
+class DatosResumenGlobal(TareasConEstado):
+    """Usuarios con carga, tareas y sesiones en el periodo del resumen global"""
+
+    def setUp(self):
+        super().setUp()
+        self.otro = User.objects.create_user(username='otro', email='otro@example.com', password='x')
+        User.objects.create_user(username='sin_datos', email='sin@example.com', password='x')
+        User.objects.create_user(username='inactivo', email='in@example.com', password='x', is_active=False)
+        dia = lambda n: date(2025, 7, n)  # con hoy = 10 y 7 días, el periodo va del 3 al 9
+
+        self.crear_tarea('Finalizada', dia(5), 'finalizado')
+        self.crear_tarea('Pendiente', dia(8))
+        self.crear_tarea('Entregada', dia(6), 'entregado', usuario=self.otro)
+        self.crear_tarea('Fuera del periodo', dia(10), 'finalizado', usuario=self.otro)
+
+        curso = Curso.objects.create(nombre='Matemáticas')
+        pomodoro = TemaDificultad.objects.create(
+            usuario=self.user, tema=Tema.objects.create(curso=curso, nombre='Cálculo'),
+            dificultad='alta', metodo_estudio='Pomodoro'
+        )
+        feynman = TemaDificultad.objects.create(
+            usuario=self.otro, tema=Tema.objects.create(curso=curso, nombre='Álgebra'),
+            dificultad='baja', metodo_estudio='Feynman'
+        )
+        for tema, fecha, minutos, completada, tipo in [
+            (pomodoro, dia(4), 50, True, 'estudio'),
+            (pomodoro, dia(4), 100, False, 'estudio'),  # no completada
+            (pomodoro, dia(4), 30, True, 'descanso'),  # los descansos no cuentan
+            (feynman, dia(5), 30, True, 'estudio'),
+            (feynman, dia(6), 40, True, 'repaso'),
+        ]:
+            SesionEstudio.objects.create(
+                usuario=tema.usuario, tema_dificultad=tema, tipo_sesion=tipo, fecha=fecha,
+                hora_inicio=time(9, 0), hora_fin=time(10, 0), duracion_minutos=minutos,
+                numero_sesion=1, completada=completada
+            )
+
+        # La carga se fija a mano para no depender de cómo la suman las señales
+        CargaDiaria.objects.all().delete()
+        for usuario, fecha, minutos in [
+            (self.user, dia(3), 700),  # sobrecarga
+            (self.user, dia(4), 70),
+            (self.otro, dia(5), 140),
+            (self.otro, dia(1), 900),  # fuera del periodo
+        ]:
+            CargaDiaria.objects.create(usuario=usuario, fecha=fecha, minutos_academicos=minutos)
+
+    def campos(self, resumen):
+        return {
+            clave: valor for clave, valor in vars(resumen).items()
+            if clave not in ('_state', 'id', 'duracion_segundos', 'fecha_calculo')
+        }
+
+
+class ResumenGlobalTests(DatosResumenGlobal, TestCase):
+    """Tests del resumen global de todos los usuarios"""
+
+    def test_agrega_todos_los_usuarios(self):
+        """Test: El resumen combina carga, tareas y métodos de los usuarios activos"""
+        resumen = calcular_resumen_global(hoy=self.hoy, dias=7, procesos=1)
+
+        self.assertEqual((resumen.desde, resumen.hasta), (date(2025, 7, 3), date(2025, 7, 9)))
+        self.assertEqual(resumen.usuarios, 3)
+        self.assertEqual(resumen.usuarios_activos, 2)
+        self.assertEqual(resumen.carga_promedio_minutos, 65.0)  # (770 / 7 + 140 / 7) / 2
+        self.assertEqual(resumen.dias_sobrecargados, 1)
+        self.assertEqual(resumen.usuarios_sobrecargados, 1)
+        self.assertEqual((resumen.tareas, resumen.tareas_completadas), (3, 2))
+        self.assertEqual(resumen.tasa_finalizacion, 66.7)
+        self.assertEqual(resumen.tasa_finalizacion_promedio, 75.0)  # (50 % + 100 %) / 2
+        self.assertEqual(resumen.metodo_mas_usado, 'Feynman')
+        self.assertEqual(resumen.minutos_por_metodo, {'Feynman': 70, 'Pomodoro': 50})
+
+    def test_bloques_dan_el_mismo_resultado(self):
+        """Test: Partir los usuarios en bloques de uno no cambia los totales"""
+        juntos = self.campos(calcular_resumen_global(hoy=self.hoy, dias=7, procesos=1))
+        por_usuario = self.campos(calcular_resumen_global(hoy=self.hoy, dias=7, procesos=1, tamano=1))
+
+        self.assertEqual(juntos, por_usuario)
+        self.assertEqual(ResumenGlobal.objects.count(), 1)  # se reescribe la fila del día
+
+    def test_bloque_con_consultas_agrupadas(self):
+        """Test: Cada bloque se agrega con tres consultas sin importar cuántos usuarios tenga"""
+        ids = list(User.objects.values_list('id', flat=True))
+        with self.assertNumQueries(3):
+            agregar_bloque(ids, date(2025, 7, 3), date(2025, 7, 9))
+
+    def test_comando(self):
+        """Test: El comando guarda el resumen del día indicado"""
+        call_command('resumen_global', '--fecha', '2025-07-10', '--dias', '7', '--tamano-bloque', '2', stdout=StringIO())
+        self.assertEqual(ResumenGlobal.objects.get().tareas, 3)
+
+    def test_endpoint_solo_administradores(self):
+        """Test: Solo el personal administrativo lee el último resumen"""
+        url = '/estadisticas/api/resumen-global/'
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        calcular_resumen_global(hoy=self.hoy - timedelta(days=1), dias=7, procesos=1)
+        calcular_resumen_global(hoy=self.hoy, dias=7, procesos=1)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['fecha'], self.hoy)
+        self.assertEqual(response.data['metodo_mas_usado'], 'Feynman')
+
+
+# Los procesos abren sus propias conexiones: los datos tienen que estar
+# confirmados y la base de pruebas en un archivo (DATABASES TEST NAME)
+class ResumenGlobalProcesosTests(DatosResumenGlobal, TransactionTestCase):
+    """Tests del resumen global repartido en varios procesos"""
+
+    def test_procesos_dan_el_mismo_resultado(self):
+        """Test: Repartir bloques de un usuario en dos procesos no cambia los totales"""
+        en_serie = self.campos(calcular_resumen_global(hoy=self.hoy, dias=7, procesos=1, tamano=1))
+        en_procesos = self.campos(calcular_resumen_global(hoy=self.hoy, dias=7, procesos=2, tamano=1))
+
+        self.assertEqual(en_procesos, en_serie)
+        self.assertEqual(en_procesos['usuarios'], 3)
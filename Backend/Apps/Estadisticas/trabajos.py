@@ -0,0 +1,13 @@
+"""
+Trabajos periódicos de las estadísticas (ver Apps.Cola_trabajos).
+"""
+from datetime import timedelta
+
+from Apps.Cola_trabajos.programador import periodico
+from .globales import calcular_resumen_global
+
+
+@periodico("0 2 * * *", tolerancia=timedelta(hours=6))
+def resumen_global():
+    resumen = calcular_resumen_global()
+    return {"fecha": resumen.fecha, "usuarios": resumen.usuarios, "segundos": resumen.duracion_segundos}
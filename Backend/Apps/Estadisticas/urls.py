@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import EstadoTareasView
+from .views import EstadoTareasView, SerieEstadoTareasView, ResumenGlobalView
 
 urlpatterns = [
     path('api/estadoTareasSemanal/', EstadoTareasView.as_view(), name='estado-tareas-semanal'), # GET http://localhost:8000/estadisticas/api/estadoTareasSemanal/
+    path('api/serie/', SerieEstadoTareasView.as_view(), name='serie-estado-tareas'), # GET http://localhost:8000/estadisticas/api/serie/?semanas=8
+    path('api/resumen-global/', ResumenGlobalView.as_view(), name='resumen-global'), # GET http://localhost:8000/estadisticas/api/resumen-global/ (solo administradores)
 
 ]
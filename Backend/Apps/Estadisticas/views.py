@@ -1,77 +1,81 @@
-from datetime import timedelta
-from django.utils.timezone import now
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework import status
 
-from Apps.Calendario.models import Tarea
-from Apps.Tareas.models import EstadoTarea
+from django.utils import timezone
+
+from .cache import estadisticas_en_cache
+from .models import ResumenGlobal
+from .resumen import MAX_SEMANAS_SERIE, porcentajes, resumen_semanal, serie_semanal
 
 
 class EstadoTareasView(APIView):
+    """Porcentaje de tareas por estado en la semana actual"""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        hoy = now().date()
-        inicio_semana = hoy - timedelta(days=hoy.weekday())  # lunes
-        fin_semana = inicio_semana + timedelta(days=6)  # domingo
+        # Las categorías dependen del día, así que la caché se separa por fecha
+        hoy = timezone.localdate()
+        resultado = estadisticas_en_cache(
+            request.user.pk,
+            "estado_semanal",
+            lambda: porcentajes(resumen_semanal(request.user.pk, hoy)),
+            extra=hoy.isoformat(),
+        )
+        return Response(resultado)
 
-        tareas = Tarea.objects.filter(usuario=request.user)
 
-        contador = {
-            "por_hacer": 0,
-            "en_proceso_dentro_fecha": 0,
-            "en_proceso_fuera_fecha": 0,
-            "finalizado_dentro_fecha": 0,
-            "finalizado_fuera_fecha": 0,
-        }
+class SerieEstadoTareasView(APIView):
+    """Tareas cerradas a tiempo, tarde y abiertas de cada una de las últimas semanas"""
+    permission_classes = [IsAuthenticated]
 
-        for tarea in tareas:
-            estado = (
-                EstadoTarea.objects.filter(tarea=tarea)
-                .order_by("-fecha_estado")
-                .first()
+    def get(self, request):
+        try:
+            semanas = int(request.query_params.get("semanas", 8))
+        except ValueError:
+            semanas = 0
+        if not 1 <= semanas <= MAX_SEMANAS_SERIE:
+            return Response(
+                {"error": f"semanas debe ser un número entre 1 y {MAX_SEMANAS_SERIE}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-            # Línea de depuración:
-            print(
-                tarea.titulo,
-                tarea.fechaEntrega,
-                estado.estado if estado else "Sin estado",
-            )
+        return Response({"semanas": serie_semanal(request.user.pk, semanas)})
 
-            # Obtenemos la fecha de entrega
-            fecha_entrega = tarea.fechaEntrega
 
-            if not estado:
-                if inicio_semana <= fecha_entrega <= fin_semana:
-                    contador["por_hacer"] += 1
-                elif fecha_entrega < hoy:
-                    contador["en_proceso_fuera_fecha"] += 1  # nunca se hizo y ya pasó
-                # si es futuro y no está en la semana actual, lo ignoramos
-            elif estado.estado in ["inicio", "en_desarrollo"]:
-                if fecha_entrega < hoy:
-                    contador["en_proceso_fuera_fecha"] += 1
-                else:
-                    contador["en_proceso_dentro_fecha"] += 1
+class ResumenGlobalView(APIView):
+    """Último resumen global de todos los usuarios, para administradores"""
+    permission_classes = [IsAdminUser]
 
-            elif estado.estado in ["finalizado", "entregado"]:
-                if inicio_semana <= fecha_entrega <= fin_semana:
-                    if estado.fecha_estado.date() <= fecha_entrega:
-                        contador["finalizado_dentro_fecha"] += 1
-                    else:
-                        contador["finalizado_fuera_fecha"] += 1
-                elif fecha_entrega < hoy:
-                    if estado.fecha_estado.date() <= fecha_entrega:
-                        contador["finalizado_dentro_fecha"] += 1
-                    else:
-                        contador["finalizado_fuera_fecha"] += 1
-                # si es futuro y no está en la semana actual, lo ignoramos
+    def get(self, request):
+        resumen = ResumenGlobal.objects.first()  # ordenado por fecha descendente
+        if resumen is None:
+            return Response(
+                {"error": "Todavía no se calculó el resumen global"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
-        total = sum(contador.values()) or 1  # Evitar división por cero
+        return Response({
+            "fecha": resumen.fecha,
+            "desde": resumen.desde,
+            "hasta": resumen.hasta,
+            "usuarios": resumen.usuarios,
+            "usuarios_activos": resumen.usuarios_activos,
+            "carga_promedio_minutos": resumen.carga_promedio_minutos,
+            "dias_sobrecargados": resumen.dias_sobrecargados,
+            "usuarios_sobrecargados": resumen.usuarios_sobrecargados,
+            "tareas": resumen.tareas,
+            "tareas_completadas": resumen.tareas_completadas,
+            "tasa_finalizacion": resumen.tasa_finalizacion,
+            "tasa_finalizacion_promedio": resumen.tasa_finalizacion_promedio,
+            "metodo_mas_usado": resumen.metodo_mas_usado,
+            "minutos_por_metodo": resumen.minutos_por_metodo,
+            "fecha_calculo": resumen.fecha_calculo,
+        })
 
-        resultado = {
-            clave: f"{(valor / total) * 100:.1f}%" for clave, valor in contador.items()
-        }
 
-        return Response(resultado)
+# Operación	                      Método HTTP	                    Ruta completa
+# Estado semanal de tareas	         GET	          http://localhost:8000/estadisticas/api/estadoTareasSemanal/
+# Serie semanal de tareas	         GET	          http://localhost:8000/estadisticas/api/serie/?semanas=8
+# Resumen global (administradores)	 GET	          http://localhost:8000/estadisticas/api/resumen-global/
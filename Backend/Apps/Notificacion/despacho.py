@@ -0,0 +1,169 @@
+"""
+Despacho masivo de correos.
+
+Las plantillas se compilan una sola vez por proceso (plantilla()) y cada
+correo solo se renderiza con su contexto. El envío reparte los mensajes
+entre un grupo de hilos, cada uno con su propia conexión SMTP abierta
+durante toda la corrida: los hilos toman tandas de tamano_lote mensajes de
+una cola común y mandan cada tanda por su conexión con una sola llamada a
+send_messages. Como el costo de SMTP es casi todo espera de red, varias
+conexiones en paralelo multiplican el caudal sin usar más procesos.
+
+Los backends envían la tanda en orden, así que un fallo se ubica: si
+send_messages lanza una excepción, los mensajes anteriores al que estaba
+tomando ya salieron; si devuelve menos de los que tomó, los que faltan son
+los últimos. Solo el mensaje que falló se reintenta, con la conexión
+reabierta y espera exponencial; si sigue fallando, el error se informa para
+ese mensaje y el resto de la tanda continúa. Un mensaje sin destinatarios
+no se envía y se informa como error.
+"""
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.template.loader import get_template
+
+REINTENTOS_CONEXION = 3
+ESPERA_REINTENTO = 1  # segundos; se duplica en cada reintento
+
+
+@lru_cache(maxsize=None)
+def plantilla(nombre):
+    """Plantilla compilada; se carga y compila una sola vez por nombre"""
+    return get_template(nombre)
+
+
+def renderizar(nombre, contexto):
+    return plantilla(nombre).render(contexto)
+
+
+class Remitente:
+    """Mantiene abierta una conexión SMTP y la reabre con espera al fallar"""
+
+    def __init__(self, reintentos=REINTENTOS_CONEXION, espera=ESPERA_REINTENTO, fabrica_conexion=None):
+        self.reintentos = reintentos
+        self.espera = espera
+        self.fabrica_conexion = fabrica_conexion or (lambda: get_connection(fail_silently=False))
+        self.conexion = None
+
+    def _enviar_desde(self, emails, inicio):
+        """Un send_messages con emails[inicio:]; devuelve (cuántos salieron, error)"""
+        tomados = 0
+
+        def tanda():
+            nonlocal tomados
+            for email in emails[inicio:]:
+                tomados += 1
+                yield email
+
+        try:
+            if self.conexion is None:
+                self.conexion = self.fabrica_conexion()
+                self.conexion.open()
+            enviados = self.conexion.send_messages(tanda()) or 0
+        except Exception as error:
+            # El mensaje que se estaba tomando falló; los anteriores salieron
+            return max(tomados - 1, 0), error
+        if enviados < len(emails) - inicio:
+            return enviados, RuntimeError(
+                f"El servidor aceptó {enviados} de {len(emails) - inicio} mensajes"
+            )
+        return enviados, None
+
+    def enviar_lote(self, emails):
+        """
+        Envía emails por esta conexión y devuelve una lista alineada: None si
+        el correo salió o la excepción con la que falló.
+        """
+        errores = [None] * len(emails)
+        validos = []
+        for indice, email in enumerate(emails):
+            if email.recipients():
+                validos.append(indice)
+            else:
+                errores[indice] = ValueError("Correo sin destinatarios")
+
+        emails = [emails[indice] for indice in validos]
+        inicio = intento = 0
+        while inicio < len(emails):
+            enviados, error = self._enviar_desde(emails, inicio)
+            if error is None:
+                return errores
+            inicio += enviados
+            # Cada mensaje que falla tiene sus propios reintentos
+            intento = intento + 1 if enviados == 0 else 1
+            self.cerrar()
+            if intento > self.reintentos:
+                errores[validos[inicio]] = error
+                inicio += 1
+                intento = 0
+            else:
+                time.sleep(self.espera * 2 ** (intento - 1))
+        return errores
+
+    def cerrar(self):
+        if self.conexion is not None:
+            try:
+                self.conexion.close()
+            except Exception:
+                pass
+            self.conexion = None
+
+
+def crear_remitentes(conexiones=None, reintentos=REINTENTOS_CONEXION, espera=ESPERA_REINTENTO, fabrica_conexion=None):
+    """Un Remitente por conexión del grupo; se pueden reutilizar entre llamadas a despachar"""
+    conexiones = conexiones or getattr(settings, "CORREO_CONEXIONES_SMTP", 4)
+    return [Remitente(reintentos, espera, fabrica_conexion) for _ in range(conexiones)]
+
+
+def cerrar_remitentes(remitentes):
+    for remitente in remitentes:
+        remitente.cerrar()
+
+
+def despachar(mensajes, remitentes=None, tamano_lote=50):
+    """
+    Envía mensajes (lista de EmailMessage) repartidos entre las conexiones
+    de remitentes. Sin remitentes se crea un grupo para esta llamada y se
+    cierra al terminar. Devuelve una lista alineada con mensajes: None si el
+    correo salió o la excepción con la que falló.
+    """
+    resultados = [None] * len(mensajes)
+    if not mensajes:
+        return resultados
+
+    propios = remitentes is None
+    if propios:
+        remitentes = crear_remitentes()
+
+    # Tandas más chicas cuando hay pocos mensajes, para ocupar todas las conexiones
+    tamano_lote = max(min(tamano_lote, -(-len(mensajes) // len(remitentes))), 1)
+    tandas = queue.SimpleQueue()
+    for inicio in range(0, len(mensajes), tamano_lote):
+        tandas.put(range(inicio, min(inicio + tamano_lote, len(mensajes))))
+    activos = remitentes[:-(-len(mensajes) // tamano_lote)]
+
+    def trabajar(remitente):
+        while True:
+            try:
+                tanda = tandas.get_nowait()
+            except queue.Empty:
+                return
+            errores = remitente.enviar_lote([mensajes[indice] for indice in tanda])
+            for indice, error in zip(tanda, errores):
+                resultados[indice] = error
+
+    try:
+        if len(activos) == 1:
+            trabajar(activos[0])
+        else:
+            with ThreadPoolExecutor(max_workers=len(activos), thread_name_prefix="correo") as grupo:
+                for futuro in [grupo.submit(trabajar, remitente) for remitente in activos]:
+                    futuro.result()
+    finally:
+        if propios:
+            cerrar_remitentes(remitentes)
+    return resultados
@@ -0,0 +1,29 @@
+"""
+Envía los correos acumulados en el Outbox.
+
+Pensado para correr cada pocos minutos desde cron; cada corrida agrupa los
+avisos vencidos de cada usuario en un solo correo.
+
+    python manage.py enviar_outbox [--lote N] [--conexiones N]
+"""
+from django.core.management.base import BaseCommand
+
+from Apps.Notificacion.outbox import vaciar_outbox
+
+
+class Command(BaseCommand):
+    help = "Envía los avisos pendientes del Outbox agrupados por usuario"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, help="Usuarios por tanda")
+        parser.add_argument("--conexiones", type=int, help="Conexiones SMTP en paralelo")
+
+    def handle(self, *args, **options):
+        correos, avisos, errores = vaciar_outbox(
+            tamano_lote=options["lote"], conexiones=options["conexiones"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"{correos} correo(s) enviados con {avisos} aviso(s)")
+        )
+        if errores:
+            self.stdout.write(self.style.WARNING(f"{errores} aviso(s) quedaron para reintentar"))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 13:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("Notificacion", "0005_remove_clase_usuario_remove_estudio_usuario_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificacionEnviada",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[("expiracion_tarea", "Tarea por vencer")],
+                        max_length=30,
+                    ),
+                ),
+                ("objeto_id", models.PositiveIntegerField()),
+                ("fecha_envio", models.DateTimeField(auto_now_add=True)),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notificaciones_enviadas",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("usuario", "tipo", "objeto_id"),
+                        name="notificacion_unica",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2 on 2026-10-18 13:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Notificacion", "0006_notificacion_enviada"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Outbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("sugerencia", "Sugerencia"),
+                            ("recordatorio", "Recordatorio"),
+                        ],
+                        default="sugerencia",
+                        max_length=20,
+                    ),
+                ),
+                ("asunto", models.CharField(max_length=255)),
+                ("mensaje", models.TextField()),
+                ("html", models.BooleanField(default=False)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[("pendiente", "Pendiente"), ("fallido", "Fallido")],
+                        default="pendiente",
+                        max_length=20,
+                    ),
+                ),
+                ("intentos", models.PositiveSmallIntegerField(default=0)),
+                ("ultimo_error", models.TextField(blank=True)),
+                ("fecha_creacion", models.DateTimeField(auto_now_add=True)),
+                ("enviar_despues", models.DateTimeField()),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="outbox",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["estado", "enviar_despues"],
+                        name="Notificacio_estado_230f25_idx",
+                    ),
+                    models.Index(
+                        fields=["usuario", "estado"],
+                        name="Notificacio_usuario_220065_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
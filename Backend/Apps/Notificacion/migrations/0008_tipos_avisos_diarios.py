@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 14:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Notificacion", "0007_outbox"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notificacionenviada",
+            name="tipo",
+            field=models.CharField(
+                choices=[
+                    ("expiracion_tarea", "Tarea por vencer"),
+                    ("resumen_diario", "Resumen matutino"),
+                    ("tareas_pendientes", "Tareas no completadas"),
+                ],
+                max_length=30,
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Notificacion", "0008_tipos_avisos_diarios"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outbox",
+            name="token",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AlterField(
+            model_name="outbox",
+            name="estado",
+            field=models.CharField(
+                choices=[
+                    ("pendiente", "Pendiente"),
+                    ("enviando", "Enviando"),
+                    ("fallido", "Fallido"),
+                ],
+                default="pendiente",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -1 +1,71 @@
 from django.db import models
+from django.contrib.auth import get_user_model
+
+
+class NotificacionEnviada(models.Model):
+    """
+    Registro de los avisos ya enviados. La clave (usuario, tipo, objeto_id)
+    hace que un aviso se mande una sola vez aunque el proceso corra varias
+    veces o con retraso. En los avisos diarios objeto_id es el día
+    (date.toordinal()).
+    """
+    TIPOS = [
+        ("expiracion_tarea", "Tarea por vencer"),
+        ("resumen_diario", "Resumen matutino"),
+        ("tareas_pendientes", "Tareas no completadas"),
+    ]
+
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="notificaciones_enviadas")
+    tipo = models.CharField(max_length=30, choices=TIPOS)
+    objeto_id = models.PositiveIntegerField()
+    fecha_envio = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["usuario", "tipo", "objeto_id"], name="notificacion_unica"),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.objeto_id} - {self.usuario_id}"
+
+
+class Outbox(models.Model):
+    """
+    Correos pendientes de envío. Las sugerencias y recordatorios de un mismo
+    usuario que coinciden en la ventana de espera salen juntos en un solo
+    correo de resumen (ver outbox.vaciar_outbox).
+
+    Mientras se envían quedan en "enviando" con el token de la corrida que
+    los reclamó; en ese estado enviar_despues es el fin del reclamo, pasado
+    el cual otra corrida los puede tomar si la primera murió.
+    """
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("enviando", "Enviando"),
+        ("fallido", "Fallido"),
+    ]
+    TIPOS = [
+        ("sugerencia", "Sugerencia"),
+        ("recordatorio", "Recordatorio"),
+    ]
+
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="outbox")
+    tipo = models.CharField(max_length=20, choices=TIPOS, default="sugerencia")
+    asunto = models.CharField(max_length=255)
+    mensaje = models.TextField()
+    html = models.BooleanField(default=False)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="pendiente")
+    intentos = models.PositiveSmallIntegerField(default=0)
+    ultimo_error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    enviar_despues = models.DateTimeField()
+    token = models.CharField(max_length=32, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["estado", "enviar_despues"]),
+            models.Index(fields=["usuario", "estado"]),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} - {self.usuario_id} ({self.estado})"
@@ -0,0 +1,190 @@
+"""
+Bandeja de salida de correos.
+
+Las sugerencias y recordatorios no se envían en el momento: se guardan en
+Outbox y un proceso aparte (vaciar_outbox, o el comando enviar_outbox) los
+manda después. Un aviso nuevo se suma a los pendientes del usuario y sale
+con ellos; si no había ninguno, espera OUTBOX_VENTANA_SEGUNDOS por si llegan
+más. Cuando algún aviso del usuario vence se envía todo lo pendiente en un
+solo correo de resumen.
+
+Antes de enviar, cada tanda se reclama con un UPDATE condicional (estado
+"pendiente" a "enviando" con el token de la corrida), como los trabajos de
+la cola: si dos corridas se solapan, cada aviso lo toma solo una y el
+resumen no sale dos veces. Si la corrida muere, los avisos reclamados
+vuelven a estar disponibles después de RECLAMO_OUTBOX.
+
+Cada tanda de resúmenes se reparte entre las conexiones SMTP de
+despacho.despachar, que reintenta con espera exponencial. Si un correo
+sigue fallando, sus avisos se reprograman para una corrida posterior y tras
+OUTBOX_MAX_INTENTOS quedan como fallidos.
+"""
+import uuid
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from .despacho import (
+    ESPERA_REINTENTO,
+    REINTENTOS_CONEXION,
+    cerrar_remitentes,
+    crear_remitentes,
+    despachar,
+    renderizar,
+)
+from .models import Outbox
+
+RECLAMO_OUTBOX = timedelta(minutes=10)
+
+
+def _ventana():
+    return timedelta(seconds=getattr(settings, "OUTBOX_VENTANA_SEGUNDOS", 300))
+
+
+def _programacion(usuario_id, espera):
+    """Momento de envío de un aviso nuevo: el del resumen pendiente del usuario, si hay uno"""
+    pendiente = (
+        Outbox.objects.filter(usuario_id=usuario_id, estado="pendiente")
+        .aggregate(primero=Min("enviar_despues"))["primero"]
+    )
+    propio = timezone.now() + espera
+    return min(pendiente, propio) if pendiente else propio
+
+
+def encolar_correo(usuario, asunto, mensaje, tipo="sugerencia", html=False, espera=None):
+    """Agrega un aviso a la bandeja de salida del usuario"""
+    espera = _ventana() if espera is None else espera
+    return Outbox.objects.create(
+        usuario=usuario,
+        tipo=tipo,
+        asunto=asunto,
+        mensaje=mensaje,
+        html=html,
+        enviar_despues=_programacion(usuario.pk, espera),
+    )
+
+
+def encolar_correos(avisos, tipo="recordatorio", html=True, espera=timedelta(0)):
+    """
+    Agrega varios avisos con bulk_create. avisos es un iterable de
+    (usuario, asunto, mensaje); los recordatorios no esperan la ventana.
+    """
+    ahora = timezone.now()
+    filas = [
+        Outbox(
+            usuario_id=usuario.id,
+            tipo=tipo,
+            asunto=asunto,
+            mensaje=mensaje,
+            html=html,
+            enviar_despues=ahora + espera,
+        )
+        for usuario, asunto, mensaje in avisos
+    ]
+    Outbox.objects.bulk_create(filas, batch_size=500)
+    return len(filas)
+
+
+def _reclamables(ahora):
+    """Avisos pendientes, o reclamados por una corrida cuyo reclamo ya venció"""
+    return Q(estado="pendiente") | Q(estado="enviando", enviar_despues__lte=ahora)
+
+
+def reclamar_avisos(usuarios, ahora):
+    """Marca como enviando los avisos de usuarios que nadie más tomó; devuelve el token"""
+    token = uuid.uuid4().hex
+    Outbox.objects.filter(_reclamables(ahora), usuario_id__in=usuarios).update(
+        estado="enviando", token=token, enviar_despues=ahora + RECLAMO_OUTBOX
+    )
+    return token
+
+
+def componer_resumen(usuario, avisos):
+    """Un correo con todos los avisos pendientes del usuario"""
+    if len(avisos) == 1:
+        aviso = avisos[0]
+        email = EmailMessage(aviso.asunto, aviso.mensaje, to=[usuario.email])
+        if aviso.html:
+            email.content_subtype = "html"
+        return email
+
+    mensaje = renderizar(
+        "resumen_avisos.html", {"nombre": usuario.first_name, "avisos": avisos}
+    )
+    email = EmailMessage(
+        f"Tienes {len(avisos)} avisos de SmarTime", mensaje, to=[usuario.email]
+    )
+    email.content_subtype = "html"
+    return email
+
+
+def vaciar_outbox(
+    ahora=None,
+    tamano_lote=None,
+    conexiones=None,
+    reintentos=REINTENTOS_CONEXION,
+    espera=ESPERA_REINTENTO,
+):
+    """
+    Envía un resumen por cada usuario con algún aviso vencido. Los usuarios
+    se procesan por tandas de tamano_lote; los avisos de la tanda se
+    reclaman antes de abrir el envío y se borran al enviarse. Devuelve
+    (correos enviados, avisos enviados, avisos con error).
+    """
+    ahora = ahora or timezone.now()
+    tamano_lote = tamano_lote or getattr(settings, "OUTBOX_TAMANO_LOTE", 100)
+    max_intentos = getattr(settings, "OUTBOX_MAX_INTENTOS", 5)
+
+    usuarios = list(
+        Outbox.objects.filter(estado__in=["pendiente", "enviando"], enviar_despues__lte=ahora)
+        .values_list("usuario_id", flat=True)
+        .distinct()
+        .order_by("usuario_id")
+    )
+
+    # Las mismas conexiones sirven para todas las tandas de la corrida
+    remitentes = crear_remitentes(conexiones, reintentos, espera)
+    correos = enviados = errores = 0
+    try:
+        for inicio in range(0, len(usuarios), tamano_lote):
+            token = reclamar_avisos(usuarios[inicio:inicio + tamano_lote], ahora)
+            avisos = (
+                Outbox.objects.filter(estado="enviando", token=token)
+                .select_related("usuario")
+                .order_by("usuario_id", "id")
+            )
+            grupos = [list(grupo) for _, grupo in groupby(avisos, key=lambda a: a.usuario_id)]
+            if not grupos:
+                continue  # otra corrida se llevó la tanda
+            resultados = despachar(
+                [componer_resumen(grupo[0].usuario, grupo) for grupo in grupos],
+                remitentes,
+            )
+
+            entregados = []
+            for grupo, error in zip(grupos, resultados):
+                ids = [aviso.pk for aviso in grupo]
+                if error is None:
+                    entregados += ids
+                    correos += 1
+                    continue
+                errores += len(ids)
+                Outbox.objects.filter(pk__in=ids).update(
+                    estado="pendiente",
+                    token="",
+                    intentos=F("intentos") + 1,
+                    ultimo_error=str(error)[:1000],
+                    enviar_despues=ahora + _ventana() * 2 ** min(grupo[0].intentos, 6),
+                )
+                Outbox.objects.filter(pk__in=ids, intentos__gte=max_intentos).update(
+                    estado="fallido"
+                )
+            Outbox.objects.filter(pk__in=entregados).delete()
+            enviados += len(entregados)
+    finally:
+        cerrar_remitentes(remitentes)
+    return correos, enviados, errores
@@ -0,0 +1,202 @@
+"""
+Selección de actividades para los recordatorios por correo.
+
+El resumen matutino se arma como un flujo: un único UNION ALL de las tareas,
+clases y estudios del día ordenado por usuario se lee con
+.iterator(chunk_size), las ocurrencias de las series semanales llegan en otro
+flujo ordenado por usuario y ambos se intercalan con heapq.merge. Las filas
+consecutivas de un mismo usuario forman un mensaje, de modo que en memoria
+solo está el día de un usuario a la vez, sin importar cuántos haya inscritos.
+
+El aviso de vencimiento busca las tareas que se entregan dentro de la
+ventana siguiente (VENTANA_EXPIRACION) con una consulta de rango sobre el
+índice (fechaEntrega, horaEntrega) y descarta las que ya figuran en
+NotificacionEnviada. Así el proceso puede correr cada minuto o cada cuarto
+de hora, tarde o dos veces, y cada tarea se avisa una sola vez. El resumen
+matutino y el de tareas pendientes usan el mismo registro con el día como
+objeto_id (avisar_una_vez_por_dia): uno por usuario y día.
+"""
+import heapq
+from collections import namedtuple
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import CharField, Exists, F, OuterRef, Q, Value
+from django.utils.timezone import localtime, now
+
+from Apps.Calendario.models import Tarea, Clase, Estudio
+from Apps.Calendario.recurrencia import series_en_ventana, ocurrencias_serie
+from .models import NotificacionEnviada
+
+TAMANO_LOTE_RECORDATORIOS = 500
+VENTANA_EXPIRACION = timedelta(hours=2)
+
+Destinatario = namedtuple("Destinatario", ["id", "email", "first_name"])
+
+
+def _columnas(queryset, tipo, titulo):
+    """Proyecta un queryset a las columnas del resumen matutino"""
+    return (
+        queryset.order_by()
+        .annotate(
+            tipo=Value(tipo, output_field=CharField()),
+            destinatario=F("usuario_id"),
+            correo=F("usuario__email"),
+            nombre_usuario=F("usuario__first_name"),
+            nombre=F(titulo),
+            inicio=F("horaInicio"),
+        )
+        .values("destinatario", "correo", "nombre_usuario", "tipo", "nombre", "inicio")
+    )
+
+
+def _filas_guardadas(fecha):
+    """Tareas, estudios y clases sin repetición del día, ordenados por usuario"""
+    consultas = [
+        _columnas(
+            Tarea.objects.filter(fechaRealizacion=fecha, usuario__notificacion=True),
+            "Tarea", "titulo",
+        ),
+        _columnas(
+            Clase.objects.filter(fecha=fecha, repetir=False, usuario__notificacion=True),
+            "Clase", "curso",
+        ),
+        _columnas(
+            Estudio.objects.filter(fecha=fecha, usuario__notificacion=True),
+            "Estudio", "titulo",
+        ),
+    ]
+    return (
+        consultas[0]
+        .union(*consultas[1:], all=True)
+        .order_by("destinatario", "inicio")
+        .iterator(chunk_size=TAMANO_LOTE_RECORDATORIOS)
+    )
+
+
+def _filas_series(fecha):
+    """Ocurrencias del día de las clases semanales, ordenadas por usuario"""
+    series = (
+        series_en_ventana(
+            Clase.objects.filter(repetir=True, usuario__notificacion=True), fecha, fecha
+        )
+        .select_related("usuario")
+        .prefetch_related("excepciones")
+        .order_by("usuario_id", "id")
+    )
+    for serie in series.iterator(chunk_size=TAMANO_LOTE_RECORDATORIOS):
+        for ocurrencia in ocurrencias_serie(serie, fecha, fecha):
+            yield {
+                "destinatario": serie.usuario_id,
+                "correo": serie.usuario.email,
+                "nombre_usuario": serie.usuario.first_name,
+                "tipo": "Clase",
+                "nombre": serie.curso,
+                "inicio": ocurrencia.horaInicio,
+            }
+
+
+def actividades_del_dia_por_usuario(fecha):
+    """
+    Genera (Destinatario, actividades) por cada usuario con recordatorios
+    activos y actividades académicas en fecha. actividades es una lista de
+    dicts con titulo y horaInicio, ordenada por hora.
+    """
+    filas = heapq.merge(
+        _filas_guardadas(fecha), _filas_series(fecha), key=itemgetter("destinatario")
+    )
+    for usuario_id, grupo in groupby(filas, key=itemgetter("destinatario")):
+        grupo = sorted(grupo, key=itemgetter("inicio"))
+        destinatario = Destinatario(usuario_id, grupo[0]["correo"], grupo[0]["nombre_usuario"])
+        yield destinatario, [
+            {"tipo": fila["tipo"], "titulo": fila["nombre"], "horaInicio": fila["inicio"]}
+            for fila in grupo
+        ]
+
+
+def _entrega_entre(inicio, fin):
+    """Condición (fechaEntrega, horaEntrega) en (inicio, fin], aunque cruce la medianoche"""
+    if inicio.date() == fin.date():
+        return Q(
+            fechaEntrega=inicio.date(),
+            horaEntrega__gt=inicio.time(),
+            horaEntrega__lte=fin.time(),
+        )
+    condicion = Q(fechaEntrega=inicio.date(), horaEntrega__gt=inicio.time())
+    condicion |= Q(fechaEntrega__gt=inicio.date(), fechaEntrega__lt=fin.date())
+    condicion |= Q(fechaEntrega=fin.date(), horaEntrega__lte=fin.time())
+    return condicion
+
+
+def tareas_por_vencer(ahora=None, ventana=VENTANA_EXPIRACION):
+    """
+    Tareas de usuarios con recordatorios activos que se entregan dentro de la
+    ventana y que todavía no se avisaron.
+    """
+    ahora = localtime(ahora or now()).replace(tzinfo=None)
+    avisada = NotificacionEnviada.objects.filter(
+        usuario=OuterRef("usuario"),
+        tipo="expiracion_tarea",
+        objeto_id=OuterRef("pk"),
+    )
+    return (
+        Tarea.objects.filter(_entrega_entre(ahora, ahora + ventana), usuario__notificacion=True)
+        .exclude(Exists(avisada))
+        .select_related("usuario")
+        .order_by("fechaEntrega", "horaEntrega", "id")
+    )
+
+
+def notificar_vencimientos(enviar, ahora=None, ventana=VENTANA_EXPIRACION):
+    """
+    Avisa las tareas por vencer con enviar(lista de (usuario, tarea)) y las
+    registra en NotificacionEnviada. El registro y el aviso (que normalmente
+    se encola en el Outbox) van en la misma transacción: si el aviso falla no
+    queda nada anotado y la siguiente corrida lo reintenta. Devuelve cuántas
+    tareas se avisaron.
+    """
+    with transaction.atomic():
+        tareas = list(tareas_por_vencer(ahora, ventana))
+        if not tareas:
+            return 0
+        NotificacionEnviada.objects.bulk_create(
+            [
+                NotificacionEnviada(
+                    usuario_id=tarea.usuario_id, tipo="expiracion_tarea", objeto_id=tarea.pk
+                )
+                for tarea in tareas
+            ],
+            ignore_conflicts=True,
+        )
+        enviar([(tarea.usuario, tarea) for tarea in tareas])
+    return len(tareas)
+
+
+def avisar_una_vez_por_dia(tipo, fecha, avisos, enviar):
+    """
+    Pasa a enviar(avisos) solo los avisos (usuario, ...) de usuarios que aún
+    no recibieron el aviso tipo de fecha, y los registra en
+    NotificacionEnviada en la misma transacción, como notificar_vencimientos.
+    Devuelve lo que devuelve enviar, o 0 si no queda nada por avisar.
+    """
+    with transaction.atomic():
+        avisados = set(
+            NotificacionEnviada.objects.filter(
+                tipo=tipo,
+                objeto_id=fecha.toordinal(),
+                usuario_id__in=[aviso[0].id for aviso in avisos],
+            ).values_list("usuario_id", flat=True)
+        )
+        pendientes = [aviso for aviso in avisos if aviso[0].id not in avisados]
+        if not pendientes:
+            return 0
+        NotificacionEnviada.objects.bulk_create(
+            [
+                NotificacionEnviada(usuario_id=aviso[0].id, tipo=tipo, objeto_id=fecha.toordinal())
+                for aviso in pendientes
+            ],
+            ignore_conflicts=True,
+        )
+        return enviar(pendientes)
@@ -1,3 +1,416 @@
+"""
+Tests para los recordatorios por correo
+"""
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends import locmem
+from django.template.loader import get_template
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from Apps.Calendario.models import Tarea, Clase, Estudio, ExcepcionOcurrencia
+from django.utils import timezone
+from Apps.Cola_trabajos.cola import ejecutar_pendientes
+from Apps.Cola_trabajos.models import Trabajo
+from Apps.Tareas.models import EstadoTarea
+from .models import NotificacionEnviada, Outbox
+from .despacho import (
+    cerrar_remitentes, crear_remitentes, despachar, plantilla, renderizar,
+)
+from .outbox import encolar_correo, vaciar_outbox
+from .recordatorios import actividades_del_dia_por_usuario, notificar_vencimientos
+from .trabajos import enviar_outbox, recordatorio_matutino, recordatorio_pendientes
+from .utils import encolar_recordatorios_tareas, encolar_recordatorios_expiracion
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ResumenMatutinoTests(TestCase):
+    """Tests para el flujo del recordatorio matutino"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.hoy = date.today()
+        self.usuarios = [
+            User.objects.create_user(
+                username=f'alumno{i}', email=f'alumno{i}@example.com',
+                password='testpass123', first_name=f'Alumno {i}'
+            )
+            for i in range(3)
+        ]
+        self.silenciado = User.objects.create_user(
+            username='silenciado', email='silenciado@example.com',
+            password='testpass123', notificacion=False
+        )
+
+    def crear_tarea(self, usuario, titulo, hora, dia=None):
+        return Tarea.objects.create(
+            usuario=usuario, titulo=titulo, curso='Cálculo',
+            fechaRealizacion=dia or self.hoy, fechaEntrega=dia or self.hoy,
+            horaEntrega=time(23, 59), horaInicio=hora, horaFin=time(hora.hour + 1),
+            complejidad=2
+        )
+
+    def test_agrupa_por_usuario_y_ordena_por_hora(self):
+        """Test: Cada usuario recibe sus actividades del día ordenadas por hora"""
+        primero, segundo, _ = self.usuarios
+        self.crear_tarea(primero, 'Informe', time(15, 0))
+        Estudio.objects.create(
+            usuario=primero, titulo='Repaso', curso='Química', fecha=self.hoy,
+            horaInicio=time(9, 0), horaFin=time(10, 0)
+        )
+        Clase.objects.create(
+            usuario=segundo, curso='Física', fecha=self.hoy,
+            horaInicio=time(8, 0), horaFin=time(10, 0)
+        )
+        self.crear_tarea(segundo, 'Mañana', time(8, 0), dia=self.hoy + timedelta(days=1))
+        self.crear_tarea(self.silenciado, 'Sin aviso', time(8, 0))
+
+        resumen = [
+            (destinatario.email, [a['titulo'] for a in actividades])
+            for destinatario, actividades in actividades_del_dia_por_usuario(self.hoy)
+        ]
+
+        self.assertEqual(resumen, [
+            ('alumno0@example.com', ['Repaso', 'Informe']),
+            ('alumno1@example.com', ['Física']),
+        ])
+
+    def test_incluye_ocurrencias_de_series(self):
+        """Test: Las clases semanales aparecen en los días en que ocurren"""
+        primero, segundo, _ = self.usuarios
+        Clase.objects.create(
+            usuario=primero, curso='Álgebra', fecha=self.hoy - timedelta(days=14),
+            horaInicio=time(10, 0), horaFin=time(12, 0), repetir=True, semanas=4
+        )
+        cancelada = Clase.objects.create(
+            usuario=segundo, curso='Historia', fecha=self.hoy - timedelta(days=7),
+            horaInicio=time(10, 0), horaFin=time(12, 0), repetir=True, semanas=4
+        )
+        ExcepcionOcurrencia.objects.create(
+            clase=cancelada, fechaOriginal=self.hoy, cancelada=True
+        )
+
+        resumen = [
+            (destinatario.email, [a['titulo'] for a in actividades])
+            for destinatario, actividades in actividades_del_dia_por_usuario(self.hoy)
+        ]
+
+        self.assertEqual(resumen, [('alumno0@example.com', ['Álgebra'])])
+
+    def test_encola_en_tandas_y_envia_un_correo_por_usuario(self):
+        """Test: El flujo se encola por tandas y sale un correo por usuario"""
+        for i, usuario in enumerate(self.usuarios):
+            self.crear_tarea(usuario, f'Tarea {i}', time(9, 0))
+
+        encolados = encolar_recordatorios_tareas(
+            actividades_del_dia_por_usuario(self.hoy), tamano_buffer=2
+        )
+        vaciar_outbox()
+
+        self.assertEqual(encolados, 3)
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox),
+            ['alumno0@example.com', 'alumno1@example.com', 'alumno2@example.com']
+        )
+        self.assertIn('Tarea 0', mail.outbox[0].body)
+
+    def test_trabajo_periodico_sin_actividades(self):
+        """Test: Sin actividades el trabajo matutino no encola correos"""
+        self.assertEqual(recordatorio_matutino(), 0)
+        self.assertFalse(Outbox.objects.exists())
+
+    def test_trabajo_periodico_encola_y_enviar_outbox_envia(self):
+        """Test: El recordatorio solo encola; el trabajo enviar_outbox lo envía"""
+        self.crear_tarea(self.usuarios[0], 'Álgebra', time(9, 0), dia=timezone.localdate())
+
+        self.assertEqual(recordatorio_matutino(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(enviar_outbox()['correos'], 1)
+        self.assertIn('Álgebra', mail.outbox[0].body)
+
+    def test_resumen_una_vez_por_dia(self):
+        """Test: Si el trabajo matutino corre dos veces, cada usuario recibe un solo resumen"""
+        hoy = timezone.localdate()
+        self.crear_tarea(self.usuarios[0], 'Álgebra', time(9, 0), dia=hoy)
+
+        self.assertEqual(recordatorio_matutino(), 1)
+        self.crear_tarea(self.usuarios[1], 'Física', time(10, 0), dia=hoy)
+        self.assertEqual(recordatorio_matutino(), 1)  # solo el usuario nuevo
+
+        self.assertEqual(Outbox.objects.count(), 2)
+        self.assertEqual(
+            NotificacionEnviada.objects.filter(tipo='resumen_diario', objeto_id=hoy.toordinal()).count(), 2
+        )
+
+    def test_pendientes_una_vez_por_dia(self):
+        """Test: El aviso de tareas no completadas sale una vez por usuario y día"""
+        ayer = timezone.localdate() - timedelta(days=1)
+        tarea = self.crear_tarea(self.usuarios[0], 'Informe', time(9, 0), dia=ayer)
+        EstadoTarea.objects.create(tarea=tarea, estado='inicio')
+
+        self.assertEqual(recordatorio_pendientes(), 1)
+        self.assertEqual(recordatorio_pendientes(), 0)
+        self.assertEqual(Outbox.objects.count(), 1)
+
+
+class RecordatorioVencimientoTests(TestCase):
+    """Tests para el aviso de tareas que vencen en las próximas 2 horas"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com',
+            password='testpass123', first_name='Ana'
+        )
+        self.ahora = datetime(2025, 7, 10, 14, 0, tzinfo=ZoneInfo(settings.TIME_ZONE))
+
+    def crear_tarea(self, titulo, fecha, hora):
+        return Tarea.objects.create(
+            usuario=self.user, titulo=titulo, curso='Cálculo',
+            fechaRealizacion=fecha, fechaEntrega=fecha, horaEntrega=hora,
+            horaInicio=time(8, 0), horaFin=time(9, 0), complejidad=2
+        )
+
+    def test_avisa_las_tareas_dentro_de_la_ventana(self):
+        """Test: Se avisan las entregas de las próximas 2 horas, no las demás"""
+        dia = self.ahora.date()
+        self.crear_tarea('Justo ahora', dia, time(14, 0))
+        self.crear_tarea('En una hora', dia, time(15, 0))
+        self.crear_tarea('En dos horas', dia, time(16, 0))
+        self.crear_tarea('Más tarde', dia, time(16, 1))
+
+        avisadas = notificar_vencimientos(encolar_recordatorios_expiracion, ahora=self.ahora)
+        vaciar_outbox()
+
+        self.assertEqual(avisadas, 2)
+        # Los dos avisos del mismo usuario salen en un solo resumen
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('<strong>"En una hora"</strong>', mail.outbox[0].body)
+        self.assertIn('<strong>"En dos horas"</strong>', mail.outbox[0].body)
+
+    def test_segunda_corrida_no_repite_avisos(self):
+        """Test: Correr dos veces o con retraso no duplica ni pierde avisos"""
+        dia = self.ahora.date()
+        self.crear_tarea('Informe', dia, time(15, 30))
+
+        notificar_vencimientos(encolar_recordatorios_expiracion, ahora=self.ahora)
+        notificar_vencimientos(
+            encolar_recordatorios_expiracion, ahora=self.ahora + timedelta(minutes=17)
+        )
+        vaciar_outbox()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(NotificacionEnviada.objects.count(), 1)
+
+    def test_ventana_que_cruza_la_medianoche(self):
+        """Test: A las 23:00 se avisa una entrega de la 00:30 del día siguiente"""
+        noche = self.ahora.replace(hour=23)
+        self.crear_tarea('Madrugada', noche.date() + timedelta(days=1), time(0, 30))
+
+        avisadas = notificar_vencimientos(encolar_recordatorios_expiracion, ahora=noche)
+
+        self.assertEqual(avisadas, 1)
+
+    def test_si_el_envio_falla_no_se_registra(self):
+        """Test: Un error al enviar deja la tarea pendiente para la siguiente corrida"""
+        self.crear_tarea('Informe', self.ahora.date(), time(15, 0))
+
+        def fallar(_):
+            raise ConnectionError('SMTP caído')
+
+        with self.assertRaises(ConnectionError):
+            notificar_vencimientos(fallar, ahora=self.ahora)
+
+        self.assertEqual(NotificacionEnviada.objects.count(), 0)
+        self.assertEqual(
+            notificar_vencimientos(encolar_recordatorios_expiracion, ahora=self.ahora), 1
+        )
+
+
+class OutboxTests(TestCase):
+    """Tests para la bandeja de salida y el resumen por usuario"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com',
+            password='testpass123', first_name='Ana'
+        )
+        self.otro = User.objects.create_user(
+            username='otro', email='otro@example.com', password='testpass123'
+        )
+        self.despues = timezone.now() + timedelta(days=1)
+
+    def test_sugerencia_no_envia_en_la_peticion(self):
+        """Test: Crear una actividad encola un trabajo y este encola la sugerencia"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.post('/calendario/api/estudios/', {
+            'titulo': 'Maratón', 'curso': 'Química', 'fecha': '2025-07-10',
+            'horaInicio': '08:00', 'horaFin': '19:00',
+        }, format='json')
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(Outbox.objects.exists())
+        self.assertEqual(Trabajo.objects.filter(usuario=self.user).count(), 1)
+
+        ejecutar_pendientes()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Outbox.objects.filter(usuario=self.user).count(), 1)
+
+    def test_agrupa_los_avisos_del_usuario(self):
+        """Test: Los avisos de la ventana salen en un solo correo por usuario"""
+        encolar_correo(self.user, 'Sugerencia 1', 'Primer aviso')
+        encolar_correo(self.user, 'Sugerencia 2', 'Segundo aviso')
+        encolar_correo(self.otro, 'Sugerencia', 'Aviso del otro')
+
+        self.assertEqual(vaciar_outbox(ahora=timezone.now()), (0, 0, 0))
+        correos, avisos, errores = vaciar_outbox(ahora=self.despues)
+
+        self.assertEqual((correos, avisos, errores), (2, 3, 0))
+        resumen = next(m for m in mail.outbox if m.to == ['test@example.com'])
+        self.assertEqual(resumen.subject, 'Tienes 2 avisos de SmarTime')
+        self.assertIn('Primer aviso', resumen.body)
+        self.assertIn('Segundo aviso', resumen.body)
+        self.assertFalse(Outbox.objects.exists())
+
+    def test_aviso_nuevo_se_suma_al_resumen_pendiente(self):
+        """Test: Un aviso nuevo sale cuando vence el resumen pendiente del usuario"""
+        primero = encolar_correo(self.user, 'Sugerencia 1', 'Primer aviso')
+        segundo = encolar_correo(self.user, 'Sugerencia 2', 'Segundo aviso')
+
+        self.assertEqual(segundo.enviar_despues, primero.enviar_despues)
+
+    def test_reintenta_y_reprograma_si_falla(self):
+        """Test: Si SMTP falla se reintenta y luego el aviso queda reprogramado"""
+        encolar_correo(self.user, 'Sugerencia', 'Aviso')
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=ConnectionError('SMTP caído'),
+        ) as envio:
+            resultado = vaciar_outbox(ahora=self.despues, reintentos=2, espera=0)
+
+        self.assertEqual(resultado, (0, 0, 1))
+        self.assertEqual(envio.call_count, 3)
+        aviso = Outbox.objects.get()
+        self.assertEqual((aviso.estado, aviso.token), ('pendiente', ''))
+        self.assertEqual(aviso.intentos, 1)
+        self.assertGreater(aviso.enviar_despues, self.despues)
+        self.assertIn('SMTP caído', aviso.ultimo_error)
+
+    def test_corridas_solapadas_no_repiten_el_resumen(self):
+        """Test: Una segunda corrida no toma los avisos que otra ya reclamó"""
+        encolar_correo(self.user, 'Sugerencia', 'Aviso')
+        competencia = []
+
+        def despachar_y_competir(correos, remitentes):
+            competencia.append(vaciar_outbox(ahora=self.despues))
+            return despachar(correos, remitentes)
+
+        with mock.patch('Apps.Notificacion.outbox.despachar', side_effect=despachar_y_competir):
+            resultado = vaciar_outbox(ahora=self.despues)
+
+        self.assertEqual(resultado, (1, 1, 0))
+        self.assertEqual(competencia, [(0, 0, 0)])
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_reclamo_vencido_se_vuelve_a_enviar(self):
+        """Test: Si la corrida que reclamó los avisos murió, salen al vencer el reclamo"""
+        encolar_correo(self.user, 'Sugerencia', 'Aviso')
+        Outbox.objects.update(estado='enviando', token='muerta', enviar_despues=self.despues)
+
+        self.assertEqual(vaciar_outbox(ahora=self.despues - timedelta(seconds=1)), (0, 0, 0))
+        self.assertEqual(vaciar_outbox(ahora=self.despues), (1, 1, 0))
+        self.assertFalse(Outbox.objects.exists())
+
+    def test_reutiliza_las_conexiones_entre_tandas(self):
+        """Test: La corrida abre cada conexión del grupo una sola vez"""
+        for i in range(9):
+            usuario = User.objects.create_user(
+                username=f'alumno{i}', email=f'alumno{i}@example.com', password='x'
+            )
+            encolar_correo(usuario, 'Sugerencia', 'Aviso')
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open', return_value=True
+        ) as apertura:
+            correos, _, _ = vaciar_outbox(ahora=self.despues, tamano_lote=3, conexiones=2)
+
+        self.assertEqual(correos, 9)
+        self.assertEqual(len(mail.outbox), 9)
+        self.assertLessEqual(apertura.call_count, 2)
+
+
+class DespachoTests(TestCase):
+    """Tests para el envío en paralelo y las plantillas compiladas"""
+
+    def test_plantilla_se_compila_una_vez(self):
+        """Test: Renderizar varias veces no vuelve a cargar la plantilla"""
+        plantilla.cache_clear()
+        with mock.patch(
+            'Apps.Notificacion.despacho.get_template', wraps=get_template
+        ) as carga:
+            for i in range(5):
+                renderizar('recordatorio.html', {'nombre': f'Alumno {i}', 'actividades': []})
+
+        self.assertEqual(carga.call_count, 1)
+
+    def test_reparte_entre_conexiones_e_informa_errores(self):
+        """Test: Cada tanda sale en un send_messages y el que falla se informa por posición"""
+        mensajes = [
+            EmailMessage('Aviso', 'Cuerpo', to=[f'alumno{i}@example.com']) for i in range(40)
+        ]
+        mensajes[7].to = ['falla@example.com']
+        mensajes[12].to = []
+        enviar_original = locmem.EmailBackend.send_messages
+        llamadas = []
+
+        def enviar(backend, emails):
+            # Como el backend SMTP: envía en orden y corta en el primer rechazo
+            llamadas.append(1)
+            enviados = 0
+            for email in emails:
+                if email.to == ['falla@example.com']:
+                    raise ConnectionError('rechazado')
+                enviados += enviar_original(backend, [email])
+            return enviados
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', enviar):
+            remitentes = crear_remitentes(4, reintentos=1, espera=0)
+            resultados = despachar(mensajes, remitentes, tamano_lote=5)
+
+        self.assertEqual(len(mail.outbox), 38)  # ninguno repetido
+        self.assertEqual(len({m.to[0] for m in mail.outbox}), 38)
+        self.assertIsInstance(resultados[7], ConnectionError)
+        self.assertIsInstance(resultados[12], ValueError)
+        self.assertEqual(sum(r is None for r in resultados), 38)
+        # 8 tandas, más el reintento del rechazado y la continuación de su tanda
+        self.assertEqual(len(llamadas), 10)
+        cerrar_remitentes(remitentes)
+
+    def test_conteo_corto_reintenta_los_que_faltan(self):
+        """Test: Si el backend acepta menos mensajes de los enviados, los que faltan se reintentan"""
+        mensajes = [
+            EmailMessage('Aviso', 'Cuerpo', to=[f'alumno{i}@example.com']) for i in range(4)
+        ]
+        enviar_original = locmem.EmailBackend.send_messages
+        cortes = [2]
+
+        def enviar(backend, emails):
+            emails = list(emails)
+            if cortes:
+                emails = emails[:cortes.pop()]
+            return enviar_original(backend, emails)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', enviar):
+            resultados = despachar(mensajes, crear_remitentes(1, reintentos=1, espera=0))
+
+        self.assertEqual(resultados, [None] * 4)
+        self.assertEqual([m.to[0] for m in mail.outbox], [f'alumno{i}@example.com' for i in range(4)])
@@ -0,0 +1,130 @@
+"""
+Benchmark del envío masivo de recordatorios.
+
+Levanta un servidor SMTP local que acepta todo y simula la latencia de un
+servidor real, renderiza recordatorio.html para 10.000 destinatarios con la
+plantilla compilada y mide cuántos mensajes por segundo salen con una sola
+conexión y con el grupo de conexiones de despacho.despachar.
+
+    python manage.py test Apps.Notificacion.tests_rendimiento
+"""
+import socketserver
+import threading
+import time as reloj
+from datetime import time
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends.smtp import EmailBackend
+from django.test import TestCase
+
+from .despacho import cerrar_remitentes, crear_remitentes, despachar, renderizar
+
+DESTINATARIOS = 10000
+CONEXIONES = [1, 4, 8]
+LATENCIA_SMTP = 0.002  # segundos que tarda el servidor en aceptar cada mensaje
+
+
+class _SesionSMTP(socketserver.StreamRequestHandler):
+    """Diálogo SMTP mínimo: acepta cualquier remitente, destinatario y mensaje"""
+
+    def handle(self):
+        self.wfile.write(b"220 localhost ESMTP\r\n")
+        while True:
+            linea = self.rfile.readline()
+            if not linea:
+                return
+            comando = linea[:4].upper()
+            if comando in (b"EHLO", b"HELO"):
+                self.wfile.write(b"250 localhost\r\n")
+            elif comando == b"DATA":
+                self.wfile.write(b"354 Fin con <CRLF>.<CRLF>\r\n")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                reloj.sleep(LATENCIA_SMTP)
+                with self.server.candado:
+                    self.server.recibidos += 1
+                self.wfile.write(b"250 OK\r\n")
+            elif comando == b"QUIT":
+                self.wfile.write(b"221 Adios\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+class _ServidorSMTP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SesionSMTP)
+        self.candado = threading.Lock()
+        self.recibidos = 0
+
+
+class DespachoMasivoBenchmark(TestCase):
+    """Benchmark: mensajes por segundo según el número de conexiones SMTP"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = _ServidorSMTP()
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def _conexion(self):
+        host, puerto = self.servidor.server_address
+        return EmailBackend(
+            host=host, port=puerto, username="", password="",
+            use_tls=False, use_ssl=False, fail_silently=False, timeout=10,
+        )
+
+    def _mensajes(self):
+        actividades = [
+            {"titulo": "Cálculo", "horaInicio": time(8, 0)},
+            {"titulo": "Informe de laboratorio", "horaInicio": time(15, 0)},
+        ]
+        mensajes = []
+        for i in range(DESTINATARIOS):
+            cuerpo = renderizar(
+                "recordatorio.html", {"nombre": f"Alumno {i}", "actividades": actividades}
+            )
+            email = EmailMessage(
+                "Tus actividades para hoy", cuerpo,
+                from_email="smartime@example.com", to=[f"alumno{i}@example.com"],
+            )
+            email.content_subtype = "html"
+            mensajes.append(email)
+        return mensajes
+
+    def test_caudal_con_grupo_de_conexiones(self):
+        inicio = reloj.perf_counter()
+        mensajes = self._mensajes()
+        render = reloj.perf_counter() - inicio
+
+        resultados = []
+        for conexiones in CONEXIONES:
+            self.servidor.recibidos = 0
+            remitentes = crear_remitentes(conexiones, reintentos=1, espera=0, fabrica_conexion=self._conexion)
+            inicio = reloj.perf_counter()
+            try:
+                errores = despachar(mensajes, remitentes)
+            finally:
+                cerrar_remitentes(remitentes)
+            duracion = reloj.perf_counter() - inicio
+
+            self.assertFalse(any(errores))
+            self.assertEqual(self.servidor.recibidos, DESTINATARIOS)
+            resultados.append((conexiones, DESTINATARIOS / duracion))
+
+        print(f"\nRender de {DESTINATARIOS} correos: {render:.2f} s")
+        print("Conexiones  |  Mensajes por segundo")
+        for conexiones, caudal in resultados:
+            print(f"{conexiones:>10}  |  {caudal:10.0f}")
+
+        # Con la latencia de red dominando, el grupo debe rendir bastante más
+        self.assertGreater(resultados[-1][1], resultados[0][1] * 2)
@@ -0,0 +1,113 @@
+"""
+Trabajos en segundo plano de las notificaciones (ver Apps.Cola_trabajos).
+Reciben ids y fechas ISO porque los argumentos se guardan como JSON.
+
+Los recordatorios son periódicos (run_scheduler): solo encolan avisos en el
+Outbox y enviar_outbox los agrupa y envía en la siguiente vuelta.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.utils import timezone
+
+from Apps.Calendario.models import Tarea
+from Apps.Cola_trabajos.cola import encolar, trabajo
+from Apps.Cola_trabajos.programador import periodico
+from .outbox import vaciar_outbox
+from .recordatorios import actividades_del_dia_por_usuario, notificar_vencimientos
+from .utils import (
+    encolar_recordatorios_expiracion,
+    encolar_recordatorios_pendientes,
+    encolar_recordatorios_tareas,
+    sugerencia_actividad,
+    sugerencias_lote,
+)
+
+
+@trabajo
+def sugerir_actividad(usuario_id, modelo, actividad_id):
+    actividad = (
+        apps.get_model("Calendario", modelo)
+        .objects.filter(pk=actividad_id, usuario_id=usuario_id)
+        .first()
+    )
+    if actividad is None:
+        return None  # se borró antes de que corriera el trabajo
+    sugerencia_actividad(get_user_model().objects.get(pk=usuario_id), actividad)
+
+
+@trabajo
+def sugerir_lote(usuario_id, fechas, tareas):
+    usuario = get_user_model().objects.get(pk=usuario_id)
+    sugerencias_lote(
+        usuario,
+        [date.fromisoformat(fecha) for fecha in fechas],
+        list(usuario.tareas.filter(pk__in=tareas)),
+    )
+
+
+@trabajo
+def enviar_correo(asunto, mensaje, destinatarios):
+    send_mail(asunto, mensaje, settings.DEFAULT_FROM_EMAIL, destinatarios, fail_silently=False)
+
+
+def encolar_sugerencia(usuario, actividad):
+    """Encola sugerencia_actividad para que no corra dentro de la petición"""
+    encolar(
+        sugerir_actividad,
+        usuario=usuario,
+        usuario_id=usuario.pk,
+        modelo=type(actividad).__name__,
+        actividad_id=actividad.pk,
+    )
+
+
+def encolar_sugerencias_lote(usuario, fechas, tareas):
+    if not fechas and not tareas:
+        return
+    encolar(
+        sugerir_lote,
+        usuario=usuario,
+        usuario_id=usuario.pk,
+        fechas=sorted({fecha.isoformat() for fecha in fechas}),
+        tareas=[tarea.pk for tarea in tareas],
+    )
+
+
+@periodico("0 7 * * *", tolerancia=timedelta(hours=4))
+def recordatorio_matutino():
+    # Flujo ordenado por usuario: nunca se cargan todas las actividades del día.
+    # Los usuarios ya avisados hoy quedan en NotificacionEnviada y no se repiten
+    hoy = timezone.localdate()
+    return encolar_recordatorios_tareas(actividades_del_dia_por_usuario(hoy), fecha=hoy)
+
+
+@periodico("*/15 * * * *")
+def recordatorio_vencimientos():
+    # Ventana de 2 horas; las tareas ya avisadas quedan en NotificacionEnviada
+    return notificar_vencimientos(encolar_recordatorios_expiracion)
+
+
+@periodico("0 9 * * *", tolerancia=timedelta(hours=12))
+def recordatorio_pendientes():
+    hoy = timezone.localdate()
+    tareas = Tarea.objects.select_related("usuario", "estado_actual").filter(
+        estado_actual__estado__in=["inicio", "en_desarrollo"],
+        usuario__notificacion=True,
+        fechaRealizacion__lt=hoy,
+    )
+
+    tareas_por_usuario = defaultdict(list)
+    for tarea in tareas:
+        tareas_por_usuario[tarea.usuario].append(tarea)
+    return encolar_recordatorios_pendientes(tareas_por_usuario, fecha=hoy)
+
+
+@periodico("* * * * *")
+def enviar_outbox():
+    correos, avisos, errores = vaciar_outbox()
+    return {"correos": correos, "avisos": avisos, "errores": errores}
@@ -1,39 +1,51 @@
-from django.core.mail import EmailMessage, get_connection, send_mail
-from django.template.loader import render_to_string
-from datetime import date, datetime
-from django.conf import settings
-
-
-def enviar_recordatorios_tareas(usuario_actividades):
-    connection = get_connection()
-    connection.open()
-
-    emails = []
-    for usuario, actividades in usuario_actividades.items():
-        subject = f"Tus actividades para hoy ({date.today().strftime('%d/%m/%Y')})"
-        message = render_to_string(
+from django.utils import timezone
+
+from Apps.Calendario.carga import SOBRECARGA_MINUTOS, minutos_academicos
+from Apps.Tareas.inversiones import inversiones_de, mensaje_inversiones
+from .despacho import renderizar
+from .outbox import encolar_correo, encolar_correos
+from .recordatorios import avisar_una_vez_por_dia
+
+
+TAMANO_BUFFER_ENVIO = 100
+
+
+def encolar_recordatorios_tareas(usuario_actividades, fecha=None, tamano_buffer=TAMANO_BUFFER_ENVIO):
+    """
+    Encola el resumen del día de cada usuario en el Outbox. usuario_actividades
+    es un iterable de (usuario, actividades), por ejemplo el generador de
+    actividades_del_dia_por_usuario; los correos se guardan en tandas de
+    tamano_buffer, así que nunca hay más de una tanda en memoria. Cada
+    usuario recibe un solo resumen por día aunque el trabajo corra dos veces.
+    Devuelve cuántos correos se encolaron.
+    """
+    fecha = fecha or timezone.localdate()
+    subject = f"Tus actividades para hoy ({fecha.strftime('%d/%m/%Y')})"
+    encolados = 0
+    avisos = []
+    for usuario, actividades in usuario_actividades:
+        message = renderizar(
             "recordatorio.html",
             {
                 "nombre": usuario.first_name,
                 "actividades": actividades,
             },
         )
-        email = EmailMessage(subject, message, to=[usuario.email])
-        email.content_subtype = "html"
-        emails.append(email)
+        avisos.append((usuario, subject, message))
+        if len(avisos) >= tamano_buffer:
+            encolados += avisar_una_vez_por_dia("resumen_diario", fecha, avisos, encolar_correos)
+            avisos = []
 
-    connection.send_messages(emails)
-    connection.close()
+    if avisos:
+        encolados += avisar_una_vez_por_dia("resumen_diario", fecha, avisos, encolar_correos)
+    return encolados
 
 
-def enviar_recordatorios_expiracion(usuarios_actividades):
-    connection = get_connection()
-    connection.open()
-
-    emails = []
+def encolar_recordatorios_expiracion(usuarios_actividades):
+    avisos = []
     for usuario, actividad in usuarios_actividades:
         subject = f"⏰ Recordatorio: Actividad '{actividad.titulo}' por terminar"
-        message = render_to_string(
+        message = renderizar(
             "expiracion.html",
             {
                 "nombre": usuario.first_name,
@@ -41,35 +53,26 @@ def enviar_recordatorios_expiracion(usuarios_actividades):
                 "horaEntrega": actividad.horaEntrega,
             },
         )
-        email = EmailMessage(subject, message, to=[usuario.email])
-        email.content_subtype = "html"
-        email.connection = connection
-        emails.append(email)
-
-    connection.send_messages(emails)
-    connection.close()
+        avisos.append((usuario, subject, message))
 
+    return encolar_correos(avisos)
 
-def enviar_recordatorios_pendientes(usuario_actividades):
-    connection = get_connection()
-    connection.open()
 
-    emails = []
+def encolar_recordatorios_pendientes(usuario_actividades, fecha=None):
+    fecha = fecha or timezone.localdate()
+    avisos = []
     for usuario, actividades in usuario_actividades.items():
-        subject = f"Tareas no completadas ({date.today().strftime('%d/%m/%Y')})"
-        message = render_to_string(
+        subject = f"Tareas no completadas ({fecha.strftime('%d/%m/%Y')})"
+        message = renderizar(
             "actIncompleta.html",
             {
                 "nombre": usuario.first_name,
                 "actividades": actividades,
             },
         )
-        email = EmailMessage(subject, message, to=[usuario.email])
-        email.content_subtype = "html"
-        emails.append(email)
+        avisos.append((usuario, subject, message))
 
-    connection.send_messages(emails)
-    connection.close()
+    return avisar_una_vez_por_dia("tareas_pendientes", fecha, avisos, encolar_correos)
 
 
 def sugerencia_actividad(usuario, actividad):
@@ -87,65 +90,54 @@ def verificar_sobrecarga(usuario, actividad):
     else:
         fecha = actividad.fecha
 
-    total_horas = 0
-
-    tareas = usuario.tareas.filter(fechaRealizacion=fecha)
-    clases = usuario.clases.filter(fecha=fecha)
-    estudios = usuario.estudios.filter(fecha=fecha)
-
-    print(
-        f"Verificando sobrecarga para {usuario.first_name} email: {usuario.email} en {fecha} tareas: {tareas}, clases: {clases}, estudios: {estudios}"
-    )
+    verificar_sobrecarga_dia(usuario, fecha)
 
-    for act in list(tareas) + list(clases) + list(estudios):
-        t_inicio = act.horaInicio
-        t_fin = act.horaFin
-        delta = datetime.combine(fecha, t_fin) - datetime.combine(fecha, t_inicio)
-        total_horas += delta.total_seconds() / 3600
 
-    if total_horas > 10:
+def verificar_sobrecarga_dia(usuario, fecha):
+    # CargaDiaria ya tiene sumados los minutos de tareas, clases y estudios del día
+    if minutos_academicos(usuario, fecha) > SOBRECARGA_MINUTOS:
         enviar_sugerencia(
-            usuario.email,
+            usuario,
             "Sugerencia de optimización",
             f"Se tiene sobrecarga de actividades académicas programadas para el día {fecha}. Se sugiere reprogramar alguna(s) actividad(es).",
         )
 
 
 def verificar_orden_tareas(usuario, tarea_nueva):
-    otras_tareas = usuario.tareas.exclude(id=tarea_nueva.id)
-
-    for otra in otras_tareas:
-        if (
-            tarea_nueva.fechaRealizacion < otra.fechaRealizacion
-            and tarea_nueva.fechaEntrega > otra.fechaEntrega
-        ):
-            # tarea_nueva se hace primero pero se entrega después = mal
-            enviar_sugerencia(
-                usuario.email,
-                "Sugerencia de optimización",
-                f'La tarea "{otra.titulo}" es más urgente que la tarea "{tarea_nueva.titulo}". '
-                f"Se sugiere priorizar aquella cuya fecha de entrega es más próxima.",
-            )
-            break
+    # Dos consultas de rango sobre (usuario, fechaRealizacion, fechaEntrega)
+    # traen todas las inversiones de la tarea, no solo la primera
+    pares = inversiones_de(usuario, tarea_nueva)
+    if pares:
+        enviar_sugerencia(
+            usuario,
+            "Sugerencia de optimización",
+            mensaje_inversiones(pares),
+        )
+
 
-        if (
-            tarea_nueva.fechaRealizacion > otra.fechaRealizacion
-            and tarea_nueva.fechaEntrega < otra.fechaEntrega
-        ):
-            # tarea_nueva se hace después pero se entrega antes = mal
+def sugerencias_lote(usuario, fechas, tareas):
+    """
+    Sugerencias para un lote de actividades: la sobrecarga se revisa una vez
+    por día afectado y el orden de las tareas con las consultas indexadas de
+    inversiones_de, enviando a lo sumo una sugerencia de orden por día.
+    """
+    for fecha in sorted(set(fechas)):
+        verificar_sobrecarga_dia(usuario, fecha)
+
+    dias_avisados = set()
+    for tarea in sorted(tareas, key=lambda t: t.fechaRealizacion):
+        if tarea.fechaRealizacion in dias_avisados:
+            continue
+        pares = inversiones_de(usuario, tarea)
+        if pares:
             enviar_sugerencia(
-                usuario.email,
+                usuario,
                 "Sugerencia de optimización",
-                f'La tarea "{tarea_nueva.titulo}" es más urgente que la tarea "{otra.titulo}". '
-                f"Se sugiere priorizar aquella cuya fecha de entrega es más próxima.",
+                mensaje_inversiones(pares),
             )
-            break
+            dias_avisados.add(tarea.fechaRealizacion)
 
 
-def enviar_sugerencia(email, asunto, mensaje):
-    send_mail(
-        asunto,
-        mensaje,
-        settings.EMAIL_HOST_USER,
-        [email],
-    )
+def enviar_sugerencia(usuario, asunto, mensaje):
+    # Se encola: las sugerencias del usuario dentro de la ventana salen en un solo correo
+    encolar_correo(usuario, asunto, mensaje)
@@ -5,3 +5,6 @@ class TareasConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "Apps.Tareas"
     label = "Tareas"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,136 @@
+"""
+Inversiones de prioridad entre tareas.
+
+Dos tareas están invertidas si una se realiza antes que la otra pero se
+entrega después: a.fechaRealizacion < b.fechaRealizacion y
+a.fechaEntrega > b.fechaEntrega. En ese caso b es la más urgente.
+
+Para una sola tarea basta con dos consultas de rango sobre el índice
+(usuario, fechaRealizacion, fechaEntrega), una por cada lado de la
+inversión. Para listar todas las inversiones de un rango se recorren las
+tareas ordenadas por fecha de realización. Las fechas de entrega se
+comprimen a posiciones 1..m y un árbol de Fenwick cuenta cuántas tareas ya
+vistas hay en cada una: las que se entregan después de la actual salen de
+una resta de prefijos en O(log n). Las tareas vistas se guardan en una lista
+por fecha de entrega y, para reportar pares, el mismo árbol ubica la
+siguiente fecha con tareas. El costo es O((n + k) log n) para k pares
+reportados (k está acotado por limite).
+"""
+from bisect import bisect_left
+from itertools import groupby
+from operator import itemgetter
+
+from Apps.Calendario.models import Tarea
+
+CAMPOS_INVERSION = ("id", "titulo", "fechaRealizacion", "fechaEntrega")
+MAX_INVERSIONES = 500
+
+
+def inversiones_de(usuario, tarea):
+    """
+    Inversiones en las que participa tarea (guardada o no), como lista de
+    pares (urgente, postergable).
+    """
+    tareas = Tarea.objects.filter(usuario=usuario).exclude(pk=tarea.pk).only(*CAMPOS_INVERSION)
+    # Se hacen después pero se entregan antes: son más urgentes que tarea
+    mas_urgentes = tareas.filter(
+        fechaRealizacion__gt=tarea.fechaRealizacion,
+        fechaEntrega__lt=tarea.fechaEntrega,
+    ).order_by("fechaEntrega", "id")
+    # Se hacen antes pero se entregan después: tarea es más urgente que ellas
+    postergables = tareas.filter(
+        fechaRealizacion__lt=tarea.fechaRealizacion,
+        fechaEntrega__gt=tarea.fechaEntrega,
+    ).order_by("fechaRealizacion", "id")
+
+    return [(otra, tarea) for otra in mas_urgentes] + [(tarea, otra) for otra in postergables]
+
+
+class _Fenwick:
+    """Conteos por posición 1..n con sumas de prefijo y búsqueda en O(log n)"""
+
+    def __init__(self, n):
+        self.arbol = [0] * (n + 1)
+        self.paso_mayor = 1 << (n.bit_length() - 1) if n else 0
+
+    def sumar(self, posicion, valor=1):
+        while posicion < len(self.arbol):
+            self.arbol[posicion] += valor
+            posicion += posicion & -posicion
+
+    def prefijo(self, posicion):
+        total = 0
+        while posicion > 0:
+            total += self.arbol[posicion]
+            posicion -= posicion & -posicion
+        return total
+
+    def buscar(self, orden):
+        """Menor posición cuyo prefijo alcanza orden (1 <= orden <= total)"""
+        posicion = 0
+        paso = self.paso_mayor
+        while paso:
+            siguiente = posicion + paso
+            if siguiente < len(self.arbol) and self.arbol[siguiente] < orden:
+                posicion = siguiente
+                orden -= self.arbol[siguiente]
+            paso >>= 1
+        return posicion + 1
+
+
+def detectar_inversiones(tareas, limite=MAX_INVERSIONES):
+    """
+    Recorre tareas (dicts con CAMPOS_INVERSION ordenados por
+    fechaRealizacion) y devuelve (total, pares). total cuenta todas las
+    inversiones; pares trae como máximo limite de ellas.
+    """
+    tareas = list(tareas)
+    entregas = sorted({tarea["fechaEntrega"] for tarea in tareas})
+    vistas = _Fenwick(len(entregas))
+    por_entrega = [[] for _ in range(len(entregas) + 1)]  # tareas vistas por posición
+    cantidad_vistas = 0
+    total = 0
+    pares = []
+
+    for _, grupo in groupby(tareas, key=itemgetter("fechaRealizacion")):
+        # Las del mismo día no se invierten entre sí: se agregan después de revisarlas
+        grupo = [(tarea, bisect_left(entregas, tarea["fechaEntrega"]) + 1) for tarea in grupo]
+        for tarea, posicion in grupo:
+            hasta_la_suya = vistas.prefijo(posicion)
+            posteriores = cantidad_vistas - hasta_la_suya
+            total += posteriores
+            # Las previas de entrega más tardía, de la fecha más cercana a la más lejana
+            orden = hasta_la_suya
+            while posteriores and len(pares) < limite:
+                siguiente = vistas.buscar(orden + 1)
+                for previa in por_entrega[siguiente][:limite - len(pares)]:
+                    pares.append({"urgente": tarea, "postergable": previa})
+                orden += len(por_entrega[siguiente])
+                posteriores -= len(por_entrega[siguiente])
+
+        for tarea, posicion in grupo:
+            vistas.sumar(posicion)
+            por_entrega[posicion].append(tarea)
+            cantidad_vistas += 1
+
+    return total, pares
+
+
+def inversiones_en_rango(usuario, desde=None, hasta=None, limite=MAX_INVERSIONES):
+    """Todas las inversiones entre tareas realizadas en [desde, hasta]"""
+    tareas = Tarea.objects.filter(usuario=usuario)
+    if desde:
+        tareas = tareas.filter(fechaRealizacion__gte=desde)
+    if hasta:
+        tareas = tareas.filter(fechaRealizacion__lte=hasta)
+    tareas = tareas.order_by("fechaRealizacion", "fechaEntrega", "id").values(*CAMPOS_INVERSION)
+    return detectar_inversiones(tareas.iterator(), limite)
+
+
+def mensaje_inversiones(pares):
+    """Texto de la sugerencia de orden para una lista de pares (urgente, postergable)"""
+    lineas = [
+        f'La tarea "{urgente.titulo}" es más urgente que la tarea "{postergable.titulo}".'
+        for urgente, postergable in pares
+    ]
+    return "\n".join(lineas) + " Se sugiere priorizar aquella cuya fecha de entrega es más próxima."
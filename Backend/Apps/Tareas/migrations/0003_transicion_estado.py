@@ -0,0 +1,93 @@
+# Generated by Django 5.2 on 2026-10-18 13:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def registrar_estados_actuales(apps, schema_editor):
+    # La historia anterior se perdió; cada estado actual queda como una transición
+    EstadoTarea = apps.get_model("Tareas", "EstadoTarea")
+    TransicionEstado = apps.get_model("Tareas", "TransicionEstado")
+    TransicionEstado.objects.bulk_create(
+        (
+            TransicionEstado(
+                usuario_id=estado.tarea.usuario_id,
+                tarea_id=estado.tarea_id,
+                estado_nuevo=estado.estado,
+                fecha=estado.fecha_estado,
+            )
+            for estado in EstadoTarea.objects.select_related("tarea").iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Calendario", "0013_indice_entregas"),
+        ("Tareas", "0002_alter_estadotarea_estado"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransicionEstado",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("estado_anterior", models.CharField(blank=True, max_length=20)),
+                (
+                    "estado_nuevo",
+                    models.CharField(
+                        choices=[
+                            ("inicio", "Inicio"),
+                            ("en_desarrollo", "En desarrollo"),
+                            ("finalizado", "Finalizado"),
+                            ("entregado", "Entregado"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("fecha", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "tarea",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transiciones",
+                        to="Calendario.tarea",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transiciones_estado",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["usuario", "fecha"],
+                        name="Tareas_tran_usuario_d27ba9_idx",
+                    ),
+                    models.Index(
+                        fields=["tarea", "estado_nuevo", "fecha"],
+                        name="Tareas_tran_tarea_i_99aaaf_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(registrar_estados_actuales, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils import timezone
 from Apps.Calendario.models import Tarea
 
 
@@ -17,3 +19,25 @@ class EstadoTarea(models.Model):
     def __str__(self):
         return f"{self.tarea.titulo} - {self.estado}"
 
+
+
+class TransicionEstado(models.Model):
+    """
+    Registro de solo inserción de cada cambio de estado de una tarea.
+    EstadoTarea guarda solo el estado actual; aquí queda la historia para
+    medir tiempos y entregas a tiempo. estado_anterior vacío marca el alta.
+    """
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="transiciones_estado")
+    tarea = models.ForeignKey(Tarea, on_delete=models.CASCADE, related_name="transiciones")
+    estado_anterior = models.CharField(max_length=20, blank=True)
+    estado_nuevo = models.CharField(max_length=20, choices=EstadoTarea.ESTADOS)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["usuario", "fecha"]),
+            models.Index(fields=["tarea", "estado_nuevo", "fecha"]),
+        ]
+
+    def __str__(self):
+        return f"{self.tarea_id}: {self.estado_anterior or '-'} -> {self.estado_nuevo}"
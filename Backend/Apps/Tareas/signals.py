@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from Apps.Calendario.models import Tarea
+from .models import TransicionEstado
+
+
+@receiver(post_save, sender=Tarea)
+def tarea_creada(sender, instance, created, **kwargs):
+    # El alta abre la historia de la tarea; de aquí se mide el lead time
+    if created:
+        TransicionEstado.objects.create(
+            usuario_id=instance.usuario_id, tarea=instance, estado_nuevo="inicio"
+        )
@@ -1,3 +1,267 @@
+"""
+Tests para la detección de inversiones de prioridad y el registro de
+transiciones de estado de las tareas
+"""
+import random
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from django.core import mail
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.utils import timezone
+from Apps.Calendario.models import Tarea
+from Apps.Notificacion.outbox import vaciar_outbox
+from Apps.Cola_trabajos.cola import ejecutar_pendientes
+from .inversiones import detectar_inversiones, inversiones_de
+from .models import EstadoTarea, TransicionEstado
+from .transiciones import cambiar_estado, metricas_transiciones
 
-# Create your tests here.
+User = get_user_model()
+
+
+class InversionesPrioridadTests(TestCase):
+    """Tests para inversiones_de, detectar_inversiones y /tareas/api/inversiones/"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.inicio = date(2025, 7, 1)
+
+    def crear_tarea(self, titulo, realizacion, entrega):
+        return Tarea.objects.create(
+            usuario=self.user, titulo=titulo, curso='Cálculo',
+            fechaRealizacion=self.inicio + timedelta(days=realizacion),
+            fechaEntrega=self.inicio + timedelta(days=entrega),
+            horaEntrega=time(23, 59), horaInicio=time(9, 0), horaFin=time(10, 0),
+            complejidad=2
+        )
+
+    def test_inversiones_de_encuentra_ambos_lados(self):
+        """Test: Una tarea encuentra todas sus inversiones con dos consultas"""
+        tarea = self.crear_tarea('Informe', 2, 10)
+        self.crear_tarea('Examen', 5, 6)       # más urgente que Informe
+        self.crear_tarea('Quiz', 4, 8)         # más urgente que Informe
+        self.crear_tarea('Proyecto', 0, 20)    # Informe es más urgente
+        self.crear_tarea('Lectura', 3, 15)     # sin inversión con Informe
+
+        with self.assertNumQueries(2):
+            pares = inversiones_de(self.user, tarea)
+
+        self.assertEqual(
+            [(u.titulo, p.titulo) for u, p in pares],
+            [('Examen', 'Informe'), ('Quiz', 'Informe'), ('Informe', 'Proyecto')]
+        )
+
+    def test_detectar_inversiones_coincide_con_fuerza_bruta(self):
+        """Test: El barrido reporta los mismos pares que comparar todos contra todos"""
+        azar = random.Random(7)
+        tareas = []
+        for i in range(200):
+            realizacion = self.inicio + timedelta(days=azar.randint(0, 30))
+            tareas.append({
+                'id': i,
+                'titulo': f'T{i}',
+                'fechaRealizacion': realizacion,
+                'fechaEntrega': realizacion + timedelta(days=azar.randint(0, 20)),
+            })
+        tareas.sort(key=lambda t: (t['fechaRealizacion'], t['fechaEntrega'], t['id']))
+
+        esperados = {
+            (b['id'], a['id'])
+            for a in tareas for b in tareas
+            if a['fechaRealizacion'] < b['fechaRealizacion']
+            and a['fechaEntrega'] > b['fechaEntrega']
+        }
+        total, pares = detectar_inversiones(tareas, limite=len(esperados))
+
+        self.assertEqual(total, len(esperados))
+        self.assertEqual(
+            {(p['urgente']['id'], p['postergable']['id']) for p in pares}, esperados
+        )
+
+    def test_detectar_inversiones_respeta_limite(self):
+        """Test: Con un límite se cuentan todas pero se devuelven solo algunas"""
+        tareas = [
+            {'id': i, 'titulo': f'T{i}',
+             'fechaRealizacion': self.inicio + timedelta(days=i),
+             'fechaEntrega': self.inicio + timedelta(days=50 - i)}
+            for i in range(10)
+        ]
+        total, pares = detectar_inversiones(tareas, limite=5)
+
+        self.assertEqual(total, 45)
+        self.assertEqual(len(pares), 5)
+
+    def test_detectar_inversiones_entrega_mas_cercana_primero(self):
+        """Test: Cada tarea se compara primero con las de entrega más cercana a la suya"""
+        dia = lambda n: self.inicio + timedelta(days=n)
+        tareas = [
+            {'id': 1, 'titulo': 'A', 'fechaRealizacion': dia(0), 'fechaEntrega': dia(9)},
+            {'id': 2, 'titulo': 'B', 'fechaRealizacion': dia(0), 'fechaEntrega': dia(5)},
+            {'id': 3, 'titulo': 'C', 'fechaRealizacion': dia(1), 'fechaEntrega': dia(5)},
+            {'id': 4, 'titulo': 'D', 'fechaRealizacion': dia(2), 'fechaEntrega': dia(3)},
+        ]
+        total, pares = detectar_inversiones(tareas, limite=3)
+
+        self.assertEqual(total, 4)
+        self.assertEqual(
+            [(p['urgente']['id'], p['postergable']['id']) for p in pares],
+            [(3, 1), (4, 2), (4, 3)]
+        )
+
+    def test_endpoint_lista_inversiones_del_rango(self):
+        """Test: GET /tareas/api/inversiones/ filtra por fecha de realización"""
+        self.crear_tarea('Proyecto', 0, 20)
+        self.crear_tarea('Examen', 5, 6)
+        self.crear_tarea('Fuera', 40, 41)
+        self.crear_tarea('Mismo día', 0, 1)
+
+        response = self.client.get(
+            '/tareas/api/inversiones/', {'desde': '2025-07-01', 'hasta': '2025-07-31'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 1)
+        self.assertFalse(response.data['truncado'])
+        par = response.data['inversiones'][0]
+        self.assertEqual(par['urgente']['titulo'], 'Examen')
+        self.assertEqual(par['postergable']['titulo'], 'Proyecto')
+
+    def test_endpoint_rango_invalido(self):
+        """Test: Un rango con hasta anterior a desde responde 400"""
+        response = self.client.get(
+            '/tareas/api/inversiones/', {'desde': '2025-07-31', 'hasta': '2025-07-01'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sugerencia_incluye_todas_las_inversiones(self):
+        """Test: Al crear una tarea se sugiere el orden con todas sus inversiones"""
+        self.crear_tarea('Examen', 5, 6)
+        self.crear_tarea('Quiz', 4, 8)
+        mail.outbox = []
+
+        response = self.client.post('/calendario/api/tareas/', {
+            'titulo': 'Informe', 'curso': 'Cálculo',
+            'fechaRealizacion': '2025-07-03', 'fechaEntrega': '2025-07-11',
+            'horaEntrega': '23:59', 'horaInicio': '09:00', 'horaFin': '10:00',
+            'complejidad': 2,
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ejecutar_pendientes()
+        vaciar_outbox(ahora=timezone.now() + timedelta(days=1))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('"Examen" es más urgente que la tarea "Informe"', mail.outbox[0].body)
+        self.assertIn('"Quiz" es más urgente que la tarea "Informe"', mail.outbox[0].body)
+
+
+class TransicionEstadoTests(TestCase):
+    """Tests del registro de transiciones y de /tareas/api/metricas/"""
+
+    def setUp(self):
+        """Configuración inicial para los tests"""
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def crear_tarea(self, titulo='Informe', entrega=date(2025, 7, 10)):
+        return Tarea.objects.create(
+            usuario=self.user, titulo=titulo, curso='Cálculo',
+            fechaRealizacion=entrega, fechaEntrega=entrega,
+            horaEntrega=time(23, 59), horaInicio=time(9, 0), horaFin=time(10, 0),
+            complejidad=2
+        )
+
+    def actualizar(self, tarea, estado):
+        return self.client.patch(
+            f'/tareas/api/estadoTarea/{tarea.id}/actualizarEstado/', {'estado': estado}, format='json'
+        )
+
+    def momento(self, dia, hora=10):
+        return timezone.make_aware(datetime(2025, 7, dia, hora))
+
+    def test_cada_cambio_agrega_una_transicion(self):
+        """Test: El alta y cada cambio de estado quedan registrados en orden"""
+        tarea = self.crear_tarea()
+        self.actualizar(tarea, 'en_desarrollo')
+        self.actualizar(tarea, 'finalizado')
+
+        self.assertEqual(
+            list(tarea.transiciones.order_by('id').values_list('estado_anterior', 'estado_nuevo')),
+            [('', 'inicio'), ('inicio', 'en_desarrollo'), ('en_desarrollo', 'finalizado')],
+        )
+        ultima = tarea.transiciones.latest('id')
+        self.assertEqual(ultima.fecha, EstadoTarea.objects.get(tarea=tarea).fecha_estado)
+
+    def test_transicion_invalida_no_registra(self):
+        """Test: Un salto de estado se rechaza y no deja transición"""
+        tarea = self.crear_tarea()
+
+        response = self.actualizar(tarea, 'finalizado')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], "No puedes cambiar al estado 'finalizado' desde 'inicio'")
+        self.assertEqual(tarea.transiciones.count(), 1)  # solo el alta
+
+    def test_cambio_y_transicion_en_la_misma_transaccion(self):
+        """Test: Si no se puede registrar la transición, el estado no cambia"""
+        tarea = self.crear_tarea()
+        cambiar_estado(tarea, 'en_desarrollo')
+
+        with mock.patch.object(TransicionEstado.objects, 'create', side_effect=RuntimeError('disco lleno')):
+            with self.assertRaises(RuntimeError):
+                cambiar_estado(tarea, 'finalizado')
+
+        self.assertEqual(EstadoTarea.objects.get(tarea=tarea).estado, 'en_desarrollo')
+        self.assertEqual(tarea.transiciones.latest('id').estado_nuevo, 'en_desarrollo')
+
+    def test_metricas_desde_las_transiciones(self):
+        """Test: Lead time, cycle time y a tiempo salen de la historia de cada tarea"""
+        a_tiempo = self.crear_tarea('A tiempo', entrega=date(2025, 7, 10))
+        tarde = self.crear_tarea('Tarde', entrega=date(2025, 7, 10))
+        TransicionEstado.objects.all().delete()
+        for tarea, eventos in [
+            (a_tiempo, [('', 'inicio', 1), ('inicio', 'en_desarrollo', 5), ('en_desarrollo', 'finalizado', 9)]),
+            (tarde, [('', 'inicio', 3), ('inicio', 'en_desarrollo', 9), ('en_desarrollo', 'finalizado', 12)]),
+        ]:
+            for anterior, nuevo, dia in eventos:
+                TransicionEstado.objects.create(
+                    usuario=self.user, tarea=tarea, estado_anterior=anterior,
+                    estado_nuevo=nuevo, fecha=self.momento(dia),
+                )
+
+        with self.assertNumQueries(1):
+            metricas = metricas_transiciones(self.user.pk, date(2025, 7, 1), date(2025, 7, 31))
+
+        self.assertEqual(metricas, {
+            'finalizadas': 2,
+            'a_tiempo': 1,
+            'tarde': 1,
+            'porcentaje_a_tiempo': 50.0,
+            'lead_time_horas': (8 * 24 + 9 * 24) / 2,
+            'cycle_time_horas': (4 * 24 + 3 * 24) / 2,
+        })
+
+        # El rango filtra por la fecha en que se finalizó
+        response = self.client.get('/tareas/api/metricas/', {'desde': '2025-07-10', 'hasta': '2025-07-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['finalizadas'], 1)
+        self.assertEqual(response.data['tarde'], 1)
+
+    def test_metricas_sin_tareas_finalizadas(self):
+        """Test: Sin tareas finalizadas los promedios quedan vacíos"""
+        response = self.client.get('/tareas/api/metricas/')
+
+        self.assertEqual(response.data['finalizadas'], 0)
+        self.assertIsNone(response.data['porcentaje_a_tiempo'])
+        self.assertIsNone(response.data['lead_time_horas'])
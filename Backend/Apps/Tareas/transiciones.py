@@ -0,0 +1,117 @@
+"""
+Cambios de estado de las tareas y métricas sobre su historia.
+
+cambiar_estado valida el orden de los estados, actualiza EstadoTarea y
+agrega la TransicionEstado en la misma transacción; la fila de EstadoTarea
+se bloquea para que dos cambios simultáneos no salten un paso. Las altas
+abren la historia con una transición a "inicio": la señal post_save en las
+altas de a una y registrar_altas en las que usan bulk_create.
+
+Las métricas leen solo las transiciones a "finalizado" del rango (índice
+usuario, fecha) y, por cada una, la primera transición de la tarea y su
+último paso a "en_desarrollo" (índice tarea, estado_nuevo, fecha):
+- lead time: desde el alta de la tarea (o su primera transición registrada,
+  en tareas anteriores al registro) hasta finalizar;
+- cycle time: desde que pasó a en desarrollo hasta finalizar;
+- a tiempo: finalizada el día de entrega o antes.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import EstadoTarea, TransicionEstado
+
+ORDEN_ESTADOS = ["inicio", "en_desarrollo", "finalizado", "entregado"]
+
+
+class TransicionInvalida(Exception):
+    def __init__(self, actual, nuevo):
+        self.actual = actual
+        super().__init__(f"No puedes cambiar al estado '{nuevo}' desde '{actual or 'ninguno'}'")
+
+
+def cambiar_estado(tarea, nuevo_estado):
+    """Avanza la tarea al siguiente estado y registra la transición"""
+    with transaction.atomic():
+        estado_tarea, _ = EstadoTarea.objects.select_for_update().get_or_create(tarea=tarea)
+
+        # Validar el orden lógico de los estados
+        actual = estado_tarea.estado
+        idx_actual = ORDEN_ESTADOS.index(actual) if actual in ORDEN_ESTADOS else -1
+        if ORDEN_ESTADOS.index(nuevo_estado) != idx_actual + 1:
+            raise TransicionInvalida(actual, nuevo_estado)
+
+        estado_tarea.estado = nuevo_estado
+        estado_tarea.save()
+        return TransicionEstado.objects.create(
+            usuario_id=tarea.usuario_id,
+            tarea=tarea,
+            estado_anterior=actual,
+            estado_nuevo=nuevo_estado,
+            fecha=estado_tarea.fecha_estado,
+        )
+
+
+def registrar_altas(tareas):
+    """Transición inicial de tareas creadas con bulk_create, que no emite post_save"""
+    return TransicionEstado.objects.bulk_create(
+        [
+            TransicionEstado(usuario_id=tarea.usuario_id, tarea=tarea, estado_nuevo="inicio")
+            for tarea in tareas
+        ],
+        batch_size=500,
+    )
+
+
+def _limites(desde, hasta):
+    """Rango de fechas como [inicio, fin) en la zona del proyecto, para usar el índice"""
+    inicio = timezone.make_aware(datetime.combine(desde, time.min)) if desde else None
+    fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min)) if hasta else None
+    return inicio, fin
+
+
+def _horas(inicio, fin):
+    return (fin - inicio).total_seconds() / 3600
+
+
+def _promedio(valores):
+    return round(sum(valores) / len(valores), 1) if valores else None
+
+
+def metricas_transiciones(usuario_id, desde=None, hasta=None):
+    """Lead time, cycle time y entregas a tiempo de las tareas finalizadas en el rango"""
+    inicio, fin = _limites(desde, hasta)
+    finalizadas = TransicionEstado.objects.filter(usuario_id=usuario_id, estado_nuevo="finalizado")
+    if inicio:
+        finalizadas = finalizadas.filter(fecha__gte=inicio)
+    if fin:
+        finalizadas = finalizadas.filter(fecha__lt=fin)
+
+    de_la_tarea = TransicionEstado.objects.filter(tarea=OuterRef("tarea"), fecha__lte=OuterRef("fecha"))
+    filas = finalizadas.annotate(
+        alta=Subquery(de_la_tarea.order_by("fecha").values("fecha")[:1]),
+        en_desarrollo=Subquery(
+            de_la_tarea.filter(estado_nuevo="en_desarrollo").order_by("-fecha").values("fecha")[:1]
+        ),
+    ).values_list("fecha", "alta", "en_desarrollo", "tarea__fechaEntrega")
+
+    lead, ciclo, a_tiempo, total = [], [], 0, 0
+    for fecha, alta, en_desarrollo, entrega in filas:
+        total += 1
+        if timezone.localdate(fecha) <= entrega:
+            a_tiempo += 1
+        if alta and alta < fecha:
+            lead.append(_horas(alta, fecha))
+        if en_desarrollo:
+            ciclo.append(_horas(en_desarrollo, fecha))
+
+    return {
+        "finalizadas": total,
+        "a_tiempo": a_tiempo,
+        "tarde": total - a_tiempo,
+        "porcentaje_a_tiempo": round(a_tiempo * 100 / total, 1) if total else None,
+        "lead_time_horas": _promedio(lead),
+        "cycle_time_horas": _promedio(ciclo),
+    }
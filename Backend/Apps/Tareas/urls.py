@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import ActualizarEstadoPorTareaView, OcultarTareaView
-from .views import TareasCompletadasPendientesView
+from .views import TareasCompletadasPendientesView, InversionesPrioridadView, MetricasTareasView
 
 
 urlpatterns = [
@@ -8,6 +8,8 @@ urlpatterns = [
     path('api/visibilidadTarea/<int:tarea_id>/ocultarTarea/', OcultarTareaView.as_view(), name='ocultar-tarea'), # PATCH http://localhost:8000/tareas/api/visibilidadTarea/<tarea_id>/ocultarTarea/
 
     path('api/tareas-completadas-pendientes/', TareasCompletadasPendientesView.as_view(), name='tareas-completadas-pendientes'),
+    path('api/inversiones/', InversionesPrioridadView.as_view(), name='inversiones-prioridad'), # GET http://localhost:8000/tareas/api/inversiones/?desde=&hasta=
+    path('api/metricas/', MetricasTareasView.as_view(), name='metricas-tareas'), # GET http://localhost:8000/tareas/api/metricas/?desde=&hasta=
 
 
 
@@ -5,6 +5,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 
 from rest_framework.permissions import IsAuthenticated
+from Apps.Calendario.services import parsear_rango_fechas
+from Apps.Calendario.versiones import responder_condicional
+from .inversiones import inversiones_en_rango, MAX_INVERSIONES
+from django.db.models import Count, Q
+from Apps.Estadisticas.cache import estadisticas_en_cache
+from .transiciones import cambiar_estado, metricas_transiciones, TransicionInvalida
 
 
 class ActualizarEstadoPorTareaView(APIView):
@@ -20,23 +26,14 @@ class ActualizarEstadoPorTareaView(APIView):
         if nuevo_estado not in dict(EstadoTarea.ESTADOS):
             return Response({'error': 'Estado no válido'}, status=400)
 
-        estado_tarea, creado = EstadoTarea.objects.get_or_create(tarea=tarea)
+        # El cambio y su TransicionEstado se guardan en la misma transacción
+        try:
+            cambiar_estado(tarea, nuevo_estado)
+        except TransicionInvalida as error:
+            return Response({'error': str(error)}, status=400)
 
-        # Validar el orden lógico de los estados
-        orden = ['inicio', 'en_desarrollo', 'finalizado', 'entregado']
-        actual = estado_tarea.estado
-        idx_actual = orden.index(actual) if actual in orden else -1
-        idx_nuevo = orden.index(nuevo_estado)
+        return Response({'mensaje': f"Estado actualizado a '{nuevo_estado}'"})
 
-        if idx_nuevo == idx_actual + 1:
-            estado_tarea.estado = nuevo_estado
-            estado_tarea.save()           
-            return Response({'mensaje': f"Estado actualizado a '{nuevo_estado}'"})
-        else:
-            return Response({
-                'error': f"No puedes cambiar al estado '{nuevo_estado}' desde '{actual or 'ninguno'}'"
-            }, status=400)
-                            
 
 class OcultarTareaView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -56,21 +53,44 @@ class TareasCompletadasPendientesView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        tareas = Tarea.objects.filter(usuario=request.user, visible=True)
-        completadas = 0
-        pendientes = 0
-
-        for tarea in tareas:
-            try:
-                estado = EstadoTarea.objects.get(tarea=tarea)
-                if estado.estado in ['finalizado', 'entregado']:
-                    completadas += 1
-                elif estado.estado in ['inicio', 'en_desarrollo']:
-                    pendientes += 1
-            except EstadoTarea.DoesNotExist:
-                pendientes += 1  # Si no tiene estado, la consideramos pendiente
-
-        return Response({
-            "completadas": completadas,
-            "pendientes": pendientes
-        })
\ No newline at end of file
+        def contar():
+            # Si no tiene estado, la consideramos pendiente
+            return Tarea.objects.filter(usuario=request.user, visible=True).aggregate(
+                completadas=Count('id', filter=Q(estado_actual__estado__in=['finalizado', 'entregado'])),
+                pendientes=Count('id', filter=Q(estado_actual__isnull=True)
+                                 | Q(estado_actual__estado__in=['inicio', 'en_desarrollo'])),
+            )
+
+        return Response(estadisticas_en_cache(request.user.pk, "completadas_pendientes", contar))
+
+
+class InversionesPrioridadView(APIView):
+    """Pares de tareas que se realizan en orden inverso a su fecha de entrega"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        desde, hasta = parsear_rango_fechas(request.query_params)
+
+        def construir_respuesta():
+            total, pares = inversiones_en_rango(request.user, desde, hasta)
+            return Response({
+                "total": total,
+                "truncado": total > MAX_INVERSIONES,
+                "inversiones": pares,
+            })
+
+        return responder_condicional(request, ("tareas",), construir_respuesta)
+
+
+class MetricasTareasView(APIView):
+    """Lead time, cycle time y entregas a tiempo según el registro de transiciones"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        desde, hasta = parsear_rango_fechas(request.query_params)
+        return Response(metricas_transiciones(request.user.pk, desde, hasta))
+
+
+# Operación	                      Método HTTP	                    Ruta completa
+# Inversiones de prioridad	         GET	          http://localhost:8000/tareas/api/inversiones/?desde=2025-07-01&hasta=2025-07-31
+# Métricas de tareas	             GET	          http://localhost:8000/tareas/api/metricas/?desde=2025-07-01&hasta=2025-07-31
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 12:56
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Usuarios", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="perfilusuario",
+            name="hora_fin_dia",
+            field=models.TimeField(default=datetime.time(22, 0)),
+        ),
+        migrations.AddField(
+            model_name="perfilusuario",
+            name="hora_inicio_dia",
+            field=models.TimeField(default=datetime.time(7, 0)),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Usuarios", "0002_horario_despierto"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="perfilusuario",
+            name="clave_ics",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
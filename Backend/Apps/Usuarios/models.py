@@ -1,3 +1,5 @@
+from datetime import time
+
 from django.db import models
 from django.conf import settings
 
@@ -11,5 +13,12 @@ class PerfilUsuario(models.Model):
     anti_procrastinacion = models.BooleanField(default=False)
     sugerencias = models.BooleanField(default=True)
 
+    # Horario en que el usuario está despierto; acota la búsqueda de huecos libres
+    hora_inicio_dia = models.TimeField(default=time(7, 0))
+    hora_fin_dia = models.TimeField(default=time(22, 0))
+
+    # Va firmado en la URL del feed .ics; cambiarlo revoca los enlaces anteriores
+    clave_ics = models.CharField(max_length=32, blank=True)
+
     def __str__(self):
         return f'Perfil de {self.usuario.username}'
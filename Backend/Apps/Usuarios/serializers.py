@@ -31,4 +31,19 @@ class UsuarioPersonalizadoSerializer(serializers.ModelSerializer):
 class FotoPerfilSerializer(serializers.ModelSerializer):
     class Meta:
         model = PerfilUsuario
-        fields = ['foto_perfil']
\ No newline at end of file
+        fields = ['foto_perfil']
+
+
+class HorarioDespiertoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PerfilUsuario
+        fields = ['hora_inicio_dia', 'hora_fin_dia']
+
+    def validate(self, data):
+        inicio = data.get('hora_inicio_dia', getattr(self.instance, 'hora_inicio_dia', None))
+        fin = data.get('hora_fin_dia', getattr(self.instance, 'hora_fin_dia', None))
+        if inicio and fin and inicio >= fin:
+            raise serializers.ValidationError(
+                {'hora_fin_dia': 'Debe ser posterior a hora_inicio_dia.'}
+            )
+        return data
@@ -2,10 +2,11 @@ from django.urls import path
 from .views import UserMeView
 from .views import UserMeView
 from .views import UserMeView
-from .views import FotoPerfilView
+from .views import FotoPerfilView, HorarioDespiertoView
 
 urlpatterns = [
     path('me/', UserMeView.as_view(), name='user-me'),
     path('me/foto/', FotoPerfilView.as_view(), name='user-foto'),
+    path('me/horario/', HorarioDespiertoView.as_view(), name='user-horario'),
 
 ]
@@ -4,7 +4,8 @@ from rest_framework.permissions import IsAuthenticated
 from .serializers import UsuarioPersonalizadoSerializer
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework import status
-from .serializers import FotoPerfilSerializer
+from .serializers import FotoPerfilSerializer, HorarioDespiertoSerializer
+from .models import PerfilUsuario
 class UserMeView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -49,4 +50,20 @@ class FotoPerfilView(APIView):
         if serializer.is_valid():
             serializer.save()
             return Response({"foto_perfil": serializer.data['foto_perfil']})
-        return Response(serializer.errors, status=400)
\ No newline at end of file
+        return Response(serializer.errors, status=400)
+
+
+class HorarioDespiertoView(APIView):
+    """Horas en que el usuario está despierto (acotan los huecos libres del calendario)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        perfil, _ = PerfilUsuario.objects.get_or_create(usuario=request.user)
+        return Response(HorarioDespiertoSerializer(perfil).data)
+
+    def patch(self, request):
+        perfil, _ = PerfilUsuario.objects.get_or_create(usuario=request.user)
+        serializer = HorarioDespiertoSerializer(perfil, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
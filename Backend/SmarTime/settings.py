@@ -59,6 +59,8 @@ INSTALLED_APPS = [
     "Apps.Notificacion",
     "Apps.Usuarios",
     "Apps.Aprendizaje_adaptativo",
+    "Apps.Estadisticas",
+    "Apps.Cola_trabajos",
 ]
 
 AUTH_USER_MODEL = "Autenticacion.UsuarioPersonalizado"
@@ -102,6 +104,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # En archivo y no en memoria: los procesos del resumen global abren
+        # su propia conexión y tienen que ver la misma base de pruebas
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -174,6 +179,38 @@ EMAIL_HOST_USER = "smartime.ux@gmail.com"
 EMAIL_HOST_PASSWORD = "irushwniqnjmibws"
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Outbox: los avisos de un usuario que llegan dentro de esta ventana se
+# agrupan en un solo correo
+OUTBOX_VENTANA_SEGUNDOS = 300
+OUTBOX_TAMANO_LOTE = 100
+OUTBOX_MAX_INTENTOS = 5
+# Conexiones SMTP en paralelo para los envíos masivos
+CORREO_CONEXIONES_SMTP = 4
+
+# Workers de la cola de trabajos (manage.py run_workers)
+COLA_TRABAJOS_PROCESOS = 1
+COLA_TRABAJOS_HILOS = 2
+# Caché de estadísticas por usuario. Con un backend compartido (Redis,
+# Memcached) en CACHES, el cálculo único por usuario vale entre procesos.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "smartime",
+    }
+}
+ESTADISTICAS_CACHE_SEGUNDOS = 600
+# Procesos para el resumen global nocturno de todos los usuarios (resumen_global).
+# Con 1 los bloques de usuarios se agregan en el mismo proceso. Para repartirlos
+# en varios, subirlo (p. ej. a los núcleos libres del servidor): cada proceso
+# abre su propia conexión, así que rinde con muchos usuarios y una base que
+# atienda lecturas en paralelo. Para una sola corrida: resumen_global --procesos N
+ESTADISTICAS_GLOBAL_PROCESOS = 1
+
+# Trabajos periódicos (manage.py run_scheduler). PROGRAMACION cambia el cron
+# de una tarea por nombre, p. ej. {"recordatorio_matutino": "30 6 * * *"}
+PROGRAMADOR_ESPERA = 30
+PROGRAMACION = {}
+
 
 # CORS
 CORS_ALLOW_ALL_ORIGINS = False
@@ -26,7 +26,7 @@ urlpatterns = [
     path("calendario/", include("Apps.Calendario.urls")),
     path("tareas/", include("Apps.Tareas.urls")),
     path("estadisticas/", include("Apps.Estadisticas.urls")),
-    path("notificacion/", include("Apps.Notificacion.urls")),
     path('usuarios/', include('Apps.Usuarios.urls')),
     path('aprendizaje_adaptativo/', include('Apps.Aprendizaje_adaptativo.urls')),
+    path('cola/', include('Apps.Cola_trabajos.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
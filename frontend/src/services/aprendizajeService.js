@@ -1,5 +1,6 @@
 // src/services/aprendizajeService.js
 import apiClient from './apiClient';
+import { getTodasLasPaginas } from './paginacion';
 
 const APRENDIZAJE_BASE_PATH = '/aprendizaje_adaptativo';
 
@@ -71,8 +72,7 @@ export const getCursosYTemas = async () => {
  */
 export const getTemasDificultad = async () => {
   try {
-    const response = await apiClient.get(`${APRENDIZAJE_BASE_PATH}/tema-dificultad/`);
-    return response.data;
+    return await getTodasLasPaginas(`${APRENDIZAJE_BASE_PATH}/tema-dificultad/`);
   } catch (error) {
     console.error('Error al obtener temas con dificultad:', error);
     throw error;
@@ -99,3 +99,17 @@ export const asignarDificultadTema = async (tema_id, dificultad, metodo_estudio)
   }
 };
 
+
+/**
+ * Obtener la adherencia al plan de estudio (minutos planificados vs completados)
+ * @param {Object} rango - { desde, hasta, ventana } en formato YYYY-MM-DD; ventana en días
+ */
+export const getAdherenciaEstudio = async (rango = {}) => {
+  try {
+    const response = await apiClient.get(`${APRENDIZAJE_BASE_PATH}/adherencia/`, { params: rango });
+    return response.data;
+  } catch (error) {
+    console.error('Error al obtener la adherencia al plan de estudio:', error);
+    throw error;
+  }
+};
@@ -1,11 +1,12 @@
 // src/services/calendarService.js
 import apiClient from './apiClient';
+import { getTodasLasPaginas } from './paginacion';
+
+// Los listados aceptan un rango opcional { desde: 'YYYY-MM-DD', hasta: 'YYYY-MM-DD' }
+// para traer solo la ventana visible del calendario, y se descargan por páginas.
 
 // --- TAREAS ---
-export const getTareas = async () => {
-  const response = await apiClient.get('/calendario/api/tareas/');
-  return response.data;
-};
+export const getTareas = async (rango = {}) => getTodasLasPaginas('/calendario/api/tareas/', rango);
 
 export const createTarea = async (data) => {
   const response = await apiClient.post('/calendario/api/tareas/', data);
@@ -23,10 +24,7 @@ export const deleteTarea = async (id) => {
 };
 
 // --- CLASES ---
-export const getClases = async () => {
-  const response = await apiClient.get('/calendario/api/clases/');
-  return response.data;
-};
+export const getClases = async (rango = {}) => getTodasLasPaginas('/calendario/api/clases/', rango);
 
 export const createClase = async (data) => {
   const response = await apiClient.post('/calendario/api/clases/', data);
@@ -44,10 +42,7 @@ export const deleteClase = async (id) => {
 };
 
 // --- ESTUDIOS ---
-export const getEstudios = async () => {
-  const response = await apiClient.get('/calendario/api/estudios/');
-  return response.data;
-};
+export const getEstudios = async (rango = {}) => getTodasLasPaginas('/calendario/api/estudios/', rango);
 
 export const createEstudio = async (data) => {
   const response = await apiClient.post('/calendario/api/estudios/', data);
@@ -65,10 +60,7 @@ export const deleteEstudio = async (id) => {
 };
 
 // --- ACTIVIDADES NO ACADÉMICAS ---
-export const getActividadesNoAcademicas = async () => {
-  const response = await apiClient.get('/calendario/api/actividadesNoAcademicas/');
-  return response.data;
-};
+export const getActividadesNoAcademicas = async (rango = {}) => getTodasLasPaginas('/calendario/api/actividadesNoAcademicas/', rango);
 
 export const createActividadNoAcademica = async (data) => {
   const response = await apiClient.post('/calendario/api/actividadesNoAcademicas/', data);
@@ -90,3 +82,57 @@ export const getActividadesDeHoy = async () => {
   return response.data;
 };
 
+
+// Agenda unificada (tareas, clases, estudios, actividades y sesiones de estudio)
+// ya ordenada por fecha y hora de inicio.
+export const getAgenda = async (desde, hasta) => {
+  const response = await apiClient.get('/calendario/api/agenda/', { params: { desde, hasta } });
+  return response.data;
+};
+
+// Sin token devuelve todo el calendario; con el token de la respuesta anterior, solo los cambios
+export const getCambiosCalendario = async (token) => {
+  const params = token ? { since: token } : {};
+  const response = await apiClient.get('/calendario/api/sync/', { params });
+  return response.data;
+};
+
+// operaciones: [{ operacion: 'crear' | 'actualizar' | 'eliminar', tipo: 'tareas' | 'clases' | ..., id?, datos? }]
+export const aplicarLote = async (operaciones) => {
+  const response = await apiClient.post('/calendario/api/lote/', { operaciones });
+  return response.data;
+};
+
+export const getConflictos = async (desde, hasta) => {
+  const response = await apiClient.get('/calendario/api/conflictos/', { params: { desde, hasta } });
+  return response.data;
+};
+
+// URL privada del feed .ics para suscribirse desde Google Calendar, Outlook, etc.
+export const getEnlaceICS = async () => {
+  const response = await apiClient.get('/calendario/api/ics/enlace/');
+  return response.data.url;
+};
+
+// tipo: 'clases' (por defecto) o 'actividadesNoAcademicas' para los VEVENT del archivo
+export const importarICS = async (archivo, tipo = 'clases') => {
+  const formData = new FormData();
+  formData.append('archivo', archivo);
+  formData.append('tipo', tipo);
+  const response = await apiClient.post('/calendario/api/ics/importar/', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+  });
+  return response.data;
+};
+
+// Ventanas libres de al menos `duracion` minutos dentro del horario despierto del usuario
+export const getHuecosLibres = async (desde, hasta, duracion = 30) => {
+  const response = await apiClient.get('/calendario/api/huecos/', { params: { desde, hasta, duracion } });
+  return response.data;
+};
+
+// Carga por día para el mapa de calor; sin rango devuelve el mes actual
+export const getCargaDiaria = async (rango = {}) => {
+  const response = await apiClient.get('/calendario/api/carga/', { params: rango });
+  return response.data;
+};
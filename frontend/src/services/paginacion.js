@@ -0,0 +1,29 @@
+// src/services/paginacion.js
+import apiClient from './apiClient';
+
+const TAMANO_PAGINA = 200;
+
+/**
+ * Recorre un listado paginado por cursor página a página.
+ * Cada iteración entrega el arreglo `results` de una página.
+ */
+export async function* iterarPaginas(url, params = {}, tamanoPagina = TAMANO_PAGINA) {
+  let response = await apiClient.get(url, { params: { ...params, page_size: tamanoPagina } });
+  yield response.data.results;
+
+  while (response.data.next) {
+    response = await apiClient.get(response.data.next);
+    yield response.data.results;
+  }
+}
+
+/**
+ * Obtiene el listado completo pidiéndolo en páginas sucesivas.
+ */
+export const getTodasLasPaginas = async (url, params = {}, tamanoPagina = TAMANO_PAGINA) => {
+  const filas = [];
+  for await (const pagina of iterarPaginas(url, params, tamanoPagina)) {
+    filas.push(...pagina);
+  }
+  return filas;
+};
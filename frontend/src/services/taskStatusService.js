@@ -5,3 +5,21 @@ export const getTaskStatusPercentages = async () => {
   const response = await apiClient.get('/estado-tareas-semanal/'); // ajusta si tu endpoint tiene otra ruta
   return response.data;
 };
+
+// Pares de tareas cuya fecha de realización va en orden inverso a su entrega
+export const getInversionesPrioridad = async (rango = {}) => {
+  const response = await apiClient.get('/tareas/api/inversiones/', { params: rango });
+  return response.data;
+};
+
+// Tareas cerradas a tiempo, tarde y abiertas por semana (últimas N semanas)
+export const getSerieEstadoTareas = async (semanas = 8) => {
+  const response = await apiClient.get('/estadisticas/api/serie/', { params: { semanas } });
+  return response.data;
+};
+
+// Lead time, cycle time y porcentaje de tareas finalizadas a tiempo en un rango
+export const getMetricasTareas = async (rango = {}) => {
+  const response = await apiClient.get('/tareas/api/metricas/', { params: rango });
+  return response.data;
+};